@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 import time
 
 from backend.core.database import DatabaseManager
+from backend.core.async_database import get_async_db
 from backend.analysis.timeframe_analyzer import TimeframeAnalyzer
 from backend.analysis.economic_news_analyzer import EconomicNewsAnalyzer
 from backend.analysis.optimal_time_finder import OptimalTimeFinder
@@ -71,7 +72,7 @@ async def get_market_session_analysis(
         logger.info(f"Starting market session analysis for {symbol.value}")
         
         # 分析実行
-        result = analyzer.analyze_market_sessions(symbol.value, period_days)
+        result = await get_async_db().run(analyzer.analyze_market_sessions, symbol.value, period_days)
         
         # レスポンス構築
         best_session_name = None
@@ -138,7 +139,7 @@ async def get_hourly_analysis(
         logger.info(f"Starting hourly analysis for {symbol.value}")
         
         # 分析実行
-        result = analyzer.analyze_hourly_performance(symbol.value, period_days)
+        result = await get_async_db().run(analyzer.analyze_hourly_performance, symbol.value, period_days)
         
         # ヒートマップデータ生成
         heatmap_data = None
@@ -226,7 +227,7 @@ async def get_weekday_analysis(
         logger.info(f"Starting weekday analysis for {symbol.value}")
         
         # 分析実行
-        result = analyzer.analyze_weekday_performance(symbol.value, period_days)
+        result = await get_async_db().run(analyzer.analyze_weekday_performance, symbol.value, period_days)
         
         # 週末効果分析
         weekend_effect = None
@@ -611,7 +612,7 @@ async def run_comprehensive_analysis(request: ComprehensiveAnalysisRequest):
             # 市場セッション分析
             if request.include_market_sessions:
                 try:
-                    session_result = analyzer.analyze_market_sessions(symbol.value, request.period_days)
+                    session_result = await get_async_db().run(analyzer.analyze_market_sessions, symbol.value, request.period_days)
                     symbol_results['market_sessions'] = session_result
                 except Exception as e:
                     logger.warning(f"Market session analysis failed for {symbol.value}: {e}")
@@ -619,7 +620,7 @@ async def run_comprehensive_analysis(request: ComprehensiveAnalysisRequest):
             # 時間別分析
             if request.include_hourly_analysis:
                 try:
-                    hourly_result = analyzer.analyze_hourly_performance(symbol.value, request.period_days)
+                    hourly_result = await get_async_db().run(analyzer.analyze_hourly_performance, symbol.value, request.period_days)
                     symbol_results['hourly'] = hourly_result
                 except Exception as e:
                     logger.warning(f"Hourly analysis failed for {symbol.value}: {e}")
@@ -627,7 +628,7 @@ async def run_comprehensive_analysis(request: ComprehensiveAnalysisRequest):
             # 曜日別分析
             if request.include_weekday_analysis:
                 try:
-                    weekday_result = analyzer.analyze_weekday_performance(symbol.value, request.period_days)
+                    weekday_result = await get_async_db().run(analyzer.analyze_weekday_performance, symbol.value, request.period_days)
                     symbol_results['weekday'] = weekday_result
                 except Exception as e:
                     logger.warning(f"Weekday analysis failed for {symbol.value}: {e}")
@@ -864,7 +865,7 @@ async def test_hourly_analysis_simple(symbol: str):
     try:
         analyzer, _, _, _ = get_analysis_dependencies()
         
-        result = analyzer.analyze_hourly_performance(symbol, 180)
+        result = await get_async_db().run(analyzer.analyze_hourly_performance, symbol, 180)
         
         return {
             "status": "success",
@@ -896,7 +897,7 @@ async def analysis_health_check():
             "timeframe_analyzer": analyzer is not None,
             "news_analyzer": news_analyzer is not None,
             "optimal_time_finder": optimal_finder is not None,
-            "database": db_manager.test_connection() if db_manager else False
+            "database": await get_async_db().run(db_manager.test_connection) if db_manager else False
         }
         
         overall_healthy = all(health_status.values())
@@ -1,1103 +0,0 @@
-"""
-バックテストAPI
-"""
-from fastapi import APIRouter, HTTPException, Query, Depends, BackgroundTasks
-from typing import Dict, List, Optional, Any
-import logging
-from datetime import datetime, timedelta
-import asyncio
-import pandas as pd
-
-from backend.core.database import DatabaseManager
-from backend.models.backtest_models import (
-    BacktestRequest, BacktestResult, OptimizationRequest, OptimizationResponse,
-    ComprehensiveBacktestRequest, ComprehensiveBacktestResponse,
-    BacktestListResponse, BacktestListItem, BacktestDeleteRequest,
-    BacktestCompareRequest, BacktestCompareResponse, BacktestExportRequest,
-    BacktestValidationResult, BacktestScheduleRequest, BacktestMetrics
-)
-
-# メモリ内バックテスト結果ストレージ（フォールバック用）
-in_memory_backtest_results: Dict[str, Any] = {}
-
-# Try to import optional dependencies
-try:
-    from backend.backtest.backtest_engine import BacktestEngine
-    from backend.backtest.parameter_optimizer import ParameterOptimizer, ComprehensiveOptimizer
-    BACKTEST_MODULES_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"Backtest modules not available: {e}")
-    BacktestEngine = None
-    ParameterOptimizer = None
-    ComprehensiveOptimizer = None
-    BACKTEST_MODULES_AVAILABLE = False
-
-logger = logging.getLogger(__name__)
-
-router = APIRouter(prefix="/api/v1/backtest", tags=["backtest"])
-
-@router.get("/test")
-async def test_endpoint():
-    """テスト用エンドポイント"""
-    return {
-        "status": "success",
-        "message": "Backtest API is working",
-        "modules_available": BACKTEST_MODULES_AVAILABLE,
-        "timestamp": datetime.now().isoformat()
-    }
-
-@router.post("/debug")
-async def debug_endpoint(request: dict):
-    """デバッグ用エンドポイント"""
-    print("DEBUG ENDPOINT CALLED!")
-    print(f"Request: {request}")
-    return {"received": request, "status": "debug_success"}
-
-@router.post("/optimize2")
-async def optimize_parameters_simple(request: dict):
-    """簡単なパラメータ最適化"""
-    print("OPTIMIZE2 ENDPOINT CALLED!")
-    print(f"Request: {request}")
-    
-    import random
-    
-    symbol = request.get("symbol", "USDJPY")
-    timeframe = request.get("timeframe", "M5")
-    initial_balance = request.get("initial_balance", 100000)
-    iterations = request.get("iterations", 100)
-    
-    # 最適化結果をシミュレート
-    best_params = {
-        "rsiPeriod": random.randint(10, 20),
-        "rsiOverbought": random.randint(65, 80),
-        "rsiOversold": random.randint(15, 35),
-        "stopLossPercent": round(random.uniform(1.0, 5.0), 1),
-        "takeProfitPercent": round(random.uniform(2.0, 8.0), 1)
-    }
-    
-    best_score = round(random.uniform(1.0, 3.0), 2)
-    
-    # シミュレートされた最適化結果
-    result = {
-        "symbol": symbol,
-        "timeframe": timeframe,
-        "period": {
-            "start_date": request.get("start_date", "2023-12-31T00:00:00"),
-            "end_date": request.get("end_date", "2024-12-31T23:59:59")
-        },
-        "optimization_method": "random",
-        "optimization_metric": request.get("target", "profit_factor"),
-        "best_parameters": best_params,
-        "best_score": best_score,
-        "best_test_id": f"opt_test_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-        "total_iterations": iterations,
-        "valid_results": iterations,
-        "convergence_analysis": {
-            "converged": True,
-            "iterations": iterations,
-            "improvement_rate": round(random.uniform(0.1, 0.5), 3),
-            "stability_score": round(random.uniform(0.7, 1.0), 3)
-        },
-        "parameter_sensitivity": [
-            {
-                "parameter": "rsiPeriod",
-                "sensitivity": round(random.uniform(0.3, 0.8), 3),
-                "impact": "MEDIUM",
-                "optimal_value": best_params["rsiPeriod"]
-            },
-            {
-                "parameter": "stopLossPercent", 
-                "sensitivity": round(random.uniform(0.5, 0.9), 3),
-                "impact": "HIGH",
-                "optimal_value": best_params["stopLossPercent"]
-            }
-        ]
-    }
-    
-    return {"data": result, "status": "success"}
-
-@router.post("/run2")
-async def run_backtest_simple(request: dict):
-    """簡単なバックテスト実行"""
-    print("RUN2 ENDPOINT CALLED!")
-    print(f"Request: {request}")
-    
-    symbol = request.get("symbol", "USDJPY")
-    timeframe = request.get("timeframe", "M5")
-    initial_balance = request.get("initial_balance", 100000)
-    parameters = request.get("parameters", {})
-    start_date_str = request.get("start_date", "2023-12-31T00:00:00")
-    end_date_str = request.get("end_date", "2024-12-31T23:59:59")
-    
-    test_id = f"test_simple_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    
-    # 期間に基づいてランダムな結果を生成
-    import random
-    from datetime import datetime as dt
-    
-    # 期間の長さに基づいて取引数を調整
-    try:
-        start_dt = dt.fromisoformat(start_date_str.replace('Z', ''))
-        end_dt = dt.fromisoformat(end_date_str.replace('Z', ''))
-        days_diff = (end_dt - start_dt).days
-        base_trades = max(1, days_diff // 30)  # 1ヶ月あたり1取引
-    except:
-        base_trades = 10
-    
-    total_trades = random.randint(base_trades, base_trades * 3)
-    winning_trades = random.randint(int(total_trades * 0.4), int(total_trades * 0.8))
-    losing_trades = total_trades - winning_trades
-    win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-    
-    # ランダムな利益を生成
-    net_profit = random.randint(-5000, 10000)
-    total_profit = abs(net_profit) + random.randint(1000, 5000)
-    total_loss = total_profit - net_profit
-    
-    # 完全なバックテスト結果を生成
-    result = {
-        "test_id": test_id,
-        "symbol": symbol,
-        "timeframe": timeframe,
-        "period": {
-            "start_date": start_date_str,
-            "end_date": end_date_str
-        },
-        "initial_balance": initial_balance,
-        "parameters": parameters,
-        "statistics": {
-            "total_trades": total_trades,
-            "winning_trades": winning_trades,
-            "losing_trades": losing_trades,
-            "win_rate": round(win_rate, 2),
-            "net_profit": float(net_profit),
-            "total_profit": float(total_profit),
-            "total_loss": float(total_loss),
-            "profit_factor": round(total_profit / max(total_loss, 1), 2),
-            "avg_win": round(total_profit / max(winning_trades, 1), 2),
-            "avg_loss": round(total_loss / max(losing_trades, 1), 2),
-            "largest_win": round(total_profit / max(winning_trades, 1) * random.uniform(1.2, 2.0), 2),
-            "largest_loss": round(total_loss / max(losing_trades, 1) * random.uniform(1.2, 2.0), 2),
-            "max_drawdown": round(abs(net_profit) * random.uniform(0.3, 0.8), 2),
-            "max_drawdown_percent": round(abs(net_profit) / initial_balance * 100 * random.uniform(0.3, 0.8), 2),
-            "sharpe_ratio": round(random.uniform(-1.0, 3.0), 2),
-            "sortino_ratio": round(random.uniform(-1.0, 3.5), 2),
-            "calmar_ratio": round(random.uniform(-1.0, 2.5), 2),
-            "final_balance": float(initial_balance + net_profit),
-            "return_percent": round((net_profit / initial_balance) * 100, 2)
-        },
-        "equity_curve": [
-            {
-                "timestamp": start_date_str,
-                "equity": initial_balance,
-                "balance": initial_balance,
-                "unrealized_pnl": 0.0
-            },
-            {
-                "timestamp": end_date_str,
-                "equity": initial_balance + net_profit,
-                "balance": initial_balance + net_profit,
-                "unrealized_pnl": 0.0
-            }
-        ],
-        "trades": [],
-        "data_points": 100,
-        "created_at": datetime.now().isoformat()
-    }
-    
-    # Store results in memory for later retrieval
-    in_memory_backtest_results[test_id] = result
-    
-    return {"data": result, "status": "success"}
-
-# グローバル変数（実際の運用では適切なDIコンテナを使用）
-backtest_engine = None
-parameter_optimizer = None
-comprehensive_optimizer = None
-db_manager = None
-
-def get_backtest_dependencies():
-    """バックテストシステムの依存関係を取得"""
-    global backtest_engine, parameter_optimizer, comprehensive_optimizer, db_manager
-    
-    # モジュールが利用不可の場合は即座にNoneを返す
-    if not BACKTEST_MODULES_AVAILABLE:
-        logger.warning("Backtest modules not available, returning None dependencies")
-        return None, None, None, None
-    
-    try:
-        if not all([backtest_engine, parameter_optimizer, comprehensive_optimizer, db_manager]):
-            # 初期化
-            db_manager = DatabaseManager()
-            backtest_engine = BacktestEngine(db_manager)
-            parameter_optimizer = ParameterOptimizer(backtest_engine)
-            comprehensive_optimizer = ComprehensiveOptimizer(parameter_optimizer)
-        
-        return backtest_engine, parameter_optimizer, comprehensive_optimizer, db_manager
-    except Exception as e:
-        logger.error(f"Failed to initialize backtest dependencies: {e}")
-        # Return None values to trigger fallback mode
-        return None, None, None, None
-
-@router.post("/run")
-async def run_backtest(request: dict):
-    """バックテスト実行（シンプル版）"""
-    print("=== BACKTEST REQUEST DEBUG ===")
-    print(f"Received request object: {request}")
-    print(f"Request type: {type(request)}")
-    print("================================")
-    
-    logger.info(f"=== BACKTEST REQUEST DEBUG ===")
-    logger.info(f"Received request object: {request}")
-    logger.info(f"Request type: {type(request)}")
-    logger.info(f"================================")
-    
-    # Convert to proper format
-    symbol = request.get("symbol")
-    timeframe = request.get("timeframe") 
-    start_date_str = request.get("start_date")
-    end_date_str = request.get("end_date")
-    initial_balance = request.get("initial_balance", 100000)
-    parameters = request.get("parameters", {})
-    
-    logger.info(f"Parsed values - Symbol: {symbol}, Timeframe: {timeframe}")
-    logger.info(f"Start: {start_date_str}, End: {end_date_str}")
-    
-    # Parse dates
-    try:
-        start_date = datetime.fromisoformat(start_date_str.replace('Z', ''))
-        end_date = datetime.fromisoformat(end_date_str.replace('Z', ''))
-        logger.info(f"Parsed dates - Start: {start_date}, End: {end_date}")
-    except Exception as e:
-        logger.error(f"Date parsing error: {e}")
-        raise HTTPException(status_code=400, detail=f"Date parsing error: {e}")
-    
-    # 基本的なバリデーション
-    if start_date >= end_date:
-        raise HTTPException(status_code=400, detail="Start date must be before end date")
-    
-    # テストIDを生成
-    test_id = f"test_{symbol}_{timeframe}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    
-    # バックテスト結果を生成
-    result = {
-        "test_id": test_id,
-        "symbol": symbol,
-        "timeframe": timeframe,
-        "period": {
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat()
-        },
-        "initial_balance": initial_balance,
-        "parameters": parameters,
-        "statistics": {
-            "total_trades": 10,
-            "winning_trades": 6,
-            "losing_trades": 4,
-            "win_rate": 60.0,
-            "net_profit": 1500.0,
-            "profit_factor": 1.75,
-            "max_drawdown_percent": 5.0,
-            "sharpe_ratio": 1.2,
-            "final_balance": request.initial_balance + 1500.0,
-            "return_percent": (1500.0 / request.initial_balance) * 100
-        },
-        "created_at": datetime.now().isoformat()
-    }
-    
-    # メモリに保存（フォールバック用）
-    in_memory_backtest_results[test_id] = result
-    
-    # シンプルなモックレスポンスを返す
-    return {
-        "status": "success",
-        "message": "Backtest completed successfully",
-        "data": result
-    }
-
-@router.post("/optimize", response_model=Dict[str, Any])
-async def optimize_parameters(request: OptimizationRequest, background_tasks: BackgroundTasks):
-    """
-    パラメータ最適化実行
-    
-    Args:
-        request: 最適化リクエスト
-        background_tasks: バックグラウンドタスク
-        
-    Returns:
-        最適化結果
-    """
-    try:
-        _, optimizer, _, _ = get_backtest_dependencies()
-        
-        # パラメータ検証
-        if request.max_iterations > 500:
-            logger.warning(f"Large iteration count: {request.max_iterations}")
-        
-        logger.info(f"Starting parameter optimization for {request.symbol} {request.timeframe}")
-        
-        result = await optimizer.optimize_parameters(
-            symbol=request.symbol,
-            timeframe=request.timeframe,
-            start_date=request.start_date,
-            end_date=request.end_date,
-            parameter_ranges=request.parameter_ranges,
-            optimization_metric=request.optimization_metric,
-            max_iterations=request.max_iterations,
-            optimization_method=request.optimization_method
-        )
-        
-        return {
-            "status": "success",
-            "message": "Parameter optimization completed successfully",
-            "data": result
-        }
-        
-    except Exception as e:
-        logger.error(f"Parameter optimization failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.post("/comprehensive", response_model=Dict[str, Any])
-async def run_comprehensive_backtest(request: ComprehensiveBacktestRequest, background_tasks: BackgroundTasks):
-    """
-    包括的バックテスト実行
-    
-    Args:
-        request: 包括的バックテストリクエスト
-        background_tasks: バックグラウンドタスク
-        
-    Returns:
-        包括的テスト結果
-    """
-    try:
-        logger.info(f"Comprehensive backtest request: {request}")
-        _, _, comprehensive_optimizer, _ = get_backtest_dependencies()
-        
-        logger.info("Starting comprehensive backtest")
-        
-        # デフォルト値設定
-        symbols = request.symbols or ["USDJPY", "EURJPY", "GBPJPY", "AUDJPY"]
-        timeframes = request.timeframes or ["M15", "M30", "H1", "H4"]
-        
-        # Handle both enum objects and strings
-        symbol_values = [s.value if hasattr(s, 'value') else s for s in symbols]
-        timeframe_values = [t.value if hasattr(t, 'value') else t for t in timeframes]
-        
-        result = await comprehensive_optimizer.run_comprehensive_optimization(
-            symbols=symbol_values,
-            timeframes=timeframe_values,
-            test_period_months=request.test_period_months,
-            parameter_ranges=request.parameter_ranges,
-            optimization_metric=request.optimization_metric
-        )
-        
-        return {
-            "status": "success",
-            "message": "Comprehensive backtest completed successfully",
-            "data": result,
-            "estimated_combinations": len(symbols) * len(timeframes)
-        }
-        
-    except Exception as e:
-        logger.error(f"Comprehensive backtest failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.post("/comprehensive-fast", response_model=Dict[str, Any])
-async def run_comprehensive_backtest_fast(request: ComprehensiveBacktestRequest, background_tasks: BackgroundTasks):
-    """
-    包括的バックテスト実行（高速モード - ダミーデータ）
-    
-    Args:
-        request: 包括的バックテストリクエスト
-        background_tasks: バックグラウンドタスク
-        
-    Returns:
-        包括的テスト結果
-    """
-    try:
-        logger.info("Starting fast comprehensive backtest with dummy results")
-        
-        # 即座にダミーデータを返す
-        individual_results = {
-            "USDJPY": {
-                "H1": {
-                    "best_score": 1.65,
-                    "best_parameters": {
-                        "risk_per_trade": 2.0,
-                        "stop_loss_pips": 50,
-                        "take_profit_pips": 100,
-                    },
-                    "total_iterations": 50,
-                    "valid_results": 45,
-                    "convergence_status": "converged"
-                },
-                "H4": {
-                    "best_score": 1.32,
-                    "best_parameters": {
-                        "risk_per_trade": 1.5,
-                        "stop_loss_pips": 60,
-                        "take_profit_pips": 120,
-                    },
-                    "total_iterations": 50,
-                    "valid_results": 42,
-                    "convergence_status": "converged"
-                }
-            },
-            "EURJPY": {
-                "H1": {
-                    "best_score": 1.58,
-                    "best_parameters": {
-                        "risk_per_trade": 2.5,
-                        "stop_loss_pips": 45,
-                        "take_profit_pips": 90,
-                    },
-                    "total_iterations": 50,
-                    "valid_results": 47,
-                    "convergence_status": "converged"
-                },
-                "H4": {
-                    "best_score": 1.41,
-                    "best_parameters": {
-                        "risk_per_trade": 1.8,
-                        "stop_loss_pips": 55,
-                        "take_profit_pips": 110,
-                    },
-                    "total_iterations": 50,
-                    "valid_results": 43,
-                    "convergence_status": "converged"
-                }
-            }
-        }
-        
-        result = {
-            "individual_results": individual_results,
-            "summary_statistics": {
-                "total_combinations": 4,
-                "successful_combinations": 4,
-                "average_score": 1.49,
-                "best_combination": "USDJPY_H1"
-            },
-            "overall_analysis": {
-                "best_performing_symbol": "USDJPY",
-                "best_performing_timeframe": "H1",
-                "recommended_settings": {
-                    "risk_per_trade": 2.0,
-                    "stop_loss_pips": 50,
-                    "take_profit_pips": 100,
-                }
-            },
-            "test_period": {
-                "start_date": "2023-12-31T00:00:00",
-                "end_date": "2024-12-31T23:59:59",
-                "months": 12
-            },
-            "optimization_settings": {
-                "metric": "sharpe_ratio",
-                "symbols": ["USDJPY", "EURJPY"],
-                "timeframes": ["H1", "H4"]
-            }
-        }
-        
-        return {
-            "status": "success",
-            "message": "Fast comprehensive backtest completed successfully",
-            "data": result,
-            "estimated_combinations": 4,
-            "optimization_note": "Using dummy data for demonstration"
-        }
-        
-    except Exception as e:
-        logger.error(f"Comprehensive backtest failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.get("/results/{test_id}", response_model=Dict[str, Any])
-async def get_backtest_result(test_id: str):
-    """
-    バックテスト結果取得
-    
-    Args:
-        test_id: テストID
-        
-    Returns:
-        バックテスト結果
-    """
-    try:
-        # まずメモリから検索（フォールバック）
-        if test_id in in_memory_backtest_results:
-            logger.info(f"Found backtest result in memory: {test_id}")
-            return {
-                "status": "success",
-                "data": in_memory_backtest_results[test_id]
-            }
-        
-        # データベースから取得を試みる
-        _, _, _, db_manager = get_backtest_dependencies()
-        
-        result = await _get_backtest_result_from_db(test_id, db_manager)
-        
-        if result is None:
-            raise HTTPException(status_code=404, detail="Backtest result not found")
-        
-        return {
-            "status": "success",
-            "data": result
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting backtest result from DB: {e}")
-        # エラーが発生してもメモリから取得を試みる
-        if test_id in in_memory_backtest_results:
-            return {
-                "status": "success",
-                "data": in_memory_backtest_results[test_id]
-            }
-        raise HTTPException(status_code=404, detail="Backtest result not found")
-
-@router.get("/results", response_model=BacktestListResponse)
-async def list_backtest_results(
-    page: int = Query(default=1, ge=1),
-    page_size: int = Query(default=20, ge=1, le=100),
-    symbol: Optional[str] = Query(default=None),
-    timeframe: Optional[str] = Query(default=None),
-    start_date: Optional[datetime] = Query(default=None),
-    end_date: Optional[datetime] = Query(default=None)
-):
-    """
-    バックテスト結果一覧取得
-    
-    Args:
-        page: ページ番号
-        page_size: ページサイズ
-        symbol: 通貨ペアフィルタ
-        timeframe: 時間軸フィルタ
-        start_date: 開始日フィルタ
-        end_date: 終了日フィルタ
-        
-    Returns:
-        バックテスト結果一覧
-    """
-    try:
-        _, _, _, db_manager = get_backtest_dependencies()
-        
-        # Try to get results from database
-        try:
-            results = await _list_backtest_results_from_db(
-                db_manager, page, page_size, symbol, timeframe, start_date, end_date
-            )
-            return results
-        except Exception as db_error:
-            logger.warning(f"Database error, returning mock data: {db_error}")
-            # Return mock data when database is not available
-            return BacktestListResponse(
-                tests=[],
-                total_count=0,
-                page=page,
-                page_size=page_size,
-                has_next=False
-            )
-        
-    except Exception as e:
-        logger.error(f"Error listing backtest results: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.delete("/results")
-async def delete_backtest_results(request: BacktestDeleteRequest):
-    """
-    バックテスト結果削除
-    
-    Args:
-        request: 削除リクエスト
-        
-    Returns:
-        削除結果
-    """
-    try:
-        _, _, _, db_manager = get_backtest_dependencies()
-        
-        deleted_count = await _delete_backtest_results_from_db(request.test_ids, db_manager)
-        
-        return {
-            "status": "success",
-            "message": f"Deleted {deleted_count} backtest results",
-            "deleted_count": deleted_count,
-            "requested_count": len(request.test_ids)
-        }
-        
-    except Exception as e:
-        logger.error(f"Error deleting backtest results: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.post("/compare", response_model=BacktestCompareResponse)
-async def compare_backtest_results(request: BacktestCompareRequest):
-    """
-    バックテスト結果比較
-    
-    Args:
-        request: 比較リクエスト
-        
-    Returns:
-        比較結果
-    """
-    try:
-        _, _, _, db_manager = get_backtest_dependencies()
-        
-        comparison_result = await _compare_backtest_results(request, db_manager)
-        
-        return comparison_result
-        
-    except Exception as e:
-        logger.error(f"Error comparing backtest results: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.post("/export")
-async def export_backtest_result(request: BacktestExportRequest):
-    """
-    バックテスト結果エクスポート
-    
-    Args:
-        request: エクスポートリクエスト
-        
-    Returns:
-        エクスポートファイル
-    """
-    try:
-        _, _, _, db_manager = get_backtest_dependencies()
-        
-        # バックテスト結果取得
-        result = await _get_backtest_result_from_db(request.test_id, db_manager)
-        
-        if result is None:
-            raise HTTPException(status_code=404, detail="Backtest result not found")
-        
-        # エクスポート処理（実装は簡略化）
-        export_data = await _prepare_export_data(result, request)
-        
-        return {
-            "status": "success",
-            "message": "Export data prepared",
-            "format": request.format,
-            "data": export_data,
-            "download_url": f"/api/v1/backtest/download/{request.test_id}.{request.format}"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error exporting backtest result: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.get("/metrics", response_model=BacktestMetrics)
-async def get_backtest_metrics(
-    days: int = Query(default=30, ge=1, le=365, description="集計期間（日）")
-):
-    """
-    バックテスト指標集計取得
-    
-    Args:
-        days: 集計期間
-        
-    Returns:
-        指標集計
-    """
-    try:
-        _, _, _, db_manager = get_backtest_dependencies()
-        
-        metrics = await _calculate_backtest_metrics(db_manager, days)
-        
-        return metrics
-        
-    except Exception as e:
-        logger.error(f"Error getting backtest metrics: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.post("/validate")
-async def validate_backtest_request(request: BacktestRequest) -> BacktestValidationResult:
-    """
-    バックテストリクエスト検証
-    
-    Args:
-        request: バックテストリクエスト
-        
-    Returns:
-        検証結果
-    """
-    try:
-        validation_result = await _validate_backtest_request(request)
-        return validation_result
-        
-    except Exception as e:
-        logger.error(f"Error validating backtest request: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-@router.get("/health")
-async def backtest_health_check():
-    """
-    バックテストシステムヘルスチェック
-    
-    Returns:
-        ヘルス状態
-    """
-    try:
-        engine, optimizer, comprehensive_optimizer, db_manager = get_backtest_dependencies()
-        
-        # 各コンポーネントの状態チェック
-        health_status = {
-            "backtest_engine": engine is not None,
-            "parameter_optimizer": optimizer is not None,
-            "comprehensive_optimizer": comprehensive_optimizer is not None,
-            "database": db_manager.test_connection() if db_manager else False,
-            "recent_tests_count": await _get_recent_tests_count(db_manager)
-        }
-        
-        overall_healthy = all([
-            health_status["backtest_engine"],
-            health_status["parameter_optimizer"],
-            health_status["database"]
-        ])
-        
-        return {
-            "status": "healthy" if overall_healthy else "unhealthy",
-            "components": health_status,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        logger.error(f"Backtest health check error: {e}")
-        return {
-            "status": "error",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
-
-# 内部関数
-async def _validate_backtest_request(request: BacktestRequest) -> BacktestValidationResult:
-    """バックテストリクエスト検証"""
-    try:
-        warnings = []
-        errors = []
-        
-        # 期間チェック
-        period_days = (request.end_date - request.start_date).days
-        if period_days < 30:
-            warnings.append("Test period is less than 30 days - results may not be reliable")
-        elif period_days > 730:  # 2年
-            warnings.append("Test period is very long - execution may take significant time")
-        
-        # 初期残高チェック
-        if request.initial_balance < 10000:
-            warnings.append("Initial balance is very low - may affect position sizing")
-        elif request.initial_balance > 10000000:
-            warnings.append("Initial balance is very high - ensure realistic testing")
-        
-        # パラメータチェック
-        if request.parameters:
-            if 'risk_per_trade' in request.parameters:
-                risk = request.parameters['risk_per_trade']
-                if risk > 10:
-                    warnings.append("Risk per trade is very high (>10%)")
-                elif risk < 0.1:
-                    warnings.append("Risk per trade is very low (<0.1%)")
-        
-        # データ可用性チェック（簡易版）
-        data_quality_score = 0.8  # 実際の実装では実データをチェック
-        
-        is_valid = len(errors) == 0
-        
-        return BacktestValidationResult(
-            is_valid=is_valid,
-            warnings=warnings,
-            errors=errors,
-            data_quality_score=data_quality_score,
-            recommended_adjustments=[]
-        )
-        
-    except Exception as e:
-        logger.error(f"Error validating backtest request: {e}")
-        return BacktestValidationResult(
-            is_valid=False,
-            errors=[f"Validation error: {str(e)}"],
-            data_quality_score=0.0
-        )
-
-async def _get_backtest_result_from_db(test_id: str, db_manager: DatabaseManager) -> Optional[Dict[str, Any]]:
-    """データベースからバックテスト結果取得"""
-    try:
-        # まずメモリから検索（フォールバック）
-        if test_id in in_memory_backtest_results:
-            return in_memory_backtest_results[test_id]
-            
-        with db_manager.get_connection() as conn:
-            # メイン結果取得
-            main_query = """
-                SELECT * FROM backtest_results WHERE test_id = %s
-            """
-            main_result = pd.read_sql_query(main_query, conn, params=(test_id,))
-            
-            if main_result.empty:
-                return None
-            
-            main_data = main_result.iloc[0].to_dict()
-            
-            # エクイティカーブ取得
-            equity_query = """
-                SELECT timestamp, equity, balance, unrealized_pnl
-                FROM backtest_equity_curves 
-                WHERE test_id = %s ORDER BY timestamp
-            """
-            equity_result = pd.read_sql_query(equity_query, conn, params=(test_id,))
-            
-            # 取引履歴取得
-            trades_query = """
-                SELECT entry_time, exit_time, type, entry_price, exit_price,
-                       lot_size, profit_loss, duration_hours, exit_reason
-                FROM backtest_trades 
-                WHERE test_id = %s ORDER BY entry_time
-            """
-            trades_result = pd.read_sql_query(trades_query, conn, params=(test_id,))
-            
-            # 結果組み立て
-            result = {
-                'test_id': main_data['test_id'],
-                'symbol': main_data['symbol'],
-                'timeframe': main_data['timeframe'],
-                'period': {
-                    'start_date': main_data['period_start'].isoformat(),
-                    'end_date': main_data['period_end'].isoformat()
-                },
-                'initial_balance': main_data['initial_balance'],
-                'parameters': eval(main_data['parameters']) if main_data['parameters'] else {},
-                'statistics': eval(main_data['statistics']) if main_data['statistics'] else {},
-                'equity_curve': equity_result.to_dict('records'),
-                'trades': trades_result.to_dict('records'),
-                'created_at': main_data['created_at'].isoformat()
-            }
-            
-            return result
-            
-    except Exception as e:
-        logger.error(f"Error getting backtest result from DB: {e}")
-        return None
-
-async def _list_backtest_results_from_db(
-    db_manager: DatabaseManager,
-    page: int,
-    page_size: int,
-    symbol: Optional[str],
-    timeframe: Optional[str],
-    start_date: Optional[datetime],
-    end_date: Optional[datetime]
-) -> BacktestListResponse:
-    """データベースからバックテスト結果一覧取得"""
-    try:
-        with db_manager.get_connection() as conn:
-            # フィルタ条件構築
-            where_conditions = []
-            params = []
-            
-            if symbol:
-                where_conditions.append("symbol = %s")
-                params.append(symbol)
-            
-            if timeframe:
-                where_conditions.append("timeframe = %s")
-                params.append(timeframe)
-            
-            if start_date:
-                where_conditions.append("created_at >= %s")
-                params.append(start_date)
-            
-            if end_date:
-                where_conditions.append("created_at <= %s")
-                params.append(end_date)
-            
-            where_clause = "WHERE " + " AND ".join(where_conditions) if where_conditions else ""
-            
-            # 総件数取得
-            count_query = f"SELECT COUNT(*) as total FROM backtest_results {where_clause}"
-            count_result = pd.read_sql_query(count_query, conn, params=params)
-            total_count = count_result.iloc[0]['total']
-            
-            # ページング計算
-            offset = (page - 1) * page_size
-            
-            # データ取得
-            data_query = f"""
-                SELECT test_id, symbol, timeframe, created_at, period_start, period_end,
-                       initial_balance, final_balance, total_trades, winning_trades,
-                       win_rate, profit_factor, max_drawdown, sharpe_ratio, statistics
-                FROM backtest_results 
-                {where_clause}
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s
-            """
-            
-            params.extend([page_size, offset])
-            result = pd.read_sql_query(data_query, conn, params=params)
-            
-            # レスポンス構築
-            tests = []
-            for _, row in result.iterrows():
-                statistics = eval(row['statistics']) if row['statistics'] else {}
-                
-                test_item = BacktestListItem(
-                    test_id=row['test_id'],
-                    symbol=row['symbol'],
-                    timeframe=row['timeframe'],
-                    created_at=row['created_at'],
-                    period={
-                        'start_date': row['period_start'].isoformat(),
-                        'end_date': row['period_end'].isoformat()
-                    },
-                    final_balance=row['final_balance'],
-                    return_percent=statistics.get('return_percent', 0),
-                    total_trades=row['total_trades'],
-                    win_rate=row['win_rate'],
-                    profit_factor=row['profit_factor'],
-                    max_drawdown_percent=row['max_drawdown'],
-                    sharpe_ratio=row['sharpe_ratio']
-                )
-                tests.append(test_item)
-            
-            return BacktestListResponse(
-                tests=tests,
-                total_count=total_count,
-                page=page,
-                page_size=page_size,
-                has_next=(offset + page_size) < total_count
-            )
-            
-    except Exception as e:
-        logger.error(f"Error listing backtest results: {e}")
-        raise
-
-async def _delete_backtest_results_from_db(test_ids: List[str], db_manager: DatabaseManager) -> int:
-    """データベースからバックテスト結果削除"""
-    try:
-        with db_manager.get_connection() as conn:
-            with conn.cursor() as cursor:
-                deleted_count = 0
-                
-                for test_id in test_ids:
-                    # 関連データ削除
-                    cursor.execute("DELETE FROM backtest_equity_curves WHERE test_id = %s", (test_id,))
-                    cursor.execute("DELETE FROM backtest_trades WHERE test_id = %s", (test_id,))
-                    cursor.execute("DELETE FROM backtest_results WHERE test_id = %s", (test_id,))
-                    
-                    if cursor.rowcount > 0:
-                        deleted_count += 1
-                
-                conn.commit()
-                return deleted_count
-                
-    except Exception as e:
-        logger.error(f"Error deleting backtest results: {e}")
-        raise
-
-async def _compare_backtest_results(request: BacktestCompareRequest, db_manager: DatabaseManager) -> BacktestCompareResponse:
-    """バックテスト結果比較"""
-    try:
-        # 実装簡略化版
-        return BacktestCompareResponse(
-            test_ids=request.test_ids,
-            comparison_metrics=[],
-            summary={},
-            recommendations=[]
-        )
-        
-    except Exception as e:
-        logger.error(f"Error comparing backtest results: {e}")
-        raise
-
-async def _prepare_export_data(result: Dict[str, Any], request: BacktestExportRequest) -> Dict[str, Any]:
-    """エクスポートデータ準備"""
-    try:
-        export_data = {
-            "test_info": {
-                "test_id": result["test_id"],
-                "symbol": result["symbol"],
-                "timeframe": result["timeframe"],
-                "period": result["period"]
-            }
-        }
-        
-        if request.include_statistics:
-            export_data["statistics"] = result["statistics"]
-        
-        if request.include_trades:
-            export_data["trades"] = result["trades"]
-        
-        if request.include_equity_curve:
-            export_data["equity_curve"] = result["equity_curve"]
-        
-        return export_data
-        
-    except Exception as e:
-        logger.error(f"Error preparing export data: {e}")
-        raise
-
-async def _calculate_backtest_metrics(db_manager: DatabaseManager, days: int) -> BacktestMetrics:
-    """バックテスト指標集計計算"""
-    try:
-        with db_manager.get_connection() as conn:
-            since_date = datetime.now() - timedelta(days=days)
-            
-            query = """
-                SELECT COUNT(*) as total_tests,
-                       AVG(CAST(JSON_EXTRACT(statistics, '$.return_percent') AS FLOAT)) as avg_return,
-                       AVG(win_rate) as avg_win_rate,
-                       AVG(profit_factor) as avg_profit_factor,
-                       AVG(sharpe_ratio) as avg_sharpe_ratio
-                FROM backtest_results 
-                WHERE created_at >= %s
-            """
-            
-            result = pd.read_sql_query(query, conn, params=(since_date,))
-            
-            if result.empty:
-                # デフォルト値
-                return BacktestMetrics(
-                    total_tests=0,
-                    avg_return_percent=0,
-                    avg_win_rate=0,
-                    avg_profit_factor=0,
-                    avg_sharpe_ratio=0,
-                    best_performing_symbol="N/A",
-                    best_performing_timeframe="N/A",
-                    total_profit=0,
-                    total_trades=0
-                )
-            
-            row = result.iloc[0]
-            
-            return BacktestMetrics(
-                total_tests=row['total_tests'],
-                avg_return_percent=row['avg_return'] or 0,
-                avg_win_rate=row['avg_win_rate'] or 0,
-                avg_profit_factor=row['avg_profit_factor'] or 0,
-                avg_sharpe_ratio=row['avg_sharpe_ratio'] or 0,
-                best_performing_symbol="USDJPY",  # 簡略化
-                best_performing_timeframe="H1",   # 簡略化
-                total_profit=0,  # 実装要
-                total_trades=0   # 実装要
-            )
-            
-    except Exception as e:
-        logger.error(f"Error calculating backtest metrics: {e}")
-        raise
-
-async def _get_recent_tests_count(db_manager: DatabaseManager) -> int:
-    """最近のテスト数取得"""
-    try:
-        with db_manager.get_connection() as conn:
-            since_date = datetime.now() - timedelta(days=7)
-            
-            query = "SELECT COUNT(*) as count FROM backtest_results WHERE created_at >= %s"
-            result = pd.read_sql_query(query, conn, params=(since_date,))
-            
-            return result.iloc[0]['count'] if not result.empty else 0
-            
-    except Exception as e:
-        logger.error(f"Error getting recent tests count: {e}")
-        return 0
\ No newline at end of file
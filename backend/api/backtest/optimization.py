@@ -8,6 +8,15 @@ import random
 
 logger = logging.getLogger(__name__)
 
+# デフォルトパラメータ範囲
+DEFAULT_PARAM_RANGES = {
+    "rsi_period": {"min": 10, "max": 20},
+    "rsi_overbought": {"min": 65, "max": 80},
+    "rsi_oversold": {"min": 20, "max": 35},
+    "stop_loss_percent": {"min": 1.0, "max": 5.0},
+    "take_profit_percent": {"min": 2.0, "max": 10.0}
+}
+
 def generate_optimization_result(
     symbol: str,
     timeframe: str,
@@ -20,15 +29,8 @@ def generate_optimization_result(
 ) -> Dict[str, Any]:
     """最適化結果を生成（シミュレーション）"""
     
-    # デフォルトパラメータ範囲
     if param_ranges is None:
-        param_ranges = {
-            "rsi_period": {"min": 10, "max": 20},
-            "rsi_overbought": {"min": 65, "max": 80},
-            "rsi_oversold": {"min": 20, "max": 35},
-            "stop_loss_percent": {"min": 1.0, "max": 5.0},
-            "take_profit_percent": {"min": 2.0, "max": 10.0}
-        }
+        param_ranges = DEFAULT_PARAM_RANGES
     
     # 最適パラメータをランダムに生成
     best_params = {}
@@ -7,6 +7,8 @@ from datetime import datetime
 import logging
 
 from core.database import DatabaseManager
+from core.async_database import get_async_db
+from core.backtest_results import BacktestResultStore
 from core.progress_tracker import progress_tracker
 from models.backtest_models import (
     BacktestRequest, BacktestResult, OptimizationRequest, OptimizationResponse,
@@ -20,6 +22,8 @@ from .validators import (
     validate_backtest_request,
     validate_comprehensive_request,
     validate_optimization_request,
+    validate_walk_forward_request,
+    validate_portfolio_request,
     get_available_instruments
 )
 from utils.backtest_period_calculator import BacktestPeriodCalculator
@@ -36,13 +40,20 @@ logger = logging.getLogger(__name__)
 # Try to import optional dependencies
 try:
     from backtest.backtest_engine import BacktestEngine
-    from backtest.parameter_optimizer import ParameterOptimizer, ComprehensiveOptimizer
+    from backtest.parameter_optimizer import ParameterOptimizer, ComprehensiveOptimizer, DEFAULT_PARAMETER_RANGES
+    from backtest.executor import create_executor
+    from backtest.walk_forward import WalkForwardBacktester
+    from backtest.portfolio import PortfolioBacktester
     BACKTEST_MODULES_AVAILABLE = True
 except ImportError as e:
     logger.warning(f"Backtest modules not available: {e}")
     BacktestEngine = None
     ParameterOptimizer = None
     ComprehensiveOptimizer = None
+    DEFAULT_PARAMETER_RANGES = None
+    create_executor = None
+    WalkForwardBacktester = None
+    PortfolioBacktester = None
     BACKTEST_MODULES_AVAILABLE = False
 
 router = APIRouter(prefix="/api/v1/backtest", tags=["backtest"])
@@ -385,27 +396,114 @@ async def run_backtest_simple(request: dict):
     """Simple backtest execution (old endpoint compatibility)"""
     return await run_backtest(request)
 
-@router.post("/optimize")
-async def optimize_parameters(request: dict):
-    """Parameter optimization"""
-    logger.info(f"Optimizing parameters with request: {request}")
+@router.post("/walk-forward")
+async def run_walk_forward_backtest(request: dict):
+    """Run walk-forward backtest (retrain on rolling or anchored windows, test out of sample)"""
+    test_id = f"walk_forward_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    logger.info(f"Running walk-forward backtest with request: {request}")
     
     try:
         # Validation
-        validated = validate_optimization_request(request)
+        validated = validate_walk_forward_request(request)
+        
+        engine, _, _, _ = get_backtest_dependencies()
+        if engine is None:
+            raise HTTPException(status_code=503, detail="Backtest modules not available")
+        
+        log_backtest_start(test_id, validated)
         
-        # Generate optimization results
-        result = generate_optimization_result(
+        result = await WalkForwardBacktester(engine, validated['max_workers']).run(
             symbol=validated['symbol'],
             timeframe=validated['timeframe'],
             start_date=validated['start_date'],
             end_date=validated['end_date'],
+            parameters=validated['parameters'],
+            initial_balance=validated['initial_balance'],
+            train_bars=validated['train_bars'],
+            test_bars=validated['test_bars'],
+            anchored=validated['anchored'],
+            warm_start=validated['warm_start']
+        )
+        
+        log_backtest_complete(test_id, result)
+        
+        return {"data": result, "status": "success"}
+        
+    except HTTPException as e:
+        log_backtest_error(test_id, e, validated if 'validated' in locals() else request)
+        raise e
+    except Exception as e:
+        logger.error(f"Walk-forward backtest error: {e}")
+        log_backtest_error(test_id, e, validated if 'validated' in locals() else request)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/portfolio")
+async def run_portfolio_backtest(request: dict):
+    """Run portfolio backtest (several symbols sharing one balance and risk limits)"""
+    test_id = f"portfolio_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    logger.info(f"Running portfolio backtest with request: {request}")
+    
+    try:
+        # Validation
+        validated = validate_portfolio_request(request)
+        
+        engine, _, _, _ = get_backtest_dependencies()
+        if engine is None:
+            raise HTTPException(status_code=503, detail="Backtest modules not available")
+        
+        log_backtest_start(test_id, validated)
+        
+        result = await PortfolioBacktester(engine).run(
+            symbols=validated['symbols'],
+            timeframe=validated['timeframe'],
+            start_date=validated['start_date'],
+            end_date=validated['end_date'],
+            parameters=validated['parameters'],
             initial_balance=validated['initial_balance'],
-            optimization_target=validated['target_metric'],
-            iterations=validated['iterations'],
-            param_ranges=validated['param_ranges']
+            risk_settings=validated['risk_settings']
         )
         
+        log_backtest_complete(test_id, result)
+        
+        return {"data": result, "status": "success"}
+        
+    except HTTPException as e:
+        log_backtest_error(test_id, e, validated if 'validated' in locals() else request)
+        raise e
+    except Exception as e:
+        logger.error(f"Portfolio backtest error: {e}")
+        log_backtest_error(test_id, e, validated if 'validated' in locals() else request)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/optimize")
+async def optimize_parameters(request: dict):
+    """Parameter optimization"""
+    logger.info(f"Optimizing parameters with request: {request}")
+    
+    try:
+        # Validation
+        validated = validate_optimization_request(request)
+        
+        # First try actual optimization
+        try:
+            result = await _run_parameter_optimization(validated)
+        except Exception as e:
+            logger.error(f"Real optimization error: {e}")
+            logger.info("Fallback: Generating simulated optimization result")
+            
+            # Fallback: Generate simulated optimization results
+            result = generate_optimization_result(
+                symbol=validated['symbol'],
+                timeframe=validated['timeframe'],
+                start_date=validated['start_date'],
+                end_date=validated['end_date'],
+                initial_balance=validated['initial_balance'],
+                optimization_target=validated['target_metric'],
+                iterations=validated['iterations'],
+                param_ranges=validated['param_ranges']
+            )
+            result["is_real_backtest"] = False
+        
         return {"data": result, "status": "success"}
         
     except HTTPException as e:
@@ -414,6 +512,52 @@ async def optimize_parameters(request: dict):
         logger.error(f"Optimization error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# optimization_method → ParameterOptimizer の手法
+OPTIMIZER_METHODS = {
+    'grid_search': 'grid',
+    'random_search': 'random',
+    'bayesian': 'bayesian'
+}
+
+async def _run_parameter_optimization(validated: dict) -> Dict[str, Any]:
+    """Run ParameterOptimizer with the requested trial executor"""
+    import time
+    
+    engine, _, _, _ = get_backtest_dependencies()
+    if engine is None:
+        raise RuntimeError("Backtest modules not available")
+    if validated['optimization_method'] not in OPTIMIZER_METHODS:
+        raise ValueError(f"Optimization method not supported by ParameterOptimizer: {validated['optimization_method']}")
+    
+    start_time = time.time()
+    executor = create_executor(validated['executor'], validated['max_workers'])
+    try:
+        optimizer = ParameterOptimizer(engine, executor=executor)
+        result = await optimizer.optimize_parameters(
+            symbol=validated['symbol'],
+            timeframe=validated['timeframe'],
+            start_date=validated['start_date'],
+            end_date=validated['end_date'],
+            # Fall back to engine-level ranges (the simulator ranges are not read by BacktestEngine)
+            parameter_ranges=validated['param_ranges'] or DEFAULT_PARAMETER_RANGES,
+            optimization_metric=validated['target_metric'],
+            max_iterations=validated['iterations'],
+            optimization_method=OPTIMIZER_METHODS[validated['optimization_method']]
+        )
+    finally:
+        executor.shutdown()
+    
+    if not result.get('best_parameters'):
+        raise Exception("No valid results were generated from real optimization")
+    
+    result.update({
+        "test_id": f"opt_{validated['symbol']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        "execution_time": round(time.time() - start_time, 2),
+        "created_at": datetime.now().isoformat(),
+        "is_real_backtest": True
+    })
+    return result
+
 @router.post("/optimize2")
 async def optimize_parameters_simple(request: dict):
     """Simple parameter optimization (old endpoint compatibility)"""
@@ -533,13 +677,23 @@ async def get_backtest_result(test_id: str):
     result = get_stored_result(test_id)
     if result:
         return {"data": result, "status": "success"}
+
+    # Results saved by BacktestEngine (backtest_results catalog)
+    _, _, _, db = get_backtest_dependencies()
+    if db is not None:
+        try:
+            result = await get_async_db().run(BacktestResultStore(db).load, test_id)
+        except Exception as e:
+            logger.warning(f"Database error loading backtest result {test_id}: {e}")
+        if result:
+            return {"data": result, "status": "success"}
+
+    # Check if test is still in progress
+    progress_data = progress_tracker.get_progress(test_id)
+    if progress_data and progress_data.get("status") == "running":
+        raise HTTPException(status_code=202, detail="Backtest still in progress")
     else:
-        # Check if test is still in progress
-        progress_data = progress_tracker.get_progress(test_id)
-        if progress_data and progress_data.get("status") == "running":
-            raise HTTPException(status_code=202, detail="Backtest still in progress")
-        else:
-            raise HTTPException(status_code=404, detail="Backtest result not found")
+        raise HTTPException(status_code=404, detail="Backtest result not found")
 
 @router.get("/list")
 async def list_backtest_results(
@@ -548,53 +702,78 @@ async def list_backtest_results(
     symbol: Optional[str] = None,
     timeframe: Optional[str] = None,
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="前ページの next_cursor"),
+    sort: str = Query("created_at", regex="^(created_at|return_percent|sharpe_ratio|profit_factor|max_drawdown|win_rate|total_trades|final_balance)$"),
+    order: str = Query("desc", regex="^(asc|desc)$"),
+    count: str = Query("exact", regex="^(exact|estimate|none)$")
 ):
-    """Get list of backtest results"""
+    """
+    Get list of backtest results
+    
+    Saved results are paged from the backtest_results catalog with a keyset cursor
+    (page is only used when no cursor is given). Results held only in memory are
+    listed ahead of them on the first page. If the database is unavailable, the
+    in-memory results are paged instead.
+    """
     try:
-        # Get results from completed_results (in-memory storage)
-        logger.info(f"[LIST DEBUG] completed_results keys: {list(completed_results.keys())}")
-        logger.info(f"[LIST DEBUG] completed_results length: {len(completed_results)}")
+        memory_results = _list_memory_results(symbol, timeframe)
         
-        all_results = []
-        
-        for test_id, result_data in completed_results.items():
+        _, _, _, db = get_backtest_dependencies()
+        if db is not None:
             try:
-                # Create list item format
-                list_item = {
-                    "test_id": test_id,
-                    "test_type": result_data.get("test_type", "comprehensive"),
-                    "created_at": result_data.get("created_at", ""),
-                    "status": "completed",
-                    "symbols": result_data.get("configurations", {}).get("symbols", []),
-                    "timeframes": result_data.get("configurations", {}).get("timeframes", []),
-                    "total_configurations": result_data.get("summary", {}).get("total_configurations", 0),
-                    "average_profit": result_data.get("summary", {}).get("average_profit", 0),
-                    "profit_factor": result_data.get("summary", {}).get("average_profit_factor", 0),
-                    "is_real_backtest": result_data.get("is_real_backtest", False)
+                listing = await get_async_db().run(
+                    BacktestResultStore(db).list_results,
+                    page_size=page_size,
+                    cursor=cursor,
+                    sort=sort,
+                    descending=(order == "desc"),
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    start_date=start_date,
+                    end_date=end_date,
+                    count=count,
+                    offset=(page - 1) * page_size
+                )
+            except ValueError as e:
+                # 不正なカーソル
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as db_error:
+                logger.warning(f"Database error, listing in-memory results: {db_error}")
+            else:
+                results = [_catalog_list_item(row) for row in listing['items']]
+                if cursor is None and page == 1:
+                    results = memory_results + results
+                total = listing['total_count']
+                return {
+                    "total": total + len(memory_results) if total is not None else None,
+                    "count_is_estimate": listing['count_is_estimate'],
+                    "page": page,
+                    "page_size": page_size,
+                    "has_next": listing['has_next'],
+                    "next_cursor": listing['next_cursor'],
+                    "results": results
                 }
-                all_results.append(list_item)
-            except Exception as e:
-                logger.error(f"Error processing result {test_id}: {e}")
-                continue
         
-        # Sort by created_at (newest first)
-        all_results.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        
-        # Apply pagination
+        # Apply pagination to in-memory results
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        paginated_results = all_results[start_idx:end_idx]
+        paginated_results = memory_results[start_idx:end_idx]
         
-        logger.info(f"List results: Found {len(all_results)} total results, returning {len(paginated_results)} for page {page}")
+        logger.info(f"List results: Found {len(memory_results)} in-memory results, returning {len(paginated_results)} for page {page}")
         
         return {
-            "total": len(all_results),
+            "total": len(memory_results),
+            "count_is_estimate": False,
             "page": page,
             "page_size": page_size,
+            "has_next": end_idx < len(memory_results),
+            "next_cursor": None,
             "results": paginated_results
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing backtest results: {e}")
         return {
@@ -604,6 +783,65 @@ async def list_backtest_results(
             "results": []
         }
 
+def _list_memory_results(symbol: Optional[str], timeframe: Optional[str]) -> List[Dict[str, Any]]:
+    """In-memory (completed_results) list items, newest first"""
+    all_results = []
+    
+    for test_id, result_data in completed_results.items():
+        try:
+            configurations = result_data.get("configurations", {})
+            if symbol and symbol not in configurations.get("symbols", []):
+                continue
+            if timeframe and timeframe not in configurations.get("timeframes", []):
+                continue
+            
+            # Create list item format
+            list_item = {
+                "test_id": test_id,
+                "test_type": result_data.get("test_type", "comprehensive"),
+                "created_at": result_data.get("created_at", ""),
+                "status": "completed",
+                "symbols": configurations.get("symbols", []),
+                "timeframes": configurations.get("timeframes", []),
+                "total_configurations": result_data.get("summary", {}).get("total_configurations", 0),
+                "average_profit": result_data.get("summary", {}).get("average_profit", 0),
+                "profit_factor": result_data.get("summary", {}).get("average_profit_factor", 0),
+                "is_real_backtest": result_data.get("is_real_backtest", False)
+            }
+            all_results.append(list_item)
+        except Exception as e:
+            logger.error(f"Error processing result {test_id}: {e}")
+            continue
+    
+    # Sort by created_at (newest first)
+    all_results.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+    return all_results
+
+def _catalog_list_item(row: Dict[str, Any]) -> Dict[str, Any]:
+    """backtest_results catalog row as a list item (same format as in-memory results)"""
+    return {
+        "test_id": row['test_id'],
+        "test_type": "single",
+        "created_at": row['created_at'].isoformat() if row['created_at'] else "",
+        "status": "completed",
+        "symbols": [row['symbol']],
+        "timeframes": [row['timeframe']],
+        "period": {
+            "start_date": row['period_start'].isoformat() if row['period_start'] else None,
+            "end_date": row['period_end'].isoformat() if row['period_end'] else None
+        },
+        "total_configurations": 1,
+        "average_profit": (row['final_balance'] or 0) - (row['initial_balance'] or 0),
+        "final_balance": row['final_balance'],
+        "return_percent": row['return_percent'] or 0,
+        "total_trades": row['total_trades'],
+        "win_rate": row['win_rate'],
+        "profit_factor": row['profit_factor'],
+        "max_drawdown": row['max_drawdown'],
+        "sharpe_ratio": row['sharpe_ratio'],
+        "is_real_backtest": True
+    }
+
 @router.post("/validate")
 async def validate_backtest(request: BacktestRequest):
     """Validate backtest configuration"""
@@ -665,6 +903,43 @@ async def schedule_backtest(request: BacktestScheduleRequest, background_tasks:
         "next_run": request.schedule.get("next_run", datetime.now().isoformat())
     }
 
+@router.get("/cache/stats")
+async def get_feature_cache_stats():
+    """Get feature/model cache statistics (hits, misses, size)"""
+    try:
+        engine, _, _, _ = get_backtest_dependencies()
+        if engine is None:
+            raise HTTPException(status_code=503, detail="Backtest modules not available")
+        
+        return {
+            "status": "success",
+            "data": engine.feature_cache.get_statistics()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving cache statistics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/cache")
+async def clear_feature_cache():
+    """Clear feature/model cache"""
+    try:
+        engine, _, _, _ = get_backtest_dependencies()
+        if engine is None:
+            raise HTTPException(status_code=503, detail="Backtest modules not available")
+        
+        engine.feature_cache.clear()
+        return {
+            "status": "success",
+            "data": engine.feature_cache.get_statistics()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error clearing cache: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/logs/errors")
 async def get_error_logs(limit: int = Query(50, ge=1, le=500)):
     """Get recent error logs"""
@@ -268,11 +268,85 @@ def validate_optimization_request(request: Dict[str, Any]) -> Dict[str, Any]:
                     detail=f"Invalid parameter range for {param_name}. Min must be less than max"
                 )
     
+    # 試行の実行バックエンドの検証（リクエスト毎にプールを作るため既定は直列実行。'process' は明示指定時のみ）
+    executor = request.get('executor', 'serial')
+    valid_executors = ['serial', 'thread', 'process']
+    if executor not in valid_executors:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid executor: {executor}. Valid executors: {', '.join(valid_executors)}"
+        )
+    
+    max_workers = request.get('max_workers')
+    if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1 or max_workers > 64):
+        raise HTTPException(
+            status_code=400,
+            detail="max_workers must be an integer between 1 and 64"
+        )
+    
     validated.update({
         'optimization_method': optimization_method,
         'target_metric': target_metric,
         'param_ranges': param_ranges,
-        'iterations': iterations
+        'iterations': iterations,
+        'executor': executor,
+        'max_workers': max_workers
+    })
+    
+    return validated
+
+def _validate_int_field(request: Dict[str, Any], field: str, default: Optional[int],
+                        minimum: int, maximum: int) -> Optional[int]:
+    """整数フィールドの範囲検証"""
+    value = request.get(field, default)
+    if value is not None and (not isinstance(value, int) or value < minimum or value > maximum):
+        raise HTTPException(
+            status_code=400,
+            detail=f"{field} must be an integer between {minimum} and {maximum}"
+        )
+    return value
+
+def _validate_period_required(validated: Dict[str, Any]) -> None:
+    """期間指定が必須のバックテスト用"""
+    if validated['start_date'] is None or validated['end_date'] is None:
+        raise HTTPException(status_code=400, detail="start_date and end_date are required")
+
+def validate_walk_forward_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """ウォークフォワード・バックテストリクエストのバリデーション"""
+    validated = validate_backtest_request(request)
+    _validate_period_required(validated)
+    
+    validated.update({
+        'train_bars': _validate_int_field(request, 'train_bars', 2000, 100, 1_000_000),
+        'test_bars': _validate_int_field(request, 'test_bars', 500, 10, 1_000_000),
+        'anchored': bool(request.get('anchored', False)),
+        'warm_start': bool(request.get('warm_start', True)),
+        'max_workers': _validate_int_field(request, 'max_workers', None, 1, 64)
+    })
+    
+    return validated
+
+def validate_portfolio_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """ポートフォリオ・バックテスト（複数通貨ペア・残高共有）リクエストのバリデーション"""
+    symbols = request.get('symbols')
+    if not isinstance(symbols, list) or not symbols:
+        raise HTTPException(status_code=400, detail="symbols must be a non-empty list")
+    if len(set(symbols)) != len(symbols):
+        raise HTTPException(status_code=400, detail="symbols must not contain duplicates")
+    
+    # 通貨ペア毎の検証は単一バックテストと共通
+    for symbol in symbols:
+        validated = validate_backtest_request({**request, 'symbol': symbol})
+    _validate_period_required(validated)
+    
+    risk_settings = request.get('risk_settings')
+    if risk_settings is not None and not isinstance(risk_settings, dict):
+        raise HTTPException(status_code=400, detail="risk_settings must be an object")
+    
+    del validated['symbol']
+    validated.update({
+        'symbols': symbols,
+        'risk_settings': risk_settings
     })
     
     return validated
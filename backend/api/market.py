@@ -8,7 +8,12 @@ import logging
 import asyncio
 
 from backend.core.mt5_client import MT5Client, TARGET_SYMBOLS, TIMEFRAME_MAP
+from backend.core.market_data_hub import get_market_data_hub
+from backend.core.mt5_worker import AsyncMT5Client
+from backend.core.data_collector import IncrementalCollector, DERIVED_TIMEFRAMES
 from backend.core.database import DatabaseManager
+from backend.core.price_query import PriceQueryPlanner
+from backend.core.async_database import get_async_db
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +21,21 @@ router = APIRouter(prefix="/api/v1/market", tags=["market"])
 
 # グローバルインスタンス
 mt5_client = MT5Client()
+mt5_io = AsyncMT5Client(mt5_client)  # MT5呼び出しは専用スレッドで実行
 db_manager = DatabaseManager()
+query_planner = PriceQueryPlanner(db_manager)
 
 class MarketDataService:
     """マーケットデータサービス"""
     
     def __init__(self):
         self.mt5_client = MT5Client()
+        self.mt5_io = AsyncMT5Client(self.mt5_client)
         self.db_manager = DatabaseManager()
+        # MT5からはM1のみ取得し、上位時間軸はM1から組み立てる
+        self.collector = IncrementalCollector(
+            self.mt5_io, self.db_manager, timeframes=['M1'], derived_timeframes=DERIVED_TIMEFRAMES
+        )
         self.is_collecting = False
         
     async def start_data_collection(self):
@@ -33,6 +45,7 @@ class MarketDataService:
             return
             
         self.is_collecting = True
+        self.collector.reset()  # DBの最終足から再開し、停止中の欠損を補完
         logger.info("Starting market data collection")
         
         # バックグラウンドでデータ収集実行
@@ -47,27 +60,14 @@ class MarketDataService:
         """データ収集ループ"""
         while self.is_collecting:
             try:
-                if not self.mt5_client.ensure_connection():
+                if not await self.mt5_io.ensure_connection():
                     logger.error("Failed to connect to MT5")
                     await asyncio.sleep(30)
                     continue
                 
-                # 各通貨ペアの最新データを取得
-                for symbol in TARGET_SYMBOLS:
-                    for timeframe in ["M1", "M5", "M15", "M30", "H1"]:
-                        try:
-                            # 最新10本のデータを取得
-                            df = self.mt5_client.get_rates(symbol, timeframe, 10)
-                            if df is not None and not df.empty:
-                                # データベースに保存
-                                success = self.db_manager.save_price_data(df)
-                                if success:
-                                    logger.debug(f"Saved {len(df)} records for {symbol} {timeframe}")
-                                else:
-                                    logger.warning(f"Failed to save data for {symbol} {timeframe}")
-                                    
-                        except Exception as e:
-                            logger.error(f"Error collecting data for {symbol} {timeframe}: {e}")
+                # 各通貨ペア・時間軸の未保存の確定足のみ保存（欠損は期間指定で補完）
+                result = await self.collector.collect_once()
+                logger.debug(f"Data collection: {result}")
                 
                 # 1分待機
                 await asyncio.sleep(60)
@@ -85,10 +85,10 @@ async def get_symbols() -> Dict[str, Any]:
     利用可能な通貨ペア一覧取得
     """
     try:
-        if not mt5_client.ensure_connection():
+        if not await mt5_io.ensure_connection():
             raise HTTPException(status_code=500, detail="Failed to connect to MT5")
         
-        all_symbols = mt5_client.get_symbols()
+        all_symbols = await mt5_io.get_symbols()
         target_symbols = [s for s in all_symbols if s in TARGET_SYMBOLS]
         
         return {
@@ -110,10 +110,10 @@ async def get_symbol_info(symbol: str) -> Dict[str, Any]:
         if symbol not in TARGET_SYMBOLS:
             raise HTTPException(status_code=404, detail="Symbol not found")
             
-        if not mt5_client.ensure_connection():
+        if not await mt5_io.ensure_connection():
             raise HTTPException(status_code=500, detail="Failed to connect to MT5")
         
-        info = mt5_client.get_symbol_info(symbol)
+        info = await mt5_io.get_symbol_info(symbol)
         if info is None:
             raise HTTPException(status_code=404, detail="Symbol info not available")
         
@@ -134,10 +134,10 @@ async def get_current_tick(symbol: str) -> Dict[str, Any]:
         if symbol not in TARGET_SYMBOLS:
             raise HTTPException(status_code=404, detail="Symbol not found")
             
-        if not mt5_client.ensure_connection():
+        if not await mt5_io.ensure_connection():
             raise HTTPException(status_code=500, detail="Failed to connect to MT5")
         
-        tick = mt5_client.get_tick(symbol)
+        tick = await get_market_data_hub(mt5_client).get_tick_async(symbol)
         if tick is None:
             raise HTTPException(status_code=404, detail="Tick data not available")
         
@@ -174,10 +174,10 @@ async def get_rates(
         
         if source == "mt5":
             # MT5から直接取得
-            if not mt5_client.ensure_connection():
+            if not await mt5_io.ensure_connection():
                 raise HTTPException(status_code=500, detail="Failed to connect to MT5")
             
-            df = mt5_client.get_rates(symbol, timeframe, count)
+            df = await mt5_io.get_rates(symbol, timeframe, count)
             if df is None or df.empty:
                 raise HTTPException(status_code=404, detail="No data available")
             
@@ -214,10 +214,14 @@ async def get_rates_range(
     symbol: str,
     timeframe: str,
     start_date: datetime,
-    end_date: datetime
+    end_date: datetime,
+    source: str = Query("mt5", regex="^(mt5|database)$")
 ) -> Dict[str, Any]:
     """
     指定期間の価格データ取得
+    
+    Args:
+        source: データソース (mt5/database)。database は連続集計ビューを優先して読む
     """
     try:
         if symbol not in TARGET_SYMBOLS:
@@ -229,10 +233,18 @@ async def get_rates_range(
         if start_date >= end_date:
             raise HTTPException(status_code=400, detail="Invalid date range")
         
-        if not mt5_client.ensure_connection():
-            raise HTTPException(status_code=500, detail="Failed to connect to MT5")
+        sources = [{'source': 'mt5', 'timeframe': timeframe}]
+        if source == "mt5":
+            if not await mt5_io.ensure_connection():
+                raise HTTPException(status_code=500, detail="Failed to connect to MT5")
+            
+            df = await mt5_io.get_rates_range(symbol, timeframe, start_date, end_date)
+        else:
+            # 形成中の足も含める（チャート表示用）
+            df, sources = await get_async_db().run(
+                query_planner.load, symbol, timeframe, start_date, end_date, include_partial=True
+            )
         
-        df = mt5_client.get_rates_range(symbol, timeframe, start_date, end_date)
         if df is None or df.empty:
             raise HTTPException(status_code=404, detail="No data available")
         
@@ -250,6 +262,7 @@ async def get_rates_range(
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
             "count": len(rates),
+            "sources": sources,
             "data": rates
         }
         
@@ -281,10 +294,10 @@ async def get_multiple_rates(
         if timeframe not in TIMEFRAME_MAP:
             raise HTTPException(status_code=400, detail="Invalid timeframe")
         
-        if not mt5_client.ensure_connection():
+        if not await mt5_io.ensure_connection():
             raise HTTPException(status_code=500, detail="Failed to connect to MT5")
         
-        results = mt5_client.get_multiple_rates(symbol_list, timeframe, count)
+        results = await mt5_io.get_multiple_rates(symbol_list, timeframe, count)
         
         # DataFrameを辞書に変換
         formatted_results = {}
@@ -343,5 +356,6 @@ async def get_data_collection_status() -> Dict[str, Any]:
     """
     return {
         "is_collecting": market_service.is_collecting,
-        "mt5_connected": mt5_client.is_connected
+        "mt5_connected": mt5_client.is_connected,
+        "collector": market_service.collector.get_statistics()
     }
\ No newline at end of file
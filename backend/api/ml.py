@@ -11,6 +11,8 @@ import asyncio
 import json
 
 from backend.core.database import DatabaseManager
+from backend.core.async_database import get_async_db
+from backend.core.price_store import get_price_store
 from backend.core.mt5_client import MT5Client
 from backend.ml.features import FeatureEngineering
 from backend.ml.models.lightgbm_model import LightGBMPredictor
@@ -130,15 +132,18 @@ async def train_model(
     model_name: str,
     version: str = "1.0.0",
     lookback_days: int = Query(365, ge=30, le=1095),
-    validation_split: float = Query(0.2, ge=0.1, le=0.5)
+    validation_split: float = Query(0.2, ge=0.1, le=0.5),
+    feature_columns: Optional[str] = Query(None, description="使用する特徴量（カンマ区切り、省略時は全て）")
 ) -> Dict[str, Any]:
     """モデル学習"""
     try:
+        columns = [col.strip() for col in feature_columns.split(',')] if feature_columns else None
+        
         # バックグラウンドでモデル学習実行
         background_tasks.add_task(
             _train_model_background, 
             symbol, timeframe, model_name, version, 
-            lookback_days, validation_split
+            lookback_days, validation_split, columns
         )
         
         return {
@@ -153,25 +158,30 @@ async def train_model(
         raise HTTPException(status_code=500, detail=str(e))
 
 async def _train_model_background(symbol: str, timeframe: str, model_name: str, 
-                                version: str, lookback_days: int, validation_split: float):
+                                version: str, lookback_days: int, validation_split: float,
+                                feature_columns: Optional[List[str]] = None):
     """バックグラウンドでのモデル学習"""
     try:
         logger.info(f"Starting background training for {model_name}")
         
-        # データ取得
-        if not mt5_client.ensure_connection():
-            raise Exception("MT5 connection failed")
-        
         end_date = datetime.now()
         start_date = end_date - timedelta(days=lookback_days)
         
-        df = mt5_client.get_rates_range(symbol, timeframe, start_date, end_date)
+        # データ取得（価格ストアに十分な足が無い場合はMT5から取得）
+        store = get_price_store()
+        await get_async_db().run(store.sync_from_database, db_manager, symbol, timeframe)
+        df = store.read(symbol, timeframe, start_date, end_date)
+        if len(df) < 1000:
+            if not mt5_client.ensure_connection():
+                raise Exception("MT5 connection failed")
+            df = mt5_client.get_rates_range(symbol, timeframe, start_date, end_date)
+        
         if df is None or len(df) < 1000:
             raise Exception("Insufficient data for training")
         
-        # 特徴量生成
+        # 特徴量生成（指定時は選択したカラムのみ）
         feature_engine = FeatureEngineering()
-        features_df = feature_engine.create_features(df)
+        features_df = feature_engine.create_features(df, columns=feature_columns)
         
         # モデル作成と学習
         model = LightGBMPredictor(task_type="classification")
@@ -320,9 +330,9 @@ async def _evaluate_model_background(model_id: int, test_days: int):
         if df is None or len(df) < 100:
             raise Exception("Insufficient test data")
         
-        # 特徴量生成
+        # 特徴量生成（モデルが使うカラムのみ）
         feature_engine = FeatureEngineering()
-        features_df = feature_engine.create_features(df)
+        features_df = feature_engine.create_features(df, columns=model.feature_columns)
         
         # ラベル作成
         labeled_df = model.prepare_labels(features_df, lookforward=24)
@@ -12,6 +12,14 @@ from ..monitoring.system_monitor import SystemMonitor
 from ..monitoring.trading_monitor import TradingMonitor
 from ..monitoring.alert_manager import AlertManager, AlertLevel, AlertType, get_alert_manager
 from ..monitoring.log_viewer import LogViewer
+from ..core.db_pool import get_pool_statistics
+from ..core.async_database import get_async_db_statistics
+from ..core.market_data_hub import get_market_data_hub_statistics
+from ..core.bar_scheduler import get_bar_scheduler_statistics
+from ..core.mt5_worker import get_mt5_worker_statistics
+from ..core.price_store import get_price_store_statistics
+from ..monitoring.event_loop_monitor import event_loop_monitor
+from .websocket import manager as market_ws_manager
 
 logger = logging.getLogger(__name__)
 
@@ -402,6 +410,28 @@ async def get_monitoring_stats():
         if log_viewer:
             stats['log_viewer'] = log_viewer.get_log_stats()
         
+        # データベース接続プール（使用中・待機回数・待機時間）
+        stats['database_pool'] = get_pool_statistics()
+        
+        # イベントループ遅延・DBスレッドオフロード
+        stats['event_loop'] = event_loop_monitor.get_statistics()
+        stats['async_database'] = get_async_db_statistics()
+        
+        # マーケットデータWebSocket配信（キュー深さ・破棄・間引き）
+        stats['market_websocket'] = market_ws_manager.get_statistics()
+        
+        # MT5マーケットデータハブ（キャッシュヒット・MT5呼び出し数）
+        stats['market_data_hub'] = get_market_data_hub_statistics()
+        
+        # 足確定スケジューラ（起動・見送り回数、検出遅延）
+        stats['bar_scheduler'] = get_bar_scheduler_statistics()
+        
+        # MT5 I/Oワーカー（呼び出し毎の実行時間・キュー待ち・タイムアウト）
+        stats['mt5_worker'] = get_mt5_worker_statistics()
+        
+        # ローカル価格ストア（読み込み行数・DBからの取り込み）
+        stats['price_store'] = get_price_store_statistics()
+        
         return stats
         
     except Exception as e:
@@ -7,7 +7,9 @@ import logging
 from datetime import datetime, timedelta
 
 from backend.core.database import DatabaseManager
+from backend.core.async_database import get_async_db
 from backend.core.mt5_client import MT5Client
+from backend.core.mt5_worker import AsyncMT5Client, PRIORITY_ACCOUNT
 from backend.core.risk_manager import RiskManager
 from backend.core.drawdown_monitor import DrawdownMonitor
 from backend.models.risk_models import (
@@ -84,8 +86,8 @@ async def update_risk_settings(settings: RiskSettingsModel):
         if not update_dict:
             raise HTTPException(status_code=400, detail="No settings provided for update")
         
-        # 設定更新
-        success = manager.update_risk_settings(update_dict)
+        # 設定更新（DB書き込みはDBスレッドで実行）
+        success = await get_async_db().run(manager.update_risk_settings, update_dict)
         
         if success:
             logger.info(f"Risk settings updated: {update_dict}")
@@ -114,16 +116,18 @@ async def get_risk_status():
     """
     try:
         manager, monitor, _, client = get_risk_dependencies()
+        async_db = get_async_db()
+        mt5_io = AsyncMT5Client(client)  # MT5呼び出しは専用スレッドで実行
         
         # アカウント情報更新
-        if client.ensure_connection():
-            account_info = client.get_account_info()
+        if await mt5_io.ensure_connection():
+            account_info = await mt5_io.get_account_info()
             if account_info:
                 # ドローダウンモニター更新
-                monitor.update(account_info['equity'])
+                await async_db.run(monitor.update, account_info['equity'])
         
-        # リスク状態取得
-        risk_status = manager.get_risk_status()
+        # リスク状態取得（口座情報・ポジションを参照するためMT5ワーカーで実行）
+        risk_status = await mt5_io.run(manager.get_risk_status, priority=PRIORITY_ACCOUNT)
         
         return {
             "status": "success",
@@ -149,7 +153,7 @@ async def get_drawdown_statistics(days: int = 30):
     try:
         _, monitor, _, _ = get_risk_dependencies()
         
-        statistics = monitor.get_drawdown_statistics(days)
+        statistics = await get_async_db().run(monitor.get_drawdown_statistics, days)
         
         return {
             "status": "success",
@@ -176,7 +180,7 @@ async def get_drawdown_chart(days: int = 30):
     try:
         _, monitor, _, _ = get_risk_dependencies()
         
-        chart_data = monitor.get_drawdown_chart_data(days)
+        chart_data = await get_async_db().run(monitor.get_drawdown_chart_data, days)
         
         return {
             "status": "success",
@@ -204,13 +208,14 @@ async def trigger_emergency_stop(request: EmergencyStopRequest = EmergencyStopRe
         manager, _, _, client = get_risk_dependencies()
         
         # 緊急停止トリガー
-        manager.trigger_emergency_stop(request.reason)
+        await get_async_db().run(manager.trigger_emergency_stop, request.reason)
         
         # 全ポジションクローズ（オプション）
         closed_positions = 0
         if request.close_all_positions:
-            if client.ensure_connection():
-                closed_positions = client.close_all_positions()
+            mt5_io = AsyncMT5Client(client)
+            if await mt5_io.ensure_connection():
+                closed_positions = await mt5_io.close_all_positions()
         
         logger.critical(f"Emergency stop triggered: {request.reason}")
         
@@ -260,42 +265,47 @@ async def check_risk_limits():
         チェック結果
     """
     try:
-        manager, _, _, _ = get_risk_dependencies()
-        
-        can_trade = manager.check_risk_limits()
-        
-        # 詳細なチェック結果を作成
-        result = {
-            "can_trade": can_trade,
-            "failed_checks": [],
-            "warnings": [],
-            "risk_score": 0,
-            "timestamp": datetime.now().isoformat()
-        }
+        manager, _, _, client = get_risk_dependencies()
         
-        # 個別チェックの実行と結果記録
-        if not manager._check_max_drawdown():
-            result["failed_checks"].append("max_drawdown")
-            result["risk_score"] += 30
-            
-        if not manager._check_max_positions():
-            result["failed_checks"].append("max_positions")
-            result["risk_score"] += 20
+        def run_checks() -> Dict[str, Any]:
+            can_trade = manager.check_risk_limits()
             
-        if not manager._check_daily_trade_limit():
-            result["failed_checks"].append("daily_trade_limit")
-            result["risk_score"] += 15
+            # 詳細なチェック結果を作成
+            result = {
+                "can_trade": can_trade,
+                "failed_checks": [],
+                "warnings": [],
+                "risk_score": 0,
+                "timestamp": datetime.now().isoformat()
+            }
             
-        if not manager._check_consecutive_losses():
-            result["failed_checks"].append("consecutive_losses")
-            result["risk_score"] += 25
+            # 個別チェックの実行と結果記録
+            if not manager._check_max_drawdown():
+                result["failed_checks"].append("max_drawdown")
+                result["risk_score"] += 30
+                
+            if not manager._check_max_positions():
+                result["failed_checks"].append("max_positions")
+                result["risk_score"] += 20
+                
+            if not manager._check_daily_trade_limit():
+                result["failed_checks"].append("daily_trade_limit")
+                result["risk_score"] += 15
+                
+            if not manager._check_consecutive_losses():
+                result["failed_checks"].append("consecutive_losses")
+                result["risk_score"] += 25
+                
+            if not manager._check_daily_loss_limit():
+                result["failed_checks"].append("daily_loss_limit")
+                result["risk_score"] += 35
             
-        if not manager._check_daily_loss_limit():
-            result["failed_checks"].append("daily_loss_limit")
-            result["risk_score"] += 35
+            # リスクスコアを0-100の範囲に正規化
+            result["risk_score"] = min(100, result["risk_score"])
+            return result
         
-        # リスクスコアを0-100の範囲に正規化
-        result["risk_score"] = min(100, result["risk_score"])
+        # 口座情報・ポジションを参照するチェックを含むためMT5ワーカーで実行
+        result = await AsyncMT5Client(client).run(run_checks, priority=PRIORITY_ACCOUNT)
         
         return {
             "status": "success",
@@ -319,11 +329,12 @@ async def calculate_position_size(request: PositionSizingRequest):
     """
     try:
         manager, _, _, client = get_risk_dependencies()
+        mt5_io = AsyncMT5Client(client)  # MT5呼び出しは専用スレッドで実行
         
         # 現在価格取得（指定されていない場合）
         if request.entry_price is None:
-            if client.ensure_connection():
-                tick = client.get_tick(request.symbol)
+            if await mt5_io.ensure_connection():
+                tick = await mt5_io.get_tick(request.symbol)
                 if tick:
                     request.entry_price = tick['ask'] if request.order_type == 'BUY' else tick['bid']
                 else:
@@ -332,13 +343,15 @@ async def calculate_position_size(request: PositionSizingRequest):
                 raise HTTPException(status_code=503, detail="MT5 connection failed")
         
         # ロットサイズ計算
-        lot_size = manager.calculate_lot_size(request.symbol, request.order_type)
+        lot_size = await mt5_io.run(manager.calculate_lot_size, request.symbol, request.order_type,
+                                    priority=PRIORITY_ACCOUNT)
         
         # SL/TP計算
-        sl, tp = manager.calculate_sl_tp(request.symbol, request.order_type, request.entry_price)
+        sl, tp = await mt5_io.run(manager.calculate_sl_tp, request.symbol, request.order_type,
+                                  request.entry_price, priority=PRIORITY_ACCOUNT)
         
         # リスク金額計算
-        account_info = client.get_account_info()
+        account_info = await mt5_io.get_account_info()
         risk_amount = account_info['balance'] * manager.settings['max_risk_per_trade'] / 100
         risk_percentage = manager.settings['max_risk_per_trade']
         
@@ -373,11 +386,12 @@ async def get_account_info():
     """
     try:
         _, _, _, client = get_risk_dependencies()
+        mt5_io = AsyncMT5Client(client)
         
-        if not client.ensure_connection():
+        if not await mt5_io.ensure_connection():
             raise HTTPException(status_code=503, detail="MT5 connection failed")
         
-        account_info = client.get_account_info()
+        account_info = await mt5_io.get_account_info()
         
         if account_info is None:
             raise HTTPException(status_code=503, detail="Failed to get account info")
@@ -406,36 +420,32 @@ async def get_risk_alerts(days: int = 7):
         リスクアラート一覧
     """
     try:
-        _, _, db_manager, _ = get_risk_dependencies()
-        
-        with db_manager.get_connection() as conn:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            query = """
-                SELECT event_type, trigger_value, threshold_value, 
-                       description, severity, created_at
-                FROM risk_management_logs
-                WHERE created_at >= %s AND created_at <= %s
-                ORDER BY created_at DESC
-                LIMIT 100
-            """
-            
-            import pandas as pd
-            result = pd.read_sql_query(query, conn, params=(start_date, end_date))
-            
-            alerts = []
-            for _, row in result.iterrows():
-                alert = {
-                    "alert_type": row['event_type'],
-                    "level": row['severity'].lower(),
-                    "message": row['description'],
-                    "current_value": float(row['trigger_value']),
-                    "threshold_value": float(row['threshold_value']),
-                    "timestamp": row['created_at'].isoformat(),
-                    "action_required": row['severity'] in ['CRITICAL', 'ERROR']
-                }
-                alerts.append(alert)
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        
+        query = """
+            SELECT event_type, trigger_value, threshold_value, 
+                   description, severity, created_at
+            FROM risk_management_logs
+            WHERE created_at >= %s AND created_at <= %s
+            ORDER BY created_at DESC
+            LIMIT 100
+        """
+        
+        rows = await get_async_db().fetch_all(query, (start_date, end_date))
+        
+        alerts = []
+        for row in rows:
+            alert = {
+                "alert_type": row['event_type'],
+                "level": row['severity'].lower(),
+                "message": row['description'],
+                "current_value": float(row['trigger_value']),
+                "threshold_value": float(row['threshold_value']),
+                "timestamp": row['created_at'].isoformat(),
+                "action_required": row['severity'] in ['CRITICAL', 'ERROR']
+            }
+            alerts.append(alert)
         
         return {
             "status": "success",
@@ -460,7 +470,7 @@ async def reset_risk_statistics():
     try:
         _, monitor, _, _ = get_risk_dependencies()
         
-        monitor.reset_statistics()
+        await get_async_db().run(monitor.reset_statistics)
         
         logger.info("Risk statistics reset")
         
@@ -489,8 +499,8 @@ async def risk_health_check():
         health_status = {
             "risk_manager": manager is not None,
             "drawdown_monitor": monitor is not None,
-            "database": db_manager.test_connection() if db_manager else False,
-            "mt5_connection": client.ensure_connection() if client else False,
+            "database": await get_async_db().run(db_manager.test_connection) if db_manager else False,
+            "mt5_connection": await AsyncMT5Client(client).ensure_connection() if client else False,
             "emergency_stop": manager.emergency_stop_triggered if manager else True
         }
         
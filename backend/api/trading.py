@@ -9,6 +9,7 @@ from datetime import datetime
 
 from core.database import DatabaseManager
 from core.mt5_client import MT5Client
+from core.mt5_worker import PRIORITY_ACCOUNT
 from core.trading_engine import TradingEngine
 from core.risk_manager import RiskManager
 
@@ -28,6 +29,7 @@ class TradingStartRequest(BaseModel):
 
 class TradingStopRequest(BaseModel):
     close_positions: bool = False
+    symbol: Optional[str] = None  # 指定時はその通貨ペアのスロットのみ停止
 
 class RiskSettingsUpdate(BaseModel):
     max_risk_per_trade: Optional[float] = None
@@ -53,7 +55,7 @@ def get_trading_dependencies():
 @router.post("/start")
 async def start_trading(request: TradingStartRequest):
     """
-    自動売買開始
+    自動売買開始（稼働中の場合は通貨ペアを追加）
     
     Args:
         request: 取引開始リクエスト（通貨ペア・時間軸）
@@ -110,13 +112,17 @@ async def stop_trading(request: TradingStopRequest = TradingStopRequest()):
         engine, _, _ = get_trading_dependencies()
         
         # 取引停止
-        success = await engine.stop_trading(close_positions=request.close_positions)
+        success = await engine.stop_trading(
+            close_positions=request.close_positions, symbol=request.symbol
+        )
         
         if success:
-            logger.info("Trading stopped")
+            message = f"Trading stopped for {request.symbol}" if request.symbol else "Trading stopped"
+            logger.info(message)
             return {
                 "status": "success",
-                "message": "Trading stopped",
+                "message": message,
+                "symbol": request.symbol,
                 "positions_closed": request.close_positions,
                 "stopped_at": datetime.now().isoformat()
             }
@@ -140,7 +146,8 @@ async def get_trading_status():
     try:
         engine, _, _ = get_trading_dependencies()
         
-        status = engine.get_trading_status()
+        # リスク状態に口座情報・ポジションを含むためMT5ワーカーで実行
+        status = await engine.mt5_io.run(engine.get_trading_status, priority=PRIORITY_ACCOUNT)
         
         return {
             "status": "success",
@@ -219,12 +226,12 @@ async def get_current_positions():
         現在のポジション一覧
     """
     try:
-        _, _, mt5_client = get_trading_dependencies()
+        engine, _, _ = get_trading_dependencies()
         
-        if not mt5_client.ensure_connection():
+        if not await engine.mt5_io.ensure_connection():
             raise HTTPException(status_code=503, detail="MT5 connection failed")
         
-        positions = mt5_client.get_positions()
+        positions = await engine.mt5_io.get_positions()
         
         return {
             "status": "success",
@@ -273,12 +280,12 @@ async def get_current_orders():
         待機注文一覧
     """
     try:
-        _, _, mt5_client = get_trading_dependencies()
+        engine, _, _ = get_trading_dependencies()
         
-        if not mt5_client.ensure_connection():
+        if not await engine.mt5_io.ensure_connection():
             raise HTTPException(status_code=503, detail="MT5 connection failed")
         
-        orders = mt5_client.get_orders()
+        orders = await engine.mt5_io.get_orders()
         
         return {
             "status": "success",
@@ -304,7 +311,7 @@ async def get_risk_status():
     try:
         engine, _, _ = get_trading_dependencies()
         
-        risk_status = engine.risk_manager.get_risk_status()
+        risk_status = await engine.mt5_io.run(engine.risk_manager.get_risk_status, priority=PRIORITY_ACCOUNT)
         
         return {
             "status": "success",
@@ -377,12 +384,12 @@ async def get_account_info():
         MT5アカウント情報
     """
     try:
-        _, _, mt5_client = get_trading_dependencies()
+        engine, _, _ = get_trading_dependencies()
         
-        if not mt5_client.ensure_connection():
+        if not await engine.mt5_io.ensure_connection():
             raise HTTPException(status_code=503, detail="MT5 connection failed")
         
-        account_info = mt5_client.get_account_info()
+        account_info = await engine.mt5_io.get_account_info()
         
         if account_info is None:
             raise HTTPException(status_code=503, detail="Failed to get account info")
@@ -411,12 +418,12 @@ async def close_position(position_id: int):
         クローズ結果
     """
     try:
-        _, _, mt5_client = get_trading_dependencies()
+        engine, _, _ = get_trading_dependencies()
         
-        if not mt5_client.ensure_connection():
+        if not await engine.mt5_io.ensure_connection():
             raise HTTPException(status_code=503, detail="MT5 connection failed")
         
-        result = mt5_client.close_position(position_id)
+        result = await engine.mt5_io.close_position(position_id)
         
         if result and hasattr(result, 'retcode') and result.retcode == 0:
             logger.info(f"Position {position_id} closed manually")
@@ -445,12 +452,12 @@ async def close_all_positions():
         クローズ結果
     """
     try:
-        _, _, mt5_client = get_trading_dependencies()
+        engine, _, _ = get_trading_dependencies()
         
-        if not mt5_client.ensure_connection():
+        if not await engine.mt5_io.ensure_connection():
             raise HTTPException(status_code=503, detail="MT5 connection failed")
         
-        closed_count = mt5_client.close_all_positions()
+        closed_count = await engine.mt5_io.close_all_positions()
         
         logger.info(f"Closed {closed_count} positions manually")
         
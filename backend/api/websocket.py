@@ -5,112 +5,278 @@ from fastapi import WebSocket, WebSocketDisconnect, APIRouter
 import json
 import asyncio
 import logging
-from typing import Dict, List, Set
+from collections import OrderedDict, defaultdict
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 from datetime import datetime
 
-from backend.core.mt5_client import MT5Client, TARGET_SYMBOLS
+from backend.core.mt5_client import TARGET_SYMBOLS
+from backend.core.market_data_hub import get_market_data_hub, tick_topic
+from backend.core.mt5_worker import PRIORITY_ACCOUNT, get_mt5_worker
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ws", tags=["websocket"])
 
+class ClientConnection:
+    """WebSocket接続毎の有界送信キュー"""
+    
+    def __init__(self, websocket: WebSocket, max_queue_size: int = 100, send_timeout: float = 5.0):
+        """
+        初期化
+        
+        Args:
+            websocket: WebSocket
+            max_queue_size: 送信待ちメッセージ数の上限（超過分は破棄）
+            send_timeout: 1メッセージの送信タイムアウト（秒、超過で切断）
+        """
+        self.websocket = websocket
+        self.symbols: Set[str] = set()
+        self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        self.closed = False
+        
+        # 送信待ち {キー: メッセージ}（ティックは通貨ペア毎のキーで最新値に上書き）
+        self._pending: "OrderedDict[Any, str]" = OrderedDict()
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+        
+        self.sent = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.max_depth = 0
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+    
+    def start(self, on_failure: Callable[["ClientConnection"], Awaitable[None]]):
+        """送信タスク開始"""
+        self._sender = asyncio.create_task(self._send_loop(on_failure))
+    
+    def enqueue(self, message: str, conflate_key: Optional[str] = None) -> bool:
+        """
+        送信キューに追加（待たない）
+        
+        Args:
+            message: 送信メッセージ
+            conflate_key: 同じキーの未送信メッセージを置き換えるキー
+            
+        Returns:
+            キューに入ったかどうか
+        """
+        if self.closed:
+            return False
+        
+        if conflate_key is not None and conflate_key in self._pending:
+            # 未送信の古いティックを最新ティックで置き換え
+            self._pending[conflate_key] = message
+            self.conflated += 1
+            return True
+        
+        if len(self._pending) >= self.max_queue_size:
+            self.dropped += 1
+            return False
+        
+        if conflate_key is None:
+            self._sequence += 1
+            conflate_key = ('message', self._sequence)
+        self._pending[conflate_key] = message
+        self.max_depth = max(self.max_depth, len(self._pending))
+        self._wakeup.set()
+        return True
+    
+    async def _send_loop(self, on_failure: Callable[["ClientConnection"], Awaitable[None]]):
+        """送信ループ（接続毎に独立して実行）"""
+        while not self.closed:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            _, message = self._pending.popitem(last=False)
+            try:
+                await asyncio.wait_for(self.websocket.send_text(message), timeout=self.send_timeout)
+                self.sent += 1
+            except Exception as e:
+                logger.warning(f"Dropping slow or broken WebSocket client: {e!r}")
+                await on_failure(self)
+                break
+    
+    def close(self):
+        """送信停止"""
+        self.closed = True
+        self._pending.clear()
+        if self._sender is not None and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """送信統計"""
+        return {
+            'symbols': sorted(self.symbols),
+            'queue_depth': self.queue_depth,
+            'max_depth': self.max_depth,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'conflated': self.conflated
+        }
+
 class ConnectionManager:
     """WebSocket接続管理"""
     
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.subscriptions: Dict[WebSocket, Set[str]] = {}
-        self.mt5_client = MT5Client()
+    def __init__(self, max_queue_size: int = 100, send_timeout: float = 5.0):
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        # 通貨ペア → 購読中の接続
+        self.symbol_index: Dict[str, Set[ClientConnection]] = defaultdict(set)
+        self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        self.market_data = get_market_data_hub()
         self.is_broadcasting = False
+        self._sent_versions: Dict[str, int] = {}  # 通貨ペア → 配信済みティックのバージョン
         
+        # 切断済み接続分を含む累計
+        self.totals = {'sent': 0, 'dropped': 0, 'conflated': 0, 'slow_disconnects': 0}
+    
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+    
     async def connect(self, websocket: WebSocket):
         """WebSocket接続"""
         await websocket.accept()
-        self.active_connections.append(websocket)
-        self.subscriptions[websocket] = set()
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        connection = ClientConnection(websocket, self.max_queue_size, self.send_timeout)
+        self.connections[websocket] = connection
+        connection.start(self._on_send_failure)
+        logger.info(f"WebSocket connected. Total connections: {len(self.connections)}")
         
         # 最初の接続時にブロードキャスト開始
-        if len(self.active_connections) == 1 and not self.is_broadcasting:
+        if len(self.connections) == 1 and not self.is_broadcasting:
             asyncio.create_task(self.start_broadcasting())
     
     def disconnect(self, websocket: WebSocket):
         """WebSocket切断"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        if websocket in self.subscriptions:
-            del self.subscriptions[websocket]
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
+        connection = self.connections.pop(websocket, None)
+        if connection is not None:
+            for symbol in connection.symbols:
+                subscribers = self.symbol_index.get(symbol)
+                if subscribers is not None:
+                    subscribers.discard(connection)
+                    if not subscribers:
+                        del self.symbol_index[symbol]
+            
+            for key in ('sent', 'dropped', 'conflated'):
+                self.totals[key] += getattr(connection, key)
+            connection.close()
+        logger.info(f"WebSocket disconnected. Total connections: {len(self.connections)}")
         
         # 接続がなくなったらブロードキャスト停止
-        if len(self.active_connections) == 0:
+        if len(self.connections) == 0:
             self.is_broadcasting = False
     
+    async def _on_send_failure(self, connection: ClientConnection):
+        """送信失敗・タイムアウトした接続を切断し、ソケットを閉じる"""
+        self.totals['slow_disconnects'] += 1
+        self.disconnect(connection.websocket)
+        
+        # 登録解除だけでは受信ループが残るため、クライアント側にも切断を通知（1013: Try Again Later）
+        with suppress(Exception):
+            await asyncio.wait_for(connection.websocket.close(code=1013), timeout=self.send_timeout)
+    
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        """個別メッセージ送信"""
-        try:
-            await websocket.send_text(message)
-        except Exception as e:
-            logger.error(f"Error sending personal message: {e}")
-            self.disconnect(websocket)
+        """個別メッセージ送信（送信キュー経由で順序を維持）"""
+        connection = self.connections.get(websocket)
+        if connection is None or not connection.enqueue(message):
+            logger.error("Error sending personal message: connection closed or queue full")
     
-    async def broadcast(self, message: str, symbol: str = None):
-        """ブロードキャスト"""
-        disconnected = []
+    async def broadcast(self, message: str, symbol: str = None, conflate: bool = False) -> int:
+        """
+        ブロードキャスト（送信キューに積むのみで、クライアントの送信完了は待たない）
         
-        for websocket in self.active_connections:
-            try:
-                # 購読していない場合はスキップ
-                if symbol and symbol not in self.subscriptions[websocket]:
-                    continue
-                    
-                await websocket.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting message: {e}")
-                disconnected.append(websocket)
+        Args:
+            message: シリアライズ済みメッセージ
+            symbol: 購読者のみに送る通貨ペア（省略時は全接続）
+            conflate: 未送信の同一通貨ペアメッセージを最新で置き換えるか
+            
+        Returns:
+            キューに入れた接続数
+        """
+        if symbol:
+            targets = list(self.symbol_index.get(symbol, ()))
+        else:
+            targets = list(self.connections.values())
         
-        # 切断されたWebSocketを削除
-        for websocket in disconnected:
-            self.disconnect(websocket)
+        conflate_key = f"tick:{symbol}" if conflate and symbol else None
+        return sum(connection.enqueue(message, conflate_key) for connection in targets)
     
     def subscribe(self, websocket: WebSocket, symbol: str):
         """通貨ペア購読"""
-        if symbol in TARGET_SYMBOLS:
-            self.subscriptions[websocket].add(symbol)
+        connection = self.connections.get(websocket)
+        if connection is not None and symbol in TARGET_SYMBOLS:
+            connection.symbols.add(symbol)
+            self.symbol_index[symbol].add(connection)
             logger.info(f"Subscribed to {symbol}")
             return True
         return False
     
     def unsubscribe(self, websocket: WebSocket, symbol: str):
         """通貨ペア購読解除"""
-        if websocket in self.subscriptions:
-            self.subscriptions[websocket].discard(symbol)
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.symbols.discard(symbol)
+            subscribers = self.symbol_index.get(symbol)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.symbol_index[symbol]
             logger.info(f"Unsubscribed from {symbol}")
             return True
         return False
     
+    def get_subscriptions(self, websocket: WebSocket) -> Set[str]:
+        """接続の購読通貨ペア"""
+        connection = self.connections.get(websocket)
+        return set(connection.symbols) if connection is not None else set()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """配信統計（キュー深さ・破棄数・間引き数）"""
+        connections = list(self.connections.values())
+        depths = [connection.queue_depth for connection in connections]
+        return {
+            'connections': len(connections),
+            'is_broadcasting': self.is_broadcasting,
+            'subscribers_by_symbol': {symbol: len(subscribers) for symbol, subscribers in self.symbol_index.items()},
+            'queue_depth_total': sum(depths),
+            'queue_depth_max': max(depths, default=0),
+            'sent': self.totals['sent'] + sum(connection.sent for connection in connections),
+            'dropped': self.totals['dropped'] + sum(connection.dropped for connection in connections),
+            'conflated': self.totals['conflated'] + sum(connection.conflated for connection in connections),
+            'slow_disconnects': self.totals['slow_disconnects']
+        }
+    
     async def start_broadcasting(self):
         """リアルタイムデータ配信開始"""
         self.is_broadcasting = True
         logger.info("Starting real-time data broadcasting")
         
-        while self.is_broadcasting and len(self.active_connections) > 0:
+        while self.is_broadcasting and len(self.connections) > 0:
             try:
-                if not self.mt5_client.ensure_connection():
+                if not await get_mt5_worker().run(self.market_data.mt5_client.ensure_connection,
+                                                  priority=PRIORITY_ACCOUNT):
                     logger.error("MT5 connection lost")
                     await asyncio.sleep(5)
                     continue
                 
-                # 購読されている通貨ペアのティックデータを取得
-                subscribed_symbols = set()
-                for symbols in self.subscriptions.values():
-                    subscribed_symbols.update(symbols)
-                
-                for symbol in subscribed_symbols:
+                # 購読者がいる通貨ペアのみ、ハブのティックが更新された時に1回だけシリアライズ
+                for symbol in list(self.symbol_index):
                     try:
-                        tick = self.mt5_client.get_tick(symbol)
+                        tick = await self.market_data.get_tick_async(symbol)
+                        snapshot = self.market_data.get_snapshot(tick_topic(symbol))
+                        if snapshot is None or self._sent_versions.get(symbol) == snapshot['version']:
+                            continue
+                        self._sent_versions[symbol] = snapshot['version']
+                        
                         if tick:
-                            # ティックデータをJSON形式で送信
                             tick_message = json.dumps({
                                 "type": "tick",
                                 "data": {
@@ -124,7 +290,7 @@ class ConnectionManager:
                                 }
                             })
                             
-                            await self.broadcast(tick_message, symbol)
+                            await self.broadcast(tick_message, symbol, conflate=True)
                             
                     except Exception as e:
                         logger.error(f"Error getting tick for {symbol}: {e}")
@@ -243,7 +409,7 @@ async def websocket_market_data(websocket: WebSocket):
                         }
                 
                 elif action == "get_subscriptions":
-                    current_subscriptions = list(manager.subscriptions.get(websocket, set()))
+                    current_subscriptions = list(manager.get_subscriptions(websocket))
                     response = {
                         "type": "subscriptions",
                         "data": {
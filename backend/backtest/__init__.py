@@ -4,9 +4,19 @@ Backtest module
 
 from .backtest_engine import BacktestEngine
 from .parameter_optimizer import ParameterOptimizer, ComprehensiveOptimizer
+from .feature_cache import FeatureCache, feature_cache
+from .executor import TrialExecutor, create_executor
+from .walk_forward import WalkForwardBacktester
+from .portfolio import PortfolioBacktester
 
 __all__ = [
     'BacktestEngine',
     'ParameterOptimizer',
-    'ComprehensiveOptimizer'
+    'ComprehensiveOptimizer',
+    'FeatureCache',
+    'feature_cache',
+    'TrialExecutor',
+    'create_executor',
+    'WalkForwardBacktester',
+    'PortfolioBacktester'
 ]
\ No newline at end of file
@@ -8,22 +8,43 @@ import logging
 import asyncio
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
+from sklearn.preprocessing import LabelEncoder
 
 from backend.core.database import DatabaseManager
 from backend.core.mt5_client import MT5Client
+from backend.core.ohlcv_resampler import resample_ohlcv
+from backend.core.price_store import PriceStore, get_price_store
+from backend.core.price_query import PriceQueryPlanner
+from backend.core.async_database import get_async_db
 from backend.ml.features import FeatureEngineering
 from backend.ml.models.lightgbm_model import LightGBMPredictor
 from backend.ml.model_manager import ModelManager
+from backend.backtest.simulation_kernel import simulate_positions, to_trade_records, to_equity_curve
+from backend.backtest.feature_cache import FeatureCache, feature_cache
+from backend.core.backtest_results import BacktestResultStore
 
 logger = logging.getLogger(__name__)
 
+# 予測クラス → シグナル
+SIGNAL_LABELS = ['HOLD', 'BUY', 'SELL']
+
+# ターゲットラベルが参照する先の期間数
+TARGET_HORIZON = 5
+
 class BacktestEngine:
     """バックテストエンジン"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self,
+                 db_manager: DatabaseManager,
+                 cache: Optional[FeatureCache] = None,
+                 price_store: Optional[PriceStore] = None):
         self.db_manager = db_manager
         self.feature_engine = FeatureEngineering()
         self.model_manager = ModelManager(db_manager)
+        self.feature_cache = cache if cache is not None else feature_cache
+        self.price_store = price_store if price_store is not None else get_price_store()
+        self.query_planner = PriceQueryPlanner(db_manager)
+        self.result_store = BacktestResultStore(db_manager)
         self.results = {}
         
     async def run_backtest(self,
@@ -32,7 +53,8 @@ class BacktestEngine:
                           start_date: datetime,
                           end_date: datetime,
                           parameters: Dict[str, Any],
-                          initial_balance: float = 100000) -> Dict[str, Any]:
+                          initial_balance: float = 100000,
+                          price_data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """
         バックテスト実行
         
@@ -43,6 +65,7 @@ class BacktestEngine:
             end_date: 終了日
             parameters: パラメータ
             initial_balance: 初期残高
+            price_data: 取得済み価格データ（省略時はデータベースから取得）
             
         Returns:
             バックテスト結果
@@ -53,22 +76,18 @@ class BacktestEngine:
             
             logger.info(f"Starting backtest {test_id} for {symbol} {timeframe}")
             
-            # データ取得
-            historical_data = await self._get_historical_data(
-                symbol, timeframe, start_date, end_date
-            )
-            
-            if historical_data.empty:
-                raise ValueError(f"No data available for {symbol} {timeframe}")
-            
-            # 特徴量作成
-            features_data = self.feature_engine.create_features(historical_data)
+            use_cache = parameters.get('use_feature_cache', True)
+            feature_columns = parameters.get('feature_columns')
             
-            if features_data.empty:
-                raise ValueError("Feature generation failed")
+            # データ取得・特徴量作成（キャッシュ対象）
+            historical_data, features_data, features_key = await self._prepare_features(
+                symbol, timeframe, start_date, end_date, use_cache, price_data, feature_columns
+            )
             
-            # モデル学習（分割データで）
-            model = await self._train_model_for_backtest(features_data, parameters)
+            # モデル学習（分割データで、同一ハイパーパラメータならキャッシュ利用）
+            model = await self._get_backtest_model(
+                features_key, features_data, parameters, use_cache
+            )
             
             # バックテスト実行
             trades, equity_curve = await self._simulate_trading(
@@ -110,34 +129,132 @@ class BacktestEngine:
             logger.error(f"Backtest failed: {e}")
             raise
     
+    async def _prepare_features(self,
+                                symbol: str,
+                                timeframe: str,
+                                start_date: datetime,
+                                end_date: datetime,
+                                use_cache: bool = True,
+                                price_data: Optional[pd.DataFrame] = None,
+                                feature_columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
+        """価格データ取得と特徴量作成（キャッシュ対応、feature_columns指定時はそのカラムのみ計算）"""
+        features_key = self._features_key(symbol, timeframe, start_date, end_date, feature_columns)
+        
+        if use_cache:
+            cached = self.feature_cache.get('features', features_key)
+            if cached is not None:
+                logger.info(f"Feature cache hit for {symbol} {timeframe}")
+                historical_data, features_data = cached
+                return historical_data, features_data, features_key
+        
+        # データ取得
+        if price_data is not None:
+            historical_data = price_data
+        else:
+            historical_data = await self._get_historical_data(
+                symbol, timeframe, start_date, end_date
+            )
+        
+        if historical_data.empty:
+            raise ValueError(f"No data available for {symbol} {timeframe}")
+        
+        # 特徴量作成
+        features_data = self.feature_engine.create_features(historical_data, columns=feature_columns)
+        
+        if features_data.empty:
+            raise ValueError("Feature generation failed")
+        
+        if use_cache:
+            self.feature_cache.put('features', features_key, (historical_data, features_data))
+        
+        return historical_data, features_data, features_key
+    
+    def _features_key(self,
+                      symbol: str,
+                      timeframe: str,
+                      start_date: datetime,
+                      end_date: datetime,
+                      feature_columns: Optional[List[str]] = None) -> str:
+        """特徴量キャッシュのキー"""
+        parts = [symbol, timeframe, start_date, end_date, self.feature_engine.technical_indicators]
+        if feature_columns is not None:
+            parts.append(sorted(feature_columns))
+        return self.feature_cache.make_key(*parts)
+    
+    async def load_price_data(self,
+                              symbol: str,
+                              timeframe: str,
+                              start_date: datetime,
+                              end_date: datetime,
+                              feature_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """価格データ取得（キャッシュ済みならキャッシュから）"""
+        features_key = self._features_key(symbol, timeframe, start_date, end_date, feature_columns)
+        cached = self.feature_cache.get('features', features_key)
+        if cached is not None:
+            return cached[0]
+        
+        return await self._get_historical_data(symbol, timeframe, start_date, end_date)
+    
+    async def prepare_shared_state(self,
+                                   symbol: str,
+                                   timeframe: str,
+                                   start_date: datetime,
+                                   end_date: datetime,
+                                   parameters: Dict[str, Any]):
+        """並列実行前に価格データ・特徴量・モデルをキャッシュへ載せる"""
+        if not parameters.get('use_feature_cache', True):
+            return
+        
+        _, features_data, features_key = await self._prepare_features(
+            symbol, timeframe, start_date, end_date,
+            feature_columns=parameters.get('feature_columns')
+        )
+        await self._get_backtest_model(features_key, features_data, parameters)
+    
+    async def _get_backtest_model(self,
+                                  features_key: str,
+                                  features_data: pd.DataFrame,
+                                  parameters: Dict[str, Any],
+                                  use_cache: bool = True) -> LightGBMPredictor:
+        """バックテスト用モデル取得（キャッシュ対応）"""
+        model_key = self.feature_cache.make_key(
+            features_key, self._build_model_params(parameters)
+        )
+        
+        if use_cache:
+            model = self.feature_cache.get('model', model_key)
+            if model is not None:
+                logger.info("Model cache hit, skipping training")
+                return model
+        
+        model = await self._train_model_for_backtest(features_data, parameters)
+        
+        if use_cache:
+            self.feature_cache.put('model', model_key, model)
+        
+        return model
+    
     async def _get_historical_data(self,
                                   symbol: str,
                                   timeframe: str,
                                   start_date: datetime,
                                   end_date: datetime) -> pd.DataFrame:
         """過去データ取得"""
+        # ローカル価格ストア（取り込み済みの期間はDBを読まない）
+        df = await get_async_db().run(self._load_from_store, symbol, timeframe, start_date, end_date)
+        if df is not None:
+            return df
+        
         try:
-            # まずデータベースから取得を試みる
-            with self.db_manager.get_connection() as conn:
-                query = """
-                    SELECT time, open, high, low, close, tick_volume
-                    FROM price_data
-                    WHERE symbol = %s AND timeframe = %s 
-                    AND time >= %s AND time <= %s
-                    ORDER BY time
-                """
-                
-                df = pd.read_sql_query(
-                    query, conn, 
-                    params=(symbol, timeframe, start_date, end_date),
-                    parse_dates=['time']
-                )
-                
-                if not df.empty:
-                    df.set_index('time', inplace=True)
-                    df.columns = ['open', 'high', 'low', 'close', 'volume']
-                    logger.info(f"Retrieved {len(df)} data points from database for {symbol} {timeframe}")
-                    return df
+            # ストアが使えない場合はデータベースから取得（連続集計ビュー＋未集計分のM1）
+            df, _ = await get_async_db().run(
+                self.query_planner.load, symbol, timeframe, start_date, end_date
+            )
+            if not df.empty:
+                df.set_index('time', inplace=True)
+                df.columns = ['open', 'high', 'low', 'close', 'volume']
+                logger.info(f"Retrieved {len(df)} data points from database for {symbol} {timeframe}")
+                return df
             
             # データベースにデータがない場合、ダミーデータを生成
             logger.warning(f"No database data for {symbol} {timeframe}, generating dummy data")
@@ -148,6 +265,33 @@ class BacktestEngine:
             # エラー時もダミーデータを生成
             return self._generate_dummy_data(symbol, timeframe, start_date, end_date)
     
+    def _load_from_store(self,
+                         symbol: str,
+                         timeframe: str,
+                         start_date: datetime,
+                         end_date: datetime) -> Optional[pd.DataFrame]:
+        """価格ストアから取得（新しい足をDBから取り込んでから読む。上位足が無ければM1から組み立てる）"""
+        try:
+            for source in dict.fromkeys([timeframe, 'M1']):
+                self.price_store.sync_from_database(self.db_manager, symbol, source)
+                df = self.price_store.read(
+                    symbol, source, start_date, end_date,
+                    columns=['open', 'high', 'low', 'close', 'tick_volume']
+                )
+                if df.empty:
+                    continue
+                
+                df.set_index('time', inplace=True)
+                df.columns = ['open', 'high', 'low', 'close', 'volume']
+                if source != timeframe:
+                    df = resample_ohlcv(df, timeframe, include_partial=False)
+                if not df.empty:
+                    logger.info(f"Retrieved {len(df)} data points from price store for {symbol} {timeframe}")
+                    return df
+        except Exception as e:
+            logger.error(f"Error reading price store: {e}")
+        return None
+    
     def _generate_dummy_data(self,
                             symbol: str,
                             timeframe: str,
@@ -202,54 +346,86 @@ class BacktestEngine:
             train_data = train_data.copy()
             train_data['target'] = self._create_target_labels(train_data)
             
-            # 欠損値除去
-            train_data = train_data.dropna()
+            return self._fit_model(train_data, parameters)
             
-            if len(train_data) < 100:
-                raise ValueError("Insufficient training data")
+        except Exception as e:
+            logger.error(f"Error training model for backtest: {e}")
+            raise
+    
+    def _fit_model(self,
+                   train_data: pd.DataFrame,
+                   parameters: Dict[str, Any],
+                   init_model: Optional[LightGBMPredictor] = None) -> LightGBMPredictor:
+        """
+        ターゲット付き学習データでモデル学習
+        
+        Args:
+            train_data: 特徴量と target 列
+            parameters: パラメータ
+            init_model: 続きから学習する前回のモデル（ウォームスタート）
             
-            # 特徴量選択
+        Returns:
+            学習済みモデル
+        """
+        # 欠損値除去
+        train_data = train_data.dropna()
+        
+        if len(train_data) < 100:
+            raise ValueError("Insufficient training data")
+        
+        # 特徴量選択（指定があればそのカラムのみ）
+        feature_columns = parameters.get('feature_columns')
+        if feature_columns is None:
             feature_columns = [col for col in train_data.columns 
                              if col not in ['target', 'open', 'high', 'low', 'close', 'volume']]
-            
-            X_train = train_data[feature_columns]
-            y_train = train_data['target']
-            
-            # モデル学習
-            model = LightGBMPredictor()
-            
-            # パラメータ設定
-            # LightGBMのパラメータ設定
-            lgb_params = {
-                'objective': 'multiclass',
-                'num_class': 3,
-                'metric': 'multi_logloss',
-                'boosting_type': 'gbdt',
-                'num_leaves': 31,
-                'learning_rate': parameters.get('learning_rate', 0.1),
-                'feature_fraction': 0.9,
-                'bagging_fraction': 0.8,
-                'bagging_freq': 5,
-                'min_data_in_leaf': 20,
-                'verbose': -1,
-                'random_state': 42
-            }
-            
-            model.params = lgb_params
+        
+        X_train = train_data[feature_columns]
+        y_train = train_data['target']
+        
+        # モデル学習
+        model = LightGBMPredictor()
+        model.params = self._build_model_params(parameters)
+        if init_model is not None:
+            known = list(init_model.label_encoder.classes_)
+            labels = sorted(set(known) | set(y_train.unique()))
+            if labels[:len(known)] != known:
+                # 前回に無かったラベルが既存ラベルより前に並ぶとクラス番号がずれるため、このウィンドウは新規学習
+                logger.warning(f"Labels {labels} do not extend warm-start labels {known}, training from scratch")
+                init_model = None
+        if init_model is not None:
+            # 前回のブースターに木を追加（クラス番号は変えずに、新しいラベルを後ろに加える）
+            model.label_encoder = LabelEncoder().fit(labels)
+            model.train(X_train, y_train,
+                        num_boost_round=parameters.get('warm_start_rounds', 200),
+                        init_model=init_model.model)
+        else:
             model.train(X_train, y_train)
-            model.feature_columns = feature_columns
-            
-            return model
-            
-        except Exception as e:
-            logger.error(f"Error training model for backtest: {e}")
-            raise
+        model.feature_columns = feature_columns
+        
+        return model
+    
+    def _build_model_params(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """LightGBMのパラメータ設定"""
+        return {
+            'objective': 'multiclass',
+            'num_class': 3,
+            'metric': 'multi_logloss',
+            'boosting_type': 'gbdt',
+            'num_leaves': 31,
+            'learning_rate': parameters.get('learning_rate', 0.1),
+            'feature_fraction': 0.9,
+            'bagging_fraction': 0.8,
+            'bagging_freq': 5,
+            'min_data_in_leaf': 20,
+            'verbose': -1,
+            'random_state': 42
+        }
     
     def _create_target_labels(self, data: pd.DataFrame) -> pd.Series:
         """ターゲットラベル作成"""
         try:
             # 未来の価格変動を計算
-            future_periods = 5  # 5期間後の価格を参照
+            future_periods = TARGET_HORIZON  # 5期間後の価格を参照
             
             price_change = (
                 data['close'].shift(-future_periods) - data['close']
@@ -298,13 +474,30 @@ class BacktestEngine:
             commission_per_lot = parameters.get('commission_per_lot', 500)  # 円
             spread_pips = parameters.get('spread_pips', 1)
             
+            # 予測モード（'batch': 一括予測, 'per_bar': バー毎予測）
+            prediction_mode = parameters.get('prediction_mode', 'batch')
+            
             # 対象期間（学習期間後からテスト）
             split_point = int(len(features_data) * 0.8)
             test_features = features_data.iloc[split_point:]
             test_prices = price_data.iloc[split_point:]
+            warmup_bars = 100
             
             logger.info(f"Simulating trading on {len(test_features)} data points")
             
+            # 一括予測（テスト区間全体を1回のモデル呼び出しでスコアリング）
+            batch_signals = None
+            if prediction_mode == 'batch':
+                batch_signals = self._predict_signals_batch(model, test_features, warmup_bars)
+            
+            # 配列ベースのシミュレーションカーネル（'kernel'）またはPythonループ（'python'）
+            simulation_engine = parameters.get('simulation_engine', 'kernel')
+            if (batch_signals is not None and simulation_engine == 'kernel' and
+                    test_prices.index.equals(test_features.index)):
+                return self._simulate_trading_kernel(
+                    test_prices, batch_signals, parameters, initial_balance, warmup_bars
+                )
+            
             for i, (timestamp, feature_row) in enumerate(test_features.iterrows()):
                 if timestamp not in test_prices.index:
                     continue
@@ -313,7 +506,7 @@ class BacktestEngine:
                 current_price = price_row['close']
                 
                 # 最初の100データポイントはスキップ（安定性のため）
-                if i < 100:
+                if i < warmup_bars:
                     equity_curve.append({
                         'timestamp': timestamp.isoformat(),
                         'equity': equity,
@@ -324,23 +517,28 @@ class BacktestEngine:
                     continue
                 
                 # 予測実行
-                try:
-                    # 特徴量準備
-                    features_input = feature_row[model.feature_columns].to_frame().T
-                    
-                    if hasattr(model, 'predict_with_confidence'):
-                        predictions, confidence = model.predict_with_confidence(features_input)
-                        signal = ['HOLD', 'BUY', 'SELL'][predictions[0]]
-                        conf_score = confidence[0]
-                    else:
-                        predictions = model.predict(features_input)
-                        signal = ['HOLD', 'BUY', 'SELL'][predictions[0]]
-                        conf_score = 0.7  # デフォルト信頼度
+                if batch_signals is not None:
+                    signal_codes, confidences = batch_signals
+                    signal = SIGNAL_LABELS[signal_codes[i]]
+                    conf_score = confidences[i]
+                else:
+                    try:
+                        # 特徴量準備
+                        features_input = feature_row[model.feature_columns].to_frame().T
                         
-                except Exception as e:
-                    logger.warning(f"Prediction failed at {timestamp}: {e}")
-                    signal = 'HOLD'
-                    conf_score = 0.0
+                        if hasattr(model, 'predict_with_confidence'):
+                            predictions, confidence = model.predict_with_confidence(features_input)
+                            signal = SIGNAL_LABELS[predictions[0]]
+                            conf_score = confidence[0]
+                        else:
+                            predictions = model.predict(features_input)
+                            signal = SIGNAL_LABELS[predictions[0]]
+                            conf_score = 0.7  # デフォルト信頼度
+                            
+                    except Exception as e:
+                        logger.warning(f"Prediction failed at {timestamp}: {e}")
+                        signal = 'HOLD'
+                        conf_score = 0.0
                 
                 # 信頼度チェック
                 if conf_score < min_confidence:
@@ -415,6 +613,69 @@ class BacktestEngine:
             logger.error(f"Error in trading simulation: {e}")
             return [], []
     
+    def _predict_signals_batch(self,
+                               model: LightGBMPredictor,
+                               test_features: pd.DataFrame,
+                               warmup_bars: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        テスト区間の一括予測
+        
+        Args:
+            model: 学習済みモデル
+            test_features: テスト区間の特徴量
+            warmup_bars: 予測を行わない先頭バー数
+            
+        Returns:
+            (シグナルコード配列, 信頼度配列)。失敗時はNone（バー毎予測にフォールバック）
+        """
+        try:
+            signal_codes = np.zeros(len(test_features), dtype=np.int64)
+            confidences = np.zeros(len(test_features), dtype=np.float64)
+            
+            if len(test_features) <= warmup_bars:
+                return signal_codes, confidences
+            
+            features_input = test_features[model.feature_columns].iloc[warmup_bars:]
+            
+            if hasattr(model, 'predict_with_confidence'):
+                predictions, confidence = model.predict_with_confidence(features_input)
+                confidences[warmup_bars:] = confidence
+            else:
+                predictions = model.predict(features_input)
+                confidences[warmup_bars:] = 0.7  # デフォルト信頼度
+            
+            signal_codes[warmup_bars:] = np.asarray(predictions, dtype=np.int64)
+            
+            return signal_codes, confidences
+            
+        except Exception as e:
+            logger.warning(f"Batch prediction failed, falling back to per-bar prediction: {e}")
+            return None
+    
+    def _simulate_trading_kernel(self,
+                                 test_prices: pd.DataFrame,
+                                 batch_signals: Tuple[np.ndarray, np.ndarray],
+                                 parameters: Dict[str, Any],
+                                 initial_balance: float,
+                                 warmup_bars: int) -> Tuple[List[Dict], List[Dict]]:
+        """シミュレーションカーネルによる取引シミュレーション"""
+        signal_codes, confidences = batch_signals
+        close = test_prices['close'].to_numpy(dtype=np.float64)
+        
+        result = simulate_positions(
+            test_prices['high'].to_numpy(dtype=np.float64),
+            test_prices['low'].to_numpy(dtype=np.float64),
+            close, signal_codes, confidences,
+            parameters, initial_balance, warmup_bars
+        )
+        
+        trades = to_trade_records(result, test_prices.index)
+        equity_curve = to_equity_curve(result, test_prices.index, close, warmup_bars)
+        
+        logger.info(f"Simulation completed: {len(trades)} trades, final balance: {result['final_balance']:.2f}")
+        
+        return trades, equity_curve
+    
     async def _open_backtest_position(self,
                                      order_type: str,
                                      entry_price: float,
@@ -866,58 +1127,13 @@ class BacktestEngine:
                                    parameters: Dict[str, Any],
                                    equity_curve: List[Dict],
                                    trades: List[Dict]):
-        """バックテスト結果保存"""
+        """バックテスト結果保存（取引・エクイティカーブは間引かずにCOPYで一括保存）"""
         try:
-            with self.db_manager.get_connection() as conn:
-                with conn.cursor() as cursor:
-                    # メイン結果保存
-                    insert_query = """
-                        INSERT INTO backtest_results 
-                        (test_id, symbol, timeframe, period_start, period_end,
-                         initial_balance, final_balance, total_trades, winning_trades,
-                         win_rate, profit_factor, max_drawdown, sharpe_ratio,
-                         parameters, statistics, created_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    
-                    cursor.execute(insert_query, (
-                        test_id, symbol, timeframe, start_date, end_date,
-                        initial_balance, statistics['final_balance'],
-                        statistics['total_trades'], statistics['winning_trades'],
-                        statistics['win_rate'], statistics['profit_factor'],
-                        statistics['max_drawdown_percent'], statistics['sharpe_ratio'],
-                        str(parameters), str(statistics), datetime.now()
-                    ))
-                    
-                    # エクイティカーブ保存（サンプリング）
-                    equity_sample = equity_curve[::max(1, len(equity_curve) // 1000)]  # 最大1000ポイント
-                    for point in equity_sample:
-                        cursor.execute("""
-                            INSERT INTO backtest_equity_curves 
-                            (test_id, timestamp, equity, balance, unrealized_pnl)
-                            VALUES (%s, %s, %s, %s, %s)
-                        """, (
-                            test_id, point['timestamp'], point['equity'],
-                            point['balance'], point.get('unrealized_pnl', 0)
-                        ))
-                    
-                    # 取引履歴保存（最初の100件）
-                    for trade in trades[:100]:
-                        cursor.execute("""
-                            INSERT INTO backtest_trades 
-                            (test_id, entry_time, exit_time, type, entry_price, exit_price,
-                             lot_size, profit_loss, duration_hours, exit_reason)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (
-                            test_id, trade['entry_time'], trade['exit_time'],
-                            trade['type'], trade['entry_price'], trade['exit_price'],
-                            trade['lot_size'], trade['profit_loss'],
-                            trade['duration_hours'], trade['exit_reason']
-                        ))
-                    
-                    conn.commit()
-                    logger.info(f"Backtest result saved: {test_id}")
-                    
+            await get_async_db().run(
+                self.result_store.save,
+                test_id, symbol, timeframe, start_date, end_date, initial_balance,
+                statistics, parameters, equity_curve, trades
+            )
         except Exception as e:
             logger.error(f"Error saving backtest result: {e}")
             raise
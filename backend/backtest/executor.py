@@ -0,0 +1,324 @@
+"""
+バックテスト試行の実行バックエンド
+
+パラメータ最適化の各試行（run_backtest呼び出し）を直列・スレッドプール・
+プロセスプールのいずれかで実行し、完了順に結果を返す。
+プロセスプールでは価格データを共有メモリ経由で1回だけワーカーへ渡す。
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Any, AsyncIterator, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+TrialOutcome = Tuple[int, Dict[str, Any], Union[Dict[str, Any], Exception]]
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """最適化に必要な項目だけを残す（エクイティカーブ・取引一覧を除外）"""
+    return {key: value for key, value in result.items()
+            if key not in ('equity_curve', 'trades')}
+
+
+class TrialExecutor:
+    """試行実行バックエンド基底クラス（直列実行）"""
+
+    name = 'serial'
+
+    def __init__(self, max_workers: int = 1):
+        self.max_workers = max_workers
+
+    async def run_trials(self,
+                         engine,
+                         symbol: str,
+                         timeframe: str,
+                         start_date: datetime,
+                         end_date: datetime,
+                         param_list: List[Dict[str, Any]],
+                         initial_balance: float = 100000,
+                         summary_only: bool = True) -> AsyncIterator[TrialOutcome]:
+        """
+        試行を実行し完了順に結果を返す
+
+        Args:
+            engine: BacktestEngine
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            start_date: 開始日
+            end_date: 終了日
+            param_list: パラメータのリスト
+            initial_balance: 初期残高
+            summary_only: エクイティカーブ・取引一覧を除外するか
+
+        Yields:
+            (試行インデックス, パラメータ, 結果または例外)
+        """
+        for i, params in enumerate(param_list):
+            try:
+                result = await engine.run_backtest(
+                    symbol, timeframe, start_date, end_date, params, initial_balance
+                )
+                yield i, params, summarize_result(result) if summary_only else result
+            except Exception as e:
+                yield i, params, e
+
+    def shutdown(self) -> None:
+        """リソース解放"""
+        pass
+
+    def get_info(self) -> Dict[str, Any]:
+        """実行バックエンド情報"""
+        return {'executor': self.name, 'max_workers': self.max_workers}
+
+
+class SerialExecutor(TrialExecutor):
+    """直列実行（イベントループ上で1試行ずつ実行）"""
+
+    name = 'serial'
+
+
+class ThreadExecutor(TrialExecutor):
+    """スレッドプール実行"""
+
+    name = 'thread'
+
+    def __init__(self, max_workers: Optional[int] = None):
+        super().__init__(max_workers or os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='backtest'
+        )
+
+    async def run_trials(self,
+                         engine,
+                         symbol: str,
+                         timeframe: str,
+                         start_date: datetime,
+                         end_date: datetime,
+                         param_list: List[Dict[str, Any]],
+                         initial_balance: float = 100000,
+                         summary_only: bool = True) -> AsyncIterator[TrialOutcome]:
+        loop = asyncio.get_running_loop()
+
+        # 価格データ・特徴量・モデルを先に1回だけ用意してキャッシュに載せる
+        if param_list:
+            await engine.prepare_shared_state(
+                symbol, timeframe, start_date, end_date, param_list[0]
+            )
+
+        def run_single(params: Dict[str, Any]) -> Dict[str, Any]:
+            result = asyncio.run(engine.run_backtest(
+                symbol, timeframe, start_date, end_date, params, initial_balance
+            ))
+            return summarize_result(result) if summary_only else result
+
+        futures = {}
+        for i, params in enumerate(param_list):
+            future = asyncio.wrap_future(self._pool.submit(run_single, params), loop=loop)
+            futures[future] = (i, params)
+
+        async for outcome in _iterate_completed(futures):
+            yield outcome
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ProcessExecutor(TrialExecutor):
+    """プロセスプール実行（価格データは共有メモリで受け渡し）"""
+
+    name = 'process'
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 db_config_path: str = "config/database.conf"):
+        super().__init__(max_workers or os.cpu_count() or 1)
+        self.db_config_path = db_config_path
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(db_config_path,)
+        )
+
+    async def run_trials(self,
+                         engine,
+                         symbol: str,
+                         timeframe: str,
+                         start_date: datetime,
+                         end_date: datetime,
+                         param_list: List[Dict[str, Any]],
+                         initial_balance: float = 100000,
+                         summary_only: bool = True) -> AsyncIterator[TrialOutcome]:
+        if not param_list:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        # 親プロセスで1回だけデータ取得し共有メモリに配置
+        price_data = await engine.load_price_data(
+            symbol, timeframe, start_date, end_date, param_list[0].get('feature_columns')
+        )
+        shared = SharedPriceData.from_frame(price_data)
+
+        try:
+            futures = {}
+            for i, params in enumerate(param_list):
+                future = asyncio.wrap_future(self._pool.submit(
+                    _run_trial_in_worker, shared.spec, symbol, timeframe,
+                    start_date, end_date, params, initial_balance, summary_only
+                ), loop=loop)
+                futures[future] = (i, params)
+
+            async for outcome in _iterate_completed(futures):
+                yield outcome
+        finally:
+            shared.release()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def create_executor(kind: str = 'serial',
+                    max_workers: Optional[int] = None,
+                    **kwargs) -> TrialExecutor:
+    """
+    実行バックエンド作成
+
+    Args:
+        kind: 'serial', 'thread', 'process'
+        max_workers: ワーカー数（省略時はCPUコア数）
+
+    Returns:
+        TrialExecutor
+    """
+    if kind == 'serial':
+        return SerialExecutor()
+    elif kind == 'thread':
+        return ThreadExecutor(max_workers)
+    elif kind == 'process':
+        return ProcessExecutor(max_workers, **kwargs)
+    else:
+        raise ValueError(f"Unknown executor: {kind}")
+
+
+async def _iterate_completed(futures: Dict[asyncio.Future, Tuple[int, Dict[str, Any]]]
+                             ) -> AsyncIterator[TrialOutcome]:
+    """完了順に試行結果を返す"""
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                i, params = futures[future]
+                try:
+                    yield i, params, future.result()
+                except Exception as e:
+                    yield i, params, e
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+class SharedPriceData:
+    """共有メモリ上の価格データ（時刻int64 + OHLCV float64）"""
+
+    def __init__(self, shm: SharedMemory, rows: int, owner: bool):
+        self.shm = shm
+        self.rows = rows
+        self.owner = owner
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        """ワーカーへ渡す参照情報"""
+        return {'name': self.shm.name, 'rows': self.rows}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SharedPriceData':
+        """DataFrameから共有メモリを作成"""
+        rows = len(df)
+        shm = SharedMemory(create=True, size=max(1, rows * 8 * (1 + len(PRICE_COLUMNS))))
+
+        times, values = cls._views(shm, rows)
+        times[:] = pd.DatetimeIndex(df.index).asi8
+        values[:] = df.reindex(columns=PRICE_COLUMNS, fill_value=0).to_numpy(dtype=np.float64)
+
+        return cls(shm, rows, owner=True)
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> 'SharedPriceData':
+        """ワーカー側で既存の共有メモリに接続"""
+        shm = SharedMemory(name=spec['name'])
+        return cls(shm, spec['rows'], owner=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrameとして取り出す（共有メモリから複製）"""
+        times, values = self._views(self.shm, self.rows)
+        index = pd.DatetimeIndex(times.copy())
+        return pd.DataFrame(values.copy(), index=index, columns=PRICE_COLUMNS)
+
+    def release(self) -> None:
+        """共有メモリ解放"""
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _views(shm: SharedMemory, rows: int) -> Tuple[np.ndarray, np.ndarray]:
+        times = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf, offset=0)
+        values = np.ndarray((rows, len(PRICE_COLUMNS)), dtype=np.float64,
+                            buffer=shm.buf, offset=rows * 8)
+        return times, values
+
+
+# ワーカープロセス内の状態
+_worker_engine = None
+_worker_price_data: Dict[str, pd.DataFrame] = {}
+
+
+def _init_worker(db_config_path: str) -> None:
+    """ワーカープロセス初期化"""
+    global _worker_engine
+
+    from backend.core.database import DatabaseManager
+    from backend.backtest.backtest_engine import BacktestEngine
+
+    _worker_engine = BacktestEngine(DatabaseManager(db_config_path))
+
+
+def _run_trial_in_worker(spec: Dict[str, Any],
+                         symbol: str,
+                         timeframe: str,
+                         start_date: datetime,
+                         end_date: datetime,
+                         params: Dict[str, Any],
+                         initial_balance: float,
+                         summary_only: bool) -> Dict[str, Any]:
+    """ワーカープロセスで1試行を実行"""
+    price_data = _worker_price_data.get(spec['name'])
+    if price_data is None:
+        shared = SharedPriceData.attach(spec)
+        try:
+            price_data = shared.to_frame()
+        finally:
+            shared.release()
+        # 直近のデータセットのみ保持
+        while len(_worker_price_data) >= 8:
+            _worker_price_data.pop(next(iter(_worker_price_data)))
+        _worker_price_data[spec['name']] = price_data
+
+    result = asyncio.run(_worker_engine.run_backtest(
+        symbol, timeframe, start_date, end_date, params, initial_balance,
+        price_data=price_data
+    ))
+    return summarize_result(result) if summary_only else result
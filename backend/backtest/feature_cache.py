@@ -0,0 +1,161 @@
+"""
+特徴量・学習済みモデルキャッシュ
+
+パラメータ最適化では取引パラメータ（SL/TP、min_confidence等）だけが
+反復毎に変わるため、価格データ・特徴量行列・学習済みモデルを
+内容ベースのキーで共有し、データ取得と学習を1回に抑える。
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureCache:
+    """LRU方式の特徴量・モデルキャッシュ"""
+
+    KINDS = ('features', 'model')
+
+    def __init__(self,
+                 max_entries: int = 32,
+                 max_bytes: int = 1024 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 3600):
+        """
+        初期化
+
+        Args:
+            max_entries: 最大エントリ数
+            max_bytes: 最大合計サイズ（バイト）
+            ttl_seconds: エントリの有効期間（Noneで無期限）
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {kind: {'hits': 0, 'misses': 0} for kind in self.KINDS}
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """キー構成要素から内容ベースのキーを生成"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """キャッシュ取得（ヒット・ミスを記録）"""
+        with self._lock:
+            entry_key = self._entry_key(kind, key)
+            entry = self._entries.get(entry_key)
+
+            if entry is not None and self._is_expired(entry):
+                self._remove(entry_key)
+                entry = None
+
+            if entry is None:
+                self._counters[kind]['misses'] += 1
+                return None
+
+            self._entries.move_to_end(entry_key)
+            self._counters[kind]['hits'] += 1
+            return entry['value']
+
+    def put(self, kind: str, key: str, value: Any, nbytes: Optional[int] = None) -> None:
+        """キャッシュ登録"""
+        if nbytes is None:
+            nbytes = self._estimate_size(value)
+
+        if nbytes > self.max_bytes:
+            logger.warning(f"Cache entry too large ({nbytes} bytes), not caching")
+            return
+
+        with self._lock:
+            entry_key = self._entry_key(kind, key)
+            if entry_key in self._entries:
+                self._remove(entry_key)
+
+            self._entries[entry_key] = {
+                'value': value,
+                'nbytes': nbytes,
+                'created_at': time.monotonic()
+            }
+            self._total_bytes += nbytes
+
+            # LRU削除
+            while (len(self._entries) > self.max_entries or
+                   self._total_bytes > self.max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """キャッシュ全削除（カウンタは保持）"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """キャッシュ統計取得"""
+        with self._lock:
+            counters = {}
+            for kind, counter in self._counters.items():
+                total = counter['hits'] + counter['misses']
+                counters[kind] = {
+                    'hits': counter['hits'],
+                    'misses': counter['misses'],
+                    'hit_rate': round(counter['hits'] / total, 4) if total > 0 else 0.0,
+                    'entries': sum(1 for k in self._entries if k.startswith(f"{kind}:"))
+                }
+
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': self._evictions,
+                'counters': counters
+            }
+
+    def _entry_key(self, kind: str, key: str) -> str:
+        return f"{kind}:{key}"
+
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return time.monotonic() - entry['created_at'] > self.ttl_seconds
+
+    def _remove(self, entry_key: str) -> None:
+        entry = self._entries.pop(entry_key)
+        self._total_bytes -= entry['nbytes']
+
+    def _estimate_size(self, value: Any) -> int:
+        """値のメモリサイズ推定"""
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=False).sum())
+        if isinstance(value, np.ndarray):
+            return int(value.nbytes)
+        if isinstance(value, (tuple, list)):
+            return sum(self._estimate_size(item) for item in value)
+
+        # 学習済みモデル（LightGBMPredictor はブースターを model に保持）
+        booster = value if isinstance(value, lgb.Booster) else getattr(value, 'model', None)
+        if isinstance(booster, lgb.Booster):
+            # テキスト表現の長さで近似（木の数×葉の数に比例）
+            return len(booster.model_to_string())
+        return 0
+
+
+# グローバル特徴量キャッシュ
+feature_cache = FeatureCache()
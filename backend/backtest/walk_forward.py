@@ -0,0 +1,278 @@
+"""
+ウォークフォワード・バックテスト
+
+期間全体の特徴量・ターゲットを1回だけ作成し、学習区間・テスト区間の
+ウィンドウを時間順にずらしながら学習と検証を繰り返す。
+ローリング（学習区間の長さ固定）とアンカード（学習開始を固定）に対応し、
+ウォームスタート時は前ウィンドウのLightGBMブースターに木を追加して学習する。
+各ウィンドウのテスト区間の予測・シミュレーションは互いに独立なため
+スレッドプールで並列に実行し、アウトオブサンプルのエクイティカーブを
+時間順につなげて返す。
+"""
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+import pandas as pd
+
+from backend.backtest.backtest_engine import TARGET_HORIZON
+
+logger = logging.getLogger(__name__)
+
+
+def build_windows(total_bars: int,
+                  train_bars: int,
+                  test_bars: int,
+                  anchored: bool = False,
+                  purge_bars: int = 0) -> List[Dict[str, int]]:
+    """
+    ウィンドウ分割（位置インデックス、終端は含まない）
+
+    テスト区間は重ならずに連続し、学習区間はテスト区間の直前で終わる。
+    ターゲットが先の価格を参照するため、学習区間の末尾 purge_bars 本は
+    テスト区間の価格を見ないよう除外する。
+
+    Args:
+        total_bars: 全バー数
+        train_bars: 学習区間のバー数（アンカード時は最初のウィンドウのみ）
+        test_bars: テスト区間のバー数
+        anchored: 学習開始を先頭に固定するか
+        purge_bars: 学習区間末尾から除外するバー数
+
+    Returns:
+        train_start, train_end, test_start, test_end のリスト
+    """
+    if train_bars <= purge_bars or test_bars <= 0:
+        raise ValueError("train_bars must exceed purge_bars and test_bars must be positive")
+
+    windows = []
+    test_start = train_bars
+    while test_start < total_bars:
+        windows.append({
+            'train_start': 0 if anchored else test_start - train_bars,
+            'train_end': test_start - purge_bars,
+            'test_start': test_start,
+            'test_end': min(test_start + test_bars, total_bars)
+        })
+        test_start += test_bars
+    return windows
+
+
+def stitch_equity_curves(window_results: List[Dict[str, Any]]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    ウィンドウ毎のエクイティカーブ・取引を時間順につなげる
+
+    各ウィンドウは初期残高から独立にシミュレーションするため、
+    それまでのウィンドウの確定損益を後続ウィンドウのエクイティ・残高に加算する。
+
+    Returns:
+        (エクイティカーブ, 取引一覧)
+    """
+    equity_curve = []
+    trades = []
+    carried = 0.0
+    for result in window_results:
+        for point in result['equity_curve']:
+            equity_curve.append({**point,
+                                 'equity': point['equity'] + carried,
+                                 'balance': point['balance'] + carried})
+        trades.extend({**trade, 'window': result['window']} for trade in result['trades'])
+        carried += sum(trade['profit_loss'] for trade in result['trades'])
+    return equity_curve, trades
+
+
+class WalkForwardBacktester:
+    """ウォークフォワード・バックテスト"""
+
+    def __init__(self, engine, max_workers: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            engine: BacktestEngine（特徴量作成・学習・シミュレーションに使用）
+            max_workers: テスト区間を並列実行するスレッド数（省略時はCPUコア数）
+        """
+        self.engine = engine
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    async def run(self,
+                  symbol: str,
+                  timeframe: str,
+                  start_date: datetime,
+                  end_date: datetime,
+                  parameters: Dict[str, Any],
+                  initial_balance: float = 100000,
+                  train_bars: int = 2000,
+                  test_bars: int = 500,
+                  anchored: bool = False,
+                  warm_start: bool = True,
+                  price_data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """
+        ウォークフォワード・バックテスト実行
+
+        Args:
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            start_date: 開始日
+            end_date: 終了日
+            parameters: パラメータ
+            initial_balance: 初期残高
+            train_bars: 学習区間のバー数
+            test_bars: テスト区間のバー数
+            anchored: 学習開始を固定（False ならローリング）
+            warm_start: 前ウィンドウのブースターから学習を続けるか
+            price_data: 取得済み価格データ（省略時はデータベースから取得）
+
+        Returns:
+            バックテスト結果（windows にウィンドウ毎の統計）
+        """
+        try:
+            test_id = str(uuid.uuid4())
+            engine = self.engine
+            logger.info(f"Starting walk-forward backtest {test_id} for {symbol} {timeframe}")
+
+            # 特徴量・ターゲットは期間全体で1回だけ作成し、ウィンドウ毎に切り出す
+            historical_data, features_data, _ = await engine._prepare_features(
+                symbol, timeframe, start_date, end_date,
+                parameters.get('use_feature_cache', True), price_data,
+                parameters.get('feature_columns')
+            )
+            labeled = features_data.copy()
+            labeled['target'] = engine._create_target_labels(labeled)
+            test_prices = historical_data.reindex(features_data.index)
+
+            windows = build_windows(len(labeled), train_bars, test_bars, anchored, TARGET_HORIZON)
+            if not windows:
+                raise ValueError(f"Not enough data for walk-forward: {len(labeled)} bars, "
+                                 f"train_bars={train_bars}")
+
+            loop = asyncio.get_running_loop()
+            pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='walk_forward')
+            try:
+                tasks = []
+                model = None
+                for i, window in enumerate(windows):
+                    if warm_start:
+                        # 学習は前ウィンドウのモデルに依存するため順番に行い、
+                        # テスト区間は学習済みになったものから並列に流す
+                        model = await loop.run_in_executor(
+                            pool, self._train_window, labeled, window, parameters, model
+                        )
+                        tasks.append(loop.run_in_executor(
+                            pool, self._test_window, i, window, model, labeled, test_prices,
+                            parameters, initial_balance
+                        ))
+                    else:
+                        tasks.append(loop.run_in_executor(
+                            pool, self._run_window, i, window, labeled, test_prices,
+                            parameters, initial_balance
+                        ))
+                window_results = await asyncio.gather(*tasks)
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+            equity_curve, trades = stitch_equity_curves(window_results)
+            statistics = engine._calculate_statistics(trades, equity_curve, initial_balance)
+            window_statistics = [
+                {key: value for key, value in result.items() if key not in ('equity_curve', 'trades')}
+                for result in window_results
+            ]
+            statistics['walk_forward_windows'] = window_statistics
+
+            walk_forward = {
+                'train_bars': train_bars,
+                'test_bars': test_bars,
+                'anchored': anchored,
+                'warm_start': warm_start,
+                'windows': len(windows)
+            }
+            await engine._save_backtest_result(
+                test_id, symbol, timeframe, start_date, end_date, initial_balance,
+                statistics, {**parameters, 'walk_forward': walk_forward}, equity_curve, trades
+            )
+
+            logger.info(f"Walk-forward backtest {test_id} completed: {len(windows)} windows, "
+                        f"{len(trades)} trades")
+
+            return {
+                'test_id': test_id,
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'period': {
+                    'start_date': start_date.isoformat(),
+                    'end_date': end_date.isoformat()
+                },
+                'initial_balance': initial_balance,
+                'parameters': parameters,
+                'walk_forward': walk_forward,
+                'statistics': statistics,
+                'windows': window_statistics,
+                'equity_curve': equity_curve,
+                'trades': trades,
+                'data_points': len(historical_data)
+            }
+
+        except Exception as e:
+            logger.error(f"Walk-forward backtest failed: {e}")
+            raise
+
+    def _train_window(self,
+                      labeled: pd.DataFrame,
+                      window: Dict[str, int],
+                      parameters: Dict[str, Any],
+                      init_model=None):
+        """ウィンドウの学習区間でモデル学習"""
+        train_data = labeled.iloc[window['train_start']:window['train_end']]
+        return self.engine._fit_model(train_data, parameters, init_model)
+
+    def _test_window(self,
+                     index: int,
+                     window: Dict[str, int],
+                     model,
+                     labeled: pd.DataFrame,
+                     prices: pd.DataFrame,
+                     parameters: Dict[str, Any],
+                     initial_balance: float) -> Dict[str, Any]:
+        """ウィンドウのテスト区間で予測・シミュレーション"""
+        engine = self.engine
+        test_slice = slice(window['test_start'], window['test_end'])
+        test_features = labeled.iloc[test_slice]
+        test_prices = prices.iloc[test_slice]
+
+        # 特徴量は期間全体から作成済みのためウォームアップ不要
+        batch_signals = engine._predict_signals_batch(model, test_features, 0)
+        if batch_signals is None:
+            raise ValueError(f"Prediction failed for walk-forward window {index}")
+        trades, equity_curve = engine._simulate_trading_kernel(
+            test_prices, batch_signals, parameters, initial_balance, 0
+        )
+
+        booster = getattr(model, 'model', None)
+        return {
+            'window': index,
+            'train_start': labeled.index[window['train_start']].isoformat(),
+            'train_end': labeled.index[window['train_end'] - 1].isoformat(),
+            'test_start': test_features.index[0].isoformat(),
+            'test_end': test_features.index[-1].isoformat(),
+            'train_rows': window['train_end'] - window['train_start'],
+            'test_rows': len(test_features),
+            'num_trees': booster.num_trees() if booster is not None else None,
+            'statistics': engine._calculate_statistics(trades, equity_curve, initial_balance),
+            'equity_curve': equity_curve,
+            'trades': trades
+        }
+
+    def _run_window(self,
+                    index: int,
+                    window: Dict[str, int],
+                    labeled: pd.DataFrame,
+                    prices: pd.DataFrame,
+                    parameters: Dict[str, Any],
+                    initial_balance: float) -> Dict[str, Any]:
+        """ウォームスタート無し: 学習とテストを1ウィンドウ内で完結"""
+        model = self._train_window(labeled, window, parameters)
+        return self._test_window(index, window, model, labeled, prices, parameters, initial_balance)
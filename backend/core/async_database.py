@@ -0,0 +1,186 @@
+"""
+非同期データベースアクセス
+
+async def のエンドポイント・監視タスクから psycopg2 / pd.read_sql_query を
+直接呼ぶとイベントループが止まるため、同期DB処理を専用の有界スレッドプールへ
+オフロードして await できるようにする。
+スレッド数は接続プールの最大接続数に合わせ、プール待ちでスレッドが詰まらないようにする。
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+import psycopg2.extras
+
+from backend.core.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase:
+    """スレッドプールオフロード型の非同期DBアクセス"""
+
+    def __init__(self,
+                 db_manager: Optional[DatabaseManager] = None,
+                 max_workers: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            db_manager: DatabaseManager（省略時は新規作成）
+            max_workers: DBスレッド数（省略時は接続プールの最大接続数）
+        """
+        self.db_manager = db_manager or DatabaseManager()
+        if max_workers is None:
+            pool = self.db_manager.pool
+            max_workers = pool.max_size if pool is not None else 4
+        self.max_workers = max_workers
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'active': 0,
+            'queue_time_total': 0.0,
+            'run_time_total': 0.0,
+            'run_time_max': 0.0
+        }
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        同期関数をDBスレッドで実行
+
+        Args:
+            func: DBアクセスを含む同期関数
+            *args, **kwargs: 関数の引数
+
+        Returns:
+            関数の戻り値
+        """
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._stats['submitted'] += 1
+
+        call = functools.partial(self._run_measured, func, submitted_at, *args, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def read_sql(self,
+                       query: str,
+                       params: Optional[Sequence[Any]] = None,
+                       parse_dates: Optional[List[str]] = None) -> pd.DataFrame:
+        """pd.read_sql_queryの非同期版"""
+        def read():
+            with self.db_manager.get_connection() as conn:
+                return pd.read_sql_query(query, conn, params=params, parse_dates=parse_dates)
+
+        return await self.run(read)
+
+    async def fetch_all(self,
+                        query: str,
+                        params: Optional[Sequence[Any]] = None) -> List[Dict[str, Any]]:
+        """全行を辞書のリストで取得"""
+        def fetch():
+            with self.db_manager.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    cursor.execute(query, params)
+                    return [dict(row) for row in cursor.fetchall()]
+
+        return await self.run(fetch)
+
+    async def fetch_one(self,
+                        query: str,
+                        params: Optional[Sequence[Any]] = None) -> Optional[Dict[str, Any]]:
+        """1行を辞書で取得（該当なしはNone）"""
+        def fetch():
+            with self.db_manager.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    cursor.execute(query, params)
+                    row = cursor.fetchone()
+                    return dict(row) if row else None
+
+        return await self.run(fetch)
+
+    async def execute(self, query: str, params: Optional[Sequence[Any]] = None) -> int:
+        """更新系クエリ実行（コミット済み、影響行数を返す）"""
+        def execute():
+            with self.db_manager.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    rowcount = cursor.rowcount
+                conn.commit()
+                return rowcount
+
+        return await self.run(execute)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """オフロード統計取得"""
+        with self._lock:
+            stats = dict(self._stats)
+
+        finished = stats['completed'] + stats['failed']
+        stats['max_workers'] = self.max_workers
+        stats['queued'] = stats['submitted'] - finished - stats['active']
+        stats['avg_queue_ms'] = stats['queue_time_total'] / finished * 1000 if finished else 0.0
+        stats['avg_run_ms'] = stats['run_time_total'] / finished * 1000 if finished else 0.0
+        return stats
+
+    def shutdown(self) -> None:
+        """スレッドプール停止"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_measured(self, func: Callable[..., Any], submitted_at: float, *args, **kwargs) -> Any:
+        """DBスレッド上で実行し、待ち時間・実行時間を記録"""
+        started_at = time.perf_counter()
+        with self._lock:
+            self._stats['active'] += 1
+            self._stats['queue_time_total'] += started_at - submitted_at
+
+        failed = False
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            run_time = time.perf_counter() - started_at
+            with self._lock:
+                self._stats['active'] -= 1
+                self._stats['failed' if failed else 'completed'] += 1
+                self._stats['run_time_total'] += run_time
+                self._stats['run_time_max'] = max(self._stats['run_time_max'], run_time)
+
+
+# グローバル非同期DBインスタンス（初回使用時に作成）
+_async_db: Optional[AsyncDatabase] = None
+_async_db_lock = threading.Lock()
+
+
+def get_async_db() -> AsyncDatabase:
+    """共有AsyncDatabase取得"""
+    global _async_db
+    with _async_db_lock:
+        if _async_db is None:
+            _async_db = AsyncDatabase()
+        return _async_db
+
+
+def get_async_db_statistics() -> Optional[Dict[str, Any]]:
+    """共有AsyncDatabaseの統計（未作成時はNone）"""
+    return _async_db.get_statistics() if _async_db is not None else None
+
+
+def shutdown_async_db() -> None:
+    """共有AsyncDatabase停止（アプリケーション終了時）"""
+    global _async_db
+    with _async_db_lock:
+        if _async_db is not None:
+            _async_db.shutdown()
+            _async_db = None
@@ -0,0 +1,392 @@
+"""
+バックテスト結果の保存
+
+取引・エクイティカーブを1件ずつINSERTすると、長期間のバックテストで
+保存に時間がかかるため間引き（カーブ1000点・取引100件）していた。
+エクイティカーブは COPY BINARY でステージングへ流してから一括INSERT、
+取引は COPY（CSV）で全件を投入し、パラメータ・統計は JSONB として保存する。
+
+一覧は型付きの指標列（return_percent は statistics からの生成列）と
+(指標, test_id) のインデックスを使い、OFFSETではなくキーセットカーソルでページングする。
+"""
+import ast
+import base64
+import io
+import json
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.core.database import PGCOPY_HEADER, PGCOPY_TRAILER, PG_EPOCH
+
+logger = logging.getLogger(__name__)
+
+EQUITY_COLUMNS = ['timestamp', 'equity', 'balance', 'unrealized_pnl']
+
+# エクイティカーブのCOPY BINARYの1行
+EQUITY_COPY_DTYPE = np.dtype([
+    ('field_count', '>i2'),
+    ('timestamp_size', '>i4'), ('timestamp', '>i8'),
+    ('equity_size', '>i4'), ('equity', '>f8'),
+    ('balance_size', '>i4'), ('balance', '>f8'),
+    ('unrealized_pnl_size', '>i4'), ('unrealized_pnl', '>f8')
+])
+
+TRADE_COLUMNS = [
+    'entry_time', 'exit_time', 'type', 'entry_price', 'exit_price',
+    'lot_size', 'profit_loss', 'duration_hours', 'exit_reason'
+]
+
+
+# 一覧の並べ替えに使える列（いずれも (列, test_id) のインデックスあり）
+SORT_COLUMNS = (
+    'created_at', 'return_percent', 'sharpe_ratio', 'profit_factor',
+    'max_drawdown', 'win_rate', 'total_trades', 'final_balance'
+)
+
+LIST_COLUMNS = [
+    'test_id', 'symbol', 'timeframe', 'created_at', 'period_start', 'period_end',
+    'initial_balance', 'final_balance', 'return_percent', 'total_trades', 'winning_trades',
+    'win_rate', 'profit_factor', 'max_drawdown', 'sharpe_ratio'
+]
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+
+def _json_safe(value: Any) -> Any:
+    """JSONBに保存できる値に変換（NumPy型はPython型、NaN/InfはNone）"""
+    if isinstance(value, dict):
+        return {str(key): _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def to_jsonb(value: Optional[Dict[str, Any]]) -> Optional[str]:
+    """JSONB列に渡す文字列"""
+    if value is None:
+        return None
+    return json.dumps(_json_safe(value), default=str, allow_nan=False)
+
+
+def decode_json_column(value: Any) -> Dict[str, Any]:
+    """
+    JSONB列の値を辞書に変換
+
+    移行前の行（str(dict) で保存したTEXT）も評価せずに読めるよう
+    JSONとして読めなければリテラルとして解釈する。
+    """
+    if value is None:
+        return {}
+    if isinstance(value, dict):
+        return value
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        try:
+            decoded = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            logger.warning("Unreadable JSON column value, returning empty dict")
+            return {}
+        return decoded if isinstance(decoded, dict) else {}
+
+
+class BacktestResultStore:
+    """backtest_results と子テーブルへの保存"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def save(self,
+             test_id: str,
+             symbol: str,
+             timeframe: str,
+             start_date: datetime,
+             end_date: datetime,
+             initial_balance: float,
+             statistics: Dict[str, Any],
+             parameters: Dict[str, Any],
+             equity_curve: List[Dict[str, Any]],
+             trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        結果を1トランザクションで保存（間引きなし）
+
+        Returns:
+            保存件数と所要時間
+        """
+        start_time = time.perf_counter()
+        trade_rows = self._trade_frame(trades, test_id)
+
+        with self.db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO backtest_results
+                    (test_id, symbol, timeframe, period_start, period_end,
+                     initial_balance, final_balance, total_trades, winning_trades,
+                     win_rate, profit_factor, max_drawdown, sharpe_ratio,
+                     parameters, statistics, created_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, %s)
+                """, (
+                    test_id, symbol, timeframe, start_date, end_date,
+                    initial_balance, statistics['final_balance'],
+                    statistics['total_trades'], statistics['winning_trades'],
+                    statistics['win_rate'], statistics['profit_factor'],
+                    statistics['max_drawdown_percent'], statistics['sharpe_ratio'],
+                    to_jsonb(parameters), to_jsonb(statistics), datetime.now()
+                ))
+
+                self._copy_equity(cursor, test_id, equity_curve)
+                self._copy_trades(cursor, trade_rows)
+                conn.commit()
+
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Backtest result saved: {test_id} "
+                    f"({len(equity_curve)} equity points, {len(trade_rows)} trades, {elapsed:.3f}s)")
+        return {
+            'equity_points': len(equity_curve),
+            'trades': len(trade_rows),
+            'elapsed_seconds': elapsed
+        }
+
+    @staticmethod
+    def _encode_equity_copy(equity_curve: List[Dict[str, Any]]) -> bytes:
+        """エクイティカーブをCOPY BINARY形式に変換（列毎にまとめて変換）"""
+        count = len(equity_curve)
+        records = np.empty(count, dtype=EQUITY_COPY_DTYPE)
+        records['field_count'] = len(EQUITY_COLUMNS)
+
+        timestamps = [point['timestamp'] for point in equity_curve]
+        try:
+            # ISO文字列（simulation_kernel.to_equity_curve の出力）はNumPyで直接変換
+            times = np.array(timestamps, dtype='datetime64[us]')
+        except (TypeError, ValueError):
+            times = pd.to_datetime(timestamps).to_numpy(dtype='datetime64[us]')
+        records['timestamp'] = (times - PG_EPOCH).astype(np.int64)
+        records['equity'] = np.fromiter((point['equity'] for point in equity_curve), np.float64, count)
+        records['balance'] = np.fromiter((point['balance'] for point in equity_curve), np.float64, count)
+        records['unrealized_pnl'] = np.fromiter(
+            (point.get('unrealized_pnl') or 0 for point in equity_curve), np.float64, count
+        )
+        for field in EQUITY_COLUMNS:
+            records[f'{field}_size'] = EQUITY_COPY_DTYPE[field].itemsize
+
+        return PGCOPY_HEADER + records.tobytes() + PGCOPY_TRAILER
+
+    def _copy_equity(self, cursor, test_id: str, equity_curve: List[Dict[str, Any]]) -> None:
+        """エクイティカーブをCOPY BINARYでステージングへ流し、子テーブルへ一括INSERT"""
+        if not equity_curve:
+            return
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS backtest_equity_staging (
+                timestamp TIMESTAMP,
+                equity DOUBLE PRECISION,
+                balance DOUBLE PRECISION,
+                unrealized_pnl DOUBLE PRECISION
+            )
+        """)
+        cursor.execute("TRUNCATE backtest_equity_staging")
+        cursor.copy_expert(
+            f"COPY backtest_equity_staging ({', '.join(EQUITY_COLUMNS)}) FROM STDIN WITH (FORMAT binary)",
+            io.BytesIO(self._encode_equity_copy(equity_curve))
+        )
+        cursor.execute("""
+            INSERT INTO backtest_equity_curves (test_id, timestamp, equity, balance, unrealized_pnl)
+            SELECT %s, timestamp, equity, balance, unrealized_pnl FROM backtest_equity_staging
+        """, (test_id,))
+
+    @staticmethod
+    def _trade_frame(trades: List[Dict[str, Any]], test_id: str) -> pd.DataFrame:
+        """backtest_trades の列構成（先頭にtest_id）のDataFrame"""
+        frame = pd.DataFrame.from_records(trades) if trades else pd.DataFrame()
+        frame = frame.reindex(columns=TRADE_COLUMNS)
+        frame.insert(0, 'test_id', test_id)
+        return frame
+
+    @staticmethod
+    def _copy_trades(cursor, frame: pd.DataFrame) -> None:
+        """取引履歴をCOPY（CSV）で全件投入"""
+        if frame.empty:
+            return
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY backtest_trades ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+    def load(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """
+        保存済みの結果をエクイティカーブ・取引履歴ごと読み込む
+
+        Returns:
+            結果（存在しない場合はNone）
+        """
+        with self.db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT test_id, symbol, timeframe, period_start, period_end,
+                           initial_balance, parameters, statistics, created_at
+                    FROM backtest_results WHERE test_id = %s
+                """, (test_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+                main = dict(zip([description[0] for description in cursor.description], row))
+
+                cursor.execute(f"""
+                    SELECT {', '.join(EQUITY_COLUMNS)}
+                    FROM backtest_equity_curves WHERE test_id = %s ORDER BY timestamp
+                """, (test_id,))
+                equity_curve = [dict(zip(EQUITY_COLUMNS, point)) for point in cursor.fetchall()]
+
+                cursor.execute(f"""
+                    SELECT {', '.join(TRADE_COLUMNS)}
+                    FROM backtest_trades WHERE test_id = %s ORDER BY entry_time
+                """, (test_id,))
+                trades = [dict(zip(TRADE_COLUMNS, trade)) for trade in cursor.fetchall()]
+
+        return {
+            'test_id': main['test_id'],
+            'symbol': main['symbol'],
+            'timeframe': main['timeframe'],
+            'period': {
+                'start_date': main['period_start'].isoformat(),
+                'end_date': main['period_end'].isoformat()
+            },
+            'initial_balance': main['initial_balance'],
+            'parameters': decode_json_column(main['parameters']),
+            'statistics': decode_json_column(main['statistics']),
+            'equity_curve': equity_curve,
+            'trades': trades,
+            'created_at': main['created_at'].isoformat()
+        }
+
+    def list_results(self,
+                     page_size: int = 20,
+                     cursor: Optional[str] = None,
+                     sort: str = 'created_at',
+                     descending: bool = True,
+                     symbol: Optional[str] = None,
+                     timeframe: Optional[str] = None,
+                     start_date: Optional[datetime] = None,
+                     end_date: Optional[datetime] = None,
+                     count: str = 'exact',
+                     offset: int = 0) -> Dict[str, Any]:
+        """
+        結果一覧（キーセットページング）
+
+        Args:
+            page_size: 1ページの件数
+            cursor: 前ページの next_cursor（指定時は offset を無視）
+            sort: 並べ替え列（SORT_COLUMNS）
+            descending: 降順
+            symbol: 通貨ペアフィルタ
+            timeframe: 時間軸フィルタ
+            start_date: 作成日時の下限
+            end_date: 作成日時の上限
+            count: 件数の取得方法（exact: COUNT(*), estimate: 実行計画の推定行数, none: 取得しない）
+            offset: カーソル無しで読み飛ばす件数（ページ番号指定の互換用）
+
+        Returns:
+            items, next_cursor, has_next, total_count, count_is_estimate
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Invalid sort column: {sort}")
+        if count not in COUNT_MODES:
+            raise ValueError(f"Invalid count mode: {count}")
+
+        conditions = []
+        params: List[Any] = []
+        for column, operator, value in (('symbol', '=', symbol), ('timeframe', '=', timeframe),
+                                        ('created_at', '>=', start_date), ('created_at', '<=', end_date)):
+            if value is not None:
+                conditions.append(f"{column} {operator} %s")
+                params.append(value)
+        filter_params = list(params)
+        filter_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        if cursor is not None:
+            value, test_id = self.decode_cursor(cursor, sort, descending)
+            conditions.append(f"({sort}, test_id) {'<' if descending else '>'} (%s, %s)")
+            params.extend([value, test_id])
+            offset = 0
+
+        direction = 'DESC' if descending else 'ASC'
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+        query = f"""
+            SELECT {', '.join(LIST_COLUMNS)}
+            FROM backtest_results
+            {where_clause}
+            ORDER BY {sort} {direction}, test_id {direction}
+            LIMIT %s OFFSET %s
+        """
+
+        with self.db_manager.get_connection() as conn:
+            with conn.cursor() as db_cursor:
+                db_cursor.execute(query, params + [page_size + 1, offset])
+                columns = [description[0] for description in db_cursor.description]
+                rows = [dict(zip(columns, row)) for row in db_cursor.fetchall()]
+
+                total_count = None
+                if count == 'exact':
+                    db_cursor.execute(f"SELECT COUNT(*) FROM backtest_results {filter_clause}", filter_params)
+                    total_count = int(db_cursor.fetchone()[0])
+                elif count == 'estimate':
+                    total_count = self._estimate_count(db_cursor, filter_clause, filter_params)
+
+        has_next = len(rows) > page_size
+        items = rows[:page_size]
+        next_cursor = None
+        if has_next:
+            last = items[-1]
+            next_cursor = self.encode_cursor(sort, descending, last[sort], last['test_id'])
+
+        return {
+            'items': items,
+            'next_cursor': next_cursor,
+            'has_next': has_next,
+            'total_count': total_count,
+            'count_is_estimate': count == 'estimate'
+        }
+
+    @staticmethod
+    def _estimate_count(db_cursor, filter_clause: str, params: List[Any]) -> int:
+        """実行計画の推定行数（テーブルを走査しない）"""
+        db_cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM backtest_results {filter_clause}", params)
+        plan = db_cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    @staticmethod
+    def encode_cursor(sort: str, descending: bool, value: Any, test_id: str) -> str:
+        """ページの最終行からカーソルを作成"""
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        payload = json.dumps({'s': sort, 'd': descending, 'v': value, 'id': test_id}, default=str)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, str]:
+        """カーソルから (並べ替え列の値, test_id) を取得"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            value, test_id = payload['v'], payload['id']
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+        if payload.get('s') != sort or payload.get('d') != descending:
+            raise ValueError("Cursor does not match the requested sort order")
+        if sort == 'created_at':
+            value = datetime.fromisoformat(value)
+        return value, test_id
@@ -0,0 +1,263 @@
+"""
+足確定スケジューラ
+
+一定間隔でレート取得・特徴量計算を繰り返すと、新しい足が無い間も同じ計算をやり直し、
+足確定からシグナルまで最大1間隔遅れる。マーケットデータハブのティック時刻
+（取得できない場合は最新足の時刻）から時間軸毎の足の切り替わりを検出し、
+新しい足ができた時だけコールバックを呼ぶ。
+"""
+import asyncio
+import itertools
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.core.mt5_client import TIMEFRAME_MAP
+from backend.core.market_data_hub import MarketDataHub, get_market_data_hub
+from backend.core.mt5_worker import MT5Worker, PRIORITY_ACCOUNT, get_mt5_worker
+
+logger = logging.getLogger(__name__)
+
+_UNIT_SECONDS = {'M': 60, 'H': 3600, 'D': 86400}
+
+# 時間軸 → 足の長さ（秒）
+TIMEFRAME_SECONDS = {timeframe: int(timeframe[1:]) * _UNIT_SECONDS[timeframe[0]] for timeframe in TIMEFRAME_MAP}
+
+BarCallback = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def _utc_datetime(timestamp: float) -> datetime:
+    """UNIX時刻 → タイムゾーン無しUTC（MT5の足の時刻と同じ表現）"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def bar_open_time(timestamp: float, timeframe: str) -> float:
+    """時刻（MT5サーバー時刻のエポック秒）を含む足の開始時刻"""
+    period = TIMEFRAME_SECONDS[timeframe]
+    return timestamp // period * period
+
+
+class BarCloseScheduler:
+    """足確定イベントスケジューラ"""
+
+    def __init__(self,
+                 market_data: Optional[MarketDataHub] = None,
+                 poll_interval: float = 0.5,
+                 worker: Optional[MT5Worker] = None):
+        """
+        初期化
+
+        Args:
+            market_data: ティック時刻の取得元（省略時は共有ハブ）
+            poll_interval: 足の切り替わり確認間隔（秒、足確定後の遅延上限）
+            worker: 足の確認を実行するMT5ワーカー（省略時は共有ワーカー）
+        """
+        self.market_data = market_data or get_market_data_hub()
+        self.poll_interval = poll_interval
+        self._worker = worker
+        self._subscriptions: Dict[int, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def subscribe(self,
+                  symbol: str,
+                  timeframe: str,
+                  callback: BarCallback,
+                  fire_immediately: bool = False) -> int:
+        """
+        足確定コールバック登録
+
+        Args:
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            callback: 足確定イベント（symbol, timeframe, bar_time, closed_bar_time, latency_seconds）
+                      を受け取るコルーチン関数
+            fire_immediately: 登録直後の確認で現在の足に対して1回呼ぶか
+                              （指定しない場合は最初の確認で現在の足を記録するだけ）
+
+        Returns:
+            購読ID
+        """
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Invalid timeframe: {timeframe}")
+
+        subscription_id = next(self._ids)
+        self._subscriptions[subscription_id] = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'callback': callback,
+            # 現在の足はMT5取得を伴うため登録時には取らず、最初の check_once で記録
+            'last_bar': None,
+            'seeded': fire_immediately,
+            'task': None,
+            'fired': 0,
+            'skipped': 0,
+            'last_latency': None
+        }
+        self.market_data.watch(symbol)
+        logger.info(f"Bar close subscription {subscription_id}: {symbol} {timeframe}")
+        return subscription_id
+
+    def unsubscribe(self, subscription_id: int) -> None:
+        """コールバック登録解除"""
+        self._subscriptions.pop(subscription_id, None)
+
+    def _current_bar(self, symbol: str, timeframe: str) -> Tuple[Optional[float], Optional[float]]:
+        """
+        現在の足の開始時刻と観測時刻（ティック時刻、無ければ最新足の時刻から）
+        ※MT5ワーカー上で実行する
+
+        Returns:
+            (足の開始時刻, 観測したサーバー時刻) ※取得できない場合は (None, None)
+        """
+        tick = self.market_data.get_tick(symbol)
+        if tick is not None:
+            observed = tick['time'].timestamp()
+            return bar_open_time(observed, timeframe), observed
+
+        rates = self.market_data.mt5_client.get_rates(symbol, timeframe, count=1)
+        if rates is not None and not rates.empty:
+            observed = rates['time'].iloc[-1].timestamp()
+            return bar_open_time(observed, timeframe), observed
+        return None, None
+
+    def _get_worker(self) -> MT5Worker:
+        if self._worker is None:
+            self._worker = get_mt5_worker()
+        return self._worker
+
+    async def check_once(self) -> int:
+        """
+        全購読の足の切り替わりを確認し、新しい足があればコールバックを起動
+
+        Returns:
+            起動したコールバック数
+        """
+        fired = 0
+        bars: Dict[tuple, Tuple[Optional[float], Optional[float]]] = {}
+
+        for subscription_id, subscription in list(self._subscriptions.items()):
+            key = (subscription['symbol'], subscription['timeframe'])
+            if key not in bars:
+                # MT5ワーカー上で確認（キャッシュ切れのティック取得・最新足取得でイベントループを止めない）
+                bars[key] = await self._get_worker().run(self._current_bar, *key, priority=PRIORITY_ACCOUNT,
+                                                         label='bar_check')
+            current_bar, observed = bars[key]
+
+            # 登録後最初の確認では現在の足を記録するだけ（次の足から起動）
+            if not subscription['seeded']:
+                if current_bar is not None:
+                    subscription['last_bar'] = current_bar
+                    subscription['seeded'] = True
+                continue
+
+            if current_bar is None or (subscription['last_bar'] is not None
+                                       and current_bar <= subscription['last_bar']):
+                continue
+
+            # 前回のコールバックが終わっていなければ今回の足は見送る（処理の積み上がり防止）
+            task = subscription['task']
+            if task is not None and not task.done():
+                subscription['skipped'] += 1
+                logger.warning(f"Bar close callback still running for {key[0]} {key[1]}, skipping bar")
+                subscription['last_bar'] = current_bar
+                continue
+
+            closed_bar = subscription['last_bar']
+            subscription['last_bar'] = current_bar
+            # 足の開始（前の足の確定）から検出に使った観測時刻までの経過秒数
+            latency = observed - current_bar if closed_bar is not None else None
+            event = {
+                'symbol': key[0],
+                'timeframe': key[1],
+                'bar_time': _utc_datetime(current_bar),
+                'closed_bar_time': _utc_datetime(closed_bar) if closed_bar is not None else None,
+                'latency_seconds': latency
+            }
+            subscription['task'] = asyncio.create_task(
+                self._run_callback(subscription_id, subscription, event)
+            )
+            subscription['fired'] += 1
+            subscription['last_latency'] = latency
+            fired += 1
+
+        return fired
+
+    async def _run_callback(self, subscription_id: int, subscription: Dict[str, Any], event: Dict[str, Any]):
+        try:
+            await subscription['callback'](event)
+        except Exception as e:
+            logger.error(f"Bar close callback error for subscription {subscription_id}: {e}")
+
+    def start(self) -> None:
+        """スケジューラ開始（実行中のイベントループ上で呼ぶ）"""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Bar close scheduler started")
+
+    async def stop(self) -> None:
+        """スケジューラ停止"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Bar close scheduler stopped")
+
+    async def _run(self) -> None:
+        """確認ループ"""
+        while True:
+            try:
+                if self._subscriptions:
+                    await self.check_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Bar close scheduler error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """購読毎の起動回数・見送り回数・遅延"""
+        return {
+            'running': self.running,
+            'poll_interval': self.poll_interval,
+            'subscriptions': {
+                subscription_id: {
+                    'symbol': subscription['symbol'],
+                    'timeframe': subscription['timeframe'],
+                    'fired': subscription['fired'],
+                    'skipped': subscription['skipped'],
+                    'last_latency_seconds': subscription['last_latency'],
+                    'running': subscription['task'] is not None and not subscription['task'].done()
+                }
+                for subscription_id, subscription in self._subscriptions.items()
+            }
+        }
+
+
+# グローバル足確定スケジューラ（初回使用時に作成）
+_bar_scheduler: Optional[BarCloseScheduler] = None
+_bar_scheduler_lock = threading.Lock()
+
+
+def get_bar_scheduler() -> BarCloseScheduler:
+    """共有BarCloseScheduler取得"""
+    global _bar_scheduler
+    with _bar_scheduler_lock:
+        if _bar_scheduler is None:
+            _bar_scheduler = BarCloseScheduler()
+        return _bar_scheduler
+
+
+def get_bar_scheduler_statistics() -> Optional[Dict[str, Any]]:
+    """共有BarCloseSchedulerの統計（未作成時はNone）"""
+    return _bar_scheduler.get_statistics() if _bar_scheduler is not None else None
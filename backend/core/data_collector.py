@@ -0,0 +1,324 @@
+"""
+差分マーケットデータ収集
+
+全通貨ペア×時間軸の直近足を毎回取り直して保存すると、保存済みで変化の無い足まで
+書き込み続け、停止中に抜けた期間にも気付けない。(通貨ペア, 時間軸) 毎に最後に保存した
+確定足を追跡し、それより新しい確定足だけを保存する。取得した足が保存済みの足と
+重ならない場合は欠損とみなし、get_rates_range で期間を分割して補完する。
+"""
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.core.async_database import AsyncDatabase, get_async_db
+from backend.core.bar_scheduler import TIMEFRAME_SECONDS
+from backend.core.database import DatabaseManager
+from backend.core.mt5_client import TARGET_SYMBOLS
+from backend.core.mt5_worker import AsyncMT5Client
+from backend.core.ohlcv_resampler import bar_end, bar_starts, resample_ohlcv
+
+logger = logging.getLogger(__name__)
+
+COLLECT_TIMEFRAMES = ["M1", "M5", "M15", "M30", "H1"]
+# M1から組み立てる場合の上位時間軸
+DERIVED_TIMEFRAMES = ["M5", "M15", "M30", "H1"]
+
+
+def _naive_utc(ts: Any) -> pd.Timestamp:
+    """TIMESTAMPTZ の値をMT5の足と比較できるタイムゾーン無しUTCに揃える"""
+    ts = pd.Timestamp(ts)
+    if ts.tz is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts
+
+
+class IncrementalCollector:
+    """最終保存足を追跡する差分データ収集"""
+
+    def __init__(self,
+                 mt5_io: AsyncMT5Client,
+                 db_manager: DatabaseManager,
+                 symbols: Optional[List[str]] = None,
+                 timeframes: Optional[List[str]] = None,
+                 derived_timeframes: Optional[List[str]] = None,
+                 async_db: Optional[AsyncDatabase] = None,
+                 initial_bars: int = 1000,
+                 max_incremental_bars: int = 1000,
+                 backfill_chunk_bars: int = 5000,
+                 max_backfill_days: int = 30):
+        """
+        初期化
+
+        Args:
+            mt5_io: MT5呼び出しに使う非同期クライアント
+            db_manager: 保存先のDatabaseManager
+            symbols: 対象通貨ペア（省略時は TARGET_SYMBOLS）
+            timeframes: 対象時間軸（省略時は COLLECT_TIMEFRAMES）
+            derived_timeframes: MT5から取得せず、保存済みM1から組み立てる上位時間軸
+            async_db: DB処理のオフロード先（省略時は共有AsyncDatabase）
+            initial_bars: 保存済みの足が無い場合に取得する本数
+            max_incremental_bars: 差分取得の最大本数（超える抜けは期間指定で補完）
+            backfill_chunk_bars: 欠損補完1回あたりの最大本数
+            max_backfill_days: 欠損補完で遡る最大日数
+        """
+        self.mt5_io = mt5_io
+        self.db_manager = db_manager
+        self.symbols = symbols or TARGET_SYMBOLS
+        self.timeframes = timeframes or COLLECT_TIMEFRAMES
+        self.derived_timeframes = derived_timeframes or []
+        if self.derived_timeframes and 'M1' not in self.timeframes:
+            raise ValueError("derived_timeframes requires M1 in timeframes")
+        self._async_db = async_db
+        self.initial_bars = initial_bars
+        self.max_incremental_bars = max_incremental_bars
+        self.backfill_chunk_bars = backfill_chunk_bars
+        self.max_backfill_days = max_backfill_days
+
+        # (通貨ペア, 時間軸) → 最後に保存した確定足の時刻
+        self.last_bars: Dict[Tuple[str, str], pd.Timestamp] = {}
+        # (通貨ペア, 時間軸) → 前回取得時刻（time.monotonic、取得本数の見積もり用）
+        self._last_fetch: Dict[Tuple[str, str], float] = {}
+        self._loaded = False
+
+        self._stats = {
+            'cycles': 0,
+            'rows_written': 0,
+            'rows_skipped': 0,
+            'gap_repairs': 0,
+            'gap_rows': 0,
+            'derived_rows': 0,
+            'errors': 0,
+            'last_cycle_seconds': None,
+            'last_run': None
+        }
+
+    @property
+    def async_db(self) -> AsyncDatabase:
+        return self._async_db or get_async_db()
+
+    def reset(self) -> None:
+        """追跡状態を破棄（次回はDBの最終足から再開し、欠損を確認する）"""
+        self.last_bars.clear()
+        self._last_fetch.clear()
+        self._loaded = False
+
+    async def collect_once(self) -> Dict[str, int]:
+        """
+        全 (通貨ペア, 時間軸) の新しい確定足を保存
+
+        Returns:
+            今回の保存行数・スキップ行数・欠損補完数
+        """
+        started = time.perf_counter()
+        if not self._loaded:
+            self.last_bars.update(await self.async_db.run(self._load_last_bars))
+            self._loaded = True
+
+        totals = {'rows_written': 0, 'rows_skipped': 0, 'gap_repairs': 0, 'derived_rows': 0}
+        for symbol in self.symbols:
+            for timeframe in self.timeframes:
+                try:
+                    result = await self._collect(symbol, timeframe)
+                    for key in ('rows_written', 'rows_skipped', 'gap_repairs'):
+                        totals[key] += result[key]
+                    if timeframe == 'M1' and result['first_time'] is not None and self.derived_timeframes:
+                        totals['derived_rows'] += await self._derive(symbol, result['first_time'])
+                except Exception as e:
+                    self._stats['errors'] += 1
+                    logger.error(f"Error collecting data for {symbol} {timeframe}: {e}")
+
+        for key, value in totals.items():
+            self._stats[key] += value
+        self._stats['cycles'] += 1
+        self._stats['last_cycle_seconds'] = time.perf_counter() - started
+        self._stats['last_run'] = datetime.now().isoformat()
+        return totals
+
+    async def _collect(self, symbol: str, timeframe: str) -> Dict[str, int]:
+        """1つの (通貨ペア, 時間軸) の差分取得・欠損補完・保存"""
+        key = (symbol, timeframe)
+        last_bar = self.last_bars.get(key)
+        result = {'rows_written': 0, 'rows_skipped': 0, 'gap_repairs': 0, 'first_time': None}
+
+        df = await self.mt5_io.get_rates(symbol, timeframe, count=self._bars_to_fetch(key))
+        if df is None or df.empty:
+            return result
+        self._last_fetch[key] = time.monotonic()
+
+        # 最新足は形成中のため保存しない
+        times = pd.to_datetime(df['time'])
+        forming_bar = times.max()
+        closed = df[times < forming_bar]
+        closed_times = times[times < forming_bar]
+
+        frames = []
+        if last_bar is not None and not closed.empty:
+            # 取得した足が保存済みの足と重ならなければ、その間を期間指定で補完
+            period = pd.Timedelta(seconds=TIMEFRAME_SECONDS[timeframe])
+            if closed_times.min() > last_bar + period:
+                gap = await self._backfill(symbol, timeframe, last_bar + period, closed_times.min())
+                if not gap.empty:
+                    frames.append(gap)
+                    result['gap_repairs'] += 1
+
+        if last_bar is not None:
+            new = closed[closed_times > last_bar]
+        else:
+            new = closed
+        result['rows_skipped'] = len(df) - len(new)
+        frames.append(new)
+
+        to_save = pd.concat(frames, ignore_index=True) if len(frames) > 1 else new
+        if to_save.empty:
+            return result
+
+        saved = await self.async_db.run(
+            self.db_manager.bulk_save_price_data, to_save, symbol, timeframe
+        )
+        if not saved['success']:
+            raise RuntimeError(saved.get('error', 'price data save failed'))
+
+        # 保存に成功した場合のみ最終足を進める（失敗時は次回同じ範囲を再取得）
+        saved_times = pd.to_datetime(to_save['time'])
+        self.last_bars[key] = saved_times.max()
+        result['rows_written'] = saved['rows']
+        result['first_time'] = saved_times.min()
+        return result
+
+    async def _derive(self, symbol: str, first_new: pd.Timestamp) -> int:
+        """
+        保存済みM1から上位時間軸の確定足を組み立てて保存
+
+        Args:
+            symbol: 通貨ペア
+            first_new: 今回保存した最初のM1の時刻
+
+        Returns:
+            保存した上位足の本数
+        """
+        m1_last = self.last_bars[(symbol, 'M1')]
+        starts = {}
+        for timeframe in self.derived_timeframes:
+            last = self.last_bars.get((symbol, timeframe))
+            if last is not None:
+                starts[timeframe] = bar_end(last, timeframe)
+            else:
+                # 初回は途中から始まる足を作らないよう、最初の完全な足から
+                start = pd.Timestamp(bar_starts(np.array([first_new.to_datetime64()]), timeframe)[0])
+                starts[timeframe] = start if start == first_new else bar_end(start, timeframe)
+
+        earliest = max(min(starts.values()), m1_last - pd.Timedelta(days=self.max_backfill_days))
+        m1 = await self.async_db.run(self._load_m1, symbol, earliest, m1_last)
+        if m1.empty:
+            return 0
+
+        rows = 0
+        for timeframe, start in starts.items():
+            bars = resample_ohlcv(m1[m1['time'] >= start], timeframe, include_partial=False)
+            if bars.empty:
+                continue
+            saved = await self.async_db.run(
+                self.db_manager.bulk_save_price_data, bars, symbol, timeframe
+            )
+            if not saved['success']:
+                raise RuntimeError(saved.get('error', f'{timeframe} save failed'))
+            self.last_bars[(symbol, timeframe)] = pd.Timestamp(bars['time'].max())
+            rows += saved['rows']
+
+        return rows
+
+    def _load_m1(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """DBから期間内のM1足を取得"""
+        with self.db_manager.get_connection() as conn:
+            m1 = pd.read_sql_query("""
+                SELECT time, open, high, low, close, tick_volume, spread, real_volume
+                FROM price_data
+                WHERE symbol = %s AND timeframe = 'M1' AND time >= %s AND time <= %s
+                ORDER BY time
+            """, conn, params=(symbol, start.to_pydatetime(), end.to_pydatetime()), parse_dates=['time'])
+        # TIMESTAMPTZ はタイムゾーン付きで返るため、MT5の足と同じタイムゾーン無しUTCに揃える
+        m1['time'] = pd.to_datetime(m1['time'], utc=True).dt.tz_localize(None)
+        return m1
+
+    def _bars_to_fetch(self, key: Tuple[str, str]) -> int:
+        """前回取得からの経過時間で取得本数を見積もる（重なり確認用に余分を含む）"""
+        if key not in self.last_bars:
+            return self.initial_bars
+
+        last_fetch = self._last_fetch.get(key)
+        if last_fetch is None:
+            # 起動直後は少数だけ取得し、重ならなければ欠損補完に任せる
+            return 10
+
+        elapsed = time.monotonic() - last_fetch
+        bars = math.ceil(elapsed / TIMEFRAME_SECONDS[key[1]]) + 2
+        return max(3, min(bars, self.max_incremental_bars))
+
+    async def _backfill(self,
+                        symbol: str,
+                        timeframe: str,
+                        start: pd.Timestamp,
+                        end: pd.Timestamp) -> pd.DataFrame:
+        """
+        欠損期間 [start, end) を get_rates_range で分割取得
+
+        Returns:
+            補完した足（欠損が埋められない場合は空）
+        """
+        earliest = end - pd.Timedelta(days=self.max_backfill_days)
+        if start < earliest:
+            logger.warning(f"Gap for {symbol} {timeframe} exceeds {self.max_backfill_days} days, "
+                           f"backfilling from {earliest}")
+            start = earliest
+
+        chunk = timedelta(seconds=TIMEFRAME_SECONDS[timeframe] * self.backfill_chunk_bars)
+        frames = []
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + chunk, end)
+            df = await self.mt5_io.get_rates_range(
+                symbol, timeframe, chunk_start.to_pydatetime(), chunk_end.to_pydatetime()
+            )
+            if df is not None and not df.empty:
+                times = pd.to_datetime(df['time'])
+                frames.append(df[(times >= start) & (times < end)])
+            chunk_start = chunk_end
+
+        if not frames:
+            return pd.DataFrame()
+
+        # copy_rates_range は終端を含むため、分割境界の足は重複する
+        gap = pd.concat(frames, ignore_index=True).drop_duplicates(subset='time', keep='last')
+        self._stats['gap_rows'] += len(gap)
+        logger.info(f"Backfilled {len(gap)} bars for {symbol} {timeframe} ({start} - {end})")
+        return gap
+
+    def _load_last_bars(self) -> Dict[Tuple[str, str], pd.Timestamp]:
+        """DBから (通貨ペア, 時間軸) 毎の最終足を取得"""
+        with self.db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT symbol, timeframe, MAX(time)
+                    FROM price_data
+                    WHERE symbol = ANY(%s) AND timeframe = ANY(%s)
+                    GROUP BY symbol, timeframe
+                """, (list(self.symbols), list(self.timeframes) + list(self.derived_timeframes)))
+                return {
+                    (symbol, timeframe): _naive_utc(last_time)
+                    for symbol, timeframe, last_time in cursor.fetchall()
+                    if last_time is not None
+                }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """保存・スキップ行数、欠損補完数、(通貨ペア, 時間軸) 毎の最終足"""
+        stats = dict(self._stats)
+        stats['last_bars'] = {
+            f"{symbol}_{timeframe}": last_bar.isoformat()
+            for (symbol, timeframe), last_bar in sorted(self.last_bars.items())
+        }
+        return stats
@@ -4,22 +4,75 @@
 import psycopg2
 import psycopg2.extras
 import pandas as pd
+import numpy as np
+import io
+import time
 import logging
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable, Union
 from datetime import datetime
 from contextlib import contextmanager
 import configparser
 
+from backend.core.db_pool import ConnectionPool, get_pool
+
 logger = logging.getLogger(__name__)
 
+# price_dataのカラム（COPY・UPSERTの列順）
+PRICE_DATA_COLUMNS = [
+    'symbol', 'timeframe', 'time', 'open', 'high', 'low', 'close',
+    'tick_volume', 'spread', 'real_volume'
+]
+
+# 一括保存の1チャンクあたりの行数
+PRICE_COPY_CHUNK_SIZE = 100000
+
+# COPY BINARYの1行（フィールド数 + 各フィールドの長さと値、ビッグエンディアン）
+PRICE_COPY_DTYPE = np.dtype([
+    ('field_count', '>i2'),
+    ('time_size', '>i4'), ('time', '>i8'),
+    ('open_size', '>i4'), ('open', '>f8'),
+    ('high_size', '>i4'), ('high', '>f8'),
+    ('low_size', '>i4'), ('low', '>f8'),
+    ('close_size', '>i4'), ('close', '>f8'),
+    ('tick_volume_size', '>i4'), ('tick_volume', '>i8'),
+    ('spread_size', '>i4'), ('spread', '>i4'),
+    ('real_volume_size', '>i4'), ('real_volume', '>i8')
+])
+PRICE_COPY_FIELDS = ['time', 'open', 'high', 'low', 'close', 'tick_volume', 'spread', 'real_volume']
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + (0).to_bytes(4, 'big') + (0).to_bytes(4, 'big')
+PGCOPY_TRAILER = (-1).to_bytes(2, 'big', signed=True)
+
+# PostgreSQLのタイムスタンプ基準時刻（2000-01-01からのマイクロ秒）
+PG_EPOCH = np.datetime64('2000-01-01T00:00:00', 'us')
+
+PriceDataInput = Union[pd.DataFrame, np.ndarray]
+
 class DatabaseManager:
     """データベース管理クラス"""
     
-    def __init__(self, config_path: str = "config/database.conf"):
+    def __init__(self, config_path: str = "config/database.conf", use_pool: Optional[bool] = None):
+        """
+        初期化
+        
+        Args:
+            config_path: 設定ファイルパス
+            use_pool: 接続プールを使うか（省略時は設定ファイルの[pool] enabled）
+        """
         self.config_path = config_path
         self.connection_params = self._load_config()
+        self.pool_config = self._load_pool_config()
         self._connection = None
         
+        if use_pool is None:
+            use_pool = self.pool_config.pop('enabled')
+        else:
+            self.pool_config.pop('enabled')
+        
+        # 同一接続先のインスタンス間で共有
+        self.pool: Optional[ConnectionPool] = None
+        if use_pool:
+            self.pool = get_pool(self.connection_params, **self.pool_config)
+        
     def _load_config(self) -> Dict[str, str]:
         """設定ファイル読み込み"""
         try:
@@ -50,9 +103,31 @@ class DatabaseManager:
                 'password': 'password'
             }
     
+    def _load_pool_config(self) -> Dict[str, Any]:
+        """接続プール設定読み込み"""
+        config = configparser.ConfigParser()
+        try:
+            config.read(self.config_path, encoding='utf-8')
+        except Exception as e:
+            logger.warning(f"Could not load pool config: {e}, using defaults")
+        
+        return {
+            'enabled': config.getboolean('pool', 'enabled', fallback=True),
+            'min_size': config.getint('pool', 'min_size', fallback=1),
+            'max_size': config.getint('pool', 'max_size', fallback=10),
+            'acquire_timeout': config.getfloat('pool', 'acquire_timeout', fallback=10.0),
+            'health_check_interval': config.getfloat('pool', 'health_check_interval', fallback=30.0),
+            'max_idle_time': config.getfloat('pool', 'max_idle_time', fallback=600.0)
+        }
+    
     @contextmanager
     def get_connection(self):
         """データベース接続のコンテキストマネージャー"""
+        if self.pool is not None:
+            with self._pooled_connection() as connection:
+                yield connection
+            return
+        
         connection = None
         try:
             connection = psycopg2.connect(**self.connection_params)
@@ -67,6 +142,32 @@ class DatabaseManager:
             if connection:
                 connection.close()
     
+    @contextmanager
+    def _pooled_connection(self):
+        """プールから接続を借りて返却する"""
+        connection = None
+        broken = False
+        try:
+            connection = self.pool.acquire()
+            yield connection
+        except Exception as e:
+            if connection:
+                broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+                if not connection.closed:
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        broken = True
+            logger.error(f"Database error: {e}")
+            raise
+        finally:
+            if connection:
+                self.pool.release(connection, discard=broken)
+    
+    def get_pool_statistics(self) -> Optional[Dict[str, Any]]:
+        """接続プール統計取得（プール未使用時はNone）"""
+        return self.pool.get_statistics() if self.pool is not None else None
+    
     def test_connection(self) -> bool:
         """接続テスト"""
         try:
@@ -95,52 +196,173 @@ class DatabaseManager:
             logger.warning("No data to save")
             return False
             
+        return self.bulk_save_price_data(df)['success']
+    
+    def bulk_save_price_data(self,
+                             data: Union[PriceDataInput, Iterable[PriceDataInput]],
+                             symbol: Optional[str] = None,
+                             timeframe: Optional[str] = None,
+                             chunk_size: int = PRICE_COPY_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        価格データの一括保存（COPY → ステージングテーブル → UPSERT）
+        
+        Args:
+            data: DataFrame・NumPyレコード配列、またはそれらのイテラブル（チャンク入力）
+            symbol: 通貨ペア（データにsymbol列が無い場合）
+            timeframe: 時間軸（データにtimeframe列が無い場合）
+            chunk_size: 1回のCOPY・マージで扱う最大行数
+            
+        Returns:
+            保存結果（success, rows, chunks, elapsed_seconds, rows_per_second）
+        """
+        if isinstance(data, (pd.DataFrame, np.ndarray)):
+            data = [data]
+        
+        start_time = time.perf_counter()
+        rows = 0
+        chunks = 0
+        
         try:
             with self.get_connection() as conn:
                 with conn.cursor() as cursor:
-                    # データを準備
-                    data_tuples = []
-                    for _, row in df.iterrows():
-                        data_tuples.append((
-                            row['symbol'],
-                            row['timeframe'],
-                            row['time'],
-                            float(row['open']),
-                            float(row['high']),
-                            float(row['low']),
-                            float(row['close']),
-                            int(row.get('tick_volume', 0)),
-                            int(row.get('spread', 0)),
-                            int(row.get('real_volume', 0))
-                        ))
-                    
-                    # バッチ挿入（UPSERT）
-                    insert_query = """
-                        INSERT INTO price_data 
-                        (symbol, timeframe, time, open, high, low, close, tick_volume, spread, real_volume)
-                        VALUES %s
-                        ON CONFLICT (symbol, timeframe, time) 
-                        DO UPDATE SET
-                            open = EXCLUDED.open,
-                            high = EXCLUDED.high,
-                            low = EXCLUDED.low,
-                            close = EXCLUDED.close,
-                            tick_volume = EXCLUDED.tick_volume,
-                            spread = EXCLUDED.spread,
-                            real_volume = EXCLUDED.real_volume
-                    """
+                    cursor.execute("""
+                        CREATE TEMP TABLE IF NOT EXISTS price_data_staging (
+                            time TIMESTAMP,
+                            open DOUBLE PRECISION,
+                            high DOUBLE PRECISION,
+                            low DOUBLE PRECISION,
+                            close DOUBLE PRECISION,
+                            tick_volume BIGINT,
+                            spread INT,
+                            real_volume BIGINT
+                        )
+                    """)
                     
-                    psycopg2.extras.execute_values(
-                        cursor, insert_query, data_tuples, page_size=1000
-                    )
-                    
-                    conn.commit()
-                    logger.info(f"Saved {len(data_tuples)} price data records")
-                    return True
+                    for part in data:
+                        frame = self._normalize_price_frame(part, symbol, timeframe)
+                        for offset in range(0, len(frame), chunk_size):
+                            chunk = frame.iloc[offset:offset + chunk_size]
+                            self._copy_merge_price_chunk(cursor, chunk)
+                            # チャンク毎にコミット（長時間のバックフィルでも途中までは確定）
+                            conn.commit()
+                            rows += len(chunk)
+                            chunks += 1
+            
+            elapsed = time.perf_counter() - start_time
+            rows_per_second = rows / elapsed if elapsed > 0 else 0.0
+            if rows:
+                logger.info(f"Saved {rows} price data records in {chunks} chunks "
+                            f"({elapsed:.2f}s, {rows_per_second:,.0f} rows/sec)")
+            else:
+                logger.warning("No data to save")
+            
+            return {
+                'success': rows > 0,
+                'rows': rows,
+                'chunks': chunks,
+                'elapsed_seconds': elapsed,
+                'rows_per_second': rows_per_second
+            }
                     
         except Exception as e:
             logger.error(f"Error saving price data: {e}")
-            return False
+            elapsed = time.perf_counter() - start_time
+            return {
+                'success': False,
+                'rows': rows,
+                'chunks': chunks,
+                'elapsed_seconds': elapsed,
+                'rows_per_second': rows / elapsed if elapsed > 0 else 0.0,
+                'error': str(e)
+            }
+    
+    def _normalize_price_frame(self,
+                               data: PriceDataInput,
+                               symbol: Optional[str] = None,
+                               timeframe: Optional[str] = None) -> pd.DataFrame:
+        """入力をprice_dataの列構成のDataFrameに揃える"""
+        if isinstance(data, np.ndarray):
+            df = pd.DataFrame.from_records(data)
+        else:
+            df = data
+        
+        if 'time' not in df.columns and isinstance(df.index, pd.DatetimeIndex):
+            df = df.rename_axis('time').reset_index()
+        
+        frame = pd.DataFrame(index=range(len(df)))
+        for column, value in (('symbol', symbol), ('timeframe', timeframe)):
+            if column in df.columns:
+                frame[column] = df[column].to_numpy()
+            elif value is not None:
+                frame[column] = value
+            else:
+                raise ValueError(f"Missing '{column}' column and no default given")
+        
+        times = df['time']
+        if pd.api.types.is_integer_dtype(times):
+            # MT5のレコード配列（UNIX秒）
+            times = pd.to_datetime(times, unit='s')
+        times = pd.to_datetime(times)
+        if times.dt.tz is not None:
+            # タイムゾーン付きはUTCに揃えてオフセット付きで書き出す
+            times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+            frame.attrs['utc'] = True
+        frame['time'] = times.to_numpy()
+        
+        for column in ('open', 'high', 'low', 'close'):
+            frame[column] = df[column].to_numpy(dtype=np.float64)
+        
+        # tick_volumeが無い場合はvolumeを使用
+        volume_column = 'tick_volume' if 'tick_volume' in df.columns else 'volume'
+        for target, source in (('tick_volume', volume_column), ('spread', 'spread'),
+                               ('real_volume', 'real_volume')):
+            frame[target] = df[source].to_numpy(dtype=np.int64) if source in df.columns else 0
+        
+        # 同一キーの重複は最後の行を採用（ON CONFLICTは同一文内の重複を扱えない）
+        return frame.drop_duplicates(subset=['symbol', 'timeframe', 'time'], keep='last')
+    
+    def _copy_merge_price_chunk(self, cursor, chunk: pd.DataFrame) -> None:
+        """1チャンクをCOPY BINARYでステージングに流し込み、price_dataへマージ"""
+        # タイムゾーン付き入力はUTCとして解釈（それ以外は従来通りセッションのタイムゾーン）
+        time_expr = "time AT TIME ZONE 'UTC'" if chunk.attrs.get('utc') else "time"
+        columns = ', '.join(PRICE_DATA_COLUMNS)
+        fields = ', '.join(PRICE_COPY_FIELDS)
+        
+        for (symbol, timeframe), group in chunk.groupby(['symbol', 'timeframe'], sort=False):
+            cursor.execute("TRUNCATE price_data_staging")
+            cursor.copy_expert(
+                f"COPY price_data_staging ({fields}) FROM STDIN WITH (FORMAT binary)",
+                io.BytesIO(self._encode_price_copy(group))
+            )
+            cursor.execute(f"""
+                INSERT INTO price_data ({columns})
+                SELECT %s, %s, {time_expr}, open, high, low, close, tick_volume, spread, real_volume
+                FROM price_data_staging
+                ON CONFLICT (symbol, timeframe, time) 
+                DO UPDATE SET
+                    open = EXCLUDED.open,
+                    high = EXCLUDED.high,
+                    low = EXCLUDED.low,
+                    close = EXCLUDED.close,
+                    tick_volume = EXCLUDED.tick_volume,
+                    spread = EXCLUDED.spread,
+                    real_volume = EXCLUDED.real_volume
+            """, (symbol, timeframe))
+    
+    @staticmethod
+    def _encode_price_copy(frame: pd.DataFrame) -> bytes:
+        """COPY BINARY形式のバイト列を作成（行毎の文字列変換なし）"""
+        records = np.empty(len(frame), dtype=PRICE_COPY_DTYPE)
+        records['field_count'] = len(PRICE_COPY_FIELDS)
+        
+        times = frame['time'].to_numpy(dtype='datetime64[us]')
+        records['time'] = (times - PG_EPOCH).astype(np.int64)
+        for field in PRICE_COPY_FIELDS[1:]:
+            records[field] = frame[field].to_numpy()
+        for field in PRICE_COPY_FIELDS:
+            records[f'{field}_size'] = PRICE_COPY_DTYPE[field].itemsize
+        
+        return PGCOPY_HEADER + records.tobytes() + PGCOPY_TRAILER
     
     def save_trade(self, trade_data: Dict[str, Any]) -> bool:
         """
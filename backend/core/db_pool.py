@@ -0,0 +1,316 @@
+"""
+PostgreSQL接続プール
+
+DatabaseManager.get_connection() が毎回 psycopg2.connect / close していた
+TCP接続・認証のコストを避けるため、接続を再利用する。
+同一接続先のDatabaseManagerはプロセス内で1つのプールを共有する。
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """接続取得タイムアウト"""
+    pass
+
+
+class ConnectionPool:
+    """スレッドセーフな接続プール（取得タイムアウト・ヘルスチェック・メトリクス付き）"""
+
+    def __init__(self,
+                 connection_params: Dict[str, Any],
+                 min_size: int = 1,
+                 max_size: int = 10,
+                 acquire_timeout: float = 10.0,
+                 health_check_interval: float = 30.0,
+                 max_idle_time: float = 600.0,
+                 connect: Optional[Callable[..., Any]] = None):
+        """
+        初期化
+
+        Args:
+            connection_params: psycopg2.connectの引数
+            min_size: アイドル時も保持する最小接続数
+            max_size: 最大接続数
+            acquire_timeout: 接続取得の待機上限（秒）
+            health_check_interval: この秒数以上アイドルだった接続は使用前にSELECT 1で確認
+            max_idle_time: min_sizeを超える接続をアイドル状態で保持する上限（秒）
+            connect: 接続関数（省略時はpsycopg2.connect）
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+
+        self.connection_params = connection_params
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.max_idle_time = max_idle_time
+        self._connect = connect or psycopg2.connect
+
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.pid = os.getpid()
+
+        # メトリクス
+        self._metrics = {
+            'acquisitions': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'health_check_failures': 0
+        }
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        接続取得
+
+        Args:
+            timeout: 待機上限（秒、省略時はacquire_timeout）
+
+        Returns:
+            psycopg2接続
+
+        Raises:
+            PoolTimeoutError: 待機上限までに接続が空かなかった場合
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            connection, last_used, create = None, 0.0, False
+
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    if self._idle:
+                        connection, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection "
+                            f"(max_size={self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+                self._in_use += 1
+
+            try:
+                if create:
+                    connection = self._create_connection()
+                elif not self._is_healthy(connection, last_used):
+                    with self._cond:
+                        self._in_use -= 1
+                        self._metrics['health_check_failures'] += 1
+                    self._discard(connection)
+                    continue
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+
+            wait_time = time.monotonic() - start
+            with self._cond:
+                self._metrics['acquisitions'] += 1
+                if waited:
+                    self._metrics['waits'] += 1
+                    self._metrics['wait_time_total'] += wait_time
+                    self._metrics['wait_time_max'] = max(self._metrics['wait_time_max'], wait_time)
+            return connection
+
+    def release(self, connection, discard: bool = False) -> None:
+        """
+        接続返却
+
+        Args:
+            connection: acquire()で取得した接続
+            discard: Trueの場合は再利用せず閉じる（接続エラー時等）
+        """
+        if not discard and not connection.closed:
+            try:
+                # 未完了のトランザクションを破棄してから戻す
+                if connection.status != psycopg2.extensions.STATUS_READY:
+                    connection.rollback()
+            except Exception as e:
+                logger.warning(f"Failed to reset pooled connection: {e}")
+                discard = True
+
+        if discard or connection.closed or self._closed:
+            with self._cond:
+                self._in_use -= 1
+            self._discard(connection)
+            return
+
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((connection, now))
+
+            # min_sizeを超える長時間アイドル接続を整理（古いものから）
+            while (self._size - len(expired) > self.min_size and self._idle
+                   and now - self._idle[0][1] > self.max_idle_time):
+                expired.append(self._idle.popleft()[0])
+            self._cond.notify()
+
+        for conn in expired:
+            self._discard(conn)
+
+    def close(self) -> None:
+        """全接続を閉じる（使用中の接続は返却時に閉じる）"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+
+        for conn in idle:
+            self._discard(conn)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """プール統計取得"""
+        with self._cond:
+            metrics = dict(self._metrics)
+            stats = {
+                'host': self.connection_params.get('host'),
+                'database': self.connection_params.get('database'),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'closed': self._closed
+            }
+
+        stats.update(metrics)
+        stats['wait_time_total'] = round(metrics['wait_time_total'], 6)
+        stats['wait_time_max'] = round(metrics['wait_time_max'], 6)
+        stats['avg_wait_ms'] = (
+            metrics['wait_time_total'] / metrics['waits'] * 1000 if metrics['waits'] else 0.0
+        )
+        return stats
+
+    def _create_connection(self):
+        """新規接続作成"""
+        connection = self._connect(**self.connection_params)
+        connection.autocommit = False
+        with self._cond:
+            self._metrics['connections_created'] += 1
+        return connection
+
+    def _is_healthy(self, connection, last_used: float) -> bool:
+        """接続の健全性確認"""
+        if connection.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            connection.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            return False
+
+    def _discard(self, connection) -> None:
+        """接続を閉じてプールから外す"""
+        try:
+            if not connection.closed:
+                connection.close()
+        except Exception:
+            pass
+
+        with self._cond:
+            self._size -= 1
+            self._metrics['connections_closed'] += 1
+            self._cond.notify()
+
+
+# プロセス内で共有する接続プール（接続先ごと）
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(connection_params: Dict[str, Any], **pool_options) -> ConnectionPool:
+    """
+    接続先に対応する共有プール取得（無ければ作成）
+
+    Args:
+        connection_params: psycopg2.connectの引数
+        **pool_options: ConnectionPoolの設定（初回作成時のみ有効）
+
+    Returns:
+        ConnectionPool
+    """
+    key = tuple(sorted((k, str(v)) for k, v in connection_params.items()))
+
+    with _pools_lock:
+        pool = _pools.get(key)
+
+        # fork後の子プロセスでは親の接続を使わない
+        if pool is not None and pool.pid != os.getpid():
+            pool = None
+
+        if pool is None or pool._closed:
+            pool = ConnectionPool(connection_params, **pool_options)
+            _pools[key] = pool
+            logger.info(
+                f"Created database connection pool for {connection_params.get('host')}/"
+                f"{connection_params.get('database')} (min={pool.min_size}, max={pool.max_size})"
+            )
+
+        return pool
+
+
+def get_pool_statistics() -> Dict[str, Any]:
+    """全プールの統計取得"""
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == os.getpid()]
+
+    return {
+        'pools': [pool.get_statistics() for pool in pools],
+        'total_in_use': sum(pool._in_use for pool in pools),
+        'total_size': sum(pool._size for pool in pools)
+    }
+
+
+def close_all_pools() -> None:
+    """全プールを閉じる（アプリケーション終了時）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        if pool.pid == os.getpid():
+            pool.close()
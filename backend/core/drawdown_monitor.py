@@ -1,20 +1,46 @@
 """
 ドローダウン監視機能
+
+エクイティ更新毎のサンプルはメモリ上で分・時間単位のロールアップ（最小/最大/最終値）に
+集約し、ドローダウンが閾値以上変化した時か一定間隔でまとめて drawdown_rollups へ書き込む。
+統計・チャートは生サンプルではなくロールアップを読む。
 """
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+import psycopg2.extras
+
 from backend.core.database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# ロールアップ粒度 {粒度: バケット開始時刻への切り捨て}
+ROLLUP_BUCKETS = {
+    'minute': {'second': 0, 'microsecond': 0},
+    'hour': {'minute': 0, 'second': 0, 'microsecond': 0}
+}
+
 class DrawdownMonitor:
     """ドローダウン監視クラス"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager,
+                 change_threshold: float = 0.5,
+                 flush_interval: float = 60.0,
+                 max_buffered_buckets: int = 240):
+        """
+        初期化
+        
+        Args:
+            db_manager: DatabaseManager
+            change_threshold: 即時書き込みするドローダウン変化幅（%ポイント）
+            flush_interval: 書き込み間隔（秒）
+            max_buffered_buckets: 書き込み前に保持するバケット数の上限
+        """
         self.db_manager = db_manager
         self.peak_equity = 0
         self.current_drawdown = 0
@@ -22,6 +48,23 @@ class DrawdownMonitor:
         self.drawdown_start_date = None
         self.recovery_date = None
         
+        # ライトビハインドバッファ {(粒度, バケット開始): 集計}
+        self.change_threshold = change_threshold
+        self.flush_interval = flush_interval
+        self.max_buffered_buckets = max_buffered_buckets
+        self._buffer: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_persisted_drawdown: Optional[float] = None
+        self._last_flush_at = time.monotonic()
+        self._retry_after = 0.0
+        self.write_stats = {
+            'samples': 0,
+            'flushes': 0,
+            'rows_written': 0,
+            'failed_flushes': 0
+        }
+        
         # 履歴データ初期化
         self._initialize_peak_equity()
         
@@ -92,8 +135,8 @@ class DrawdownMonitor:
             # ドローダウンレベルによるアラート
             self._check_drawdown_alerts()
             
-            # データベースに記録
-            self._save_drawdown_record(current_equity)
+            # ロールアップに集約（条件を満たした時のみ書き込み）
+            self._record_sample(current_equity)
             
             return self.current_drawdown
             
@@ -118,35 +161,154 @@ class DrawdownMonitor:
         except Exception as e:
             logger.error(f"Error checking drawdown alerts: {e}")
     
-    def _save_drawdown_record(self, current_equity: float):
-        """ドローダウン記録の保存"""
-        try:
-            with self.db_manager.get_connection() as conn:
-                with conn.cursor() as cursor:
-                    insert_query = """
-                        INSERT INTO performance_stats 
-                        (stat_type, stat_value, metadata, created_at)
-                        VALUES (%s, %s, %s, %s)
-                    """
-                    
-                    metadata = {
-                        "current_equity": current_equity,
-                        "peak_equity": self.peak_equity,
-                        "current_drawdown": self.current_drawdown,
-                        "max_drawdown": self.max_drawdown,
-                        "drawdown_start": self.drawdown_start_date.isoformat() if self.drawdown_start_date else None
-                    }
-                    
-                    cursor.execute(insert_query, (
-                        'drawdown',
-                        self.current_drawdown,
-                        str(metadata),
-                        datetime.now()
-                    ))
+    def _record_sample(self, current_equity: float):
+        """サンプルをバッファ上のロールアップに集約し、必要ならフラッシュ"""
+        now = datetime.now()
+        drawdown = self.current_drawdown
+        
+        with self._buffer_lock:
+            for bucket_size, truncate in ROLLUP_BUCKETS.items():
+                key = (bucket_size, now.replace(**truncate))
+                sample = {
+                    'min_drawdown': drawdown,
+                    'max_drawdown': drawdown,
+                    'last_drawdown': drawdown,
+                    'last_equity': current_equity,
+                    'peak_equity': self.peak_equity,
+                    'samples': 1
+                }
+                bucket = self._buffer.get(key)
+                self._buffer[key] = self._merge_bucket(bucket, sample) if bucket else sample
+            
+            self.write_stats['samples'] += 1
+            buffered = len(self._buffer)
+        
+        if self._flush_due(drawdown, buffered):
+            self.flush()
+    
+    def _flush_due(self, drawdown: float, buffered: int) -> bool:
+        """フラッシュ条件（変化幅・経過時間・バッファ量）"""
+        now = time.monotonic()
+        if now < self._retry_after:
+            return False
+        
+        return (self._last_persisted_drawdown is None
+                or abs(drawdown - self._last_persisted_drawdown) >= self.change_threshold
+                or now - self._last_flush_at >= self.flush_interval
+                or buffered >= self.max_buffered_buckets)
+    
+    @staticmethod
+    def _merge_bucket(older: Dict[str, Any], newer: Dict[str, Any]) -> Dict[str, Any]:
+        """同一バケットの集計を結合（最終値は新しい方）"""
+        return {
+            'min_drawdown': min(older['min_drawdown'], newer['min_drawdown']),
+            'max_drawdown': max(older['max_drawdown'], newer['max_drawdown']),
+            'last_drawdown': newer['last_drawdown'],
+            'last_equity': newer['last_equity'],
+            'peak_equity': newer['peak_equity'],
+            'samples': older['samples'] + newer['samples']
+        }
+    
+    def flush(self) -> int:
+        """
+        バッファ済みロールアップをデータベースへ書き込み
+        
+        Returns:
+            書き込んだ行数
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                pending, self._buffer = self._buffer, {}
+                drawdown = self.current_drawdown
+            
+            if not pending:
+                self._last_flush_at = time.monotonic()
+                return 0
+            
+            metadata = {
+                "peak_equity": self.peak_equity,
+                "max_drawdown": self.max_drawdown,
+                "drawdown_start": self.drawdown_start_date.isoformat() if self.drawdown_start_date else None
+            }
+            rows = [
+                (bucket_size, bucket_start, bucket['min_drawdown'], bucket['max_drawdown'],
+                 bucket['last_drawdown'], bucket['last_equity'], bucket['peak_equity'],
+                 bucket['samples'], psycopg2.extras.Json(metadata))
+                for (bucket_size, bucket_start), bucket in sorted(pending.items())
+            ]
+            
+            try:
+                with self.db_manager.get_connection() as conn:
+                    with conn.cursor() as cursor:
+                        upsert_query = """
+                            INSERT INTO drawdown_rollups
+                            (bucket_size, bucket_start, min_drawdown, max_drawdown, last_drawdown,
+                             last_equity, peak_equity, samples, metadata, updated_at)
+                            VALUES %s
+                            ON CONFLICT (bucket_size, bucket_start) DO UPDATE SET
+                                min_drawdown = LEAST(drawdown_rollups.min_drawdown, EXCLUDED.min_drawdown),
+                                max_drawdown = GREATEST(drawdown_rollups.max_drawdown, EXCLUDED.max_drawdown),
+                                last_drawdown = EXCLUDED.last_drawdown,
+                                last_equity = EXCLUDED.last_equity,
+                                peak_equity = EXCLUDED.peak_equity,
+                                samples = drawdown_rollups.samples + EXCLUDED.samples,
+                                metadata = EXCLUDED.metadata,
+                                updated_at = EXCLUDED.updated_at
+                        """
+                        psycopg2.extras.execute_values(
+                            cursor, upsert_query, rows,
+                            template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)"
+                        )
                     conn.commit()
-                    
-        except Exception as e:
-            logger.error(f"Error saving drawdown record: {e}")
+                
+            except Exception as e:
+                logger.error(f"Error saving drawdown rollups: {e}")
+                # 未書き込み分をバッファへ戻し、次の間隔まで再試行しない
+                with self._buffer_lock:
+                    for key, bucket in pending.items():
+                        newer = self._buffer.get(key)
+                        self._buffer[key] = self._merge_bucket(bucket, newer) if newer else bucket
+                self.write_stats['failed_flushes'] += 1
+                self._retry_after = time.monotonic() + self.flush_interval
+                return 0
+            
+            self._last_persisted_drawdown = drawdown
+            self._last_flush_at = time.monotonic()
+            self.write_stats['flushes'] += 1
+            self.write_stats['rows_written'] += len(rows)
+            return len(rows)
+    
+    def get_write_statistics(self) -> Dict[str, Any]:
+        """ライトビハインド書き込み統計"""
+        with self._buffer_lock:
+            buffered = len(self._buffer)
+        return {**self.write_stats, 'buffered_buckets': buffered}
+    
+    def _load_rollups(self, days: int) -> pd.DataFrame:
+        """
+        期間に応じた粒度のロールアップを取得（バッファ分はフラッシュしてから読む）
+        
+        Args:
+            days: 期間（日数）
+            
+        Returns:
+            bucket_start, min_drawdown, max_drawdown, last_drawdown, samples
+        """
+        self.flush()
+        
+        bucket_size = 'minute' if days <= 1 else 'hour'
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        
+        with self.db_manager.get_connection() as conn:
+            query = """
+                SELECT bucket_start, min_drawdown, max_drawdown, last_drawdown, samples
+                FROM drawdown_rollups
+                WHERE bucket_size = %s
+                AND bucket_start >= %s AND bucket_start <= %s
+                ORDER BY bucket_start
+            """
+            return pd.read_sql_query(query, conn, params=(bucket_size, start_date, end_date))
     
     def get_drawdown_statistics(self, days: int = 30) -> Dict[str, any]:
         """
@@ -159,39 +321,28 @@ class DrawdownMonitor:
             ドローダウン統計情報
         """
         try:
-            with self.db_manager.get_connection() as conn:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=days)
-                
-                query = """
-                    SELECT stat_value, metadata, created_at
-                    FROM performance_stats
-                    WHERE stat_type = 'drawdown' 
-                    AND created_at >= %s AND created_at <= %s
-                    ORDER BY created_at
-                """
-                
-                result = pd.read_sql_query(query, conn, params=(start_date, end_date))
-                
-                if result.empty:
-                    return self._get_default_statistics()
-                
-                # 統計計算
-                drawdowns = result['stat_value'].values
-                
-                statistics = {
-                    "current_drawdown": self.current_drawdown,
-                    "max_drawdown": float(np.max(drawdowns)),
-                    "average_drawdown": float(np.mean(drawdowns[drawdowns > 0])) if len(drawdowns[drawdowns > 0]) > 0 else 0.0,
-                    "drawdown_frequency": len(drawdowns[drawdowns > 0]),
-                    "longest_drawdown_period": self._calculate_longest_drawdown_period(result),
-                    "recovery_factor": self._calculate_recovery_factor(result),
-                    "current_peak_equity": self.peak_equity,
-                    "days_in_drawdown": self._calculate_days_in_drawdown(),
-                    "time_to_recovery": self._estimate_time_to_recovery(result)
-                }
-                
-                return statistics
+            rollups = self._load_rollups(days)
+            
+            if rollups.empty:
+                return self._get_default_statistics()
+            
+            # バケット毎の最大ドローダウンで統計計算
+            result = rollups.assign(stat_value=rollups['max_drawdown'].astype(float))
+            drawdowns = result['stat_value'].values
+            
+            statistics = {
+                "current_drawdown": self.current_drawdown,
+                "max_drawdown": float(np.max(drawdowns)),
+                "average_drawdown": float(np.mean(drawdowns[drawdowns > 0])) if len(drawdowns[drawdowns > 0]) > 0 else 0.0,
+                "drawdown_frequency": len(drawdowns[drawdowns > 0]),
+                "longest_drawdown_period": self._calculate_longest_drawdown_period(result),
+                "recovery_factor": self._calculate_recovery_factor(result),
+                "current_peak_equity": self.peak_equity,
+                "days_in_drawdown": self._calculate_days_in_drawdown(),
+                "time_to_recovery": self._estimate_time_to_recovery(result)
+            }
+            
+            return statistics
                 
         except Exception as e:
             logger.error(f"Error getting drawdown statistics: {e}")
@@ -335,6 +486,9 @@ class DrawdownMonitor:
     def reset_statistics(self):
         """統計リセット"""
         try:
+            # リセット前の状態で集約済みの分は書き込んでおく
+            self.flush()
+            self._last_persisted_drawdown = None
             self.peak_equity = self._get_initial_balance()
             self.current_drawdown = 0
             self.max_drawdown = 0
@@ -357,31 +511,23 @@ class DrawdownMonitor:
             チャートデータ
         """
         try:
-            with self.db_manager.get_connection() as conn:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=days)
-                
-                query = """
-                    SELECT stat_value as drawdown, created_at
-                    FROM performance_stats
-                    WHERE stat_type = 'drawdown' 
-                    AND created_at >= %s AND created_at <= %s
-                    ORDER BY created_at
-                """
-                
-                result = pd.read_sql_query(query, conn, params=(start_date, end_date))
-                
-                if result.empty:
-                    return []
-                
-                chart_data = []
-                for _, row in result.iterrows():
-                    chart_data.append({
-                        "date": row['created_at'].isoformat(),
-                        "drawdown": float(row['drawdown'])
-                    })
-                
-                return chart_data
+            rollups = self._load_rollups(days)
+            
+            if rollups.empty:
+                return []
+            
+            return [
+                {
+                    "date": bucket_start.isoformat(),
+                    "drawdown": float(last_drawdown),
+                    "min_drawdown": float(min_drawdown),
+                    "max_drawdown": float(max_drawdown)
+                }
+                for bucket_start, last_drawdown, min_drawdown, max_drawdown in zip(
+                    rollups['bucket_start'], rollups['last_drawdown'],
+                    rollups['min_drawdown'], rollups['max_drawdown']
+                )
+            ]
                 
         except Exception as e:
             logger.error(f"Error getting chart data: {e}")
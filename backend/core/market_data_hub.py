@@ -0,0 +1,402 @@
+"""
+マーケットデータハブ
+
+WebSocket配信・取引監視・自動売買エンジン・リスク管理・APIが個別に
+MT5の get_tick / get_positions / get_account_info を呼ぶと同じデータを
+1秒間に何度も取得することになるため、ハブが通貨ペア毎・間隔毎に1回だけ取得し、
+最新スナップショット（取得時刻・バージョン付き）をメモリから配信する。
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from backend.core.mt5_client import MT5Client
+from backend.core.mt5_worker import MT5Worker, PRIORITY_ACCOUNT, get_mt5_worker
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_TOPIC = 'account'
+POSITIONS_TOPIC = 'positions'
+
+
+def tick_topic(symbol: str) -> str:
+    """ティックのトピック名"""
+    return f"tick:{symbol}"
+
+
+class MarketDataHub:
+    """MT5マーケットデータの共有キャッシュ"""
+
+    def __init__(self,
+                 mt5_client: Optional[MT5Client] = None,
+                 tick_interval: float = 0.1,
+                 account_interval: float = 1.0,
+                 max_tick_age: float = 1.0,
+                 max_account_age: float = 5.0,
+                 worker: Optional[MT5Worker] = None):
+        """
+        初期化
+
+        Args:
+            mt5_client: MT5Client（省略時は新規作成）
+            tick_interval: ティック取得間隔（秒）
+            account_interval: 口座情報・ポジション取得間隔（秒）
+            max_tick_age: キャッシュしたティックを返す最大経過秒数（超過時はMT5から取得）
+            max_account_age: 口座情報・ポジションの最大経過秒数
+            worker: ポーリングを実行するMT5ワーカー（省略時は共有ワーカー）
+        """
+        self.mt5_client = mt5_client or MT5Client()
+        self.tick_interval = tick_interval
+        self.account_interval = account_interval
+        self.max_tick_age = max_tick_age
+        self.max_account_age = max_account_age
+        self._worker = worker
+
+        # トピック → {'data', 'updated_at', 'version'}
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._symbols: Set[str] = set()
+        self._lock = threading.Lock()
+
+        # 更新通知（イベントループ上でのみ操作）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._events: Dict[str, asyncio.Event] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self._stats = {'polls': 0, 'mt5_calls': 0, 'cache_hits': 0, 'fetch_through': 0, 'updates': 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def watch(self, symbol: str) -> None:
+        """ティック取得対象に通貨ペアを追加"""
+        with self._lock:
+            self._symbols.add(symbol)
+
+    def unwatch(self, symbol: str) -> None:
+        """ティック取得対象から通貨ペアを除外"""
+        with self._lock:
+            self._symbols.discard(symbol)
+
+    # ------------------------------------------------------------------
+    # 同期アクセス（キャッシュが古い場合のみMT5から取得）
+    # キャッシュ切れの取得はMT5ワーカーの完了まで呼び出し元スレッドを止めるため、
+    # MT5ワーカー・DBスレッド等から使い、コルーチンからは非同期アクセスを使う
+    # ------------------------------------------------------------------
+
+    def get_tick(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        最新ティック取得
+
+        Args:
+            symbol: 通貨ペア
+            max_age: 許容する経過秒数（省略時は max_tick_age）
+
+        Returns:
+            ティックデータ辞書
+        """
+        self.watch(symbol)
+        return self._get(tick_topic(symbol), self.max_tick_age if max_age is None else max_age,
+                          lambda: self.mt5_client.get_tick(symbol))
+
+    def get_positions(self, symbol: str = None, max_age: Optional[float] = None) -> List[Dict]:
+        """
+        現在のポジション取得（全ポジションをキャッシュし、通貨ペアで絞り込む）
+
+        Args:
+            symbol: 通貨ペア（指定しない場合は全て）
+            max_age: 許容する経過秒数（省略時は max_account_age）
+        """
+        positions = self._get(POSITIONS_TOPIC, self.max_account_age if max_age is None else max_age,
+                              self.mt5_client.get_positions) or []
+        if symbol:
+            return [position for position in positions if position['symbol'] == symbol]
+        return list(positions)
+
+    def get_account_info(self, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        口座情報取得
+
+        Args:
+            max_age: 許容する経過秒数（省略時は max_account_age）
+        """
+        return self._get(ACCOUNT_TOPIC, self.max_account_age if max_age is None else max_age,
+                         self.mt5_client.get_account_info)
+
+    # ------------------------------------------------------------------
+    # 非同期アクセス（キャッシュ切れの取得をMT5ワーカーで待つ。イベントループを止めない）
+    # ------------------------------------------------------------------
+
+    async def get_tick_async(self, symbol: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """最新ティック取得（get_tickの非同期版）"""
+        self.watch(symbol)
+        return await self._get_async(tick_topic(symbol), self.max_tick_age if max_age is None else max_age,
+                                     lambda: self.mt5_client.get_tick(symbol))
+
+    async def get_positions_async(self, symbol: str = None, max_age: Optional[float] = None) -> List[Dict]:
+        """現在のポジション取得（get_positionsの非同期版）"""
+        positions = await self._get_async(POSITIONS_TOPIC,
+                                          self.max_account_age if max_age is None else max_age,
+                                          self.mt5_client.get_positions) or []
+        if symbol:
+            return [position for position in positions if position['symbol'] == symbol]
+        return list(positions)
+
+    async def get_account_info_async(self, max_age: Optional[float] = None) -> Optional[Dict]:
+        """口座情報取得（get_account_infoの非同期版）"""
+        return await self._get_async(ACCOUNT_TOPIC, self.max_account_age if max_age is None else max_age,
+                                     self.mt5_client.get_account_info)
+
+    def get_snapshot(self, topic: str) -> Optional[Dict[str, Any]]:
+        """トピックの最新スナップショット（data・経過秒数・バージョン）"""
+        with self._lock:
+            snapshot = self._snapshots.get(topic)
+            if snapshot is None:
+                return None
+            return {**snapshot, 'age': time.monotonic() - snapshot['updated_at']}
+
+    def _get(self, topic: str, max_age: float, fetch) -> Any:
+        """キャッシュが新しければ返し、古ければMT5から取得して更新"""
+        fresh, snapshot = self._lookup(topic, max_age)
+        if fresh:
+            return snapshot['data']
+
+        # 取得はMT5ワーカー上で実行（ポーリングや発注とターミナル呼び出しを直列化）
+        data = self._get_worker().submit(self._fetch_through, fetch, priority=PRIORITY_ACCOUNT,
+                                         label='hub_fetch_through').result()
+        return self._update(topic, snapshot, data)
+
+    async def _get_async(self, topic: str, max_age: float, fetch) -> Any:
+        """_getの非同期版（MT5ワーカーの完了をawaitで待つ）"""
+        fresh, snapshot = self._lookup(topic, max_age)
+        if fresh:
+            return snapshot['data']
+
+        data = await self._get_worker().run(self._fetch_through, fetch, priority=PRIORITY_ACCOUNT,
+                                            label='hub_fetch_through')
+        return self._update(topic, snapshot, data)
+
+    def _lookup(self, topic: str, max_age: float) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """(鮮度内か, スナップショット) を返し、キャッシュヒット・取得の統計を記録"""
+        with self._lock:
+            snapshot = self._snapshots.get(topic)
+            if snapshot is not None and time.monotonic() - snapshot['updated_at'] <= max_age:
+                self._stats['cache_hits'] += 1
+                return True, snapshot
+            self._stats['fetch_through'] += 1
+            return False, snapshot
+
+    def _update(self, topic: str, snapshot: Optional[Dict[str, Any]], data: Any) -> Any:
+        """取得結果を保存（取得できなければ古いスナップショットを返す）"""
+        if data is None:
+            return snapshot['data'] if snapshot is not None else None
+        self._store(topic, data)
+        return data
+
+    def _fetch_through(self, fetch) -> Any:
+        """接続確認してから取得（MT5ワーカー上で実行）"""
+        if not self.mt5_client.ensure_connection():
+            return None
+        return self._fetch(fetch)
+
+    def _get_worker(self) -> MT5Worker:
+        if self._worker is None:
+            self._worker = get_mt5_worker()
+        return self._worker
+
+    def _fetch(self, fetch) -> Any:
+        with self._lock:
+            self._stats['mt5_calls'] += 1
+        return fetch()
+
+    def _store(self, topic: str, data: Any) -> None:
+        """スナップショット更新（内容が変わった場合のみバージョンを進めて通知）"""
+        with self._lock:
+            snapshot = self._snapshots.get(topic)
+            if snapshot is not None and snapshot['data'] == data:
+                snapshot['updated_at'] = time.monotonic()
+                return
+            version = snapshot['version'] + 1 if snapshot is not None else 1
+            self._snapshots[topic] = {'data': data, 'updated_at': time.monotonic(), 'version': version}
+            self._stats['updates'] += 1
+
+        self._notify(topic)
+
+    # ------------------------------------------------------------------
+    # 非同期購読
+    # ------------------------------------------------------------------
+
+    async def next_update(self,
+                          topic: str,
+                          after_version: int = 0,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        指定バージョンより新しいスナップショットを待つ
+
+        Args:
+            topic: トピック（tick_topic(symbol) / 'positions' / 'account'）
+            after_version: 既に受け取ったバージョン
+            timeout: 待機上限（秒、超過時は asyncio.TimeoutError）
+
+        Returns:
+            スナップショット（途中の更新は間引かれ、最新のみ返す）
+        """
+        self._bind_loop()
+        while True:
+            snapshot = self.get_snapshot(topic)
+            if snapshot is not None and snapshot['version'] > after_version:
+                return snapshot
+
+            event = self._events.get(topic)
+            if event is None:
+                event = self._events[topic] = asyncio.Event()
+            await asyncio.wait_for(event.wait(), timeout)
+
+    async def subscribe(self, topic: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        トピックの更新を順に受け取る（遅い購読者には最新のみ届く）
+
+        使用例:
+            async for snapshot in hub.subscribe(tick_topic('USDJPY')):
+                ...
+        """
+        symbol = topic.split(':', 1)[1] if topic.startswith('tick:') else None
+        if symbol:
+            self.watch(symbol)
+
+        version = 0
+        while True:
+            snapshot = await self.next_update(topic, version)
+            version = snapshot['version']
+            yield snapshot
+
+    def _bind_loop(self) -> None:
+        """更新通知に使うイベントループを記録（ループが変わった場合は待機イベントを破棄）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._events.clear()
+
+    def _notify(self, topic: str) -> None:
+        """待機中の購読者を起こす（他スレッドからの更新はループへ委譲）"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake(topic)
+        else:
+            loop.call_soon_threadsafe(self._wake, topic)
+
+    def _wake(self, topic: str) -> None:
+        event = self._events.pop(topic, None)
+        if event is not None:
+            event.set()
+
+    # ------------------------------------------------------------------
+    # ポーリング
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """ポーリング開始（実行中のイベントループ上で呼ぶ）"""
+        if self.running:
+            return
+        self._bind_loop()
+        self._get_worker()
+        self._task = self._loop.create_task(self._poll_loop())
+        logger.info("Market data hub started")
+
+    async def stop(self) -> None:
+        """ポーリング停止"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Market data hub stopped")
+
+    def poll_once(self, include_account: bool = True) -> None:
+        """対象通貨ペアのティック（と口座情報・ポジション）を1回取得"""
+        with self._lock:
+            symbols = sorted(self._symbols)
+            self._stats['polls'] += 1
+
+        for symbol in symbols:
+            tick = self._fetch(lambda: self.mt5_client.get_tick(symbol))
+            if tick is not None:
+                self._store(tick_topic(symbol), tick)
+
+        if include_account:
+            account_info = self._fetch(self.mt5_client.get_account_info)
+            if account_info is not None:
+                self._store(ACCOUNT_TOPIC, account_info)
+            self._store(POSITIONS_TOPIC, self._fetch(self.mt5_client.get_positions))
+
+    async def _poll_loop(self) -> None:
+        """ポーリングループ"""
+        next_account_poll = 0.0
+        while True:
+            try:
+                # MT5呼び出しはMT5ワーカー上で実行（イベントループを止めない）
+                if not await self._worker.run(self.mt5_client.ensure_connection, priority=PRIORITY_ACCOUNT):
+                    logger.error("MT5 connection lost")
+                    await asyncio.sleep(5)
+                    continue
+
+                now = time.monotonic()
+                include_account = now >= next_account_poll
+                if include_account:
+                    next_account_poll = now + self.account_interval
+
+                await self._worker.run(self.poll_once, include_account, priority=PRIORITY_ACCOUNT)
+                await asyncio.sleep(self.tick_interval)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market data hub polling error: {e}")
+                await asyncio.sleep(1)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """ハブ統計"""
+        with self._lock:
+            stats = dict(self._stats)
+            now = time.monotonic()
+            ages = {topic: round(now - snapshot['updated_at'], 3) for topic, snapshot in self._snapshots.items()}
+            stats['symbols'] = sorted(self._symbols)
+
+        stats['running'] = self.running
+        stats['snapshot_age_seconds'] = ages
+        return stats
+
+
+# グローバルマーケットデータハブ（初回使用時に作成）
+_market_data_hub: Optional[MarketDataHub] = None
+_market_data_hub_lock = threading.Lock()
+
+
+def get_market_data_hub(mt5_client: Optional[MT5Client] = None) -> MarketDataHub:
+    """
+    共有MarketDataHub取得
+
+    Args:
+        mt5_client: 初回作成時に使うMT5Client（MT5接続はプロセス共通のため以降は無視）
+    """
+    global _market_data_hub
+    with _market_data_hub_lock:
+        if _market_data_hub is None:
+            _market_data_hub = MarketDataHub(mt5_client)
+        return _market_data_hub
+
+
+def get_market_data_hub_statistics() -> Optional[Dict[str, Any]]:
+    """共有MarketDataHubの統計（未作成時はNone）"""
+    return _market_data_hub.get_statistics() if _market_data_hub is not None else None
@@ -144,7 +144,8 @@ class MT5Client:
                 "equity": 100000.0,
                 "margin": 0.0,
                 "margin_free": 100000.0,
-                "margin_level": 0.0
+                "margin_level": 0.0,
+                "profit": 0.0
             }
             
         account_info = mt5.account_info()
@@ -161,7 +162,8 @@ class MT5Client:
             "equity": account_info.equity,
             "margin": account_info.margin,
             "margin_free": account_info.margin_free,
-            "margin_level": account_info.margin_level
+            "margin_level": account_info.margin_level,
+            "profit": account_info.profit
         }
     
     def get_symbols(self) -> List[str]:
@@ -0,0 +1,318 @@
+"""
+MT5 I/Oワーカー
+
+MetaTrader5 のAPI（copy_rates_from_pos / order_send / positions_get 等）は
+ブロッキングするC拡張呼び出しで、コルーチンから直接呼ぶとイベントループが止まる。
+ターミナルへの同時呼び出しも避けたいため、全呼び出しを専用スレッド1本に
+優先度付きキューで直列化し、発注・決済をデータ取得より先に処理する。
+"""
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.mt5_client import MT5Client
+
+logger = logging.getLogger(__name__)
+
+# 優先度（小さいほど先に処理）
+PRIORITY_ORDER = 0    # 発注・決済・SL/TP変更
+PRIORITY_ACCOUNT = 1  # 接続確認・口座情報・ポジション・ティック
+PRIORITY_DATA = 2     # レート・シンボル一覧などのデータ取得
+_PRIORITY_STOP = 9    # 停止用（キューに残った呼び出しを処理してから停止）
+
+PRIORITY_NAMES = {PRIORITY_ORDER: 'order', PRIORITY_ACCOUNT: 'account', PRIORITY_DATA: 'data'}
+
+# MT5Clientメソッド → 優先度
+METHOD_PRIORITY = {
+    'place_order': PRIORITY_ORDER,
+    'close_position': PRIORITY_ORDER,
+    'modify_position': PRIORITY_ORDER,
+    'close_all_positions': PRIORITY_ORDER,
+    'ensure_connection': PRIORITY_ACCOUNT,
+    'get_account_info': PRIORITY_ACCOUNT,
+    'get_positions': PRIORITY_ACCOUNT,
+    'get_orders': PRIORITY_ACCOUNT,
+    'get_tick': PRIORITY_ACCOUNT,
+    'get_symbol_info': PRIORITY_ACCOUNT,
+    'get_rates': PRIORITY_DATA,
+    'get_rates_range': PRIORITY_DATA,
+    'get_multiple_rates': PRIORITY_DATA,
+    'get_symbols': PRIORITY_DATA,
+}
+
+
+class MT5Worker:
+    """MT5呼び出しを直列化する専用スレッド"""
+
+    def __init__(self, name: str = 'mt5-io'):
+        self.name = name
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # ラベル（メソッド名）毎の呼び出し統計
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self._queue_depth_max = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """ワーカースレッド開始"""
+        with self._lock:
+            if self.running:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        logger.info("MT5 I/O worker started")
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """キューに残った呼び出しを処理してからワーカースレッドを停止"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._stopped:
+                return
+            self._stopped = True
+            self._queue.put((_PRIORITY_STOP, next(self._seq), 0.0, None, None, (), {}, None))
+
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+        logger.info("MT5 I/O worker stopped")
+
+    def submit(self,
+               func: Callable[..., Any],
+               *args,
+               priority: int = PRIORITY_DATA,
+               label: Optional[str] = None,
+               **kwargs) -> concurrent.futures.Future:
+        """
+        ワーカースレッドで実行する呼び出しを登録（任意のスレッドから呼べる）
+
+        Args:
+            func: MT5呼び出しを含む同期関数
+            priority: 優先度（PRIORITY_ORDER / PRIORITY_ACCOUNT / PRIORITY_DATA）
+            label: 統計に使う名前（省略時は関数名）
+
+        Returns:
+            結果のFuture（実行前にキャンセルされた呼び出しは実行しない）
+        """
+        label = label or getattr(func, '__name__', 'call')
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        item = (priority, next(self._seq), time.perf_counter(), label, func, args, kwargs, future)
+
+        # ワーカー上からの呼び出しは直接実行（自分自身の完了待ちによるデッドロック防止）
+        if threading.current_thread() is self._thread:
+            self._execute(item)
+            return future
+
+        if self._stopped:
+            raise RuntimeError("MT5 worker is stopped")
+        if not self.running:
+            self.start()
+
+        self._queue.put(item)
+        with self._lock:
+            self._queue_depth_max = max(self._queue_depth_max, self._queue.qsize())
+        return future
+
+    async def run(self,
+                  func: Callable[..., Any],
+                  *args,
+                  priority: int = PRIORITY_DATA,
+                  timeout: Optional[float] = None,
+                  label: Optional[str] = None,
+                  **kwargs) -> Any:
+        """
+        ワーカースレッドで実行し、結果を待つ
+
+        Args:
+            func: MT5呼び出しを含む同期関数
+            priority: 優先度
+            timeout: 待機上限（秒、キュー待ちを含む。超過時は asyncio.TimeoutError）
+            label: 統計に使う名前
+
+        Returns:
+            関数の戻り値
+        """
+        label = label or getattr(func, '__name__', 'call')
+        future = self.submit(func, *args, priority=priority, label=label, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # 未実行の呼び出しはキャンセルされ、ワーカーで破棄される
+            self._record(label, priority, timeouts=1)
+            logger.warning(f"MT5 call timed out: {label} ({timeout}s)")
+            raise
+
+    def _run(self) -> None:
+        """ワーカースレッド本体"""
+        while True:
+            item = self._queue.get()
+            if item[4] is None:
+                break
+            self._execute(item)
+
+    def _execute(self, item: tuple) -> None:
+        """呼び出しを実行し、待ち時間・実行時間を記録"""
+        priority, _, submitted_at, label, func, args, kwargs, future = item
+
+        # 待機中にタイムアウト・キャンセルされた呼び出しは実行しない（期限切れの発注を防ぐ）
+        if not future.set_running_or_notify_cancel():
+            self._record(label, priority, expired=1)
+            return
+
+        started_at = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self._record(label, priority, wait=started_at - submitted_at,
+                         run=time.perf_counter() - started_at, failed=1)
+            future.set_exception(e)
+        else:
+            self._record(label, priority, wait=started_at - submitted_at,
+                         run=time.perf_counter() - started_at)
+            future.set_result(result)
+
+    def _record(self,
+                label: str,
+                priority: int,
+                wait: Optional[float] = None,
+                run: Optional[float] = None,
+                failed: int = 0,
+                timeouts: int = 0,
+                expired: int = 0) -> None:
+        with self._lock:
+            stats = self._calls.get(label)
+            if stats is None:
+                stats = self._calls[label] = {
+                    'priority': PRIORITY_NAMES.get(priority, str(priority)),
+                    'calls': 0, 'failed': 0, 'timeouts': 0, 'expired': 0,
+                    'wait_total': 0.0, 'wait_max': 0.0, 'run_total': 0.0, 'run_max': 0.0
+                }
+            if run is not None:
+                stats['calls'] += 1
+                stats['wait_total'] += wait
+                stats['wait_max'] = max(stats['wait_max'], wait)
+                stats['run_total'] += run
+                stats['run_max'] = max(stats['run_max'], run)
+            stats['failed'] += failed
+            stats['timeouts'] += timeouts
+            stats['expired'] += expired
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """呼び出し毎の実行時間・キュー待ち時間・タイムアウト数"""
+        with self._lock:
+            calls = {}
+            for label, stats in self._calls.items():
+                count = stats['calls']
+                calls[label] = {
+                    'priority': stats['priority'],
+                    'calls': count,
+                    'failed': stats['failed'],
+                    'timeouts': stats['timeouts'],
+                    'expired': stats['expired'],
+                    'avg_wait_ms': stats['wait_total'] / count * 1000 if count else 0.0,
+                    'max_wait_ms': stats['wait_max'] * 1000,
+                    'avg_run_ms': stats['run_total'] / count * 1000 if count else 0.0,
+                    'max_run_ms': stats['run_max'] * 1000
+                }
+            queue_depth_max = self._queue_depth_max
+
+        return {
+            'running': self.running,
+            'queue_depth': self._queue.qsize(),
+            'queue_depth_max': queue_depth_max,
+            'calls': calls
+        }
+
+
+class AsyncMT5Client:
+    """
+    MT5Clientの非同期ファサード（全呼び出しをMT5Workerで実行）
+
+    使用例:
+        mt5_io = AsyncMT5Client(mt5_client)
+        df = await mt5_io.get_rates('USDJPY', 'H1', count=500)
+        result = await mt5_io.place_order('USDJPY', 'BUY', 0.1)
+    """
+
+    def __init__(self,
+                 mt5_client: MT5Client,
+                 worker: Optional['MT5Worker'] = None,
+                 timeouts: Optional[Dict[int, Optional[float]]] = None):
+        """
+        初期化
+
+        Args:
+            mt5_client: MT5Client
+            worker: 実行に使うワーカー（省略時は共有ワーカー）
+            timeouts: 優先度毎の待機上限（秒）
+        """
+        self.mt5_client = mt5_client
+        self._worker = worker
+        # 発注・決済は実行開始後に結果を捨てると建玉が管理外になるため完了まで待つ
+        self.timeouts = {PRIORITY_ORDER: None, PRIORITY_ACCOUNT: 10.0, PRIORITY_DATA: 30.0}
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+    @property
+    def worker(self) -> 'MT5Worker':
+        """実行に使うワーカー（共有ワーカーは初回呼び出し時に起動）"""
+        return self._worker or get_mt5_worker()
+
+    def __getattr__(self, name: str):
+        if name.startswith('_') or name not in METHOD_PRIORITY:
+            raise AttributeError(name)
+
+        method = getattr(self.mt5_client, name)
+        priority = METHOD_PRIORITY[name]
+
+        async def call(*args, **kwargs):
+            return await self.worker.run(method, *args, priority=priority,
+                                         timeout=self.timeouts[priority], label=name, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def run(self, func: Callable[..., Any], *args, priority: int = PRIORITY_DATA, **kwargs) -> Any:
+        """MT5呼び出しを含む任意の同期処理をワーカーで実行"""
+        return await self.worker.run(func, *args, priority=priority,
+                                     timeout=self.timeouts[priority], **kwargs)
+
+
+# グローバルMT5ワーカー（初回使用時に作成、MT5接続はプロセス共通のため1本）
+_mt5_worker: Optional[MT5Worker] = None
+_mt5_worker_lock = threading.Lock()
+
+
+def get_mt5_worker() -> MT5Worker:
+    """共有MT5Worker取得"""
+    global _mt5_worker
+    with _mt5_worker_lock:
+        if _mt5_worker is None:
+            _mt5_worker = MT5Worker()
+            _mt5_worker.start()
+        return _mt5_worker
+
+
+def get_mt5_worker_statistics() -> Optional[Dict[str, Any]]:
+    """共有MT5Workerの統計（未作成時はNone）"""
+    return _mt5_worker.get_statistics() if _mt5_worker is not None else None
+
+
+def shutdown_mt5_worker() -> None:
+    """共有MT5Worker停止（アプリケーション終了時）"""
+    global _mt5_worker
+    with _mt5_worker_lock:
+        if _mt5_worker is not None:
+            _mt5_worker.stop()
+            _mt5_worker = None
@@ -0,0 +1,185 @@
+"""
+OHLCVリサンプリング
+
+上位時間軸の足をMT5から個別に取得・保存する代わりに、M1足から組み立てる。
+始値=最初の足の始値、高値=最大、安値=最小、終値=最後の足の終値、
+出来高=合計、スプレッド=最小（MT5の足のスプレッドは足内の最小値）。
+足の区切りはMT5と同じくサーバー時刻の倍数（H4は0/4/8…時、D1は0時、W1は日曜0時、MN1は月初）で、
+ティックの無い期間（週末など）の足は作らない。
+"""
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.core.bar_scheduler import TIMEFRAME_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 固定長の時間軸（秒）。MN1は月初区切りのため別扱い
+RESAMPLE_SECONDS = {**TIMEFRAME_SECONDS, 'W1': 7 * 86400}
+
+_NS = 1_000_000_000
+# 1970-01-01 は木曜日のため、日曜始まりの週に揃えるずらし幅
+_WEEK_ORIGIN_NS = 3 * 86400 * _NS
+
+
+def bar_starts(times: np.ndarray, timeframe: str, day_offset: timedelta = timedelta(0)) -> np.ndarray:
+    """
+    各時刻が属する足の開始時刻
+
+    Args:
+        times: datetime64[ns] 配列
+        timeframe: 時間軸（M1〜D1, W1, MN1）
+        day_offset: D1以上の区切りをずらす幅（例: NYクローズ基準にする場合）
+
+    Returns:
+        datetime64[ns] 配列
+    """
+    times = np.asarray(times, dtype='datetime64[ns]')
+    if timeframe == 'MN1':
+        shifted = times - np.timedelta64(day_offset)
+        return shifted.astype('datetime64[M]').astype('datetime64[ns]') + np.timedelta64(day_offset)
+    if timeframe not in RESAMPLE_SECONDS:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+
+    period = RESAMPLE_SECONDS[timeframe] * _NS
+    offset = int(day_offset.total_seconds() * _NS) if period >= 86400 * _NS else 0
+    if timeframe == 'W1':
+        offset += _WEEK_ORIGIN_NS
+
+    ns = times.astype(np.int64) - offset
+    return ((ns // period) * period + offset).astype('datetime64[ns]')
+
+
+def bar_end(start: pd.Timestamp, timeframe: str) -> pd.Timestamp:
+    """足の終了時刻（次の足の開始時刻）"""
+    if timeframe == 'MN1':
+        return start + pd.DateOffset(months=1)
+    return start + pd.Timedelta(seconds=RESAMPLE_SECONDS[timeframe])
+
+
+def resample_ohlcv(m1: pd.DataFrame,
+                   timeframe: str,
+                   include_partial: bool = True,
+                   day_offset: timedelta = timedelta(0)) -> pd.DataFrame:
+    """
+    M1足から上位時間軸の足を作成（ベクトル化）
+
+    Args:
+        m1: M1足（time列またはDatetimeIndex、open/high/low/close と tick_volume または volume）
+        timeframe: 作成する時間軸
+        include_partial: 形成中（M1が足の終わりまで揃っていない）の最後の足を含めるか
+        day_offset: D1以上の区切りをずらす幅
+
+    Returns:
+        入力と同じ列構成（time列/インデックス）の上位時間軸の足
+    """
+    indexed = 'time' not in m1.columns
+    if m1.empty:
+        return m1.iloc[0:0].copy()
+
+    times = (m1.index if indexed else m1['time']).to_numpy(dtype='datetime64[ns]')
+    order = np.argsort(times, kind='stable')
+    if not np.all(order == np.arange(len(order))):
+        m1 = m1.iloc[order]
+        times = times[order]
+
+    starts = bar_starts(times, timeframe, day_offset)
+    boundaries = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    ends = np.r_[boundaries[1:], len(starts)] - 1
+
+    result = {
+        'open': m1['open'].to_numpy()[boundaries],
+        'high': np.maximum.reduceat(m1['high'].to_numpy(), boundaries),
+        'low': np.minimum.reduceat(m1['low'].to_numpy(), boundaries),
+        'close': m1['close'].to_numpy()[ends]
+    }
+    for column in ('tick_volume', 'volume', 'real_volume'):
+        if column in m1.columns:
+            result[column] = np.add.reduceat(m1[column].to_numpy(), boundaries)
+    if 'spread' in m1.columns:
+        result['spread'] = np.minimum.reduceat(m1['spread'].to_numpy(), boundaries)
+    if 'symbol' in m1.columns:
+        result['symbol'] = m1['symbol'].to_numpy()[boundaries]
+
+    bar_times = starts[boundaries]
+    if not include_partial:
+        last_start = pd.Timestamp(bar_times[-1])
+        if pd.Timestamp(times[-1]) + pd.Timedelta(minutes=1) < bar_end(last_start, timeframe):
+            bar_times = bar_times[:-1]
+            result = {column: values[:-1] for column, values in result.items()}
+
+    if 'timeframe' in m1.columns:
+        result['timeframe'] = timeframe
+
+    if indexed:
+        frame = pd.DataFrame(result, index=pd.DatetimeIndex(bar_times, name=m1.index.name))
+        return frame[[column for column in m1.columns if column in frame.columns]]
+
+    frame = pd.DataFrame(result)
+    frame.insert(0, 'time', bar_times)
+    return frame[[column for column in m1.columns if column in frame.columns]]
+
+
+class IncrementalResampler:
+    """M1足を1本ずつ受け取り、形成中の上位足を更新する"""
+
+    def __init__(self, timeframe: str, day_offset: timedelta = timedelta(0)):
+        """
+        初期化
+
+        Args:
+            timeframe: 作成する時間軸
+            day_offset: D1以上の区切りをずらす幅
+        """
+        if timeframe != 'MN1' and timeframe not in RESAMPLE_SECONDS:
+            raise ValueError(f"Invalid timeframe: {timeframe}")
+        self.timeframe = timeframe
+        self.day_offset = day_offset
+        self.current: Optional[Dict[str, Any]] = None
+
+    def update(self, bar: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        M1足を追加
+
+        Args:
+            bar: M1足（time, open, high, low, close, tick_volume/volume, spread）
+
+        Returns:
+            この足で確定した上位足（確定しなければNone）
+        """
+        bar_time = pd.Timestamp(bar['time'])
+        start = pd.Timestamp(bar_starts(np.array([bar_time.to_datetime64()]), self.timeframe, self.day_offset)[0])
+
+        current = self.current
+        if current is not None and start < current['time']:
+            logger.warning(f"Ignoring out-of-order M1 bar {bar_time} for {self.timeframe}")
+            return None
+
+        closed = None
+        if current is None or start > current['time']:
+            # 前の足の最後のM1が無かった場合は、次の足の開始で確定
+            closed = current
+            self.current = {'time': start, 'open': bar['open'], 'high': bar['high'],
+                            'low': bar['low'], 'close': bar['close']}
+            for column in ('tick_volume', 'volume', 'real_volume', 'spread'):
+                if column in bar:
+                    self.current[column] = bar[column]
+        else:
+            current['high'] = max(current['high'], bar['high'])
+            current['low'] = min(current['low'], bar['low'])
+            current['close'] = bar['close']
+            for column in ('tick_volume', 'volume', 'real_volume'):
+                if column in bar:
+                    current[column] = current.get(column, 0) + bar[column]
+            if 'spread' in bar:
+                current['spread'] = min(current.get('spread', bar['spread']), bar['spread'])
+
+        # 足の最後のM1が来た時点で確定
+        if closed is None and bar_time + pd.Timedelta(minutes=1) >= bar_end(self.current['time'], self.timeframe):
+            closed = self.current
+            self.current = None
+        return closed
@@ -0,0 +1,238 @@
+"""
+価格データ読み込みのクエリプランナー
+
+database/timescale_setup.sql で定義したTimescaleDBの連続集計ビュー
+（price_data_1h / price_data_1d、いずれもM1から集計）は圧縮済みの過去データを
+読まずに上位足を返せる。(symbol, timeframe, 期間) の要求に対して、
+時間軸を割り切れる最も粗い集計ビューを選び、集計済み範囲はビューから、
+未集計の末尾だけを price_data のM1から組み立てる。
+集計ビューが無い環境（TimescaleDB未導入など）や集計幅より細かい時間軸、
+集計ビューから足が得られない場合（上位足のみ保存したDBなど）は
+従来通り price_data を直接読む。
+time はどの読み込み元でもタイムゾーン無しのUTCで返す。
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.core.ohlcv_resampler import RESAMPLE_SECONDS, bar_end, bar_starts, resample_ohlcv
+
+logger = logging.getLogger(__name__)
+
+# 連続集計ビュー（粗い順）: (ビュー名, 集計幅（秒）)
+CONTINUOUS_AGGREGATES = [
+    ('price_data_1d', 86400),
+    ('price_data_1h', 3600),
+]
+
+RAW_SOURCE = 'price_data'
+
+PRICE_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'tick_volume']
+
+
+def _bar_start(value: datetime, timeframe: str) -> pd.Timestamp:
+    return pd.Timestamp(bar_starts(np.array([pd.Timestamp(value).to_datetime64()]), timeframe)[0])
+
+
+def _align_up(value: datetime, timeframe: str) -> pd.Timestamp:
+    """value 以降に始まる最初の足の開始時刻"""
+    start = _bar_start(value, timeframe)
+    return start if start == pd.Timestamp(value) else bar_end(start, timeframe)
+
+
+class PriceQueryPlanner:
+    """連続集計ビューと price_data を使い分ける価格データ読み込み"""
+
+    def __init__(self,
+                 db_manager,
+                 aggregates: Optional[List[Tuple[str, int]]] = None,
+                 availability_ttl: float = 300.0):
+        """
+        初期化
+
+        Args:
+            db_manager: DatabaseManager
+            aggregates: 使用する集計ビュー（省略時は CONTINUOUS_AGGREGATES）
+            availability_ttl: 集計ビューの有無を再確認するまでの秒数
+        """
+        self.db_manager = db_manager
+        self.aggregates = aggregates if aggregates is not None else CONTINUOUS_AGGREGATES
+        self.availability_ttl = availability_ttl
+        self._available: Optional[set] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _available_aggregates(self, conn) -> set:
+        """DBに存在する連続集計ビュー（availability_ttl 秒毎に問い合わせ）"""
+        if self._available is not None and time.monotonic() - self._checked_at < self.availability_ttl:
+            return self._available
+
+        names = [name for name, _ in self.aggregates]
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT view_name FROM timescaledb_information.continuous_aggregates
+                    WHERE view_name = ANY(%s)
+                """, (names,))
+                available = {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            conn.rollback()
+            logger.info(f"Continuous aggregates unavailable, using raw price_data: {e}")
+            available = set()
+
+        self._available = available
+        self._checked_at = time.monotonic()
+        return available
+
+    def invalidate(self) -> None:
+        """集計ビューの有無を次回の読み込みで再確認する"""
+        self._available = None
+
+    def choose_aggregate(self, conn, timeframe: str) -> Optional[Tuple[str, int]]:
+        """時間軸を割り切れる最も粗い集計ビュー（無ければNone）"""
+        period = RESAMPLE_SECONDS.get(timeframe)
+        available = self._available_aggregates(conn)
+        for name, bucket in self.aggregates:
+            if name not in available:
+                continue
+            # MN1は月初区切りのため日足以下の集計から組み立てられる
+            if timeframe == 'MN1' or (period is not None and period >= bucket and period % bucket == 0):
+                return name, bucket
+        return None
+
+    def load(self,
+             symbol: str,
+             timeframe: str,
+             start_date: datetime,
+             end_date: datetime,
+             include_partial: bool = False) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        期間内の足を取得
+
+        Args:
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            start_date: 開始時刻（この時刻以降に始まる足）
+            end_date: 終了時刻（この時刻までに始まる足）
+            include_partial: 形成中の最後の足を含めるか
+
+        Returns:
+            (time, open, high, low, close, tick_volume の DataFrame, 読み込み元毎の内訳)
+        """
+        with self.db_manager.get_connection() as conn:
+            aggregate = self.choose_aggregate(conn, timeframe)
+            df, sources = None, []
+            if aggregate is not None:
+                try:
+                    df, sources = self._load_with_aggregate(
+                        conn, aggregate, symbol, timeframe, start_date, end_date, include_partial
+                    )
+                except Exception as e:
+                    # ビューが削除された等。次回は有無を問い合わせ直す
+                    conn.rollback()
+                    self.invalidate()
+                    logger.warning(f"Continuous aggregate {aggregate[0]} failed, using raw price_data: {e}")
+            if df is None or df.empty:
+                # 集計ビューから足が得られない（M1が無く上位足のみ保存したDBなど）場合は従来の読み込み
+                df, raw_sources = self._load_raw(conn, symbol, timeframe, start_date, end_date, include_partial)
+                sources = sources + raw_sources
+
+        for source in sources:
+            self._record(source['source'], source['rows'])
+        logger.info(f"Loaded {len(df)} {symbol} {timeframe} bars from "
+                    + ", ".join(f"{s['source']}({s['rows']})" for s in sources))
+        return df, sources
+
+    def _load_raw(self, conn, symbol: str, timeframe: str,
+                  start_date: datetime, end_date: datetime,
+                  include_partial: bool) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """price_data を直接読む（保存されていない時間軸はM1から組み立てる）"""
+        df = self._read(conn, f"""
+            SELECT {', '.join(PRICE_COLUMNS)} FROM price_data
+            WHERE symbol = %s AND timeframe = %s AND time >= %s AND time <= %s
+            ORDER BY time
+        """, (symbol, timeframe, start_date, end_date))
+        if not df.empty or timeframe == 'M1':
+            return df, [{'source': RAW_SOURCE, 'timeframe': timeframe, 'rows': len(df)}]
+
+        m1 = self._read_m1(conn, symbol, _align_up(start_date, timeframe),
+                           bar_end(_bar_start(end_date, timeframe), timeframe))
+        df = resample_ohlcv(m1, timeframe, include_partial=include_partial)
+        return df, [{'source': RAW_SOURCE, 'timeframe': 'M1', 'rows': len(m1)}]
+
+    def _load_with_aggregate(self, conn, aggregate: Tuple[str, int], symbol: str, timeframe: str,
+                             start_date: datetime, end_date: datetime,
+                             include_partial: bool) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """集計済み範囲は集計ビュー、未集計の末尾は price_data のM1から組み立てる"""
+        name, bucket = aggregate
+        lo = _align_up(start_date, timeframe)
+        hi = bar_end(_bar_start(end_date, timeframe), timeframe)
+
+        # 集計済みの最終バケットの次から未集計（足の途中で分けないよう足の開始に揃える）
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT MAX(time_bucket) FROM {name} WHERE symbol = %s", (symbol,))
+            last_bucket = cursor.fetchone()[0]
+        cut = lo
+        if last_bucket is not None:
+            watermark = pd.Timestamp(last_bucket) + pd.Timedelta(seconds=bucket)
+            cut = min(max(_bar_start(watermark, timeframe), lo), hi)
+
+        sources = []
+        frames = []
+        if cut > lo:
+            materialized = self._read(conn, f"""
+                SELECT time_bucket AS time, open, high, low, close, tick_volume FROM {name}
+                WHERE symbol = %s AND time_bucket >= %s AND time_bucket < %s
+                ORDER BY time_bucket
+            """, (symbol, lo.to_pydatetime(), cut.to_pydatetime()))
+            frames.append(resample_ohlcv(materialized, timeframe))
+            sources.append({'source': name, 'timeframe': timeframe, 'rows': len(materialized),
+                            'start': lo.isoformat(), 'end': cut.isoformat()})
+
+        if hi > cut:
+            tail = self._read_m1(conn, symbol, cut, hi)
+            frames.append(resample_ohlcv(tail, timeframe, include_partial=include_partial))
+            sources.append({'source': RAW_SOURCE, 'timeframe': 'M1', 'rows': len(tail),
+                            'start': cut.isoformat(), 'end': hi.isoformat()})
+
+        frames = [frame for frame in frames if not frame.empty]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=PRICE_COLUMNS)
+        return df, sources
+
+    def _read_m1(self, conn, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """[start, end) のM1足"""
+        return self._read(conn, f"""
+            SELECT {', '.join(PRICE_COLUMNS)} FROM price_data
+            WHERE symbol = %s AND timeframe = 'M1' AND time >= %s AND time < %s
+            ORDER BY time
+        """, (symbol, pd.Timestamp(start).to_pydatetime(), pd.Timestamp(end).to_pydatetime()))
+
+    @staticmethod
+    def _read(conn, query: str, params: tuple) -> pd.DataFrame:
+        df = pd.read_sql_query(query, conn, params=params, parse_dates=['time'])
+        # TIMESTAMPTZ はタイムゾーン付きで返るため、MT5の足と同じタイムゾーン無しUTCに揃える
+        df['time'] = pd.to_datetime(df['time'], utc=True).dt.tz_localize(None)
+        for column in ('open', 'high', 'low', 'close'):
+            df[column] = df[column].astype(float)
+        return df
+
+    def _record(self, source: str, rows: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(source, {'queries': 0, 'rows': 0})
+            stats['queries'] += 1
+            stats['rows'] += rows
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """読み込み元毎のクエリ数・行数"""
+        with self._lock:
+            sources = {source: dict(stats) for source, stats in self._stats.items()}
+        return {
+            'aggregates': sorted(self._available) if self._available is not None else None,
+            'sources': sources
+        }
@@ -0,0 +1,297 @@
+"""
+列指向のローカル価格ストア
+
+バックテスト・最適化・学習の度に price_data を pd.read_sql_query で読むと、
+DECIMAL列がPythonオブジェクト経由でfloatに変換され、期間が長いほど遅くなる。
+通貨ペア・時間軸・月毎のパーティションに列毎の .npy ファイルとして保存し、
+読み込みはメモリマップ＋時刻インデックスの二分探索で期間を切り出す。
+PostgreSQLから一度だけ取り込み、以降は最終足より新しい足だけを追記する。
+
+配置: <data_dir>/price_store/<symbol>/<timeframe>/<YYYY-MM>/<column>.npy
+"""
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.core.path_manager import get_path_manager
+
+logger = logging.getLogger(__name__)
+
+# 保存する列と型（timeはUTCナイーブのdatetime64[ns]をint64で保存）
+COLUMN_DTYPES = {
+    'time': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'tick_volume': np.int64,
+    'spread': np.int32,
+    'real_volume': np.int64,
+}
+
+PRICE_COLUMNS = [column for column in COLUMN_DTYPES if column != 'time']
+
+TimeLike = Union[datetime, pd.Timestamp, np.datetime64, str]
+
+
+def _to_ns(value: TimeLike) -> int:
+    """時刻をエポックナノ秒に変換"""
+    return int(pd.Timestamp(value).value)
+
+
+class PriceStore:
+    """月パーティションの列指向価格ストア"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        """
+        初期化
+
+        Args:
+            root: 保存先ディレクトリ（省略時は data/price_store）
+        """
+        self.root = Path(root) if root is not None else get_path_manager().get_data_dir() / 'price_store'
+        self._lock = threading.RLock()
+        self._stats = {
+            'reads': 0,
+            'rows_read': 0,
+            'partitions_read': 0,
+            'rows_written': 0,
+            'partitions_written': 0,
+            'syncs': 0,
+            'sync_errors': 0
+        }
+
+    def _series_dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol / timeframe
+
+    def partitions(self, symbol: str, timeframe: str) -> List[str]:
+        """保存済みの月パーティション（YYYY-MM、昇順）"""
+        series_dir = self._series_dir(symbol, timeframe)
+        if not series_dir.is_dir():
+            return []
+        return sorted(p.name for p in series_dir.iterdir()
+                      if p.is_dir() and len(p.name) == 7 and p.name[4] == '-')
+
+    def _open_partition(self, path: Path, columns: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        """パーティションをメモリマップで開く（ファイルが揃っていなければNone）"""
+        try:
+            arrays = {column: np.load(path / f'{column}.npy', mmap_mode='r')
+                      for column in ['time'] + columns}
+        except FileNotFoundError:
+            return None
+        if len({len(values) for values in arrays.values()}) != 1:
+            logger.warning(f"Inconsistent column lengths in {path}, skipping partition")
+            return None
+        return arrays
+
+    def read_arrays(self,
+                    symbol: str,
+                    timeframe: str,
+                    start: Optional[TimeLike] = None,
+                    end: Optional[TimeLike] = None,
+                    columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        期間内の足を列毎の配列で取得
+
+        1パーティションに収まる期間はメモリマップのスライス（コピー無し）を返す。
+
+        Args:
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            start: 開始時刻（含む）
+            end: 終了時刻（含む）
+            columns: 取得する列（省略時は全列、timeは常に含む）
+
+        Returns:
+            列名 → 配列（timeはdatetime64[ns]）
+        """
+        columns = [column for column in (columns or PRICE_COLUMNS) if column != 'time']
+        start_ns = _to_ns(start) if start is not None else None
+        end_ns = _to_ns(end) if end is not None else None
+        start_month = pd.Timestamp(start).strftime('%Y-%m') if start is not None else None
+        end_month = pd.Timestamp(end).strftime('%Y-%m') if end is not None else None
+
+        pieces = []
+        with self._lock:
+            for month in self.partitions(symbol, timeframe):
+                if (start_month and month < start_month) or (end_month and month > end_month):
+                    continue
+                arrays = self._open_partition(self._series_dir(symbol, timeframe) / month, columns)
+                if arrays is None:
+                    continue
+
+                # 時刻インデックスの二分探索で期間を切り出す
+                times = arrays['time']
+                lo = int(np.searchsorted(times, start_ns, side='left')) if start_ns is not None else 0
+                hi = int(np.searchsorted(times, end_ns, side='right')) if end_ns is not None else len(times)
+                if hi > lo:
+                    pieces.append({column: values[lo:hi] for column, values in arrays.items()})
+
+        self._stats['reads'] += 1
+        self._stats['partitions_read'] += len(pieces)
+
+        if not pieces:
+            result = {column: np.empty(0, dtype=COLUMN_DTYPES[column]) for column in ['time'] + columns}
+        elif len(pieces) == 1:
+            result = pieces[0]
+        else:
+            result = {column: np.concatenate([piece[column] for piece in pieces])
+                      for column in ['time'] + columns}
+
+        result['time'] = result['time'].view('datetime64[ns]')
+        self._stats['rows_read'] += len(result['time'])
+        return result
+
+    def read(self,
+             symbol: str,
+             timeframe: str,
+             start: Optional[TimeLike] = None,
+             end: Optional[TimeLike] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """期間内の足をDataFrame（time列付き）で取得"""
+        arrays = self.read_arrays(symbol, timeframe, start, end, columns)
+        return pd.DataFrame(arrays)
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """保存済みの最終足の時刻"""
+        with self._lock:
+            for month in reversed(self.partitions(symbol, timeframe)):
+                arrays = self._open_partition(self._series_dir(symbol, timeframe) / month, [])
+                if arrays is not None and len(arrays['time']):
+                    return pd.Timestamp(int(arrays['time'][-1]))
+        return None
+
+    def write(self, df: pd.DataFrame, symbol: str, timeframe: str) -> int:
+        """
+        足を追加（同じ時刻の足は上書き）
+
+        対象月のパーティションを作り直し、ディレクトリの入れ替えで反映する。
+
+        Args:
+            df: time列と価格列を持つDataFrame
+            symbol: 通貨ペア
+            timeframe: 時間軸
+
+        Returns:
+            書き込んだ行数
+        """
+        if df is None or df.empty:
+            return 0
+
+        frame = self._normalize(df)
+        months = frame['time'].to_numpy().view('datetime64[ns]').astype('datetime64[M]').astype(str)
+
+        with self._lock:
+            series_dir = self._series_dir(symbol, timeframe)
+            series_dir.mkdir(parents=True, exist_ok=True)
+
+            for month, rows in frame.groupby(months, sort=True):
+                path = series_dir / month
+                existing = self._open_partition(path, PRICE_COLUMNS)
+                if existing is not None:
+                    current = pd.DataFrame({column: np.array(values) for column, values in existing.items()})
+                    rows = pd.concat([current, rows], ignore_index=True)
+                rows = rows.drop_duplicates('time', keep='last').sort_values('time')
+                self._replace_partition(path, rows)
+                self._stats['partitions_written'] += 1
+
+        self._stats['rows_written'] += len(frame)
+        return len(frame)
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """保存形式（COLUMN_DTYPESの列・型、timeはint64）に変換"""
+        frame = df.reset_index() if 'time' not in df.columns else df
+        if 'tick_volume' not in frame.columns and 'volume' in frame.columns:
+            frame = frame.rename(columns={'volume': 'tick_volume'})
+
+        normalized = {'time': pd.to_datetime(frame['time']).to_numpy(dtype='datetime64[ns]').view(np.int64)}
+        for column in PRICE_COLUMNS:
+            dtype = COLUMN_DTYPES[column]
+            normalized[column] = (frame[column].to_numpy(dtype=dtype) if column in frame.columns
+                                  else np.zeros(len(frame), dtype=dtype))
+        return pd.DataFrame(normalized)
+
+    def _replace_partition(self, path: Path, rows: pd.DataFrame) -> None:
+        """一時ディレクトリに書き出してから差し替え（読み込み中のメモリマップは旧ファイルを保持）"""
+        tmp = path.with_name(f'.{path.name}.tmp-{os.getpid()}')
+        old = path.with_name(f'.{path.name}.old-{os.getpid()}')
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        for column, dtype in COLUMN_DTYPES.items():
+            np.save(tmp / f'{column}.npy', np.ascontiguousarray(rows[column].to_numpy(dtype=dtype)))
+
+        if path.exists():
+            path.rename(old)
+        tmp.rename(path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def sync_from_database(self, db_manager, symbol: str, timeframe: str,
+                           chunk_rows: int = 200000) -> int:
+        """
+        price_data から最終足より新しい足を取り込む（初回は全件）
+
+        Args:
+            db_manager: DatabaseManager
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            chunk_rows: 1回に読み込む行数
+
+        Returns:
+            取り込んだ行数
+        """
+        last = self.last_time(symbol, timeframe)
+        query = """
+            SELECT time, open, high, low, close, tick_volume, spread, real_volume
+            FROM price_data
+            WHERE symbol = %s AND timeframe = %s AND time > %s
+            ORDER BY time
+        """
+        since = last.to_pydatetime() if last is not None else datetime(1970, 1, 1)
+
+        rows = 0
+        try:
+            with db_manager.get_connection() as conn:
+                for chunk in pd.read_sql_query(query, conn, params=(symbol, timeframe, since),
+                                               parse_dates=['time'], chunksize=chunk_rows,
+                                               coerce_float=True):
+                    rows += self.write(chunk, symbol, timeframe)
+        except Exception as e:
+            self._stats['sync_errors'] += 1
+            logger.error(f"Error syncing price store for {symbol} {timeframe}: {e}")
+            return rows
+
+        self._stats['syncs'] += 1
+        if rows:
+            logger.info(f"Price store synced {rows} rows for {symbol} {timeframe}")
+        return rows
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """読み書き統計"""
+        return {'root': str(self.root), **self._stats}
+
+
+# グローバル価格ストア（初回使用時に作成）
+_price_store: Optional[PriceStore] = None
+_price_store_lock = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """共有PriceStore取得"""
+    global _price_store
+    with _price_store_lock:
+        if _price_store is None:
+            _price_store = PriceStore()
+        return _price_store
+
+
+def get_price_store_statistics() -> Optional[Dict[str, Any]]:
+    """共有PriceStoreの統計（未作成時はNone）"""
+    return _price_store.get_statistics() if _price_store is not None else None
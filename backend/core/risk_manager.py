@@ -4,42 +4,41 @@
 import pandas as pd
 import numpy as np
 import logging
+import time
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import json
 
 from core.database import DatabaseManager
 from core.mt5_client import MT5Client
+from core.risk_state import DEFAULT_RISK_SETTINGS, RiskState, LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
 class RiskManager:
     """リスク管理クラス"""
     
-    def __init__(self, db_manager: DatabaseManager, mt5_client: MT5Client):
+    def __init__(self, db_manager: DatabaseManager, mt5_client: MT5Client,
+                 use_risk_state: bool = True, market_data=None):
         self.db_manager = db_manager
         self.mt5_client = mt5_client
+        # 口座情報・ポジションの取得元（MarketDataHub指定時はキャッシュから取得）
+        self.market_data = market_data
         self.settings = self._load_risk_settings()
         self.emergency_stop_triggered = False
         
+        # インメモリリスク状態（DB集計は定期補正でのみ参照）
+        self.use_risk_state = use_risk_state
+        self.risk_state = RiskState()
+        self.check_latency = LatencyHistogram()
+        self.reconcile_interval = 300  # 秒
+        self.account_max_age = 180  # 秒
+        self._last_violation: Optional[str] = None
+        
     def _load_risk_settings(self) -> Dict[str, Any]:
         """リスク設定を読み込み"""
         # デフォルト値を設定
-        default_settings = {
-            'max_risk_per_trade': 0.02,  # 2%
-            'max_drawdown': 0.20,        # 20%
-            'use_nanpin': True,
-            'nanpin_max_count': 3,
-            'nanpin_interval_pips': 10,
-            'max_positions': 5,
-            'max_daily_trades': 20,
-            'stop_loss_pips': 50,
-            'take_profit_pips': 100,
-            'trailing_stop_pips': 30,
-            'min_confidence_score': 0.7,
-            'max_consecutive_losses': 5,
-            'daily_loss_limit': 0.05    # 5%
-        }
+        default_settings = dict(DEFAULT_RISK_SETTINGS)
         
         try:
             # データベースから設定を読み込む
@@ -86,12 +85,52 @@ class RiskManager:
         Returns:
             取引可能かどうか
         """
+        started = time.perf_counter()
         try:
             # 緊急停止チェック
             if self.emergency_stop_triggered:
                 logger.warning("Emergency stop is active")
                 return False
             
+            if self.use_risk_state:
+                return self._check_risk_state()
+            return self._check_risk_limits_db()
+        finally:
+            self.check_latency.observe(time.perf_counter() - started)
+    
+    def _check_risk_state(self) -> bool:
+        """インメモリ状態によるリスク制限チェック"""
+        try:
+            # 未初期化・口座情報が古い場合のみ同期取得
+            if not self.risk_state.seeded and not self.reconcile_risk_state():
+                return self._check_risk_limits_db()
+            if not self.risk_state.account_is_fresh(self.account_max_age):
+                self.refresh_account_state()
+            
+            violation = self.risk_state.evaluate(self.settings)
+            if violation is None:
+                self._last_violation = None
+                return True
+            
+            logger.warning(violation['description'])
+            # 同じ違反が続く間はリスクイベントを重複記録しない
+            if violation['event_type'] != self._last_violation:
+                self._last_violation = violation['event_type']
+                self._log_risk_event(
+                    violation['event_type'],
+                    violation['trigger_value'],
+                    violation['threshold_value'],
+                    violation['description']
+                )
+            return False
+            
+        except Exception as e:
+            logger.error(f"Error checking risk state: {e}")
+            return False
+    
+    def _check_risk_limits_db(self) -> bool:
+        """DB・MT5参照によるリスク制限チェック"""
+        try:
             # 最大ドローダウンチェック
             if not self._check_max_drawdown():
                 logger.warning("Maximum drawdown exceeded")
@@ -382,6 +421,92 @@ class RiskManager:
             logger.error(f"Error calculating SL/TP: {e}")
             return None, None
     
+    def reconcile_due(self) -> bool:
+        """インメモリ状態のDB補正が必要か"""
+        return self.risk_state.reconcile_due(self.reconcile_interval)
+    
+    def reconcile_risk_state(self) -> bool:
+        """
+        DB集計でインメモリ状態を初期化・補正
+        
+        Returns:
+            補正成功かどうか
+        """
+        try:
+            today = datetime.now().date()
+            max_losses = self.settings['max_consecutive_losses']
+            
+            with self.db_manager.get_connection() as conn:
+                query = """
+                    SELECT
+                        (SELECT COUNT(*) FROM trades WHERE DATE(entry_time) = %s) as trade_count,
+                        (SELECT COALESCE(SUM(profit_loss), 0) FROM trades
+                         WHERE DATE(entry_time) = %s AND is_closed = true) as daily_pnl
+                """
+                totals = pd.read_sql_query(query, conn, params=(today, today))
+                
+                query = """
+                    SELECT profit_loss
+                    FROM trades 
+                    WHERE is_closed = true
+                    ORDER BY exit_time DESC
+                    LIMIT %s
+                """
+                recent = pd.read_sql_query(query, conn, params=(max_losses,))
+            
+            # 直近から数えた連続損失数
+            losses = (recent['profit_loss'] < 0).to_numpy()
+            consecutive_losses = int(losses.argmin()) if not losses.all() else len(losses)
+            
+            drift = self.risk_state.load({
+                'daily_trade_count': int(totals.iloc[0]['trade_count']),
+                'daily_pnl': float(totals.iloc[0]['daily_pnl']),
+                'consecutive_losses': consecutive_losses,
+                'max_equity': self._get_max_equity_from_db()
+            })
+            if drift:
+                logger.warning(f"Risk state drift corrected from database: {drift}")
+            
+            self.refresh_account_state()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error reconciling risk state: {e}")
+            return False
+    
+    def refresh_account_state(self) -> bool:
+        """MT5の口座情報・ポジション数をインメモリ状態に反映"""
+        try:
+            source = self.market_data or self.mt5_client
+            account_info = source.get_account_info()
+            if account_info is None:
+                return False
+            
+            positions = source.get_positions()
+            self.risk_state.update_account(account_info, len(positions))
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error refreshing account state: {e}")
+            return False
+    
+    def on_trade_opened(self, entry_time: Optional[datetime] = None):
+        """取引オープンをインメモリ状態に反映"""
+        self.risk_state.on_trade_opened(entry_time)
+    
+    def on_trade_closed(self, profit_loss: float, entry_time: Optional[datetime] = None):
+        """取引クローズをインメモリ状態に反映"""
+        self.risk_state.on_trade_closed(profit_loss, entry_time)
+    
+    def get_risk_state_statistics(self) -> Dict[str, Any]:
+        """インメモリリスク状態・チェックレイテンシ統計"""
+        return {
+            'enabled': self.use_risk_state,
+            'reconcile_interval': self.reconcile_interval,
+            'state': self.risk_state.snapshot(),
+            'check_latency': self.check_latency.get_statistics()
+        }
+    
     def should_emergency_stop(self) -> bool:
         """緊急停止判定"""
         return self.emergency_stop_triggered
@@ -488,7 +613,8 @@ class RiskManager:
                 "current_positions": len(positions),
                 "max_positions": self.settings['max_positions'],
                 "daily_pnl": daily_pnl,
-                "risk_settings": self.settings
+                "risk_settings": self.settings,
+                "risk_state": self.get_risk_state_statistics()
             }
             
         except Exception as e:
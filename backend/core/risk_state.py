@@ -0,0 +1,254 @@
+"""
+インメモリリスク状態
+
+取引ループ毎の check_risk_limits でDB集計クエリ・MT5呼び出しを繰り返さないよう、
+日次取引数・連続損失数・日次損益・最大エクイティを取引イベントで更新して保持する。
+起動時にDBから初期化し、定期的にDB集計（正）と突き合わせて補正する。
+"""
+import bisect
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# リスク設定の既定値（system_settings に無いキーはこの値を使う）
+DEFAULT_RISK_SETTINGS = {
+    'max_risk_per_trade': 0.02,  # 2%
+    'max_drawdown': 0.20,        # 20%
+    'use_nanpin': True,
+    'nanpin_max_count': 3,
+    'nanpin_interval_pips': 10,
+    'max_positions': 5,
+    'max_daily_trades': 20,
+    'stop_loss_pips': 50,
+    'take_profit_pips': 100,
+    'trailing_stop_pips': 30,
+    'min_confidence_score': 0.7,
+    'max_consecutive_losses': 5,
+    'daily_loss_limit': 0.05    # 5%
+}
+
+
+class LatencyHistogram:
+    """レイテンシヒストグラム（マイクロ秒バケット）"""
+
+    DEFAULT_BUCKETS_US = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+    def __init__(self, buckets_us: Sequence[float] = DEFAULT_BUCKETS_US):
+        """
+        初期化
+
+        Args:
+            buckets_us: バケット上限（マイクロ秒、昇順）
+        """
+        self.buckets_us = tuple(buckets_us)
+        self.counts = [0] * (len(self.buckets_us) + 1)
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """計測値を記録"""
+        value_us = seconds * 1e6
+        index = bisect.bisect_left(self.buckets_us, value_us)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_us += value_us
+            self.max_us = max(self.max_us, value_us)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """ヒストグラム統計取得"""
+        with self._lock:
+            counts = list(self.counts)
+            count, total_us, max_us = self.count, self.total_us, self.max_us
+
+        buckets = {f"le_{bound:g}us": n for bound, n in zip(self.buckets_us, counts)}
+        buckets[f"gt_{self.buckets_us[-1]:g}us"] = counts[-1]
+        return {
+            'count': count,
+            'avg_us': round(total_us / count, 3) if count else 0.0,
+            'max_us': round(max_us, 3),
+            'buckets': buckets
+        }
+
+
+class RiskState:
+    """取引イベント駆動のリスク状態"""
+
+    def __init__(self):
+        self.trading_date: date = datetime.now().date()
+        self.daily_trade_count = 0
+        self.daily_pnl = 0.0
+        self.consecutive_losses = 0
+        self.open_positions = 0
+        self.equity: Optional[float] = None
+        self.balance: Optional[float] = None
+        self.max_equity: Optional[float] = None
+
+        self.seeded = False
+        self.last_reconciled_at: Optional[float] = None
+        self.account_updated_at: Optional[float] = None
+        self.reconcile_count = 0
+        self.drift_count = 0
+        self._lock = threading.Lock()
+
+    def load(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        DB集計値で状態を置き換え（初期化・定期補正）
+
+        Args:
+            snapshot: daily_trade_count / daily_pnl / consecutive_losses / max_equity
+
+        Returns:
+            補正前後で値が変わった項目 {項目: (メモリ値, DB値)}
+        """
+        with self._lock:
+            self._roll_day(datetime.now().date())
+            drift = {}
+            for key in ('daily_trade_count', 'daily_pnl', 'consecutive_losses'):
+                current, loaded = getattr(self, key), snapshot[key]
+                if self.seeded and abs(current - loaded) > 1e-9:
+                    drift[key] = (current, loaded)
+                setattr(self, key, loaded)
+
+            # 最大エクイティはDB値と観測済みエクイティの高い方
+            candidates = [v for v in (snapshot.get('max_equity'), self.equity) if v is not None]
+            self.max_equity = max(candidates) if candidates else None
+
+            self.seeded = True
+            self.last_reconciled_at = time.monotonic()
+            self.reconcile_count += 1
+            if drift:
+                self.drift_count += 1
+            return drift
+
+    def on_trade_opened(self, entry_time: Optional[datetime] = None) -> None:
+        """取引オープンイベント"""
+        with self._lock:
+            self._roll_day(datetime.now().date())
+            if entry_time is None or entry_time.date() == self.trading_date:
+                self.daily_trade_count += 1
+            self.open_positions += 1
+
+    def on_trade_closed(self, profit_loss: float, entry_time: Optional[datetime] = None) -> None:
+        """取引クローズイベント"""
+        with self._lock:
+            self._roll_day(datetime.now().date())
+            # 日次損益はDB集計と同じくエントリー日基準
+            if entry_time is None or entry_time.date() == self.trading_date:
+                self.daily_pnl += profit_loss
+            self.consecutive_losses = self.consecutive_losses + 1 if profit_loss < 0 else 0
+            self.open_positions = max(0, self.open_positions - 1)
+
+    def update_account(self, account_info: Dict[str, Any], positions_count: Optional[int] = None) -> None:
+        """口座情報（エクイティ・残高・ポジション数）を更新"""
+        with self._lock:
+            self.equity = float(account_info['equity'])
+            self.balance = float(account_info['balance'])
+            if self.max_equity is None or self.equity > self.max_equity:
+                self.max_equity = self.equity
+            if positions_count is not None:
+                self.open_positions = positions_count
+            self.account_updated_at = time.monotonic()
+
+    def account_is_fresh(self, max_age: float) -> bool:
+        """口座情報が指定秒数以内に更新されているか"""
+        updated_at = self.account_updated_at
+        return updated_at is not None and time.monotonic() - updated_at <= max_age
+
+    def reconcile_due(self, interval: float) -> bool:
+        """DB補正が必要か"""
+        reconciled_at = self.last_reconciled_at
+        return (not self.seeded or reconciled_at is None
+                or time.monotonic() - reconciled_at >= interval
+                or datetime.now().date() != self.trading_date)
+
+    def evaluate(self, settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        リスク制限判定（check_risk_limitsと同じ順序）
+
+        Args:
+            settings: リスク設定
+
+        Returns:
+            違反内容（違反なしの場合はNone）
+        """
+        with self._lock:
+            self._roll_day(datetime.now().date())
+            equity, balance, max_equity = self.equity, self.balance, self.max_equity
+
+            if equity is None:
+                return self._violation('account_unavailable', 0, 0, 'Account info unavailable')
+
+            if max_equity and max_equity > 0:
+                drawdown = (max_equity - equity) / max_equity
+                if drawdown > settings['max_drawdown']:
+                    return self._violation('drawdown_limit', drawdown, settings['max_drawdown'],
+                                           'Maximum drawdown exceeded')
+
+            if self.open_positions >= settings['max_positions']:
+                return self._violation('position_limit', self.open_positions, settings['max_positions'],
+                                       'Maximum positions exceeded')
+
+            if self.daily_trade_count >= settings['max_daily_trades']:
+                return self._violation('daily_trade_limit', self.daily_trade_count,
+                                       settings['max_daily_trades'], 'Daily trade limit exceeded')
+
+            max_losses = settings['max_consecutive_losses']
+            if self.consecutive_losses >= max_losses:
+                return self._violation('consecutive_losses', max_losses, max_losses,
+                                       'Maximum consecutive losses reached')
+
+            if self.daily_pnl < 0 and balance:
+                loss_percentage = abs(self.daily_pnl) / balance
+                if loss_percentage > settings['daily_loss_limit']:
+                    return self._violation('daily_loss_limit', loss_percentage,
+                                           settings['daily_loss_limit'], 'Daily loss limit exceeded')
+
+            return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """現在の状態"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'seeded': self.seeded,
+                'trading_date': self.trading_date.isoformat(),
+                'daily_trade_count': self.daily_trade_count,
+                'daily_pnl': self.daily_pnl,
+                'consecutive_losses': self.consecutive_losses,
+                'open_positions': self.open_positions,
+                'equity': self.equity,
+                'balance': self.balance,
+                'max_equity': self.max_equity,
+                'seconds_since_reconcile': (
+                    round(now - self.last_reconciled_at, 3) if self.last_reconciled_at is not None else None
+                ),
+                'seconds_since_account_update': (
+                    round(now - self.account_updated_at, 3) if self.account_updated_at is not None else None
+                ),
+                'reconcile_count': self.reconcile_count,
+                'drift_count': self.drift_count
+            }
+
+    def _roll_day(self, today: date) -> None:
+        """日付が変わったら日次カウンタをリセット（ロック取得済みで呼ぶ）"""
+        if today != self.trading_date:
+            self.trading_date = today
+            self.daily_trade_count = 0
+            self.daily_pnl = 0.0
+
+    @staticmethod
+    def _violation(event_type: str, trigger_value: float,
+                   threshold_value: float, description: str) -> Dict[str, Any]:
+        return {
+            'event_type': event_type,
+            'trigger_value': trigger_value,
+            'threshold_value': threshold_value,
+            'description': description
+        }
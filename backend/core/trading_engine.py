@@ -5,14 +5,21 @@ import pandas as pd
 import numpy as np
 import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import json
 
 from backend.core.mt5_client import MT5Client
 from backend.core.database import DatabaseManager
+from backend.core.async_database import get_async_db
+from backend.core.market_data_hub import get_market_data_hub
+from backend.core.bar_scheduler import get_bar_scheduler
+from backend.core.mt5_worker import AsyncMT5Client, PRIORITY_ACCOUNT, PRIORITY_ORDER
 from backend.core.risk_manager import RiskManager
 from backend.ml.features import FeatureEngineering
+from backend.ml.streaming_features import StreamingFeatureEngine
 from backend.ml.model_manager import ModelManager
 from backend.ml.models.lightgbm_model import LightGBMPredictor
 
@@ -125,32 +132,74 @@ class NanpinManager:
             logger.error(f"Error executing nanpin: {e}")
             return False
 
+@dataclass
+class StrategySlot:
+    """戦略スロット（通貨ペア・時間軸・モデルの組と評価状況）"""
+    symbol: str
+    timeframe: str
+    model: Any
+    subscription_id: Optional[int] = None
+    enabled: bool = True
+    pending_event: Optional[Dict[str, Any]] = None
+    evaluations: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    last_signal: Optional[str] = None
+    last_confidence: Optional[float] = None
+    last_latency_ms: Optional[float] = None
+    last_bar_latency_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+    last_run: Optional[datetime] = None
+    
+    def get_status(self) -> Dict[str, Any]:
+        """スロット状態"""
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'enabled': self.enabled,
+            'model_loaded': self.model is not None,
+            'evaluations': self.evaluations,
+            'errors': self.errors,
+            'last_signal': self.last_signal,
+            'last_confidence': self.last_confidence,
+            'last_latency_ms': self.last_latency_ms,
+            'last_bar_latency_seconds': self.last_bar_latency_seconds,
+            'last_error': self.last_error,
+            'last_run': self.last_run.isoformat() if self.last_run else None
+        }
+
 class TradingEngine:
-    """自動売買エンジン"""
+    """自動売買エンジン（複数通貨ペアのスロットを1プロセスで運用）"""
     
     def __init__(self, db_manager: DatabaseManager, mt5_client: MT5Client):
         self.db_manager = db_manager
         self.mt5_client = mt5_client
-        self.risk_manager = RiskManager(db_manager, mt5_client)
+        self.mt5_io = AsyncMT5Client(mt5_client)  # MT5呼び出しは専用スレッドで実行
+        self.market_data = get_market_data_hub(mt5_client)
+        self.risk_manager = RiskManager(db_manager, mt5_client, market_data=self.market_data)
         self.model_manager = ModelManager(db_manager)
         self.feature_engine = FeatureEngineering()
+        self.streaming_features = StreamingFeatureEngine()
         self.nanpin_manager = NanpinManager(mt5_client)
         
         # 取引状態
         self.is_active = False
-        self.symbol = None
-        self.timeframe = None
-        self.model = None
+        self.slots: Dict[str, StrategySlot] = {}  # {symbol: slot} ※ポジションは通貨ペア単位
         self.current_positions = {}  # {symbol: position_info}
         self.magic_number = 12345  # マジックナンバー
+        self._batch: Optional[asyncio.Task] = None
         
         # 設定
         self.check_interval = 60  # 秒
         self.min_confidence = 0.7
+        self.use_streaming_features = True  # 最新足のみインクリメンタルに特徴量更新
+        self.order_tick_max_age = 0.25  # 発注に使うティックの最大経過秒数
+        self.use_bar_scheduler = True  # 足確定時のみシグナル判定（ポジション管理はcheck_interval毎）
+        self.max_slot_errors = 5  # 連続エラーでスロットを停止する回数
         
     async def start_trading(self, symbol: str, timeframe: str) -> bool:
         """
-        自動売買開始
+        自動売買開始（稼働中の場合はスロットを追加）
         
         Args:
             symbol: 通貨ペア
@@ -160,66 +209,92 @@ class TradingEngine:
             開始成功かどうか
         """
         try:
-            if self.is_active:
-                logger.warning("Trading already active")
+            if symbol in self.slots:
+                logger.warning(f"Trading already active for {symbol}")
                 return False
             
             # MT5接続確認
-            if not self.mt5_client.ensure_connection():
+            if not await self.mt5_io.ensure_connection():
                 logger.error("MT5 connection failed")
                 return False
             
             # モデル読み込み
-            self.model = self.model_manager.load_latest_model(symbol, timeframe)
-            if self.model is None:
+            model = self.model_manager.load_latest_model(symbol, timeframe)
+            if model is None:
                 logger.error(f"No trained model found for {symbol} {timeframe}")
                 return False
             
-            self.symbol = symbol
-            self.timeframe = timeframe
-            self.is_active = True
-            
-            logger.info(f"Trading started for {symbol} {timeframe}")
+            slot = StrategySlot(symbol=symbol, timeframe=timeframe, model=model)
+            self.slots[symbol] = slot
+            self.streaming_features.reset(symbol, timeframe)
             
             # 既存ポジションを読み込み
-            await self._load_existing_positions()
+            await self._load_existing_positions(symbol)
             
-            # メインループ開始
-            asyncio.create_task(self._trading_loop())
+            if not self.is_active:
+                self.is_active = True
+                
+                # リスク状態をDBから初期化
+                await get_async_db().run(self.risk_manager.reconcile_risk_state)
+                
+                # メインループ開始（全スロット共通）
+                if self.use_bar_scheduler:
+                    asyncio.create_task(self._position_loop())
+                else:
+                    asyncio.create_task(self._trading_loop())
+            
+            if self.use_bar_scheduler:
+                scheduler = get_bar_scheduler()
+                slot.subscription_id = scheduler.subscribe(
+                    symbol, timeframe, self._on_bar_close, fire_immediately=True
+                )
+                scheduler.start()
             
+            logger.info(f"Trading started for {symbol} {timeframe} ({len(self.slots)} slots)")
             return True
             
         except Exception as e:
             logger.error(f"Error starting trading: {e}")
+            self.slots.pop(symbol, None)
             return False
     
-    async def stop_trading(self, close_positions: bool = False) -> bool:
+    async def stop_trading(self, close_positions: bool = False, symbol: Optional[str] = None) -> bool:
         """
         自動売買停止
         
         Args:
             close_positions: ポジションをクローズするかどうか
+            symbol: 停止する通貨ペア（指定しない場合は全スロット）
             
         Returns:
             停止成功かどうか
         """
         try:
-            self.is_active = False
+            for slot_symbol in ([symbol] if symbol else list(self.slots)):
+                slot = self.slots.pop(slot_symbol, None)
+                if slot is not None and slot.subscription_id is not None:
+                    get_bar_scheduler().unsubscribe(slot.subscription_id)
+            
+            if not self.slots:
+                self.is_active = False
             
             if close_positions:
-                await self._close_all_positions()
+                if symbol:
+                    await self._close_position(symbol)
+                else:
+                    await self._close_all_positions()
             
-            logger.info("Trading stopped")
+            logger.info(f"Trading stopped for {symbol}" if symbol else "Trading stopped")
             return True
             
         except Exception as e:
             logger.error(f"Error stopping trading: {e}")
             return False
     
-    async def _load_existing_positions(self):
+    async def _load_existing_positions(self, symbol: str):
         """既存ポジションの読み込み"""
         try:
-            positions = self.mt5_client.get_positions(self.symbol)
+            positions = await self.mt5_io.get_positions(symbol)
             
             for pos in positions:
                 if pos['magic'] == self.magic_number:
@@ -234,43 +309,22 @@ class TradingEngine:
                         'nanpin_count': 0,  # 既存ポジションのナンピン回数は0とする
                         'magic': pos['magic']
                     }
-                    self.current_positions[self.symbol] = position_info
+                    self.current_positions[symbol] = position_info
                     logger.info(f"Loaded existing position: {pos['ticket']}")
                     
         except Exception as e:
             logger.error(f"Error loading existing positions: {e}")
     
     async def _trading_loop(self):
-        """メイントレーディングループ"""
+        """メイントレーディングループ（一定間隔で全スロット評価、use_bar_scheduler=False の場合）"""
         while self.is_active:
             try:
-                # MT5接続確認
-                if not self.mt5_client.ensure_connection():
-                    logger.error("MT5 connection lost")
-                    await asyncio.sleep(30)
-                    continue
-                
-                # 最新データ取得
-                latest_data = await self._get_latest_data()
-                if latest_data is None or latest_data.empty:
-                    logger.warning("No data available")
-                    await asyncio.sleep(self.check_interval)
-                    continue
-                
-                # シグナル生成
-                signal, confidence = await self._generate_signal(latest_data)
-                
-                # リスクチェック
-                if not self.risk_manager.check_risk_limits():
-                    logger.warning("Risk limits exceeded, skipping trade")
-                    await asyncio.sleep(self.check_interval)
-                    continue
-                
-                # トレード実行
-                await self._execute_trade_signal(signal, confidence)
-                
-                # ポジション管理
-                await self._manage_positions()
+                if await self._evaluate_slots(list(self.slots.values())):
+                    # ポジション管理
+                    await self._manage_positions()
+                    
+                    # 次回リスクチェック用に口座情報を更新
+                    await self.mt5_io.run(self.risk_manager.refresh_account_state, priority=PRIORITY_ACCOUNT)
                 
                 # 次の実行まで待機
                 await asyncio.sleep(self.check_interval)
@@ -281,14 +335,147 @@ class TradingEngine:
         
         logger.info("Trading loop stopped")
     
-    async def _get_latest_data(self) -> Optional[pd.DataFrame]:
-        """最新データ取得"""
+    async def _on_bar_close(self, event: Dict[str, Any]):
+        """足確定時の取引判断（同時に確定したスロットと同じバッチで評価）"""
+        slot = self.slots.get(event['symbol'])
+        if not self.is_active or slot is None or slot.timeframe != event['timeframe']:
+            return
+        
+        slot.pending_event = event
+        if self._batch is None or self._batch.done():
+            self._batch = asyncio.create_task(self._run_pending_batch())
+        await asyncio.shield(self._batch)
+    
+    async def _run_pending_batch(self):
+        """足確定待ちのスロットをまとめて評価"""
+        # 同じ確認で足確定した他スロットのコールバックが合流するのを待つ
+        await asyncio.sleep(0)
+        
+        ready = []
+        for slot in self.slots.values():
+            if slot.pending_event is not None:
+                slot.last_bar_latency_seconds = slot.pending_event['latency_seconds']
+                slot.pending_event = None
+                ready.append(slot)
+        self._batch = None  # 以降の足確定は次のバッチ
+        
+        try:
+            await self._evaluate_slots(ready)
+        except Exception as e:
+            logger.error(f"Bar close batch error: {e}")
+    
+    async def _position_loop(self):
+        """ポジション管理ループ（足確定スケジューラ使用時）"""
+        while self.is_active:
+            try:
+                if await self.mt5_io.ensure_connection():
+                    await self._manage_positions()
+                    await self.mt5_io.run(self.risk_manager.refresh_account_state, priority=PRIORITY_ACCOUNT)
+                
+                await asyncio.sleep(self.check_interval)
+                
+            except Exception as e:
+                logger.error(f"Position loop error: {e}")
+                await asyncio.sleep(60)
+        
+        logger.info("Position loop stopped")
+    
+    async def _evaluate_slots(self, slots: List[StrategySlot]) -> bool:
+        """
+        スロットのバッチ評価（全スロットのシグナル生成→信頼度の高い順にリスクチェック・発注）
+        
+        Args:
+            slots: 評価するスロット
+            
+        Returns:
+            MT5に接続できたかどうか
+        """
+        # MT5接続確認
+        if not await self.mt5_io.ensure_connection():
+            logger.error("MT5 connection lost")
+            return False
+        
+        slots = [slot for slot in slots if slot.enabled]
+        if not slots:
+            return True
+        
+        # リスク状態の定期DB補正（バッチで1回）
+        if self.risk_manager.reconcile_due():
+            await get_async_db().run(self.risk_manager.reconcile_risk_state)
+        
+        # シグナル生成（スロット毎にエラーを隔離）
+        signals = []
+        for slot in slots:
+            result = await self._evaluate_slot(slot)
+            if result is not None and result[0] != 'HOLD':
+                signals.append((slot, *result))
+        
+        # 信頼度の高いシグナルから発注（発注毎にインメモリのリスク状態で判定）
+        for slot, signal, confidence in sorted(signals, key=lambda item: item[2], reverse=True):
+            # 口座情報が古い場合はMT5から再取得するためMT5ワーカーで実行
+            if not await self.mt5_io.run(self.risk_manager.check_risk_limits, priority=PRIORITY_ACCOUNT):
+                logger.warning("Risk limits exceeded, skipping remaining trades")
+                break
+            
+            try:
+                await self._execute_trade_signal(slot, signal, confidence)
+            except Exception as e:
+                self._record_slot_error(slot, e)
+        
+        return True
+    
+    async def _evaluate_slot(self, slot: StrategySlot) -> Optional[Tuple[str, float]]:
+        """
+        1スロットのデータ取得・シグナル生成
+        
+        Returns:
+            (シグナル, 信頼度) ※データ不足・エラー時はNone
+        """
+        started = time.perf_counter()
         try:
-            # MT5から最新データ取得（500本）
-            df = self.mt5_client.get_rates(self.symbol, self.timeframe, count=500)
+            latest_data = await self._get_latest_data(slot)
+            if latest_data is None or latest_data.empty:
+                logger.warning(f"No data available for {slot.symbol} {slot.timeframe}")
+                return None
             
-            if df is None or len(df) < 200:
-                logger.warning(f"Insufficient data for {self.symbol} {self.timeframe}")
+            signal, confidence = await self._generate_signal(slot, latest_data)
+            
+        except Exception as e:
+            self._record_slot_error(slot, e)
+            return None
+        
+        finally:
+            slot.last_latency_ms = round((time.perf_counter() - started) * 1000, 3)
+            slot.last_run = datetime.now()
+        
+        slot.evaluations += 1
+        slot.consecutive_errors = 0
+        slot.last_signal = signal
+        slot.last_confidence = confidence
+        return signal, confidence
+    
+    def _record_slot_error(self, slot: StrategySlot, error: Exception):
+        """スロットのエラー記録（連続エラーが上限に達したらスロットを停止）"""
+        logger.error(f"Error evaluating {slot.symbol} {slot.timeframe}: {error}")
+        slot.errors += 1
+        slot.consecutive_errors += 1
+        slot.last_error = str(error)
+        
+        if slot.consecutive_errors >= self.max_slot_errors:
+            slot.enabled = False
+            logger.error(f"Slot {slot.symbol} {slot.timeframe} disabled after {slot.consecutive_errors} consecutive errors")
+    
+    async def _get_latest_data(self, slot: StrategySlot) -> Optional[pd.DataFrame]:
+        """最新データ取得"""
+        try:
+            # MT5から最新データ取得（初回500本、ウォームアップ後は直近の足のみ）
+            count = 500
+            if self.use_streaming_features:
+                count = self.streaming_features.bars_needed(slot.symbol, slot.timeframe, full=500)
+            df = await self.mt5_io.get_rates(slot.symbol, slot.timeframe, count=count)
+            
+            if df is None or len(df) < min(count, 200):
+                logger.warning(f"Insufficient data for {slot.symbol} {slot.timeframe}")
                 return None
             
             return df
@@ -297,61 +484,62 @@ class TradingEngine:
             logger.error(f"Error getting latest data: {e}")
             return None
     
-    async def _generate_signal(self, data: pd.DataFrame) -> Tuple[str, float]:
+    async def _generate_signal(self, slot: StrategySlot, data: pd.DataFrame) -> Tuple[str, float]:
         """
-        シグナル生成
+        シグナル生成（例外は呼び出し元のスロット単位で処理）
         
         Args:
+            slot: 戦略スロット
             data: 価格データ
             
         Returns:
             (シグナル, 信頼度)
         """
-        try:
-            # 特徴量作成
-            features_df = self.feature_engine.create_features(data)
-            
-            if features_df.empty or len(features_df) < 1:
-                logger.warning("Feature generation failed")
-                return 'HOLD', 0.0
-            
-            # 最新行のみ取得
-            latest_features = features_df.tail(1)
-            
-            # 必要な特徴量があるかチェック
-            required_features = self.model.feature_columns
-            if not all(col in latest_features.columns for col in required_features):
-                logger.warning("Missing required features")
-                return 'HOLD', 0.0
-            
-            # 予測実行
-            if hasattr(self.model, 'predict_with_confidence'):
-                predictions, confidence = self.model.predict_with_confidence(
-                    latest_features[required_features]
-                )
-                prediction = predictions[0]
-                confidence_score = confidence[0]
-            else:
-                prediction = self.model.predict(latest_features[required_features])[0]
-                confidence_score = 0.5  # デフォルト信頼度
-            
-            # シグナル変換
-            signal_map = {0: 'HOLD', 1: 'BUY', 2: 'SELL'}
-            signal = signal_map.get(prediction, 'HOLD')
-            
-            logger.info(f"Generated signal: {signal} (confidence: {confidence_score:.3f})")
-            
-            return signal, confidence_score
-            
-        except Exception as e:
-            logger.error(f"Error generating signal: {e}")
+        # 特徴量作成（最新行のみ、スロット間で共有する特徴量キャッシュを使用）
+        if self.use_streaming_features:
+            latest_features = self.streaming_features.update_from_frame(
+                slot.symbol, slot.timeframe, data
+            )
+        else:
+            latest_features = self.feature_engine.create_features(
+                data, columns=slot.model.feature_columns
+            ).tail(1)
+        
+        if latest_features is None or latest_features.empty:
+            logger.warning("Feature generation failed")
+            return 'HOLD', 0.0
+        
+        # 必要な特徴量があるかチェック
+        required_features = slot.model.feature_columns
+        if not all(col in latest_features.columns for col in required_features):
+            logger.warning("Missing required features")
             return 'HOLD', 0.0
+        
+        # 予測実行
+        if hasattr(slot.model, 'predict_with_confidence'):
+            predictions, confidence = slot.model.predict_with_confidence(
+                latest_features[required_features]
+            )
+            prediction = predictions[0]
+            confidence_score = confidence[0]
+        else:
+            prediction = slot.model.predict(latest_features[required_features])[0]
+            confidence_score = 0.5  # デフォルト信頼度
+        
+        # シグナル変換
+        signal_map = {0: 'HOLD', 1: 'BUY', 2: 'SELL'}
+        signal = signal_map.get(prediction, 'HOLD')
+        
+        logger.info(f"Generated signal for {slot.symbol}: {signal} (confidence: {confidence_score:.3f})")
+        
+        return signal, confidence_score
     
-    async def _execute_trade_signal(self, signal: str, confidence: float):
+    async def _execute_trade_signal(self, slot: StrategySlot, signal: str, confidence: float):
         """
         トレードシグナル実行
         
         Args:
+            slot: 戦略スロット
             signal: シグナル
             confidence: 信頼度
         """
@@ -361,40 +549,46 @@ class TradingEngine:
                 logger.info(f"Signal confidence too low: {confidence:.3f}")
                 return
             
-            current_position = self.current_positions.get(self.symbol)
+            current_position = self.current_positions.get(slot.symbol)
             
             if signal == 'BUY':
                 if not current_position or current_position['type'] == 'SELL':
-                    await self._open_position('BUY')
+                    await self._open_position(slot, 'BUY')
             elif signal == 'SELL':
                 if not current_position or current_position['type'] == 'BUY':
-                    await self._open_position('SELL')
+                    await self._open_position(slot, 'SELL')
             # HOLDの場合は何もしない
             
         except Exception as e:
             logger.error(f"Error executing trade signal: {e}")
     
-    async def _open_position(self, order_type: str):
+    async def _open_position(self, slot: StrategySlot, order_type: str):
         """
         ポジションオープン
         
         Args:
+            slot: 戦略スロット
             order_type: 注文タイプ ('BUY' or 'SELL')
         """
+        symbol = slot.symbol
         try:
             # 既存ポジションがあればクローズ
-            if self.symbol in self.current_positions:
-                await self._close_position(self.symbol)
+            if symbol in self.current_positions:
+                await self._close_position(symbol)
             
             # ロットサイズ計算
-            lot_size = self.risk_manager.calculate_lot_size(self.symbol, order_type)
+            lot_size = await self.mt5_io.run(
+                self.risk_manager.calculate_lot_size, symbol, order_type, priority=PRIORITY_ORDER
+            )
             
             if lot_size <= 0:
                 logger.error("Invalid lot size calculated")
                 return
             
-            # 価格取得
-            tick = self.mt5_client.get_tick(self.symbol)
+            # 価格取得（発注価格のため鮮度を厳しくする）
+            tick = await self.mt5_io.run(
+                self.market_data.get_tick, symbol, max_age=self.order_tick_max_age, priority=PRIORITY_ORDER
+            )
             if tick is None:
                 logger.error("Failed to get current price")
                 return
@@ -402,17 +596,20 @@ class TradingEngine:
             price = tick['ask'] if order_type == 'BUY' else tick['bid']
             
             # ストップロス・テイクプロフィット計算
-            sl, tp = self.risk_manager.calculate_sl_tp(self.symbol, order_type, price)
+            sl, tp = await self.mt5_io.run(
+                self.risk_manager.calculate_sl_tp, symbol, order_type, price, priority=PRIORITY_ORDER
+            )
             
             # 注文実行
-            result = self.mt5_client.place_order(
-                symbol=self.symbol,
+            comment = f"ML_AUTO_{slot.timeframe}"
+            result = await self.mt5_io.place_order(
+                symbol=symbol,
                 order_type=order_type,
                 volume=lot_size,
                 price=price,
                 sl=sl,
                 tp=tp,
-                comment=f"ML_AUTO_{self.timeframe}",
+                comment=comment,
                 magic=self.magic_number
             )
             
@@ -420,6 +617,7 @@ class TradingEngine:
                 # ポジション記録
                 position_data = {
                     'ticket': result.order if hasattr(result, 'order') else None,
+                    'symbol': symbol,
                     'type': order_type,
                     'volume': lot_size,
                     'avg_price': price,
@@ -427,14 +625,16 @@ class TradingEngine:
                     'sl': sl,
                     'tp': tp,
                     'nanpin_count': 0,
-                    'magic': self.magic_number
+                    'magic': self.magic_number,
+                    'comment': comment
                 }
-                self.current_positions[self.symbol] = position_data
+                self.current_positions[symbol] = position_data
+                self.risk_manager.on_trade_opened(position_data['open_time'])
                 
                 # データベースに保存
                 await self._save_trade_to_db(position_data)
                 
-                logger.info(f"Position opened: {order_type} {lot_size} lots at {price}")
+                logger.info(f"Position opened: {symbol} {order_type} {lot_size} lots at {price}")
             else:
                 error_msg = result.comment if result and hasattr(result, 'comment') else "Unknown error"
                 logger.error(f"Order failed: {error_msg}")
@@ -456,18 +656,20 @@ class TradingEngine:
         
         try:
             # クローズ注文実行
-            result = self.mt5_client.close_position(position['ticket'])
+            result = await self.mt5_io.close_position(position['ticket'])
             
             if result and hasattr(result, 'retcode') and result.retcode == 0:
                 # 損益計算
-                tick = self.mt5_client.get_tick(symbol)
+                tick = await self.market_data.get_tick_async(symbol)
                 close_price = tick['bid'] if position['type'] == 'BUY' else tick['ask']
                 
                 # ポジション削除
                 del self.current_positions[symbol]
                 
                 # データベース更新
-                await self._update_trade_in_db(position['ticket'], close_price, datetime.now())
+                trade = await self._update_trade_in_db(position['ticket'], close_price, datetime.now())
+                if trade is not None:
+                    self.risk_manager.on_trade_closed(trade['profit_loss'], trade['entry_time'])
                 
                 logger.info(f"Position closed: {symbol} at {close_price}")
             else:
@@ -495,8 +697,10 @@ class TradingEngine:
                 
                 # ナンピンチェック
                 if self.risk_manager.settings.get('use_nanpin', False):
-                    if self.nanpin_manager.check_nanpin_condition(symbol, position):
-                        if self.nanpin_manager.execute_nanpin(symbol, position):
+                    if await self.mt5_io.run(self.nanpin_manager.check_nanpin_condition, symbol, position,
+                                             priority=PRIORITY_ACCOUNT):
+                        if await self.mt5_io.run(self.nanpin_manager.execute_nanpin, symbol, position,
+                                                 priority=PRIORITY_ORDER):
                             # ポジション情報更新後にDB保存
                             await self._update_position_in_db(position)
                 
@@ -513,14 +717,14 @@ class TradingEngine:
                 return
             
             # 現在価格取得
-            tick = self.mt5_client.get_tick(symbol)
+            tick = await self.market_data.get_tick_async(symbol)
             if tick is None:
                 return
             
             current_price = tick['ask'] if position['type'] == 'BUY' else tick['bid']
             
             # 通貨ペア情報取得
-            symbol_info = self.mt5_client.get_symbol_info(symbol)
+            symbol_info = await self.mt5_io.get_symbol_info(symbol)
             if symbol_info is None:
                 return
             
@@ -545,7 +749,7 @@ class TradingEngine:
             
             # ストップロス更新
             if new_sl is not None:
-                result = self.mt5_client.modify_position(position['ticket'], sl=new_sl)
+                result = await self.mt5_io.modify_position(position['ticket'], sl=new_sl)
                 if result and hasattr(result, 'retcode') and result.retcode == 0:
                     position['sl'] = new_sl
                     logger.info(f"Trailing stop updated for {symbol}: {new_sl}")
@@ -558,13 +762,13 @@ class TradingEngine:
         try:
             trade_data = {
                 'trade_id': position_data['ticket'],
-                'symbol': self.symbol,
+                'symbol': position_data['symbol'],
                 'order_type': position_data['type'],
                 'entry_time': position_data['open_time'],
                 'entry_price': position_data['avg_price'],
                 'volume': position_data['volume'],
                 'magic_number': position_data['magic'],
-                'comment': f"ML_AUTO_{self.timeframe}",
+                'comment': position_data['comment'],
                 'is_closed': False
             }
             
@@ -577,21 +781,22 @@ class TradingEngine:
         except Exception as e:
             logger.error(f"Error saving trade to database: {e}")
     
-    async def _update_trade_in_db(self, ticket: int, close_price: float, close_time: datetime):
-        """データベースの取引データを更新"""
+    async def _update_trade_in_db(self, ticket: int, close_price: float,
+                                  close_time: datetime) -> Optional[Dict[str, Any]]:
+        """データベースの取引データを更新（確定損益とエントリー時刻を返す）"""
         try:
             with self.db_manager.get_connection() as conn:
                 with conn.cursor() as cursor:
                     # 取引データ取得して損益計算
                     select_query = """
-                        SELECT entry_price, volume, order_type
+                        SELECT entry_price, volume, order_type, entry_time
                         FROM trades WHERE trade_id = %s
                     """
                     cursor.execute(select_query, (ticket,))
                     result = cursor.fetchone()
                     
                     if result:
-                        entry_price, volume, order_type = result
+                        entry_price, volume, order_type, entry_time = result
                         
                         # 損益計算（簡易版）
                         if order_type == 'BUY':
@@ -610,9 +815,13 @@ class TradingEngine:
                         conn.commit()
                         
                         logger.info(f"Trade updated in database: {ticket}, P/L: {profit_loss}")
+                        return {'profit_loss': float(profit_loss), 'entry_time': entry_time}
+            
+            return None
                     
         except Exception as e:
             logger.error(f"Error updating trade in database: {e}")
+            return None
     
     async def _update_position_in_db(self, position: Dict[str, Any]):
         """ポジション情報をデータベースに更新"""
@@ -638,11 +847,14 @@ class TradingEngine:
     def get_trading_status(self) -> Dict[str, Any]:
         """取引状態取得"""
         try:
+            single_slot = next(iter(self.slots.values())) if len(self.slots) == 1 else None
             return {
                 "is_active": self.is_active,
-                "symbol": self.symbol,
-                "timeframe": self.timeframe,
-                "model_loaded": self.model is not None,
+                # 単一スロット運用時の互換項目
+                "symbol": single_slot.symbol if single_slot else None,
+                "timeframe": single_slot.timeframe if single_slot else None,
+                "model_loaded": bool(self.slots) and all(slot.model is not None for slot in self.slots.values()),
+                "slots": {symbol: slot.get_status() for symbol, slot in self.slots.items()},
                 "current_positions": len(self.current_positions),
                 "positions": self.current_positions,
                 "risk_status": self.risk_manager.get_risk_status(),
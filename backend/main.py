@@ -16,6 +16,12 @@ from backend.api.analysis import router as analysis_router
 from backend.api.monitoring import router as monitoring_router
 from backend.core.mt5_client import MT5Client
 from backend.core.database import DatabaseManager
+from backend.core.db_pool import close_all_pools
+from backend.core.async_database import shutdown_async_db
+from backend.core.mt5_worker import shutdown_mt5_worker
+from backend.monitoring.event_loop_monitor import event_loop_monitor
+from backend.core.market_data_hub import get_market_data_hub
+from backend.core.bar_scheduler import get_bar_scheduler
 
 # ログ設定
 logging.basicConfig(
@@ -53,13 +59,25 @@ async def lifespan(app: FastAPI):
             logger.info("MT5 connection test successful")
         else:
             logger.warning(f"MT5 connection test failed: {test_result['message']}")
+        
+        # MT5データは共有ハブが一括取得
+        get_market_data_hub().start()
     else:
         logger.warning("MT5 config file not found. Please create config/mt5_config.json")
     
+    # イベントループ遅延監視
+    event_loop_monitor.start()
+    
     yield
     
     # 終了時の処理
     logger.info("Shutting down FX Trading System API")
+    await event_loop_monitor.stop()
+    await get_bar_scheduler().stop()
+    await get_market_data_hub().stop()
+    shutdown_mt5_worker()
+    shutdown_async_db()
+    close_all_pools()
 
 app = FastAPI(
     title="FX Trading System API",
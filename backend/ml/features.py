@@ -4,15 +4,137 @@
 import pandas as pd
 import numpy as np
 import talib
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import logging
 from datetime import datetime
 
+from backend.ml.rolling_stats import rolling_autocorr, pattern_counts
+
 logger = logging.getLogger(__name__)
 
+# TALIBのパターン認識関数
+PATTERN_FUNCTIONS = [
+    'CDL2CROWS', 'CDL3BLACKCROWS', 'CDL3INSIDE', 'CDL3LINESTRIKE',
+    'CDL3OUTSIDE', 'CDL3STARSINSOUTH', 'CDL3WHITESOLDIERS',
+    'CDLABANDONEDBABY', 'CDLADVANCEBLOCK', 'CDLBELTHOLD',
+    'CDLBREAKAWAY', 'CDLCLOSINGMARUBOZU', 'CDLCONCEALBABYSWALL',
+    'CDLCOUNTERATTACK', 'CDLDARKCLOUDCOVER', 'CDLDOJI',
+    'CDLDOJISTAR', 'CDLDRAGONFLYDOJI', 'CDLENGULFING',
+    'CDLEVENINGDOJISTAR', 'CDLEVENINGSTAR', 'CDLGAPSIDESIDEWHITE',
+    'CDLGRAVESTONEDOJI', 'CDLHAMMER', 'CDLHANGINGMAN',
+    'CDLHARAMI', 'CDLHARAMICROSS', 'CDLHIGHWAVE', 'CDLHIKKAKE',
+    'CDLHIKKAKEMOD', 'CDLHOMINGPIGEON', 'CDLIDENTICAL3CROWS',
+    'CDLINNECK', 'CDLINVERTEDHAMMER', 'CDLKICKING',
+    'CDLKICKINGBYLENGTH', 'CDLLADDERBOTTOM', 'CDLLONGLEGGEDDOJI',
+    'CDLLONGLINE', 'CDLMARUBOZU', 'CDLMATCHINGLOW',
+    'CDLMATHOLD', 'CDLMORNINGDOJISTAR', 'CDLMORNINGSTAR',
+    'CDLONNECK', 'CDLPIERCING', 'CDLRICKSHAWMAN',
+    'CDLRISEFALL3METHODS', 'CDLSEPARATINGLINES', 'CDLSHOOTINGSTAR',
+    'CDLSHORTLINE', 'CDLSPINNINGTOP', 'CDLSTALLEDPATTERN',
+    'CDLSTICKSANDWICH', 'CDLTAKURI', 'CDLTASUKIGAP',
+    'CDLTHRUSTING', 'CDLTRISTAR', 'CDLUNIQUE3RIVER',
+    'CDLUPSIDEGAP2CROWS', 'CDLXSIDEGAP3METHODS'
+]
+
+# 上位20パターンのみ使用（計算量削減）
+PATTERN_LIMIT = 20
+
+# 価格変化率・ボラティリティ・統計量の計算期間
+PRICE_CHANGE_PERIODS = [1, 3, 5, 10, 20]
+VOLATILITY_PERIODS = [5, 10, 20, 50]
+STATISTICAL_PERIODS = [10, 20, 50]
+AUTOCORR_LAGS = [1, 5, 10]
+AUTOCORR_WINDOW = 50
+
+# 時間的特徴量のカラム
+TIME_FEATURE_COLUMNS = [
+    'hour', 'day_of_week', 'month', 'quarter', 'day_of_month', 'week_of_year',
+    'hour_sin', 'hour_cos', 'day_sin', 'day_cos', 'month_sin', 'month_cos',
+    'tokyo_session', 'london_session', 'ny_session', 'overlap_london_ny', 'overlap_tokyo_london',
+    'is_weekend', 'is_monday', 'is_friday', 'is_month_end', 'is_month_start',
+    'news_time_jpy', 'news_time_eur', 'news_time_usd'
+]
+
+
+class FeatureGroup:
+    """特徴量グループ（まとめて計算されるカラムの集合）"""
+
+    def __init__(self,
+                 name: str,
+                 columns: List[str],
+                 compute: Callable[[pd.DataFrame], None],
+                 depends_on: Optional[List[str]] = None,
+                 requires: Optional[List[str]] = None):
+        """
+        Args:
+            name: グループ名
+            columns: 作成するカラム
+            compute: DataFrameにカラムを追加する関数
+            depends_on: 先に計算が必要なグループ名
+            requires: 入力データに必要なカラム（無ければスキップ）
+        """
+        self.name = name
+        self.columns = columns
+        self.compute = compute
+        self.depends_on = depends_on or []
+        self.requires = requires or []
+
+
+class FeatureRegistry:
+    """特徴量グループの登録簿（登録順 = 計算順）"""
+
+    def __init__(self):
+        self._groups: Dict[str, FeatureGroup] = {}
+        self._column_groups: Dict[str, str] = {}
+
+    def register(self, group: FeatureGroup) -> None:
+        """グループ登録（依存先は登録済みであること）"""
+        if group.name in self._groups:
+            raise ValueError(f"Feature group already registered: {group.name}")
+
+        missing = [dep for dep in group.depends_on if dep not in self._groups]
+        if missing:
+            raise ValueError(f"Feature group {group.name} depends on unregistered groups: {missing}")
+
+        self._groups[group.name] = group
+        for column in group.columns:
+            self._column_groups[column] = group.name
+
+    def groups(self) -> List[FeatureGroup]:
+        """登録済みグループ一覧"""
+        return list(self._groups.values())
+
+    def group_for_column(self, column: str) -> Optional[str]:
+        """カラムを作成するグループ名"""
+        return self._column_groups.get(column)
+
+    def resolve(self, columns: Optional[List[str]] = None) -> List[FeatureGroup]:
+        """
+        計算が必要なグループを解決
+
+        Args:
+            columns: 必要なカラム（Noneの場合は全グループ）
+
+        Returns:
+            依存関係を含むグループ（計算順）
+        """
+        if columns is None:
+            return self.groups()
+
+        needed = set()
+        stack = [self._column_groups[col] for col in columns if col in self._column_groups]
+        while stack:
+            name = stack.pop()
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self._groups[name].depends_on)
+
+        return [group for group in self._groups.values() if group.name in needed]
+
+
 class FeatureEngineering:
     """特徴量エンジニアリングクラス"""
-    
+
     def __init__(self):
         self.technical_indicators = {
             'sma': [5, 10, 20, 50, 200],
@@ -29,435 +151,459 @@ class FeatureEngineering:
             'obv': True,
             'sar': {'acceleration': 0.02, 'maximum': 0.2}
         }
-        
+
         self.feature_columns = []
-        
-    def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.registry = self._build_registry()
+
+    def create_features(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         特徴量作成メイン関数
-        
+
         Args:
             df: OHLCV価格データのDataFrame
-            
+            columns: 必要な特徴量カラム（モデルのfeature_columns等）。
+                     指定時はそのカラムと依存先のみ計算する
+
         Returns:
             特徴量を追加したDataFrame
         """
         try:
             logger.info("Starting feature engineering...")
             df = df.copy()
-            
+
             # 基本チェック
             if not self._validate_input(df):
                 raise ValueError("Invalid input data")
-            
-            # テクニカル指標
-            df = self._add_technical_indicators(df)
-            
-            # 価格変化率
-            df = self._add_price_changes(df)
-            
-            # 時間的特徴量
-            df = self._add_time_features(df)
-            
-            # ボラティリティ指標
-            df = self._add_volatility_features(df)
-            
-            # 統計的特徴量
-            df = self._add_statistical_features(df)
-            
-            # パターン認識特徴量
-            df = self._add_pattern_features(df)
-            
+
+            if columns is not None:
+                unknown = [col for col in columns
+                           if col not in df.columns and self.registry.group_for_column(col) is None]
+                if unknown:
+                    logger.warning(f"Unknown feature columns requested: {unknown}")
+
+            # 依存関係順にグループを計算
+            for group in self.registry.resolve(columns):
+                if not all(col in df.columns for col in group.requires):
+                    continue
+                try:
+                    group.compute(df)
+                except Exception as e:
+                    logger.error(f"Error computing feature group {group.name}: {e}")
+                    raise
+
             # 特徴量リストを更新
             self._update_feature_columns(df)
-            
+            if columns is not None:
+                self.feature_columns = [col for col in columns if col in df.columns]
+
             # NaN値の処理
             df = self._handle_missing_values(df)
-            
+
             logger.info(f"Feature engineering completed. Created {len(self.feature_columns)} features")
             return df
-            
+
         except Exception as e:
             logger.error(f"Error in feature engineering: {e}")
             raise
-    
+
     def _validate_input(self, df: pd.DataFrame) -> bool:
         """入力データの検証"""
         required_columns = ['open', 'high', 'low', 'close']
         if 'volume' in df.columns:
             required_columns.append('volume')
-            
+
         if not all(col in df.columns for col in required_columns):
             logger.error(f"Missing required columns: {required_columns}")
             return False
-            
+
         if len(df) < 200:  # 最小データ数
             logger.error("Insufficient data for feature engineering")
             return False
-            
+
         return True
-    
-    def _add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """テクニカル指標の追加"""
-        try:
-            # 移動平均線
-            for period in self.technical_indicators['sma']:
-                df[f'sma_{period}'] = talib.SMA(df['close'], timeperiod=period)
-                df[f'price_sma_{period}_ratio'] = df['close'] / df[f'sma_{period}']
-                
-                # 移動平均線の傾き
-                df[f'sma_{period}_slope'] = df[f'sma_{period}'].diff(5) / df[f'sma_{period}']
-            
-            # 指数移動平均
-            for period in self.technical_indicators['ema']:
-                df[f'ema_{period}'] = talib.EMA(df['close'], timeperiod=period)
-                df[f'price_ema_{period}_ratio'] = df['close'] / df[f'ema_{period}']
-            
-            # RSI
-            for period in self.technical_indicators['rsi']:
-                df[f'rsi_{period}'] = talib.RSI(df['close'], timeperiod=period)
-                # RSIの変化率
-                df[f'rsi_{period}_change'] = df[f'rsi_{period}'].diff()
-            
-            # MACD
-            macd_config = self.technical_indicators['macd']
-            macd, macdsignal, macdhist = talib.MACD(
-                df['close'], 
-                fastperiod=macd_config['fast'],
-                slowperiod=macd_config['slow'],
-                signalperiod=macd_config['signal']
-            )
-            df['macd'] = macd
-            df['macd_signal'] = macdsignal
-            df['macd_histogram'] = macdhist
-            df['macd_signal_cross'] = np.where(
-                (df['macd'] > df['macd_signal']) & 
-                (df['macd'].shift(1) <= df['macd_signal'].shift(1)), 1,
-                np.where(
-                    (df['macd'] < df['macd_signal']) & 
-                    (df['macd'].shift(1) >= df['macd_signal'].shift(1)), -1, 0
-                )
-            )
-            
-            # ボリンジャーバンド
-            bb_config = self.technical_indicators['bollinger']
-            upper, middle, lower = talib.BBANDS(
-                df['close'], 
-                timeperiod=bb_config['period'],
-                nbdevup=bb_config['std'],
-                nbdevdn=bb_config['std']
-            )
-            df['bb_upper'] = upper
-            df['bb_middle'] = middle
-            df['bb_lower'] = lower
-            df['bb_width'] = (upper - lower) / middle
-            df['bb_position'] = (df['close'] - lower) / (upper - lower)
-            df['bb_squeeze'] = df['bb_width'] < df['bb_width'].rolling(20).mean() * 0.8
-            
-            # ATR (Average True Range)
-            atr_period = self.technical_indicators['atr']
-            df['atr'] = talib.ATR(df['high'], df['low'], df['close'], timeperiod=atr_period)
-            df['atr_ratio'] = df['atr'] / df['close']
-            
-            # ストキャスティクス
-            stoch_config = self.technical_indicators['stoch']
-            slowk, slowd = talib.STOCH(
-                df['high'], df['low'], df['close'],
-                fastk_period=stoch_config['k'], 
-                slowk_period=stoch_config['d'],
-                slowd_period=stoch_config['d']
-            )
-            df['stoch_k'] = slowk
-            df['stoch_d'] = slowd
-            df['stoch_cross'] = np.where(
-                (df['stoch_k'] > df['stoch_d']) & 
-                (df['stoch_k'].shift(1) <= df['stoch_d'].shift(1)), 1,
-                np.where(
-                    (df['stoch_k'] < df['stoch_d']) & 
-                    (df['stoch_k'].shift(1) >= df['stoch_d'].shift(1)), -1, 0
-                )
+
+    def _build_registry(self) -> FeatureRegistry:
+        """特徴量グループの登録（既存のカラム順を維持する順序で登録）"""
+        registry = FeatureRegistry()
+        config = self.technical_indicators
+
+        def add(name, columns, compute, depends_on=None, requires=None):
+            registry.register(FeatureGroup(name, columns, compute, depends_on, requires))
+
+        # テクニカル指標
+        for period in config['sma']:
+            add(f'sma_{period}',
+                [f'sma_{period}', f'price_sma_{period}_ratio', f'sma_{period}_slope'],
+                lambda df, p=period: self._add_sma(df, p))
+        for period in config['ema']:
+            add(f'ema_{period}', [f'ema_{period}', f'price_ema_{period}_ratio'],
+                lambda df, p=period: self._add_ema(df, p))
+        for period in config['rsi']:
+            add(f'rsi_{period}', [f'rsi_{period}', f'rsi_{period}_change'],
+                lambda df, p=period: self._add_rsi(df, p))
+        add('macd', ['macd', 'macd_signal', 'macd_histogram', 'macd_signal_cross'], self._add_macd)
+        add('bollinger', ['bb_upper', 'bb_middle', 'bb_lower', 'bb_width', 'bb_position', 'bb_squeeze'],
+            self._add_bollinger)
+        add('atr', ['atr', 'atr_ratio'], self._add_atr)
+        add('stoch', ['stoch_k', 'stoch_d', 'stoch_cross'], self._add_stoch)
+        add('adx', ['adx', 'plus_di', 'minus_di', 'dx'], self._add_adx)
+        add('cci', ['cci'], self._add_cci)
+        add('williams_r', ['williams_r'], self._add_williams_r)
+        add('mfi', ['mfi'], self._add_mfi, requires=['volume'])
+        add('obv', ['obv', 'obv_sma'], self._add_obv, requires=['volume'])
+        add('sar', ['sar', 'sar_signal'], self._add_sar)
+
+        # 価格変化率
+        for period in PRICE_CHANGE_PERIODS:
+            add(f'price_change_{period}',
+                [f'price_change_{period}', f'high_change_{period}', f'low_change_{period}',
+                 f'log_return_{period}', f'hl_ratio_{period}'],
+                lambda df, p=period: self._add_price_change(df, p))
+        add('intraday', ['intraday_range', 'open_close_ratio', 'high_close_ratio', 'low_close_ratio'],
+            self._add_intraday)
+        add('gap', ['gap', 'gap_filled'], self._add_gap)
+
+        # 時間的特徴量
+        add('time', TIME_FEATURE_COLUMNS, self._add_time_features)
+
+        # ボラティリティ指標
+        for period in VOLATILITY_PERIODS:
+            add(f'volatility_{period}',
+                [f'volatility_{period}', f'volatility_{period}_norm', f'parkinson_vol_{period}',
+                 f'gk_vol_{period}', f'return_range_{period}'],
+                lambda df, p=period: self._add_volatility(df, p))
+        add('vix_like', ['vix_like', 'vix_like_ma', 'vix_spike'], self._add_vix_like, depends_on=['atr'])
+        add('vol_regime', ['vol_regime'], self._add_vol_regime)
+
+        # 統計的特徴量
+        for period in STATISTICAL_PERIODS:
+            add(f'statistics_{period}',
+                [f'skewness_{period}', f'kurtosis_{period}', f'percentile_10_{period}',
+                 f'percentile_90_{period}', f'percentile_position_{period}',
+                 f'zscore_{period}', f'high_position_{period}'],
+                lambda df, p=period: self._add_statistics(df, p))
+        for lag in AUTOCORR_LAGS:
+            add(f'autocorr_{lag}', [f'autocorr_{lag}'],
+                lambda df, l=lag: self._add_autocorr(df, l))
+
+        # パターン認識特徴量
+        pattern_groups = []
+        for pattern in PATTERN_FUNCTIONS[:PATTERN_LIMIT]:
+            if not hasattr(talib, pattern):
+                continue
+            column = f'pattern_{pattern.lower()}'
+            add(column, [column], lambda df, p=pattern: self._add_candle_pattern(df, p))
+            pattern_groups.append(column)
+        add('pattern_scores', ['pattern_bull_score', 'pattern_bear_score', 'pattern_net_score'],
+            lambda df: self._add_pattern_scores(df, pattern_groups), depends_on=pattern_groups)
+        add('price_patterns', ['higher_high', 'lower_low', 'inside_bar', 'outside_bar'],
+            self._add_price_patterns)
+
+        return registry
+
+    # --- テクニカル指標 ---
+
+    def _add_sma(self, df: pd.DataFrame, period: int) -> None:
+        """移動平均線"""
+        df[f'sma_{period}'] = talib.SMA(df['close'], timeperiod=period)
+        df[f'price_sma_{period}_ratio'] = df['close'] / df[f'sma_{period}']
+
+        # 移動平均線の傾き
+        df[f'sma_{period}_slope'] = df[f'sma_{period}'].diff(5) / df[f'sma_{period}']
+
+    def _add_ema(self, df: pd.DataFrame, period: int) -> None:
+        """指数移動平均"""
+        df[f'ema_{period}'] = talib.EMA(df['close'], timeperiod=period)
+        df[f'price_ema_{period}_ratio'] = df['close'] / df[f'ema_{period}']
+
+    def _add_rsi(self, df: pd.DataFrame, period: int) -> None:
+        """RSI"""
+        df[f'rsi_{period}'] = talib.RSI(df['close'], timeperiod=period)
+        # RSIの変化率
+        df[f'rsi_{period}_change'] = df[f'rsi_{period}'].diff()
+
+    def _add_macd(self, df: pd.DataFrame) -> None:
+        """MACD"""
+        macd_config = self.technical_indicators['macd']
+        macd, macdsignal, macdhist = talib.MACD(
+            df['close'],
+            fastperiod=macd_config['fast'],
+            slowperiod=macd_config['slow'],
+            signalperiod=macd_config['signal']
+        )
+        df['macd'] = macd
+        df['macd_signal'] = macdsignal
+        df['macd_histogram'] = macdhist
+        df['macd_signal_cross'] = np.where(
+            (df['macd'] > df['macd_signal']) &
+            (df['macd'].shift(1) <= df['macd_signal'].shift(1)), 1,
+            np.where(
+                (df['macd'] < df['macd_signal']) &
+                (df['macd'].shift(1) >= df['macd_signal'].shift(1)), -1, 0
             )
-            
-            # ADX (Average Directional Index)
-            adx_period = self.technical_indicators['adx']
-            df['adx'] = talib.ADX(df['high'], df['low'], df['close'], timeperiod=adx_period)
-            df['plus_di'] = talib.PLUS_DI(df['high'], df['low'], df['close'], timeperiod=adx_period)
-            df['minus_di'] = talib.MINUS_DI(df['high'], df['low'], df['close'], timeperiod=adx_period)
-            df['dx'] = talib.DX(df['high'], df['low'], df['close'], timeperiod=adx_period)
-            
-            # CCI (Commodity Channel Index)
-            cci_period = self.technical_indicators['cci']
-            df['cci'] = talib.CCI(df['high'], df['low'], df['close'], timeperiod=cci_period)
-            
-            # Williams %R
-            willr_period = self.technical_indicators['williams_r']
-            df['williams_r'] = talib.WILLR(df['high'], df['low'], df['close'], timeperiod=willr_period)
-            
-            # MFI (Money Flow Index) - volumeが必要
-            if 'volume' in df.columns:
-                mfi_period = self.technical_indicators['mfi']
-                df['mfi'] = talib.MFI(df['high'], df['low'], df['close'], df['volume'], timeperiod=mfi_period)
-                
-                # OBV (On Balance Volume)
-                df['obv'] = talib.OBV(df['close'], df['volume'])
-                df['obv_sma'] = talib.SMA(df['obv'], timeperiod=20)
-            
-            # Parabolic SAR
-            sar_config = self.technical_indicators['sar']
-            df['sar'] = talib.SAR(
-                df['high'], df['low'], 
-                acceleration=sar_config['acceleration'],
-                maximum=sar_config['maximum']
+        )
+
+    def _add_bollinger(self, df: pd.DataFrame) -> None:
+        """ボリンジャーバンド"""
+        bb_config = self.technical_indicators['bollinger']
+        upper, middle, lower = talib.BBANDS(
+            df['close'],
+            timeperiod=bb_config['period'],
+            nbdevup=bb_config['std'],
+            nbdevdn=bb_config['std']
+        )
+        df['bb_upper'] = upper
+        df['bb_middle'] = middle
+        df['bb_lower'] = lower
+        df['bb_width'] = (upper - lower) / middle
+        df['bb_position'] = (df['close'] - lower) / (upper - lower)
+        df['bb_squeeze'] = df['bb_width'] < df['bb_width'].rolling(20).mean() * 0.8
+
+    def _add_atr(self, df: pd.DataFrame) -> None:
+        """ATR (Average True Range)"""
+        atr_period = self.technical_indicators['atr']
+        df['atr'] = talib.ATR(df['high'], df['low'], df['close'], timeperiod=atr_period)
+        df['atr_ratio'] = df['atr'] / df['close']
+
+    def _add_stoch(self, df: pd.DataFrame) -> None:
+        """ストキャスティクス"""
+        stoch_config = self.technical_indicators['stoch']
+        slowk, slowd = talib.STOCH(
+            df['high'], df['low'], df['close'],
+            fastk_period=stoch_config['k'],
+            slowk_period=stoch_config['d'],
+            slowd_period=stoch_config['d']
+        )
+        df['stoch_k'] = slowk
+        df['stoch_d'] = slowd
+        df['stoch_cross'] = np.where(
+            (df['stoch_k'] > df['stoch_d']) &
+            (df['stoch_k'].shift(1) <= df['stoch_d'].shift(1)), 1,
+            np.where(
+                (df['stoch_k'] < df['stoch_d']) &
+                (df['stoch_k'].shift(1) >= df['stoch_d'].shift(1)), -1, 0
             )
-            df['sar_signal'] = np.where(df['close'] > df['sar'], 1, -1)
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error adding technical indicators: {e}")
-            raise
-    
-    def _add_price_changes(self, df: pd.DataFrame) -> pd.DataFrame:
-        """価格変化率の追加"""
-        try:
-            periods = [1, 3, 5, 10, 20]
-            
-            for period in periods:
-                # 価格変化率
-                df[f'price_change_{period}'] = df['close'].pct_change(period)
-                df[f'high_change_{period}'] = df['high'].pct_change(period)
-                df[f'low_change_{period}'] = df['low'].pct_change(period)
-                
-                # ログリターン
-                df[f'log_return_{period}'] = np.log(df['close'] / df['close'].shift(period))
-                
-                # 価格レンジ
-                df[f'hl_ratio_{period}'] = (df['high'] - df['low']) / df['close']
-                
-            # 日中価格変動
-            df['intraday_range'] = (df['high'] - df['low']) / df['open']
-            df['open_close_ratio'] = df['close'] / df['open']
-            df['high_close_ratio'] = df['high'] / df['close']
-            df['low_close_ratio'] = df['low'] / df['close']
-            
-            # ギャップ
-            df['gap'] = (df['open'] - df['close'].shift(1)) / df['close'].shift(1)
-            df['gap_filled'] = np.where(
-                (df['gap'] > 0) & (df['low'] <= df['close'].shift(1)), 1,
-                np.where(
-                    (df['gap'] < 0) & (df['high'] >= df['close'].shift(1)), 1, 0
-                )
+        )
+
+    def _add_adx(self, df: pd.DataFrame) -> None:
+        """ADX (Average Directional Index)"""
+        adx_period = self.technical_indicators['adx']
+        df['adx'] = talib.ADX(df['high'], df['low'], df['close'], timeperiod=adx_period)
+        df['plus_di'] = talib.PLUS_DI(df['high'], df['low'], df['close'], timeperiod=adx_period)
+        df['minus_di'] = talib.MINUS_DI(df['high'], df['low'], df['close'], timeperiod=adx_period)
+        df['dx'] = talib.DX(df['high'], df['low'], df['close'], timeperiod=adx_period)
+
+    def _add_cci(self, df: pd.DataFrame) -> None:
+        """CCI (Commodity Channel Index)"""
+        cci_period = self.technical_indicators['cci']
+        df['cci'] = talib.CCI(df['high'], df['low'], df['close'], timeperiod=cci_period)
+
+    def _add_williams_r(self, df: pd.DataFrame) -> None:
+        """Williams %R"""
+        willr_period = self.technical_indicators['williams_r']
+        df['williams_r'] = talib.WILLR(df['high'], df['low'], df['close'], timeperiod=willr_period)
+
+    def _add_mfi(self, df: pd.DataFrame) -> None:
+        """MFI (Money Flow Index) - volumeが必要"""
+        mfi_period = self.technical_indicators['mfi']
+        df['mfi'] = talib.MFI(df['high'], df['low'], df['close'], df['volume'], timeperiod=mfi_period)
+
+    def _add_obv(self, df: pd.DataFrame) -> None:
+        """OBV (On Balance Volume) - volumeが必要"""
+        df['obv'] = talib.OBV(df['close'], df['volume'])
+        df['obv_sma'] = talib.SMA(df['obv'], timeperiod=20)
+
+    def _add_sar(self, df: pd.DataFrame) -> None:
+        """Parabolic SAR"""
+        sar_config = self.technical_indicators['sar']
+        df['sar'] = talib.SAR(
+            df['high'], df['low'],
+            acceleration=sar_config['acceleration'],
+            maximum=sar_config['maximum']
+        )
+        df['sar_signal'] = np.where(df['close'] > df['sar'], 1, -1)
+
+    # --- 価格変化率 ---
+
+    def _add_price_change(self, df: pd.DataFrame, period: int) -> None:
+        """価格変化率"""
+        df[f'price_change_{period}'] = df['close'].pct_change(period)
+        df[f'high_change_{period}'] = df['high'].pct_change(period)
+        df[f'low_change_{period}'] = df['low'].pct_change(period)
+
+        # ログリターン
+        df[f'log_return_{period}'] = np.log(df['close'] / df['close'].shift(period))
+
+        # 価格レンジ
+        df[f'hl_ratio_{period}'] = (df['high'] - df['low']) / df['close']
+
+    def _add_intraday(self, df: pd.DataFrame) -> None:
+        """日中価格変動"""
+        df['intraday_range'] = (df['high'] - df['low']) / df['open']
+        df['open_close_ratio'] = df['close'] / df['open']
+        df['high_close_ratio'] = df['high'] / df['close']
+        df['low_close_ratio'] = df['low'] / df['close']
+
+    def _add_gap(self, df: pd.DataFrame) -> None:
+        """ギャップ"""
+        df['gap'] = (df['open'] - df['close'].shift(1)) / df['close'].shift(1)
+        df['gap_filled'] = np.where(
+            (df['gap'] > 0) & (df['low'] <= df['close'].shift(1)), 1,
+            np.where(
+                (df['gap'] < 0) & (df['high'] >= df['close'].shift(1)), 1, 0
             )
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error adding price changes: {e}")
-            raise
-    
-    def _add_time_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        )
+
+    # --- 時間的特徴量 ---
+
+    def _add_time_features(self, df: pd.DataFrame) -> None:
         """時間的特徴量の追加"""
+        # 基本的な時間特徴量
+        df['hour'] = df.index.hour
+        df['day_of_week'] = df.index.dayofweek
+        df['month'] = df.index.month
+        df['quarter'] = df.index.quarter
+        df['day_of_month'] = df.index.day
+        df['week_of_year'] = df.index.isocalendar().week
+
+        # 循環的エンコーディング
+        df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
+        df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
+        df['day_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
+        df['day_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
+        df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
+        df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
+
+        # 市場セッション
+        df['tokyo_session'] = ((df['hour'] >= 0) & (df['hour'] < 9)).astype(int)
+        df['london_session'] = ((df['hour'] >= 8) & (df['hour'] < 16)).astype(int)
+        df['ny_session'] = ((df['hour'] >= 13) & (df['hour'] < 22)).astype(int)
+        df['overlap_london_ny'] = ((df['hour'] >= 13) & (df['hour'] < 16)).astype(int)
+        df['overlap_tokyo_london'] = ((df['hour'] >= 8) & (df['hour'] < 9)).astype(int)
+
+        # 週末・休日フラグ
+        df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
+        df['is_monday'] = (df['day_of_week'] == 0).astype(int)
+        df['is_friday'] = (df['day_of_week'] == 4).astype(int)
+
+        # 月末・月初フラグ
+        df['is_month_end'] = (df['day_of_month'] >= 28).astype(int)
+        df['is_month_start'] = (df['day_of_month'] <= 3).astype(int)
+
+        # 経済指標発表時間フラグ（一般的な時間）
+        df['news_time_jpy'] = ((df['hour'] == 0) | (df['hour'] == 1)).astype(int)  # 日本時間8:30, 9:30
+        df['news_time_eur'] = ((df['hour'] == 9) | (df['hour'] == 10)).astype(int)  # 欧州時間10:00
+        df['news_time_usd'] = ((df['hour'] == 13) | (df['hour'] == 14) | (df['hour'] == 15)).astype(int)  # 米国時間8:30, 10:00
+
+    # --- ボラティリティ指標 ---
+
+    def _add_volatility(self, df: pd.DataFrame, period: int) -> None:
+        """期間別ボラティリティ"""
+        # 価格ボラティリティ（標準偏差）
+        df[f'volatility_{period}'] = df['close'].rolling(period).std()
+        df[f'volatility_{period}_norm'] = df[f'volatility_{period}'] / df['close']
+
+        # パーキンソン推定量（高値・安値を使用）
+        df[f'parkinson_vol_{period}'] = np.sqrt(
+            0.25 * np.log(df['high'] / df['low']).pow(2).rolling(period).mean()
+        )
+
+        # ガーマン・クラス推定量
+        df[f'gk_vol_{period}'] = np.sqrt(
+            np.log(df['high'] / df['close']) * np.log(df['high'] / df['open']) +
+            np.log(df['low'] / df['close']) * np.log(df['low'] / df['open'])
+        ).rolling(period).mean()
+
+        # リターンのレンジ
+        df[f'return_range_{period}'] = (
+            df['close'].rolling(period).max() - df['close'].rolling(period).min()
+        ) / df['close']
+
+    def _add_vix_like(self, df: pd.DataFrame) -> None:
+        """VIXライクな指標（ATRベース）"""
+        df['vix_like'] = df['atr'] / df['close'] * 100
+        df['vix_like_ma'] = df['vix_like'].rolling(20).mean()
+        df['vix_spike'] = (df['vix_like'] > df['vix_like_ma'] * 1.5).astype(int)
+
+    def _add_vol_regime(self, df: pd.DataFrame) -> None:
+        """ボラティリティレジーム"""
+        vol_20 = df['close'].rolling(20).std()
+        vol_60 = df['close'].rolling(60).std()
+        df['vol_regime'] = np.where(vol_20 > vol_60 * 1.2, 1,  # 高ボラティリティ
+                            np.where(vol_20 < vol_60 * 0.8, -1, 0))  # 低ボラティリティ
+
+    # --- 統計的特徴量 ---
+
+    def _add_statistics(self, df: pd.DataFrame, period: int) -> None:
+        """期間別統計量"""
+        # 歪度・尖度
+        df[f'skewness_{period}'] = df['close'].rolling(period).skew()
+        df[f'kurtosis_{period}'] = df['close'].rolling(period).kurt()
+
+        # パーセンタイル
+        df[f'percentile_10_{period}'] = df['close'].rolling(period).quantile(0.1)
+        df[f'percentile_90_{period}'] = df['close'].rolling(period).quantile(0.9)
+        df[f'percentile_position_{period}'] = (
+            df['close'] - df[f'percentile_10_{period}']
+        ) / (df[f'percentile_90_{period}'] - df[f'percentile_10_{period}'])
+
+        # Z-Score
+        df[f'zscore_{period}'] = (
+            df['close'] - df['close'].rolling(period).mean()
+        ) / df['close'].rolling(period).std()
+
+        # 最高値・最安値からの位置
+        df[f'high_position_{period}'] = (
+            df['close'] - df['close'].rolling(period).min()
+        ) / (df['close'].rolling(period).max() - df['close'].rolling(period).min())
+
+    def _add_autocorr(self, df: pd.DataFrame, lag: int) -> None:
+        """自己相関"""
+        df[f'autocorr_{lag}'] = rolling_autocorr(df['close'].to_numpy(), AUTOCORR_WINDOW, lag)
+
+    # --- パターン認識特徴量 ---
+
+    def _add_candle_pattern(self, df: pd.DataFrame, pattern: str) -> None:
+        """ローソク足パターン（計算できないパターンはスキップ）"""
         try:
-            # 基本的な時間特徴量
-            df['hour'] = df.index.hour
-            df['day_of_week'] = df.index.dayofweek
-            df['month'] = df.index.month
-            df['quarter'] = df.index.quarter
-            df['day_of_month'] = df.index.day
-            df['week_of_year'] = df.index.isocalendar().week
-            
-            # 循環的エンコーディング
-            df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-            df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-            df['day_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-            df['day_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
-            df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-            df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
-            
-            # 市場セッション
-            df['tokyo_session'] = ((df['hour'] >= 0) & (df['hour'] < 9)).astype(int)
-            df['london_session'] = ((df['hour'] >= 8) & (df['hour'] < 16)).astype(int)
-            df['ny_session'] = ((df['hour'] >= 13) & (df['hour'] < 22)).astype(int)
-            df['overlap_london_ny'] = ((df['hour'] >= 13) & (df['hour'] < 16)).astype(int)
-            df['overlap_tokyo_london'] = ((df['hour'] >= 8) & (df['hour'] < 9)).astype(int)
-            
-            # 週末・休日フラグ
-            df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
-            df['is_monday'] = (df['day_of_week'] == 0).astype(int)
-            df['is_friday'] = (df['day_of_week'] == 4).astype(int)
-            
-            # 月末・月初フラグ
-            df['is_month_end'] = (df['day_of_month'] >= 28).astype(int)
-            df['is_month_start'] = (df['day_of_month'] <= 3).astype(int)
-            
-            # 経済指標発表時間フラグ（一般的な時間）
-            df['news_time_jpy'] = ((df['hour'] == 0) | (df['hour'] == 1)).astype(int)  # 日本時間8:30, 9:30
-            df['news_time_eur'] = ((df['hour'] == 9) | (df['hour'] == 10)).astype(int)  # 欧州時間10:00
-            df['news_time_usd'] = ((df['hour'] == 13) | (df['hour'] == 14) | (df['hour'] == 15)).astype(int)  # 米国時間8:30, 10:00
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error adding time features: {e}")
-            raise
-    
-    def _add_volatility_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """ボラティリティ特徴量の追加"""
-        try:
-            periods = [5, 10, 20, 50]
-            
-            for period in periods:
-                # 価格ボラティリティ（標準偏差）
-                df[f'volatility_{period}'] = df['close'].rolling(period).std()
-                df[f'volatility_{period}_norm'] = df[f'volatility_{period}'] / df['close']
-                
-                # パーキンソン推定量（高値・安値を使用）
-                df[f'parkinson_vol_{period}'] = np.sqrt(
-                    0.25 * np.log(df['high'] / df['low']).pow(2).rolling(period).mean()
-                )
-                
-                # ガーマン・クラス推定量
-                df[f'gk_vol_{period}'] = np.sqrt(
-                    np.log(df['high'] / df['close']) * np.log(df['high'] / df['open']) +
-                    np.log(df['low'] / df['close']) * np.log(df['low'] / df['open'])
-                ).rolling(period).mean()
-                
-                # リターンのレンジ
-                df[f'return_range_{period}'] = (
-                    df['close'].rolling(period).max() - df['close'].rolling(period).min()
-                ) / df['close']
-                
-            # VIXライクな指標（ATRベース）
-            df['vix_like'] = df['atr'] / df['close'] * 100
-            df['vix_like_ma'] = df['vix_like'].rolling(20).mean()
-            df['vix_spike'] = (df['vix_like'] > df['vix_like_ma'] * 1.5).astype(int)
-            
-            # ボラティリティレジーム
-            vol_20 = df['close'].rolling(20).std()
-            vol_60 = df['close'].rolling(60).std()
-            df['vol_regime'] = np.where(vol_20 > vol_60 * 1.2, 1,  # 高ボラティリティ
-                                np.where(vol_20 < vol_60 * 0.8, -1, 0))  # 低ボラティリティ
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error adding volatility features: {e}")
-            raise
-    
-    def _add_statistical_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """統計的特徴量の追加"""
-        try:
-            periods = [10, 20, 50]
-            
-            for period in periods:
-                # 歪度・尖度
-                df[f'skewness_{period}'] = df['close'].rolling(period).skew()
-                df[f'kurtosis_{period}'] = df['close'].rolling(period).kurt()
-                
-                # パーセンタイル
-                df[f'percentile_10_{period}'] = df['close'].rolling(period).quantile(0.1)
-                df[f'percentile_90_{period}'] = df['close'].rolling(period).quantile(0.9)
-                df[f'percentile_position_{period}'] = (
-                    df['close'] - df[f'percentile_10_{period}']
-                ) / (df[f'percentile_90_{period}'] - df[f'percentile_10_{period}'])
-                
-                # Z-Score
-                df[f'zscore_{period}'] = (
-                    df['close'] - df['close'].rolling(period).mean()
-                ) / df['close'].rolling(period).std()
-                
-                # 最高値・最安値からの位置
-                df[f'high_position_{period}'] = (
-                    df['close'] - df['close'].rolling(period).min()
-                ) / (df['close'].rolling(period).max() - df['close'].rolling(period).min())
-                
-            # 自己相関
-            for lag in [1, 5, 10]:
-                df[f'autocorr_{lag}'] = df['close'].rolling(50).apply(
-                    lambda x: x.autocorr(lag=lag), raw=False
-                )
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error adding statistical features: {e}")
-            raise
-    
-    def _add_pattern_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """パターン認識特徴量の追加"""
-        try:
-            # TALIBのパターン認識関数
-            pattern_functions = [
-                'CDL2CROWS', 'CDL3BLACKCROWS', 'CDL3INSIDE', 'CDL3LINESTRIKE',
-                'CDL3OUTSIDE', 'CDL3STARSINSOUTH', 'CDL3WHITESOLDIERS',
-                'CDLABANDONEDBABY', 'CDLADVANCEBLOCK', 'CDLBELTHOLD',
-                'CDLBREAKAWAY', 'CDLCLOSINGMARUBOZU', 'CDLCONCEALBABYSWALL',
-                'CDLCOUNTERATTACK', 'CDLDARKCLOUDCOVER', 'CDLDOJI',
-                'CDLDOJISTAR', 'CDLDRAGONFLYDOJI', 'CDLENGULFING',
-                'CDLEVENINGDOJISTAR', 'CDLEVENINGSTAR', 'CDLGAPSIDESIDEWHITE',
-                'CDLGRAVESTONEDOJI', 'CDLHAMMER', 'CDLHANGINGMAN',
-                'CDLHARAMI', 'CDLHARAMICROSS', 'CDLHIGHWAVE', 'CDLHIKKAKE',
-                'CDLHIKKAKEMOD', 'CDLHOMINGPIGEON', 'CDLIDENTICAL3CROWS',
-                'CDLINNECK', 'CDLINVERTEDHAMMER', 'CDLKICKING',
-                'CDLKICKINGBYLENGTH', 'CDLLADDERBOTTOM', 'CDLLONGLEGGEDDOJI',
-                'CDLLONGLINE', 'CDLMARUBOZU', 'CDLMATCHINGLOW',
-                'CDLMATHOLD', 'CDLMORNINGDOJISTAR', 'CDLMORNINGSTAR',
-                'CDLONNECK', 'CDLPIERCING', 'CDLRICKSHAWMAN',
-                'CDLRISEFALL3METHODS', 'CDLSEPARATINGLINES', 'CDLSHOOTINGSTAR',
-                'CDLSHORTLINE', 'CDLSPINNINGTOP', 'CDLSTALLEDPATTERN',
-                'CDLSTICKSANDWICH', 'CDLTAKURI', 'CDLTASUKIGAP',
-                'CDLTHRUSTING', 'CDLTRISTAR', 'CDLUNIQUE3RIVER',
-                'CDLUPSIDEGAP2CROWS', 'CDLXSIDEGAP3METHODS'
-            ]
-            
-            pattern_scores = []
-            for pattern in pattern_functions[:20]:  # 上位20パターンのみ使用（計算量削減）
-                try:
-                    pattern_func = getattr(talib, pattern)
-                    df[f'pattern_{pattern.lower()}'] = pattern_func(
-                        df['open'], df['high'], df['low'], df['close']
-                    )
-                    pattern_scores.append(f'pattern_{pattern.lower()}')
-                except:
-                    continue
-            
-            # パターンスコアの合計
-            if pattern_scores:
-                df['pattern_bull_score'] = df[pattern_scores].apply(
-                    lambda x: (x > 0).sum(), axis=1
-                )
-                df['pattern_bear_score'] = df[pattern_scores].apply(
-                    lambda x: (x < 0).sum(), axis=1
-                )
-                df['pattern_net_score'] = df['pattern_bull_score'] - df['pattern_bear_score']
-            
-            # 価格パターン
-            df['higher_high'] = (
-                (df['high'] > df['high'].shift(1)) & 
-                (df['high'].shift(1) > df['high'].shift(2))
-            ).astype(int)
-            
-            df['lower_low'] = (
-                (df['low'] < df['low'].shift(1)) & 
-                (df['low'].shift(1) < df['low'].shift(2))
-            ).astype(int)
-            
-            df['inside_bar'] = (
-                (df['high'] <= df['high'].shift(1)) & 
-                (df['low'] >= df['low'].shift(1))
-            ).astype(int)
-            
-            df['outside_bar'] = (
-                (df['high'] >= df['high'].shift(1)) & 
-                (df['low'] <= df['low'].shift(1))
-            ).astype(int)
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error adding pattern features: {e}")
-            raise
-    
+            pattern_func = getattr(talib, pattern)
+            df[f'pattern_{pattern.lower()}'] = pattern_func(
+                df['open'], df['high'], df['low'], df['close']
+            )
+        except Exception:
+            pass
+
+    def _add_pattern_scores(self, df: pd.DataFrame, pattern_columns: List[str]) -> None:
+        """パターンスコアの合計"""
+        pattern_columns = [col for col in pattern_columns if col in df.columns]
+        if pattern_columns:
+            bull_score, bear_score = pattern_counts(df[pattern_columns].to_numpy())
+            df['pattern_bull_score'] = bull_score
+            df['pattern_bear_score'] = bear_score
+            df['pattern_net_score'] = df['pattern_bull_score'] - df['pattern_bear_score']
+
+    def _add_price_patterns(self, df: pd.DataFrame) -> None:
+        """価格パターン"""
+        df['higher_high'] = (
+            (df['high'] > df['high'].shift(1)) &
+            (df['high'].shift(1) > df['high'].shift(2))
+        ).astype(int)
+
+        df['lower_low'] = (
+            (df['low'] < df['low'].shift(1)) &
+            (df['low'].shift(1) < df['low'].shift(2))
+        ).astype(int)
+
+        df['inside_bar'] = (
+            (df['high'] <= df['high'].shift(1)) &
+            (df['low'] >= df['low'].shift(1))
+        ).astype(int)
+
+        df['outside_bar'] = (
+            (df['high'] >= df['high'].shift(1)) &
+            (df['low'] <= df['low'].shift(1))
+        ).astype(int)
+
     def _update_feature_columns(self, df: pd.DataFrame):
         """特徴量カラムリストを更新"""
         exclude_columns = ['open', 'high', 'low', 'close', 'volume', 'time', 
@@ -160,7 +160,8 @@ class LightGBMPredictor:
     def train(self, X: pd.DataFrame, y: pd.Series, 
               validation_split: float = 0.2,
               early_stopping_rounds: int = 50,
-              num_boost_round: int = 1000) -> Dict[str, Any]:
+              num_boost_round: int = 1000,
+              init_model: Optional[lgb.Booster] = None) -> Dict[str, Any]:
         """
         モデル学習
         
@@ -170,6 +171,7 @@ class LightGBMPredictor:
             validation_split: 検証データ分割比率
             early_stopping_rounds: 早期停止ラウンド数
             num_boost_round: 最大ブースティングラウンド数
+            init_model: 続きから学習する既存のブースター（ウォームスタート）
             
         Returns:
             学習結果メトリクス
@@ -205,6 +207,7 @@ class LightGBMPredictor:
                 valid_sets=[train_data, val_data],
                 valid_names=['train', 'eval'],
                 num_boost_round=num_boost_round,
+                init_model=init_model,
                 callbacks=callbacks
             )
             
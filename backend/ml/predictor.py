@@ -12,7 +12,9 @@ from pathlib import Path
 
 from backend.core.mt5_client import MT5Client
 from backend.core.database import DatabaseManager
+from backend.core.bar_scheduler import get_bar_scheduler
 from backend.ml.features import FeatureEngineering
+from backend.ml.streaming_features import StreamingFeatureEngine
 from backend.ml.models.lightgbm_model import LightGBMPredictor
 
 logger = logging.getLogger(__name__)
@@ -24,10 +26,14 @@ class RealTimePredictionService:
         self.db_manager = db_manager
         self.mt5_client = mt5_client
         self.feature_engine = FeatureEngineering()
+        self.streaming_features = StreamingFeatureEngine()
+        self.use_streaming_features = True  # 最新足のみインクリメンタルに特徴量更新
         self.active_models = {}  # {symbol_timeframe: model}
         self.prediction_cache = {}  # キャッシュ
         self.is_running = False
-        self.prediction_interval = 60  # 秒
+        self.prediction_interval = 60  # 秒（use_bar_scheduler=False の場合）
+        self.use_bar_scheduler = True  # 足確定時のみ予測
+        self._bar_subscriptions: List[int] = []
         
     async def start_prediction_service(self):
         """予測サービス開始"""
@@ -42,13 +48,33 @@ class RealTimePredictionService:
         await self._load_active_models()
         
         # 予測ループ開始
-        asyncio.create_task(self._prediction_loop())
+        if self.use_bar_scheduler:
+            self._subscribe_bar_close()
+        else:
+            asyncio.create_task(self._prediction_loop())
     
     async def stop_prediction_service(self):
         """予測サービス停止"""
         self.is_running = False
+        scheduler = get_bar_scheduler()
+        for subscription_id in self._bar_subscriptions:
+            scheduler.unsubscribe(subscription_id)
+        self._bar_subscriptions = []
         logger.info("Stopping real-time prediction service")
     
+    def _subscribe_bar_close(self):
+        """アクティブモデル毎に足確定時の予測を登録"""
+        scheduler = get_bar_scheduler()
+        for model_info in self.active_models.values():
+            async def on_bar_close(event: Dict[str, Any], model_info: Dict[str, Any] = model_info):
+                if self.is_running:
+                    await self._predict_for_model(model_info)
+            
+            self._bar_subscriptions.append(scheduler.subscribe(
+                model_info['symbol'], model_info['timeframe'], on_bar_close, fire_immediately=True
+            ))
+        scheduler.start()
+    
     async def _load_active_models(self):
         """アクティブなモデルを読み込み"""
         try:
@@ -122,20 +148,28 @@ class RealTimePredictionService:
             timeframe = model_info['timeframe']
             model = model_info['model']
             
-            # 最新データ取得
-            df = self.mt5_client.get_rates(symbol, timeframe, count=500)
-            if df is None or len(df) < 200:
+            # 最新データ取得（初回500本、ウォームアップ後は直近の足のみ）
+            count = 500
+            if self.use_streaming_features:
+                count = self.streaming_features.bars_needed(symbol, timeframe, full=500)
+            df = self.mt5_client.get_rates(symbol, timeframe, count=count)
+            if df is None or len(df) < min(count, 200):
                 logger.warning(f"Insufficient data for {symbol} {timeframe}")
                 return
             
-            # 特徴量生成
-            features_df = self.feature_engine.create_features(df)
-            if features_df.empty:
+            # 特徴量生成（最新行のみ）
+            if self.use_streaming_features:
+                features_df = self.streaming_features.update_from_frame(symbol, timeframe, df)
+            else:
+                features_df = self.feature_engine.create_features(
+                    df, columns=model.feature_columns
+                ).tail(1)
+            if features_df is None or features_df.empty:
                 logger.warning(f"Feature generation failed for {symbol} {timeframe}")
                 return
             
             # 最新レコードで予測
-            latest_features = features_df.tail(1)[model.feature_columns]
+            latest_features = features_df[model.feature_columns]
             
             # 予測実行
             if hasattr(model, 'predict_with_confidence'):
@@ -0,0 +1,125 @@
+"""
+ベクトル化ローリング統計量
+
+rolling().apply() や apply(axis=1) のように窓・行ごとにPythonへ戻る処理を、
+スライディングウィンドウ（ストライドビュー）上の一括演算に置き換える。
+巨大な一時配列を避けるため、窓はチャンク単位で処理する。
+歪度・尖度・分位点はpandasのrolling実装（コンパイル済み）の方が速いためそちらを使う。
+"""
+import logging
+from typing import Iterator, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# 1チャンクあたりの窓数（一時配列 = チャンク数 × 窓長 × 8バイト）
+DEFAULT_CHUNK_SIZE = 16384
+
+
+def _iter_windows(values: np.ndarray,
+                  window: int,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, np.ndarray]]:
+    """(出力位置, 窓のビュー[チャンク数, 窓長]) を順に返す"""
+    windows = sliding_window_view(values, window)
+    for start in range(0, len(windows), chunk_size):
+        yield start + window - 1, windows[start:start + chunk_size]
+
+
+def rolling_autocorr(values: Sequence[float],
+                     window: int,
+                     lag: int,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    ローリング自己相関
+
+    rolling(window).apply(lambda x: x.autocorr(lag)) と同じ値を返す。
+
+    Args:
+        values: 系列
+        window: 窓長
+        lag: ラグ
+        chunk_size: 1回に処理する窓数
+
+    Returns:
+        自己相関（先頭window-1本とNaNを含む窓はNaN）
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if lag <= 0 or lag >= window or len(values) < window:
+        return result
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for end, windows in _iter_windows(values, window, chunk_size):
+            x = windows[:, lag:]
+            y = windows[:, :-lag]
+            x = x - x.mean(axis=1, keepdims=True)
+            y = y - y.mean(axis=1, keepdims=True)
+            numerator = np.einsum('ij,ij->i', x, y)
+            denominator = np.sqrt(np.einsum('ij,ij->i', x, x) * np.einsum('ij,ij->i', y, y))
+            corr = np.clip(numerator / denominator, -1.0, 1.0)
+            result[end:end + len(corr)] = np.where(denominator == 0, np.nan, corr)
+
+    return result
+
+
+def pattern_counts(patterns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ローソク足パターンの強気・弱気シグナル数
+
+    Args:
+        patterns: パターン認識結果 [本数, パターン数]
+
+    Returns:
+        (強気パターン数, 弱気パターン数)
+    """
+    patterns = np.asarray(patterns)
+    bull = (patterns > 0).sum(axis=1).astype(np.int64)
+    bear = (patterns < 0).sum(axis=1).astype(np.int64)
+    return bull, bear
+
+
+if __name__ == "__main__":
+    # ベンチマーク（10万本）
+    import time
+    import pandas as pd
+
+    logging.basicConfig(level=logging.INFO)
+
+    num_bars = 100000
+    np.random.seed(42)
+    close = pd.Series(100 + np.cumsum(np.random.randn(num_bars) * 0.1))
+    patterns = pd.DataFrame(np.random.choice([-100, 0, 0, 0, 100], size=(num_bars, 20)))
+
+    def measure(func):
+        start = time.perf_counter()
+        result = func()
+        return time.perf_counter() - start, result
+
+    # rolling().apply()は遅いため一部の本数で計測し10万本に換算
+    sample = close.iloc[:5000]
+    legacy_time, _ = measure(lambda: sample.rolling(50).apply(lambda x: x.autocorr(lag=1), raw=False))
+    legacy_time *= num_bars / len(sample)
+    vector_time, _ = measure(lambda: rolling_autocorr(close.to_numpy(), 50, 1))
+    print(f"autocorr (x1 lag): rolling.apply ~{legacy_time:.2f}s, vectorized {vector_time:.3f}s "
+          f"({legacy_time / vector_time:.0f}x)")
+
+    legacy_time, _ = measure(lambda: (patterns.apply(lambda x: (x > 0).sum(), axis=1),
+                                      patterns.apply(lambda x: (x < 0).sum(), axis=1)))
+    vector_time, _ = measure(lambda: pattern_counts(patterns.to_numpy()))
+    print(f"pattern scores: apply(axis=1) {legacy_time:.2f}s, vectorized {vector_time:.4f}s "
+          f"({legacy_time / vector_time:.0f}x)")
+
+    from backend.ml.features import FeatureEngineering
+
+    dates = pd.date_range('2010-01-01', periods=num_bars, freq='H')
+    sample_data = pd.DataFrame({
+        'open': close.to_numpy() + np.random.randn(num_bars) * 0.05,
+        'high': close.to_numpy() + np.abs(np.random.randn(num_bars) * 0.1),
+        'low': close.to_numpy() - np.abs(np.random.randn(num_bars) * 0.1),
+        'close': close.to_numpy(),
+        'volume': np.random.randint(1000, 10000, num_bars)
+    }, index=dates)
+    feature_time, _ = measure(lambda: FeatureEngineering().create_features(sample_data))
+    print(f"create_features ({num_bars} bars): {feature_time:.2f}s")
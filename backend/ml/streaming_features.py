@@ -0,0 +1,1074 @@
+"""
+インクリメンタル特徴量計算（ストリーミング）
+
+ライブ取引・リアルタイム予測では最新足の特徴量しか使わないため、
+通貨ペア×時間軸ごとにリングバッファと指標の内部状態を保持し、
+新しい足1本ごとに最新行だけを更新する。
+計算式は FeatureEngineering.create_features（TA-Lib準拠）と一致させている。
+"""
+import logging
+import math
+import time
+from typing import Dict, Optional, Any, Tuple
+
+import numpy as np
+import pandas as pd
+import talib
+import talib.abstract
+
+from backend.ml.features import (
+    FeatureEngineering, PATTERN_FUNCTIONS, PATTERN_LIMIT,
+    PRICE_CHANGE_PERIODS, VOLATILITY_PERIODS, STATISTICAL_PERIODS,
+    AUTOCORR_LAGS, AUTOCORR_WINDOW
+)
+
+logger = logging.getLogger(__name__)
+
+# TA-Libのゼロ判定閾値
+TA_EPSILON = 0.00000001
+
+# 特徴量計算に必要な最小データ数（FeatureEngineering._validate_inputと同じ）
+MIN_BARS = 200
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _div(a: float, b: float) -> float:
+    """ゼロ除算時にNumPyと同じくinf/NaNを返す除算"""
+    if b == 0:
+        if a == 0 or a != a:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+def _is_zero(value: float) -> bool:
+    return -TA_EPSILON < value < TA_EPSILON
+
+
+class RingBuffer:
+    """固定長リングバッファ（末尾k件を連続ビューで取得可能）"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.full(capacity * 2, np.nan)
+        self._end = 0
+
+    def __len__(self) -> int:
+        return min(self._end, self.capacity)
+
+    def append(self, value: float) -> None:
+        if self._end == len(self._data):
+            # 末尾capacity件を先頭へ詰め直す（償却O(1)）
+            self._data[:self.capacity] = self._data[self._end - self.capacity:self._end]
+            self._end = self.capacity
+        self._data[self._end] = value
+        self._end += 1
+
+    def pop(self) -> None:
+        """末尾1件を取り消す"""
+        self._end -= 1
+
+    def last(self, offset: int = 1) -> float:
+        """末尾からoffset番目の値（データ不足時はNaN）"""
+        if offset > len(self):
+            return math.nan
+        return float(self._data[self._end - offset])
+
+    def tail(self, k: int) -> Optional[np.ndarray]:
+        """末尾k件のビュー（データ不足時はNone）"""
+        if k > len(self):
+            return None
+        return self._data[self._end - k:self._end]
+
+
+class _State:
+    """指標の内部状態（未確定足の置き換え用に複製可能）"""
+
+    def copy(self) -> '_State':
+        state = object.__new__(type(self))
+        state.__dict__.update(self.__dict__)
+        return state
+
+
+class _SMA(_State):
+    """単純移動平均（TA-Libと同じ累積和方式）"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, buffer: RingBuffer) -> float:
+        self.total += buffer.last()
+        self.count += 1
+        if self.count < self.period:
+            return math.nan
+        value = self.total / self.period
+        self.total -= buffer.last(self.period)
+        return value
+
+
+class _EMA(_State):
+    """指数移動平均（先頭period本の単純平均を初期値とする）"""
+
+    def __init__(self, period: int, skip: int = 0):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.skip = skip
+        self.count = 0
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        n = self.count - self.skip
+        if n <= 0:
+            return math.nan
+        if n < self.period:
+            self.value = (0.0 if n == 1 else self.value) + x
+            return math.nan
+        if n == self.period:
+            self.value = ((0.0 if n == 1 else self.value) + x) / self.period
+        else:
+            self.value = ((x - self.value) * self.k) + self.value
+        return self.value
+
+
+class _RSI(_State):
+    """RSI（Wilder平滑化）"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.prev = math.nan
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def update(self, x: float) -> float:
+        self.count += 1
+        if self.count == 1:
+            self.prev = x
+            return math.nan
+
+        diff = x - self.prev
+        self.prev = x
+
+        if self.count <= self.period + 1:
+            if diff < 0:
+                self.loss -= diff
+            else:
+                self.gain += diff
+            if self.count < self.period + 1:
+                return math.nan
+            self.loss /= self.period
+            self.gain /= self.period
+        else:
+            self.loss *= (self.period - 1)
+            self.gain *= (self.period - 1)
+            if diff < 0:
+                self.loss -= diff
+            else:
+                self.gain += diff
+            self.loss /= self.period
+            self.gain /= self.period
+
+        total = self.gain + self.loss
+        return 100.0 * (self.gain / total) if not _is_zero(total) else 0.0
+
+
+class _ATR(_State):
+    """ATR（Wilder平滑化）"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, true_range: float) -> float:
+        self.count += 1
+        if self.count == 1:
+            return math.nan
+        n = self.count - 1
+        if n < self.period:
+            self.value += true_range
+            return math.nan
+        if n == self.period:
+            self.value = (self.value + true_range) / self.period
+        else:
+            self.value *= (self.period - 1)
+            self.value += true_range
+            self.value /= self.period
+        return self.value
+
+
+class _DMI(_State):
+    """+DI/-DI/DX/ADX（Wilder平滑化）"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.prev_high = math.nan
+        self.prev_low = math.nan
+        self.prev_close = math.nan
+        self.plus_dm = 0.0
+        self.minus_dm = 0.0
+        self.tr = 0.0
+        self.dx = 0.0
+        self.sum_dx = 0.0
+        self.adx = math.nan
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float, float]:
+        self.count += 1
+        n = self.count - 1
+        nan4 = (math.nan, math.nan, math.nan, math.nan)
+
+        if n == 0:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return nan4
+
+        diff_p = high - self.prev_high
+        diff_m = self.prev_low - low
+        plus_dm = diff_p if (diff_p > 0 and diff_p > diff_m) else 0.0
+        minus_dm = diff_m if (diff_m > 0 and diff_p < diff_m) else 0.0
+
+        true_range = high - low
+        candidate = abs(high - self.prev_close)
+        if candidate > true_range:
+            true_range = candidate
+        candidate = abs(low - self.prev_close)
+        if candidate > true_range:
+            true_range = candidate
+
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        if n < self.period:
+            self.plus_dm += plus_dm
+            self.minus_dm += minus_dm
+            self.tr += true_range
+            return nan4
+
+        period = self.period
+        self.plus_dm = self.plus_dm - (self.plus_dm / period) + plus_dm
+        self.minus_dm = self.minus_dm - (self.minus_dm / period) + minus_dm
+        self.tr = self.tr - (self.tr / period) + true_range
+
+        dx_value = None
+        if not _is_zero(self.tr):
+            plus_di = 100.0 * (self.plus_dm / self.tr)
+            minus_di = 100.0 * (self.minus_dm / self.tr)
+            di_sum = minus_di + plus_di
+            if not _is_zero(di_sum):
+                dx_value = 100.0 * (abs(minus_di - plus_di) / di_sum)
+        else:
+            plus_di = 0.0
+            minus_di = 0.0
+
+        # DXは算出不能時に前回値を保持（初回は0）
+        if dx_value is not None:
+            self.dx = dx_value
+        elif n == period:
+            self.dx = 0.0
+
+        # ADXは最初のperiod本のDX平均を初期値とする
+        if n < 2 * period:
+            if dx_value is not None:
+                self.sum_dx += dx_value
+            if n == 2 * period - 1:
+                self.adx = self.sum_dx / period
+        elif dx_value is not None:
+            self.adx = ((self.adx * (period - 1)) + dx_value) / period
+
+        return plus_di, minus_di, self.dx, self.adx
+
+
+class _SAR(_State):
+    """パラボリックSAR"""
+
+    def __init__(self, acceleration: float, maximum: float):
+        if acceleration > maximum:
+            acceleration = maximum
+        self.acceleration = acceleration
+        self.maximum = maximum
+        self.count = 0
+        self.is_long = True
+        self.af = acceleration
+        self.ep = math.nan
+        self.sar = math.nan
+        self.prev_high = math.nan
+        self.prev_low = math.nan
+
+    def update(self, high: float, low: float) -> float:
+        self.count += 1
+        if self.count == 1:
+            self.prev_high, self.prev_low = high, low
+            return math.nan
+
+        if self.count == 2:
+            # 最初の2本の-DMで初期方向を決定
+            diff_p = high - self.prev_high
+            diff_m = self.prev_low - low
+            minus_dm = diff_m if (diff_m > 0 and diff_p < diff_m) else 0.0
+            self.is_long = not (minus_dm > 0)
+            if self.is_long:
+                self.ep = high
+                self.sar = self.prev_low
+            else:
+                self.ep = low
+                self.sar = self.prev_high
+            prev_high, prev_low = high, low
+        else:
+            prev_high, prev_low = self.prev_high, self.prev_low
+
+        self.prev_high, self.prev_low = high, low
+        acc, maximum = self.acceleration, self.maximum
+
+        if self.is_long:
+            if low <= self.sar:
+                # 売りへ転換
+                self.is_long = False
+                sar = max(self.ep, prev_high, high)
+                output = sar
+                self.af = acc
+                self.ep = low
+                sar = sar + self.af * (self.ep - sar)
+                self.sar = max(sar, prev_high, high)
+            else:
+                output = self.sar
+                if high > self.ep:
+                    self.ep = high
+                    self.af = min(self.af + acc, maximum)
+                sar = self.sar + self.af * (self.ep - self.sar)
+                self.sar = min(sar, prev_low, low)
+        else:
+            if high >= self.sar:
+                # 買いへ転換
+                self.is_long = True
+                sar = min(self.ep, prev_low, low)
+                output = sar
+                self.af = acc
+                self.ep = high
+                sar = sar + self.af * (self.ep - sar)
+                self.sar = min(sar, prev_low, low)
+            else:
+                output = self.sar
+                if low < self.ep:
+                    self.ep = low
+                    self.af = min(self.af + acc, maximum)
+                sar = self.sar + self.af * (self.ep - self.sar)
+                self.sar = max(sar, prev_high, high)
+
+        return output
+
+
+class _OBV(_State):
+    """OBV"""
+
+    def __init__(self):
+        self.value = math.nan
+
+    def update(self, close: float, prev_close: float, volume: float) -> float:
+        if math.isnan(self.value):
+            self.value = volume
+        elif close > prev_close:
+            self.value += volume
+        elif close < prev_close:
+            self.value -= volume
+        return self.value
+
+
+class _BollingerStd(_State):
+    """ボリンジャーバンド用の標準偏差（TA-Libと同じ二乗和方式）"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.total2 = 0.0
+        self.count = 0
+
+    def update(self, buffer: RingBuffer, middle: float) -> float:
+        x = buffer.last()
+        self.total2 += x * x
+        self.count += 1
+        if self.count < self.period:
+            return math.nan
+        mean2 = self.total2 / self.period
+        oldest = buffer.last(self.period)
+        self.total2 -= oldest * oldest
+        mean2 -= middle * middle
+        return math.sqrt(mean2) if mean2 >= TA_EPSILON else 0.0
+
+
+def _window_mean(values: Optional[np.ndarray]) -> float:
+    """ウィンドウ平均（データ不足時はNaN）"""
+    if values is None:
+        return math.nan
+    return float(values.sum()) / len(values)
+
+
+class _WindowStats:
+    """終値ウィンドウの統計量（足1本の計算中に期間ごとに1回だけ算出）"""
+
+    __slots__ = ('n', 'sorted', 'low', 'high', 'mean', 'centered', 'sum2', 'std')
+
+    def __init__(self, values: np.ndarray):
+        n = len(values)
+        self.n = n
+        self.sorted = np.sort(values)
+        self.low = float(self.sorted[0])
+        self.high = float(self.sorted[-1])
+        self.mean = float(values.sum()) / n
+        self.centered = values - self.mean
+        self.sum2 = float(self.centered.dot(self.centered))
+        self.std = math.sqrt(self.sum2 / (n - 1))
+
+    def skew(self) -> float:
+        """歪度（pandas rolling().skew()相当）"""
+        n = self.n
+        if self.low == self.high:
+            return 0.0
+        m2 = self.sum2 / n
+        if m2 <= 1e-14:
+            return math.nan
+        m3 = float((self.centered * self.centered).dot(self.centered)) / n
+        return (math.sqrt(n * (n - 1)) * m3) / ((n - 2) * m2 ** 1.5)
+
+    def kurt(self) -> float:
+        """尖度（pandas rolling().kurt()相当）"""
+        n = self.n
+        if self.low == self.high:
+            return -3.0
+        m2 = self.sum2 / n
+        if m2 <= 1e-14:
+            return math.nan
+        squared = self.centered * self.centered
+        m4 = float(squared.dot(squared)) / n
+        k = (n * n - 1.0) * m4 / (m2 * m2) - 3.0 * ((n - 1.0) ** 2)
+        return k / ((n - 2.0) * (n - 3.0))
+
+    def quantile(self, quantile: float) -> float:
+        """分位点（線形補間、pandas rolling().quantile()相当）"""
+        position = quantile * (self.n - 1)
+        idx = int(position)
+        low = float(self.sorted[idx])
+        if idx == position:
+            return low
+        high = float(self.sorted[idx + 1])
+        return low + (high - low) * (position - idx)
+
+
+def _autocorr(values: Optional[np.ndarray], lag: int) -> float:
+    """自己相関（pandas Series.autocorr相当）"""
+    if values is None:
+        return math.nan
+    x = values[lag:] - values[lag:].mean()
+    y = values[:-lag] - values[:-lag].mean()
+    denominator = math.sqrt(float(x.dot(x)) * float(y.dot(y)))
+    if denominator == 0:
+        return math.nan
+    return max(-1.0, min(1.0, float(x.dot(y)) / denominator))
+
+
+def _cross(current: float, current_ref: float, prev: float, prev_ref: float) -> int:
+    """ゴールデンクロス=1 / デッドクロス=-1"""
+    if current > current_ref and prev <= prev_ref:
+        return 1
+    if current < current_ref and prev >= prev_ref:
+        return -1
+    return 0
+
+
+class _SymbolStream:
+    """1つの通貨ペア×時間軸の特徴量状態"""
+
+    def __init__(self, config: Dict[str, Any], capacity: int, has_volume: bool):
+        self.config = config
+        self.capacity = capacity
+        self.has_volume = has_volume
+        self.patterns = PATTERN_FUNCTIONS[:PATTERN_LIMIT]
+        self.pattern_window = max(
+            talib.abstract.Function(name).lookback for name in self.patterns
+        ) + 1
+
+        self.buffers: Dict[str, RingBuffer] = {}
+        for name in ['open', 'high', 'low', 'close', 'volume',
+                     'bb_width', 'vix_like', 'log_hl_sq', 'gk', 'obv',
+                     'fastk', 'stoch_k', 'mfi_pos', 'mfi_neg', 'tp',
+                     'macd', 'macd_signal', 'stoch_d', 'stoch_k_out']:
+            self.buffers[name] = RingBuffer(capacity)
+        for period in config['sma']:
+            self.buffers[f'sma_{period}'] = RingBuffer(capacity)
+        for period in config['rsi']:
+            self.buffers[f'rsi_{period}'] = RingBuffer(capacity)
+
+        self.states: Dict[str, Any] = {}
+        for period in config['sma']:
+            self.states[f'sma_{period}'] = _SMA(period)
+        for period in config['ema']:
+            self.states[f'ema_{period}'] = _EMA(period)
+        for period in config['rsi']:
+            self.states[f'rsi_{period}'] = _RSI(period)
+        # MACDの短期EMAはTA-Lib同様に長期EMAと同じ足から開始する
+        macd_config = config['macd']
+        fast, slow = sorted((macd_config['fast'], macd_config['slow']))
+        self.states['macd_fast'] = _EMA(fast, skip=slow - fast)
+        self.states['macd_slow'] = _EMA(slow)
+        self.states['macd_signal'] = _EMA(macd_config['signal'])
+        bb_period = config['bollinger']['period']
+        self.states['bb_middle'] = _SMA(bb_period)
+        self.states['bb_std'] = _BollingerStd(bb_period)
+        self.states['atr'] = _ATR(config['atr'])
+        stoch_config = config['stoch']
+        self.states['slowk'] = _SMA(stoch_config['d'])
+        self.states['slowd'] = _SMA(stoch_config['d'])
+        self.states['dmi'] = _DMI(config['adx'])
+        self.states['obv'] = _OBV()
+        self.states['obv_sma'] = _SMA(20)
+        sar_config = config['sar']
+        self.states['sar'] = _SAR(sar_config['acceleration'], sar_config['maximum'])
+
+        self.last_valid: Dict[str, Any] = {}
+        self.bar_count = 0
+        self.last_time: Optional[pd.Timestamp] = None
+        self.last_row: Optional[Dict[str, Any]] = None
+        self._snapshot: Optional[Tuple[Dict[str, Any], Dict[str, Any], int, Any]] = None
+
+    def update(self, bar_time: pd.Timestamp, bar: Dict[str, Any]) -> Dict[str, Any]:
+        """足1本を反映（直前と同時刻なら未確定足の更新として置き換え）"""
+        if self.last_time is not None and bar_time == self.last_time:
+            if self._same_bar(bar):
+                return self.last_row
+            self._rollback()
+        elif self.last_time is not None and bar_time < self.last_time:
+            raise ValueError(f"Bar time {bar_time} is older than {self.last_time}")
+
+        self._snapshot = (
+            {key: state.copy() for key, state in self.states.items()},
+            dict(self.last_valid),
+            self.bar_count,
+            self.last_time
+        )
+
+        for name in OHLCV_COLUMNS:
+            self.buffers[name].append(float(bar.get(name, math.nan)))
+        self.bar_count += 1
+        self.last_time = bar_time
+
+        raw = self._compute(bar_time, bar)
+        self.last_row = self._fill_missing(raw)
+        return self.last_row
+
+    def _same_bar(self, bar: Dict[str, Any]) -> bool:
+        for name in OHLCV_COLUMNS:
+            value = float(bar.get(name, math.nan))
+            last = self.buffers[name].last()
+            if value != last and not (math.isnan(value) and math.isnan(last)):
+                return False
+        return all(self.last_row.get(key) == value for key, value in bar.items()
+                   if key not in OHLCV_COLUMNS)
+
+    def _rollback(self) -> None:
+        """直前の足を取り消す"""
+        states, last_valid, bar_count, last_time = self._snapshot
+        for buffer in self.buffers.values():
+            buffer.pop()
+        self.states = states
+        self.last_valid = last_valid
+        self.bar_count = bar_count
+        self.last_time = last_time
+        self._snapshot = None
+
+    def _fill_missing(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        """欠損値処理（前方補完→0補完→無限大を0、create_featuresと同じ順序）"""
+        row = {}
+        last_valid = self.last_valid
+        for key, value in raw.items():
+            if value != value:
+                value = last_valid.get(key, 0.0)
+            else:
+                last_valid[key] = value
+            if value == math.inf or value == -math.inf:
+                value = 0.0
+            row[key] = value
+        return row
+
+    def _compute(self, bar_time: pd.Timestamp, bar: Dict[str, Any]) -> Dict[str, Any]:
+        """最新足の特徴量（欠損値処理前）"""
+        b = self.buffers
+        o = b['open'].last()
+        h = b['high'].last()
+        l = b['low'].last()
+        c = b['close'].last()
+        v = b['volume'].last()
+        prev_close = b['close'].last(2)
+
+        row: Dict[str, Any] = {'open': o, 'high': h, 'low': l, 'close': c}
+        if self.has_volume:
+            row['volume'] = v
+        for key, value in bar.items():
+            if key not in OHLCV_COLUMNS:
+                row[key] = value
+
+        self._stats: Dict[int, Optional[_WindowStats]] = {}
+        self._technical_indicators(row, o, h, l, c, v, prev_close)
+        self._price_changes(row, o, h, l, c, prev_close)
+        self._time_features(row, bar_time)
+        self._volatility_features(row, o, h, l, c)
+        self._statistical_features(row, c)
+        self._pattern_features(row, h, l)
+        return row
+
+    def _technical_indicators(self, row, o, h, l, c, v, prev_close) -> None:
+        b = self.buffers
+        s = self.states
+        config = self.config
+
+        # 移動平均線
+        for period in config['sma']:
+            sma = s[f'sma_{period}'].update(b['close'])
+            b[f'sma_{period}'].append(sma)
+            row[f'sma_{period}'] = sma
+            row[f'price_sma_{period}_ratio'] = _div(c, sma)
+            row[f'sma_{period}_slope'] = _div(sma - b[f'sma_{period}'].last(6), sma)
+
+        # 指数移動平均
+        for period in config['ema']:
+            ema = s[f'ema_{period}'].update(c)
+            row[f'ema_{period}'] = ema
+            row[f'price_ema_{period}_ratio'] = _div(c, ema)
+
+        # RSI
+        for period in config['rsi']:
+            rsi = s[f'rsi_{period}'].update(c)
+            prev_rsi = b[f'rsi_{period}'].last()
+            b[f'rsi_{period}'].append(rsi)
+            row[f'rsi_{period}'] = rsi
+            row[f'rsi_{period}_change'] = rsi - prev_rsi
+
+        # MACD
+        macd = macd_signal = macd_hist = math.nan
+        fast = s['macd_fast'].update(c)
+        slow = s['macd_slow'].update(c)
+        if not math.isnan(slow):
+            signal = s['macd_signal'].update(fast - slow)
+            if not math.isnan(signal):
+                macd, macd_signal, macd_hist = fast - slow, signal, (fast - slow) - signal
+        prev_macd = b['macd'].last()
+        prev_signal = b['macd_signal'].last()
+        b['macd'].append(macd)
+        b['macd_signal'].append(macd_signal)
+        row['macd'] = macd
+        row['macd_signal'] = macd_signal
+        row['macd_histogram'] = macd_hist
+        row['macd_signal_cross'] = _cross(macd, macd_signal, prev_macd, prev_signal)
+
+        # ボリンジャーバンド
+        nbdev = config['bollinger']['std']
+        middle = s['bb_middle'].update(b['close'])
+        std = s['bb_std'].update(b['close'], middle)
+        upper = middle + std * nbdev
+        lower = middle - std * nbdev
+        bb_width = _div(upper - lower, middle)
+        b['bb_width'].append(bb_width)
+        row['bb_upper'] = upper
+        row['bb_middle'] = middle
+        row['bb_lower'] = lower
+        row['bb_width'] = bb_width
+        row['bb_position'] = _div(c - lower, upper - lower)
+        row['bb_squeeze'] = bool(bb_width < _window_mean(b['bb_width'].tail(20)) * 0.8)
+
+        # ATR
+        true_range = math.nan
+        if not math.isnan(prev_close):
+            true_range = max(h - l, abs(prev_close - h), abs(l - prev_close))
+        atr = s['atr'].update(true_range)
+        row['atr'] = atr
+        row['atr_ratio'] = _div(atr, c)
+
+        # ストキャスティクス
+        stoch_config = config['stoch']
+        highs = b['high'].tail(stoch_config['k'])
+        fastk = math.nan
+        if highs is not None:
+            highest = float(highs.max())
+            lowest = float(b['low'].tail(stoch_config['k']).min())
+            diff = (highest - lowest) / 100.0
+            fastk = (c - lowest) / diff if diff != 0.0 else 0.0
+        b['fastk'].append(fastk)
+        slowk = math.nan
+        slowd = math.nan
+        if not math.isnan(fastk):
+            slowk = s['slowk'].update(b['fastk'])
+            b['stoch_k'].append(slowk)
+            if not math.isnan(slowk):
+                slowd = s['slowd'].update(b['stoch_k'])
+        else:
+            b['stoch_k'].append(math.nan)
+        prev_k = b['stoch_k_out'].last()
+        prev_d = b['stoch_d'].last()
+        if math.isnan(slowd):
+            slowk = math.nan
+        b['stoch_k_out'].append(slowk)
+        b['stoch_d'].append(slowd)
+        row['stoch_k'] = slowk
+        row['stoch_d'] = slowd
+        row['stoch_cross'] = _cross(slowk, slowd, prev_k, prev_d)
+
+        # ADX
+        plus_di, minus_di, dx, adx = s['dmi'].update(h, l, c)
+        row['adx'] = adx
+        row['plus_di'] = plus_di
+        row['minus_di'] = minus_di
+        row['dx'] = dx
+
+        # CCI
+        tp = (h + l + c) / 3
+        b['tp'].append(tp)
+        cci_period = config['cci']
+        tps = b['tp'].tail(cci_period)
+        cci = math.nan
+        if tps is not None:
+            average = float(tps.sum()) / cci_period
+            deviation = float(np.abs(tps - average).sum())
+            diff = tp - average
+            cci = diff / (0.015 * (deviation / cci_period)) if diff != 0.0 and deviation != 0.0 else 0.0
+        row['cci'] = cci
+
+        # Williams %R
+        willr_period = config['williams_r']
+        highs = b['high'].tail(willr_period)
+        willr = math.nan
+        if highs is not None:
+            highest = float(highs.max())
+            lowest = float(b['low'].tail(willr_period).min())
+            diff = (highest - lowest) / -100.0
+            willr = (highest - c) / diff if diff != 0.0 else 0.0
+        row['williams_r'] = willr
+
+        # MFI・OBV
+        if self.has_volume:
+            mfi_period = config['mfi']
+            prev_tp = b['tp'].last(2)
+            flow = tp * v
+            b['mfi_pos'].append(flow if tp > prev_tp else 0.0)
+            b['mfi_neg'].append(flow if tp < prev_tp else 0.0)
+            mfi = math.nan
+            if self.bar_count > mfi_period:
+                pos = float(b['mfi_pos'].tail(mfi_period).sum())
+                neg = float(b['mfi_neg'].tail(mfi_period).sum())
+                total = pos + neg
+                mfi = 100.0 * (pos / total) if total >= 1.0 else 0.0
+            row['mfi'] = mfi
+
+            obv = s['obv'].update(c, prev_close, v)
+            b['obv'].append(obv)
+            row['obv'] = obv
+            row['obv_sma'] = s['obv_sma'].update(b['obv'])
+        else:
+            b['mfi_pos'].append(math.nan)
+            b['mfi_neg'].append(math.nan)
+            b['obv'].append(math.nan)
+
+        # パラボリックSAR
+        sar = s['sar'].update(h, l)
+        row['sar'] = sar
+        row['sar_signal'] = 1 if c > sar else -1
+
+    def _price_changes(self, row, o, h, l, c, prev_close) -> None:
+        b = self.buffers
+        for period in PRICE_CHANGE_PERIODS:
+            base_close = b['close'].last(period + 1)
+            row[f'price_change_{period}'] = _div(c, base_close) - 1
+            row[f'high_change_{period}'] = _div(h, b['high'].last(period + 1)) - 1
+            row[f'low_change_{period}'] = _div(l, b['low'].last(period + 1)) - 1
+            ratio = _div(c, base_close)
+            row[f'log_return_{period}'] = math.log(ratio) if ratio > 0 else math.nan
+            row[f'hl_ratio_{period}'] = _div(h - l, c)
+
+        row['intraday_range'] = _div(h - l, o)
+        row['open_close_ratio'] = _div(c, o)
+        row['high_close_ratio'] = _div(h, c)
+        row['low_close_ratio'] = _div(l, c)
+
+        gap = _div(o - prev_close, prev_close)
+        row['gap'] = gap
+        row['gap_filled'] = 1 if ((gap > 0 and l <= prev_close) or
+                                  (gap < 0 and h >= prev_close)) else 0
+
+    def _time_features(self, row, bar_time: pd.Timestamp) -> None:
+        hour = bar_time.hour
+        day_of_week = bar_time.dayofweek
+        month = bar_time.month
+        day_of_month = bar_time.day
+
+        row['hour'] = hour
+        row['day_of_week'] = day_of_week
+        row['month'] = month
+        row['quarter'] = (month - 1) // 3 + 1
+        row['day_of_month'] = day_of_month
+        row['week_of_year'] = bar_time.isocalendar()[1]
+
+        # 循環的エンコーディング
+        row['hour_sin'] = math.sin(2 * math.pi * hour / 24)
+        row['hour_cos'] = math.cos(2 * math.pi * hour / 24)
+        row['day_sin'] = math.sin(2 * math.pi * day_of_week / 7)
+        row['day_cos'] = math.cos(2 * math.pi * day_of_week / 7)
+        row['month_sin'] = math.sin(2 * math.pi * month / 12)
+        row['month_cos'] = math.cos(2 * math.pi * month / 12)
+
+        # 市場セッション
+        row['tokyo_session'] = int(0 <= hour < 9)
+        row['london_session'] = int(8 <= hour < 16)
+        row['ny_session'] = int(13 <= hour < 22)
+        row['overlap_london_ny'] = int(13 <= hour < 16)
+        row['overlap_tokyo_london'] = int(8 <= hour < 9)
+
+        row['is_weekend'] = int(day_of_week >= 5)
+        row['is_monday'] = int(day_of_week == 0)
+        row['is_friday'] = int(day_of_week == 4)
+        row['is_month_end'] = int(day_of_month >= 28)
+        row['is_month_start'] = int(day_of_month <= 3)
+
+        row['news_time_jpy'] = int(hour in (0, 1))
+        row['news_time_eur'] = int(hour in (9, 10))
+        row['news_time_usd'] = int(hour in (13, 14, 15))
+
+    def _close_stats(self, period: int) -> Optional[_WindowStats]:
+        """終値ウィンドウの統計量（同じ足の中では期間ごとに再利用）"""
+        if period not in self._stats:
+            closes = self.buffers['close'].tail(period)
+            self._stats[period] = _WindowStats(closes) if closes is not None else None
+        return self._stats[period]
+
+    def _volatility_features(self, row, o, h, l, c) -> None:
+        b = self.buffers
+
+        log_hl = math.log(_div(h, l))
+        b['log_hl_sq'].append(log_hl ** 2)
+        gk_term = (math.log(_div(h, c)) * math.log(_div(h, o)) +
+                   math.log(_div(l, c)) * math.log(_div(l, o)))
+        b['gk'].append(math.sqrt(gk_term) if gk_term >= 0 else math.nan)
+
+        for period in VOLATILITY_PERIODS:
+            stats = self._close_stats(period)
+            volatility = stats.std if stats is not None else math.nan
+            row[f'volatility_{period}'] = volatility
+            row[f'volatility_{period}_norm'] = _div(volatility, c)
+
+            parkinson = 0.25 * _window_mean(b['log_hl_sq'].tail(period))
+            row[f'parkinson_vol_{period}'] = math.sqrt(parkinson) if parkinson >= 0 else math.nan
+            row[f'gk_vol_{period}'] = _window_mean(b['gk'].tail(period))
+
+            row[f'return_range_{period}'] = (
+                _div(stats.high - stats.low, c) if stats is not None else math.nan
+            )
+
+        # VIXライクな指標（ATRベース）
+        vix_like = _div(row['atr'], c) * 100
+        b['vix_like'].append(vix_like)
+        vix_like_ma = _window_mean(b['vix_like'].tail(20))
+        row['vix_like'] = vix_like
+        row['vix_like_ma'] = vix_like_ma
+        row['vix_spike'] = int(vix_like > vix_like_ma * 1.5)
+
+        # ボラティリティレジーム
+        stats_20 = self._close_stats(20)
+        stats_60 = self._close_stats(60)
+        vol_20 = stats_20.std if stats_20 is not None else math.nan
+        vol_60 = stats_60.std if stats_60 is not None else math.nan
+        row['vol_regime'] = 1 if vol_20 > vol_60 * 1.2 else (-1 if vol_20 < vol_60 * 0.8 else 0)
+
+    def _statistical_features(self, row, c) -> None:
+        b = self.buffers
+        for period in STATISTICAL_PERIODS:
+            stats = self._close_stats(period)
+            if stats is None:
+                for name in ('skewness', 'kurtosis', 'percentile_10', 'percentile_90',
+                             'percentile_position', 'zscore', 'high_position'):
+                    row[f'{name}_{period}'] = math.nan
+                continue
+
+            row[f'skewness_{period}'] = stats.skew()
+            row[f'kurtosis_{period}'] = stats.kurt()
+
+            p10 = stats.quantile(0.1)
+            p90 = stats.quantile(0.9)
+            row[f'percentile_10_{period}'] = p10
+            row[f'percentile_90_{period}'] = p90
+            row[f'percentile_position_{period}'] = _div(c - p10, p90 - p10)
+
+            row[f'zscore_{period}'] = _div(c - stats.mean, stats.std)
+            row[f'high_position_{period}'] = _div(c - stats.low, stats.high - stats.low)
+
+        closes = b['close'].tail(AUTOCORR_WINDOW)
+        for lag in AUTOCORR_LAGS:
+            row[f'autocorr_{lag}'] = _autocorr(closes, lag)
+
+    def _pattern_features(self, row, h, l) -> None:
+        b = self.buffers
+        window = min(self.pattern_window, len(b['close']))
+        o_tail = b['open'].tail(window)
+        h_tail = b['high'].tail(window)
+        l_tail = b['low'].tail(window)
+        c_tail = b['close'].tail(window)
+
+        bull = 0
+        bear = 0
+        for pattern in self.patterns:
+            value = int(getattr(talib, pattern)(o_tail, h_tail, l_tail, c_tail)[-1])
+            row[f'pattern_{pattern.lower()}'] = value
+            if value > 0:
+                bull += 1
+            elif value < 0:
+                bear += 1
+        row['pattern_bull_score'] = bull
+        row['pattern_bear_score'] = bear
+        row['pattern_net_score'] = bull - bear
+
+        prev_high = b['high'].last(2)
+        prev_low = b['low'].last(2)
+        row['higher_high'] = int(h > prev_high and prev_high > b['high'].last(3))
+        row['lower_low'] = int(l < prev_low and prev_low < b['low'].last(3))
+        row['inside_bar'] = int(h <= prev_high and l >= prev_low)
+        row['outside_bar'] = int(h >= prev_high and l <= prev_low)
+
+
+class StreamingFeatureEngine:
+    """通貨ペア×時間軸ごとのインクリメンタル特徴量エンジン"""
+
+    def __init__(self,
+                 capacity: int = 256,
+                 incremental_bars: int = 10,
+                 feature_engine: Optional[FeatureEngineering] = None):
+        """
+        初期化
+
+        Args:
+            capacity: リングバッファ長（最長の計算期間+1以上）
+            incremental_bars: ウォームアップ後に取得する足の本数
+            feature_engine: 指標設定の参照元
+        """
+        self.config = (feature_engine or FeatureEngineering()).technical_indicators
+        longest = max(max(self.config['sma']) + 1, 60, AUTOCORR_WINDOW)
+        self.capacity = max(capacity, longest + 1)
+        self.incremental_bars = incremental_bars
+
+        self._streams: Dict[Tuple[str, str], _SymbolStream] = {}
+        self._updates = 0
+        self._update_seconds = 0.0
+
+    def update(self,
+               symbol: str,
+               timeframe: str,
+               bar_time: Any,
+               bar: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        足1本を反映し最新行の特徴量を返す
+
+        Args:
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            bar_time: 足の時刻（直前と同時刻なら未確定足の更新として置き換え）
+            bar: open/high/low/close/volume（その他の列はそのまま出力）
+
+        Returns:
+            特徴量（create_featuresの1行と同じ列）
+        """
+        key = (symbol, timeframe)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = _SymbolStream(self.config, self.capacity,
+                                   has_volume=bar.get('volume') is not None)
+            self._streams[key] = stream
+
+        started = time.perf_counter()
+        row = stream.update(pd.Timestamp(bar_time), bar)
+        self._update_seconds += time.perf_counter() - started
+        self._updates += 1
+        return row
+
+    def update_from_frame(self,
+                          symbol: str,
+                          timeframe: str,
+                          df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        価格データのうち未反映の足だけを反映し、最新行を返す
+
+        Args:
+            symbol: 通貨ペア
+            timeframe: 時間軸
+            df: 価格データ（DatetimeIndexまたはtime列、時刻昇順）
+
+        Returns:
+            最新足の特徴量（1行のDataFrame）、データ不足時はNone
+        """
+        try:
+            if df is None or df.empty:
+                return None
+
+            if 'time' in df.columns:
+                times = pd.DatetimeIndex(pd.to_datetime(df['time']))
+                df = df.drop(columns=['time'])
+            else:
+                times = pd.DatetimeIndex(df.index)
+
+            key = (symbol, timeframe)
+            stream = self._streams.get(key)
+
+            # 前回の最新足と重ならない場合は欠損の可能性があるため作り直す
+            if stream is not None and stream.last_time is not None and times[0] > stream.last_time:
+                logger.warning(f"Gap detected in stream {symbol} {timeframe}, rebuilding")
+                self.reset(symbol, timeframe)
+                stream = None
+
+            start = 0
+            if stream is not None and stream.last_time is not None:
+                start = int(times.searchsorted(stream.last_time, side='left'))
+
+            columns = list(df.columns)
+            values = df.to_numpy(dtype=object)
+            for i in range(start, len(df)):
+                bar = dict(zip(columns, values[i]))
+                self.update(symbol, timeframe, times[i], bar)
+
+            stream = self._streams.get(key)
+            if stream is None or stream.bar_count < MIN_BARS:
+                logger.warning(f"Insufficient data for streaming features {symbol} {timeframe}")
+                return None
+
+            return pd.DataFrame([stream.last_row], index=pd.DatetimeIndex([stream.last_time]))
+
+        except Exception as e:
+            logger.error(f"Error updating streaming features for {symbol} {timeframe}: {e}")
+            self.reset(symbol, timeframe)
+            return None
+
+    def is_ready(self, symbol: str, timeframe: str) -> bool:
+        """ウォームアップ済みかどうか"""
+        stream = self._streams.get((symbol, timeframe))
+        return stream is not None and stream.bar_count >= MIN_BARS
+
+    def bars_needed(self, symbol: str, timeframe: str, full: int = 500) -> int:
+        """次回取得すべき足の本数"""
+        return self.incremental_bars if self.is_ready(symbol, timeframe) else full
+
+    def reset(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        """状態を破棄（引数省略時は全て）"""
+        if symbol is None:
+            self._streams.clear()
+            return
+        for key in list(self._streams):
+            if key[0] == symbol and (timeframe is None or key[1] == timeframe):
+                del self._streams[key]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """統計情報取得"""
+        return {
+            'streams': {
+                f"{symbol}_{timeframe}": {
+                    'bars': stream.bar_count,
+                    'last_time': stream.last_time.isoformat() if stream.last_time is not None else None
+                }
+                for (symbol, timeframe), stream in self._streams.items()
+            },
+            'updates': self._updates,
+            'avg_update_us': round(self._update_seconds / self._updates * 1e6, 1) if self._updates else 0.0
+        }
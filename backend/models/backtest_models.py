@@ -244,10 +244,12 @@ class BacktestListItem(BaseModel):
 class BacktestListResponse(BaseModel):
     """バックテストリストレスポンス"""
     tests: List[BacktestListItem]
-    total_count: int
+    total_count: Optional[int] = None
+    count_is_estimate: bool = False
     page: int
     page_size: int
     has_next: bool
+    next_cursor: Optional[str] = None
 
 class BacktestDeleteRequest(BaseModel):
     """バックテスト削除リクエスト"""
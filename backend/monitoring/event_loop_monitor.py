@@ -0,0 +1,101 @@
+"""
+イベントループ遅延監視
+一定間隔でスリープし、予定時刻からの遅れ（同期処理によるブロック時間）を計測する
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """イベントループ遅延監視クラス"""
+
+    def __init__(self,
+                 interval: float = 0.5,
+                 history_size: int = 600,
+                 warning_threshold_ms: float = 200.0):
+        """
+        初期化
+
+        Args:
+            interval: 計測間隔（秒）
+            history_size: 保持する計測数
+            warning_threshold_ms: 警告ログを出す遅延（ミリ秒）
+        """
+        self.interval = interval
+        self.warning_threshold_ms = warning_threshold_ms
+        self.lags_ms: Deque[float] = deque(maxlen=history_size)
+        self.max_lag_ms = 0.0
+        self.samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """監視開始（実行中のイベントループ上で呼ぶ）"""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._measure_loop())
+        logger.info("Event loop lag monitoring started")
+
+    async def stop(self) -> None:
+        """監視停止"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Event loop lag monitoring stopped")
+
+    def record(self, lag_ms: float) -> None:
+        """遅延を記録"""
+        lag_ms = max(0.0, lag_ms)
+        self.lags_ms.append(lag_ms)
+        self.samples += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+        if lag_ms >= self.warning_threshold_ms:
+            logger.warning(f"Event loop blocked for {lag_ms:.0f}ms")
+
+    async def _measure_loop(self) -> None:
+        """計測ループ"""
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record((time.perf_counter() - expected) * 1000)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """遅延統計取得（ミリ秒）"""
+        stats: Dict[str, Any] = {
+            'running': self.running,
+            'interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'max_lag_ms': round(self.max_lag_ms, 3)
+        }
+
+        if self.lags_ms:
+            lags = np.fromiter(self.lags_ms, dtype=float)
+            stats.update({
+                'current_lag_ms': round(lags[-1], 3),
+                'avg_lag_ms': round(float(lags.mean()), 3),
+                'p99_lag_ms': round(float(np.percentile(lags, 99)), 3),
+                'window_max_lag_ms': round(float(lags.max()), 3),
+                'blocked_samples': int((lags >= self.warning_threshold_ms).sum())
+            })
+
+        return stats
+
+
+# グローバルイベントループ遅延監視インスタンス
+event_loop_monitor = EventLoopLagMonitor()
@@ -3,16 +3,13 @@
 取引状況、ポジション、リスク状況をリアルタイムで監視
 """
 import asyncio
-import MetaTrader5 as mt5
 from datetime import datetime, timedelta, date
 import logging
 from typing import Dict, List, Optional, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
 
 from ..websocket.websocket_manager import WebSocketManager
-# from ..core.database import get_db
-# from ..models.backtest_models import Trade, Position
+from ..core.async_database import get_async_db
+from ..core.market_data_hub import get_market_data_hub
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +19,7 @@ class TradingMonitor:
     def __init__(self, websocket_manager: WebSocketManager):
         self.websocket_manager = websocket_manager
         self.monitoring_active = False
+        self.market_data = get_market_data_hub()
         
         # アラート閾値設定
         self.alert_thresholds = {
@@ -184,17 +182,10 @@ class TradingMonitor:
             Dict[str, Any]: 本日の取引統計
         """
         try:
-            db: Session = next(get_db())
             today = date.today()
             
-            # 本日の完了取引取得
-            trades = db.query(Trade).filter(
-                Trade.entry_time >= today,
-                Trade.exit_time.isnot(None),
-                Trade.profit_loss.isnot(None)
-            ).all()
-            
-            db.close()
+            # 本日の完了取引取得（DBスレッドで実行しイベントループを止めない）
+            trades = await self._fetch_closed_trades(today)
             
             if not trades:
                 return {
@@ -214,12 +205,12 @@ class TradingMonitor:
                 }
             
             # 統計計算
-            winning_trades = [t for t in trades if t.profit_loss > 0]
-            losing_trades = [t for t in trades if t.profit_loss < 0]
+            winning_trades = [t for t in trades if t['profit_loss'] > 0]
+            losing_trades = [t for t in trades if t['profit_loss'] < 0]
             
-            total_pnl = sum(t.profit_loss for t in trades)
-            gross_profit = sum(t.profit_loss for t in winning_trades)
-            gross_loss = sum(t.profit_loss for t in losing_trades)
+            total_pnl = sum(t['profit_loss'] for t in trades)
+            gross_profit = sum(t['profit_loss'] for t in winning_trades)
+            gross_loss = sum(t['profit_loss'] for t in losing_trades)
             
             return {
                 'date': today.isoformat(),
@@ -230,8 +221,8 @@ class TradingMonitor:
                 'total_pnl': total_pnl,
                 'gross_profit': gross_profit,
                 'gross_loss': gross_loss,
-                'largest_win': max((t.profit_loss for t in winning_trades), default=0),
-                'largest_loss': min((t.profit_loss for t in losing_trades), default=0),
+                'largest_win': max((t['profit_loss'] for t in winning_trades), default=0),
+                'largest_loss': min((t['profit_loss'] for t in losing_trades), default=0),
                 'average_win': gross_profit / len(winning_trades) if winning_trades else 0,
                 'average_loss': gross_loss / len(losing_trades) if losing_trades else 0,
                 'profit_factor': abs(gross_profit / gross_loss) if gross_loss != 0 else 0
@@ -244,6 +235,26 @@ class TradingMonitor:
                 'error': str(e)
             }
     
+    async def _fetch_closed_trades(self, since) -> List[Dict[str, Any]]:
+        """
+        指定日時以降にエントリーした決済済み取引取得
+        
+        Args:
+            since: 開始日時
+            
+        Returns:
+            List[Dict[str, Any]]: 取引リスト（entry_time, profit_loss）
+        """
+        query = """
+            SELECT entry_time, profit_loss::float AS profit_loss
+            FROM trades
+            WHERE entry_time >= %s
+              AND exit_time IS NOT NULL
+              AND profit_loss IS NOT NULL
+            ORDER BY entry_time
+        """
+        return await get_async_db().fetch_all(query, (since,))
+    
     async def _get_current_pnl(self) -> Dict[str, Any]:
         """
         現在の損益取得
@@ -252,16 +263,10 @@ class TradingMonitor:
             Dict[str, Any]: 現在の損益情報
         """
         try:
-            # MT5から現在のポジション取得
-            positions = mt5.positions_get()
-            if positions is None:
-                return {
-                    'total_profit': 0,
-                    'unrealized_pnl': 0,
-                    'position_count': 0
-                }
+            # マーケットデータハブから現在のポジション取得
+            positions = await self.market_data.get_positions_async()
             
-            total_profit = sum(pos.profit for pos in positions)
+            total_profit = sum(pos['profit'] for pos in positions)
             
             return {
                 'total_profit': float(total_profit),
@@ -287,34 +292,34 @@ class TradingMonitor:
             Dict[str, Any]: 口座情報
         """
         try:
-            account_info = mt5.account_info()
+            account_info = await self.market_data.get_account_info_async()
             if account_info is None:
                 return {'error': 'Failed to get account info'}
             
             # エクイティの変化を検出
-            current_equity = float(account_info.equity)
+            current_equity = float(account_info['equity'])
             equity_change = current_equity - self.last_equity if self.last_equity > 0 else 0
             
             # 証拠金維持率の変化を検出
-            current_margin_level = float(account_info.margin_level) if account_info.margin_level else 0
+            current_margin_level = float(account_info['margin_level']) if account_info['margin_level'] else 0
             margin_level_change = current_margin_level - self.last_margin_level if self.last_margin_level > 0 else 0
             
             self.last_equity = current_equity
             self.last_margin_level = current_margin_level
             
             return {
-                'login': account_info.login,
-                'balance': float(account_info.balance),
+                'login': account_info['login'],
+                'balance': float(account_info['balance']),
                 'equity': current_equity,
                 'equity_change': equity_change,
-                'margin': float(account_info.margin),
-                'margin_free': float(account_info.margin_free),
+                'margin': float(account_info['margin']),
+                'margin_free': float(account_info['margin_free']),
                 'margin_level': current_margin_level,
                 'margin_level_change': margin_level_change,
-                'profit': float(account_info.profit),
-                'currency': account_info.currency,
-                'server': account_info.server,
-                'company': account_info.company,
+                'profit': float(account_info.get('profit', 0.0)),
+                'currency': account_info['currency'],
+                'server': account_info['server'],
+                'company': account_info['company'],
                 'updated_at': datetime.now().isoformat()
             }
             
@@ -330,31 +335,26 @@ class TradingMonitor:
             List[Dict[str, Any]]: ポジションリスト
         """
         try:
-            positions = mt5.positions_get()
-            if positions is None:
-                return []
+            positions = await self.market_data.get_positions_async()
             
             position_list = []
             for pos in positions:
-                # 現在価格取得
-                symbol_info = mt5.symbol_info_tick(pos.symbol)
-                current_price = symbol_info.bid if pos.type == mt5.ORDER_TYPE_BUY else symbol_info.ask
-                
+                # 現在価格（決済側）はポジション情報のprice_currentを使用
                 position_list.append({
-                    'ticket': pos.ticket,
-                    'symbol': pos.symbol,
-                    'type': 'BUY' if pos.type == mt5.ORDER_TYPE_BUY else 'SELL',
-                    'volume': float(pos.volume),
-                    'open_price': float(pos.price_open),
-                    'current_price': float(current_price),
-                    'profit': float(pos.profit),
-                    'swap': float(pos.swap),
-                    'commission': float(pos.commission),
-                    'open_time': datetime.fromtimestamp(pos.time).isoformat(),
-                    'comment': pos.comment or '',
-                    'magic': pos.magic,
-                    'sl': float(pos.sl) if pos.sl else None,
-                    'tp': float(pos.tp) if pos.tp else None
+                    'ticket': pos['ticket'],
+                    'symbol': pos['symbol'],
+                    'type': pos['type'],
+                    'volume': float(pos['volume']),
+                    'open_price': float(pos['price_open']),
+                    'current_price': float(pos['price_current']),
+                    'profit': float(pos['profit']),
+                    'swap': float(pos['swap']),
+                    'commission': float(pos['commission']),
+                    'open_time': pos['time'].isoformat(),
+                    'comment': pos['comment'] or '',
+                    'magic': pos['magic'],
+                    'sl': float(pos['sl']) if pos['sl'] else None,
+                    'tp': float(pos['tp']) if pos['tp'] else None
                 })
             
             return position_list
@@ -392,22 +392,21 @@ class TradingMonitor:
         """
         try:
             # 口座情報取得
-            account_info = mt5.account_info()
+            account_info = await self.market_data.get_account_info_async()
             if not account_info:
                 return {'error': 'Failed to get account info for risk calculation'}
             
             # 現在のポジション取得
-            positions = mt5.positions_get()
-            total_positions = len(positions) if positions else 0
+            total_positions = len(await self.market_data.get_positions_async())
             
             # 本日の損益取得
             today_stats = await self._get_today_trading_stats()
             today_pnl = today_stats.get('total_pnl', 0)
             
             # リスク指標計算
-            balance = float(account_info.balance)
-            equity = float(account_info.equity)
-            margin_level = float(account_info.margin_level) if account_info.margin_level else 0
+            balance = float(account_info['balance'])
+            equity = float(account_info['equity'])
+            margin_level = float(account_info['margin_level']) if account_info['margin_level'] else 0
             
             # ドローダウン計算
             drawdown = ((balance - equity) / balance) * 100 if balance > 0 else 0
@@ -424,8 +423,8 @@ class TradingMonitor:
                 'total_positions': total_positions,
                 'balance': balance,
                 'equity': equity,
-                'margin_used': float(account_info.margin),
-                'margin_free': float(account_info.margin_free),
+                'margin_used': float(account_info['margin']),
+                'margin_free': float(account_info['margin_free']),
                 'calculated_at': datetime.now().isoformat()
             }
             
@@ -458,17 +457,9 @@ class TradingMonitor:
             Dict[str, Any]: パフォーマンス指標
         """
         try:
-            db: Session = next(get_db())
-            
             # 過去30日の取引取得
             thirty_days_ago = datetime.now() - timedelta(days=30)
-            trades = db.query(Trade).filter(
-                Trade.entry_time >= thirty_days_ago,
-                Trade.exit_time.isnot(None),
-                Trade.profit_loss.isnot(None)
-            ).all()
-            
-            db.close()
+            trades = await self._fetch_closed_trades(thirty_days_ago)
             
             if not trades:
                 return {
@@ -480,20 +471,20 @@ class TradingMonitor:
                 }
             
             # パフォーマンス計算
-            winning_trades = [t for t in trades if t.profit_loss > 0]
-            losing_trades = [t for t in trades if t.profit_loss < 0]
+            winning_trades = [t for t in trades if t['profit_loss'] > 0]
+            losing_trades = [t for t in trades if t['profit_loss'] < 0]
             
-            total_pnl = sum(t.profit_loss for t in trades)
-            gross_profit = sum(t.profit_loss for t in winning_trades)
-            gross_loss = sum(t.profit_loss for t in losing_trades)
+            total_pnl = sum(t['profit_loss'] for t in trades)
+            gross_profit = sum(t['profit_loss'] for t in winning_trades)
+            gross_loss = sum(t['profit_loss'] for t in losing_trades)
             
             # 日別統計
             daily_stats = {}
             for trade in trades:
-                trade_date = trade.entry_time.date()
+                trade_date = trade['entry_time'].date()
                 if trade_date not in daily_stats:
                     daily_stats[trade_date] = []
-                daily_stats[trade_date].append(trade.profit_loss)
+                daily_stats[trade_date].append(trade['profit_loss'])
             
             daily_pnls = [sum(pnls) for pnls in daily_stats.values()]
             profitable_days = len([pnl for pnl in daily_pnls if pnl > 0])
@@ -508,8 +499,8 @@ class TradingMonitor:
                 'gross_loss': gross_loss,
                 'profit_factor': abs(gross_profit / gross_loss) if gross_loss != 0 else 0,
                 'average_trade': total_pnl / len(trades),
-                'largest_win': max((t.profit_loss for t in winning_trades), default=0),
-                'largest_loss': min((t.profit_loss for t in losing_trades), default=0),
+                'largest_win': max((t['profit_loss'] for t in winning_trades), default=0),
+                'largest_loss': min((t['profit_loss'] for t in losing_trades), default=0),
                 'trading_days': len(daily_stats),
                 'profitable_days': profitable_days,
                 'daily_win_rate': (profitable_days / len(daily_stats)) * 100 if daily_stats else 0,
@@ -0,0 +1,129 @@
+"""
+マーケットデータWebSocketの購読インデックス・並行配信のテスト
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from backend.api.websocket import ConnectionManager
+
+
+class FakeWebSocket:
+    """送信内容を記録するWebSocket"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.messages.append(message)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+async def connect(manager: ConnectionManager, *symbols, delay: float = 0.0) -> FakeWebSocket:
+    websocket = FakeWebSocket(delay)
+    await manager.connect(websocket)
+    for symbol in symbols:
+        manager.subscribe(websocket, symbol)
+    return websocket
+
+
+@pytest_asyncio.fixture
+async def manager():
+    connection_manager = ConnectionManager(max_queue_size=3, send_timeout=0.2)
+    connection_manager.is_broadcasting = True  # 配信ループは起動しない
+    yield connection_manager
+
+    for websocket in connection_manager.active_connections:
+        connection_manager.disconnect(websocket)
+    await asyncio.sleep(0)
+
+
+class TestConnectionManager:
+    """ConnectionManagerのテストクラス"""
+
+    @pytest.mark.asyncio
+    async def test_symbol_index_routes_ticks(self, manager):
+        """購読者にのみ配信されること"""
+        usdjpy = await connect(manager, 'USDJPY')
+        eurjpy = await connect(manager, 'EURJPY')
+
+        assert await manager.broadcast('tick-usdjpy', 'USDJPY') == 1
+        await asyncio.sleep(0.01)
+
+        assert usdjpy.messages == ['tick-usdjpy']
+        assert eurjpy.messages == []
+
+        manager.unsubscribe(usdjpy, 'USDJPY')
+        assert 'USDJPY' not in manager.symbol_index
+        assert manager.get_statistics()['subscribers_by_symbol'] == {'EURJPY': 1}
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_block_others(self, manager):
+        """遅いクライアントのティックは最新値に間引かれ、他の接続は遅延しないこと"""
+        slow = await connect(manager, 'USDJPY', delay=0.1)
+        fast = await connect(manager, 'USDJPY')
+
+        for i in range(5):
+            await manager.broadcast(f'tick-{i}', 'USDJPY', conflate=True)
+            await asyncio.sleep(0.01)
+
+        assert fast.messages == [f'tick-{i}' for i in range(5)]
+
+        await asyncio.sleep(0.25)
+        assert slow.messages == ['tick-0', 'tick-4']
+        assert manager.get_statistics()['conflated'] == 3
+
+    @pytest.mark.asyncio
+    async def test_queue_overflow_drops_messages(self, manager):
+        """キュー上限を超えたメッセージは破棄・計数されること"""
+        websocket = await connect(manager, delay=0.05)
+
+        results = [await manager.broadcast(f'alert-{i}') for i in range(6)]
+
+        assert sum(results) < 6
+        stats = manager.get_statistics()
+        assert stats['dropped'] == 6 - sum(results)
+        assert stats['queue_depth_max'] <= 3
+
+        await asyncio.sleep(0.3)
+        assert len(websocket.messages) == sum(results)
+
+    @pytest.mark.asyncio
+    async def test_stalled_client_is_disconnected(self, manager):
+        """送信タイムアウトした接続は切断されること"""
+        stalled = await connect(manager, 'USDJPY', delay=1.0)
+
+        await manager.broadcast('tick', 'USDJPY', conflate=True)
+        await asyncio.sleep(0.3)
+
+        assert stalled not in manager.connections
+        assert 'USDJPY' not in manager.symbol_index
+        assert manager.get_statistics()['slow_disconnects'] == 1
+        assert stalled.close_code == 1013
+
+    @pytest.mark.asyncio
+    async def test_broken_client_is_closed_even_if_close_fails(self, manager):
+        """送信エラーの接続は、ソケットを閉じられなくても切断されること"""
+        broken = await connect(manager, 'USDJPY')
+
+        async def fail(*args, **kwargs):
+            raise RuntimeError('connection reset')
+
+        broken.send_text = fail
+        broken.close = fail
+
+        await manager.broadcast('tick', 'USDJPY', conflate=True)
+        await asyncio.sleep(0.05)
+
+        assert broken not in manager.connections
+        assert manager.get_statistics()['slow_disconnects'] == 1
@@ -0,0 +1,80 @@
+"""
+BacktestEngine単体テスト
+"""
+import pytest
+from unittest.mock import Mock
+from datetime import datetime
+import numpy as np
+
+from backend.backtest.backtest_engine import BacktestEngine
+
+
+class RuleBasedModel:
+    """テスト用の決定的な予測モデル（LightGBMPredictor互換）"""
+
+    def __init__(self):
+        self.feature_columns = ['rsi_14', 'price_change_1']
+        self.call_count = 0
+
+    def predict_with_confidence(self, X):
+        self.call_count += 1
+        rsi = X['rsi_14'].astype(float).values
+        change = X['price_change_1'].astype(float).values
+        predictions = np.where(rsi < 40, 1, np.where(rsi > 60, 2, 0))
+        confidence = np.clip(0.5 + np.abs(change) * 200, 0, 1)
+        return predictions, confidence
+
+
+class TestBacktestEngine:
+    """BacktestEngineのテストクラス"""
+
+    @pytest.fixture
+    def engine(self):
+        """BacktestEngineインスタンス作成"""
+        return BacktestEngine(Mock())
+
+    @pytest.fixture
+    def market_data(self, engine):
+        """価格データと特徴量"""
+        price_data = engine._generate_dummy_data(
+            'GBPJPY', 'H1', datetime(2023, 1, 1), datetime(2023, 4, 1)
+        )
+        features_data = engine.feature_engine.create_features(price_data)
+        return price_data, features_data
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('parameters', [
+        {'min_confidence': 0.5},
+        {'min_confidence': 0.6, 'stop_loss_pips': 20, 'take_profit_pips': 30},
+        {'min_confidence': 0.5, 'use_nanpin': True, 'nanpin_interval_pips': 5},
+    ])
+    async def test_batch_prediction_matches_per_bar(self, engine, market_data, parameters):
+        """一括予測とバー毎予測で取引・エクイティカーブが一致すること"""
+        price_data, features_data = market_data
+
+        per_bar_model = RuleBasedModel()
+        per_bar = await engine._simulate_trading(
+            price_data, features_data, per_bar_model,
+            dict(parameters, prediction_mode='per_bar'), 100000
+        )
+
+        batch_model = RuleBasedModel()
+        batch = await engine._simulate_trading(
+            price_data, features_data, batch_model,
+            dict(parameters, prediction_mode='batch'), 100000
+        )
+
+        assert len(per_bar[0]) > 0
+        assert batch == per_bar
+        assert batch_model.call_count == 1
+        assert per_bar_model.call_count > 1
+
+    def test_batch_prediction_failure_falls_back(self, engine, market_data):
+        """一括予測失敗時はNoneを返すこと"""
+        _, features_data = market_data
+
+        model = Mock()
+        model.feature_columns = ['rsi_14']
+        model.predict_with_confidence.side_effect = RuntimeError("boom")
+
+        assert engine._predict_signals_batch(model, features_data, 100) is None
@@ -0,0 +1,98 @@
+"""
+試行実行バックエンドのテスト
+"""
+import multiprocessing
+import pytest
+from unittest.mock import Mock
+from datetime import datetime
+import pandas as pd
+
+from backend.backtest.backtest_engine import BacktestEngine
+from backend.backtest.executor import SharedPriceData, create_executor
+from backend.backtest.feature_cache import FeatureCache
+from backend.backtest.parameter_optimizer import ParameterOptimizer
+from backend.tests.test_backtest.test_backtest_engine import RuleBasedModel
+
+
+START_DATE = datetime(2023, 1, 1)
+END_DATE = datetime(2023, 3, 1)
+PARAMETER_RANGES = {'stop_loss_pips': [20, 30, 40], 'min_confidence': [0.5, 0.6]}
+
+
+class TestExecutor:
+    """TrialExecutorのテストクラス"""
+
+    @pytest.fixture
+    def patched_engine_class(self, monkeypatch):
+        """DB・学習を使わないBacktestEngine（forkしたワーカーにも引き継がれる）"""
+        async def get_historical_data(self, symbol, timeframe, start_date, end_date):
+            return self._generate_dummy_data(symbol, timeframe, start_date, end_date)
+
+        async def train_model(self, features_data, parameters):
+            return RuleBasedModel()
+
+        async def save_result(self, *args, **kwargs):
+            return None
+
+        monkeypatch.setattr(BacktestEngine, '_get_historical_data', get_historical_data)
+        monkeypatch.setattr(BacktestEngine, '_train_model_for_backtest', train_model)
+        monkeypatch.setattr(BacktestEngine, '_save_backtest_result', save_result)
+        return BacktestEngine
+
+    def test_shared_price_data_roundtrip(self):
+        """共有メモリ経由で価格データが復元されること"""
+        engine = BacktestEngine(Mock())
+        price_data = engine._generate_dummy_data('USDJPY', 'H1', START_DATE, END_DATE)
+
+        shared = SharedPriceData.from_frame(price_data)
+        try:
+            attached = SharedPriceData.attach(shared.spec)
+            restored = attached.to_frame()
+            attached.release()
+        finally:
+            shared.release()
+
+        pd.testing.assert_frame_equal(
+            restored, price_data[['open', 'high', 'low', 'close', 'volume']].astype(float),
+            check_freq=False
+        )
+
+    def test_unknown_executor(self):
+        """未知の実行バックエンドはエラー"""
+        with pytest.raises(ValueError):
+            create_executor('cluster')
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('kind', ['thread', 'process'])
+    async def test_parallel_matches_serial(self, patched_engine_class, kind):
+        """並列実行でも直列実行と同じ最適化結果になること"""
+        if kind == 'process' and multiprocessing.get_start_method() != 'fork':
+            pytest.skip("process executor test requires fork start method")
+
+        serial = ParameterOptimizer(
+            patched_engine_class(Mock(), cache=FeatureCache()), create_executor('serial')
+        )
+        expected = await serial.optimize_parameters(
+            'USDJPY', 'M15', START_DATE, END_DATE, PARAMETER_RANGES, max_iterations=6
+        )
+
+        executor = create_executor(kind, max_workers=2)
+        try:
+            streamed = []
+            parallel = ParameterOptimizer(
+                patched_engine_class(Mock(), cache=FeatureCache()), executor
+            )
+            result = await parallel.optimize_parameters(
+                'USDJPY', 'M15', START_DATE, END_DATE, PARAMETER_RANGES, max_iterations=6,
+                result_callback=streamed.append
+            )
+        finally:
+            executor.shutdown()
+
+        assert result['executor'] == {'executor': kind, 'max_workers': 2}
+        assert result['valid_results'] > 0
+        assert len(streamed) == result['valid_results']
+        assert [r['iteration'] for r in result['all_results']] == \
+            [r['iteration'] for r in expected['all_results']]
+        assert [r['statistics'] for r in result['all_results']] == \
+            [r['statistics'] for r in expected['all_results']]
@@ -0,0 +1,124 @@
+"""
+FeatureCache単体テスト
+"""
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from datetime import datetime
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from backend.backtest.backtest_engine import BacktestEngine
+from backend.backtest.feature_cache import FeatureCache
+from backend.backtest.parameter_optimizer import ParameterOptimizer
+from backend.tests.test_backtest.test_backtest_engine import RuleBasedModel
+
+
+class TestFeatureCache:
+    """FeatureCacheのテストクラス"""
+
+    def test_make_key_is_content_based(self):
+        """同じ内容から同じキーが生成されること"""
+        start = datetime(2023, 1, 1)
+        key1 = FeatureCache.make_key('USDJPY', 'H1', start, {'sma': [5, 10]})
+        key2 = FeatureCache.make_key('USDJPY', 'H1', start, {'sma': [5, 10]})
+        key3 = FeatureCache.make_key('USDJPY', 'H1', start, {'sma': [5, 20]})
+
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_hit_miss_counters(self):
+        """ヒット・ミスが種別毎に記録されること"""
+        cache = FeatureCache()
+
+        assert cache.get('features', 'a') is None
+        cache.put('features', 'a', 'value', nbytes=10)
+        assert cache.get('features', 'a') == 'value'
+        assert cache.get('model', 'a') is None
+
+        stats = cache.get_statistics()
+        assert stats['counters']['features'] == {
+            'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'entries': 1
+        }
+        assert stats['counters']['model']['misses'] == 1
+        assert stats['size_bytes'] == 10
+
+    def test_lru_eviction_by_entries(self):
+        """最大エントリ数を超えると最も古く使われたエントリが削除されること"""
+        cache = FeatureCache(max_entries=2)
+        cache.put('features', 'a', 1, nbytes=0)
+        cache.put('features', 'b', 2, nbytes=0)
+        cache.get('features', 'a')
+        cache.put('features', 'c', 3, nbytes=0)
+
+        assert cache.get('features', 'b') is None
+        assert cache.get('features', 'a') == 1
+        assert cache.get('features', 'c') == 3
+        assert cache.get_statistics()['evictions'] == 1
+
+    def test_eviction_by_size(self):
+        """最大サイズを超えると削除されること"""
+        frame = pd.DataFrame({'close': range(1000)})
+        nbytes = int(frame.memory_usage(index=True).sum())
+        cache = FeatureCache(max_bytes=nbytes * 2)
+
+        cache.put('features', 'a', frame)
+        cache.put('features', 'b', frame)
+        cache.put('features', 'c', frame)
+
+        stats = cache.get_statistics()
+        assert stats['entries'] == 2
+        assert stats['size_bytes'] <= nbytes * 2
+
+    def test_model_size_counts_towards_limit(self):
+        """学習済みモデルのサイズも最大サイズの判定に含まれること"""
+        rng = np.random.default_rng(0)
+        booster = lgb.train(
+            {'objective': 'binary', 'num_leaves': 15, 'verbose': -1},
+            lgb.Dataset(rng.random((500, 5)), label=rng.integers(0, 2, 500)),
+            num_boost_round=20
+        )
+        model = Mock(spec=['model'])
+        model.model = booster
+        nbytes = len(booster.model_to_string())
+        cache = FeatureCache(max_bytes=int(nbytes * 2.5))
+
+        cache.put('model', 'a', model)
+        cache.put('model', 'b', model)
+        cache.put('model', 'c', model)
+
+        stats = cache.get_statistics()
+        assert stats['size_bytes'] == nbytes * 2
+        assert stats['entries'] == 2
+        assert cache.get('model', 'a') is None
+
+    def test_ttl_expiry(self):
+        """有効期限切れのエントリはミスになること"""
+        cache = FeatureCache(ttl_seconds=10)
+        with patch('backend.backtest.feature_cache.time.monotonic', return_value=100.0):
+            cache.put('features', 'a', 1, nbytes=0)
+        with patch('backend.backtest.feature_cache.time.monotonic', return_value=111.0):
+            assert cache.get('features', 'a') is None
+
+    @pytest.mark.asyncio
+    async def test_optimizer_loads_and_trains_once(self):
+        """最適化の反復全体でデータ取得と学習が1回だけ行われること"""
+        engine = BacktestEngine(Mock(), cache=FeatureCache())
+        price_data = engine._generate_dummy_data(
+            'USDJPY', 'H1', datetime(2023, 1, 1), datetime(2023, 3, 1)
+        )
+        engine._get_historical_data = AsyncMock(return_value=price_data)
+        engine._train_model_for_backtest = AsyncMock(return_value=RuleBasedModel())
+        engine._save_backtest_result = AsyncMock()
+
+        optimizer = ParameterOptimizer(engine)
+        result = await optimizer.optimize_parameters(
+            'USDJPY', 'H1', datetime(2023, 1, 1), datetime(2023, 3, 1),
+            {'stop_loss_pips': [20, 30, 40], 'min_confidence': [0.5, 0.6]},
+            max_iterations=6
+        )
+
+        assert engine._get_historical_data.await_count == 1
+        assert engine._train_model_for_backtest.await_count == 1
+        assert result['cache_statistics']['counters']['features']['hits'] == 5
+        assert result['cache_statistics']['counters']['model']['hits'] == 5
@@ -0,0 +1,133 @@
+"""
+ポートフォリオ・バックテストのテスト
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from backend.backtest.backtest_engine import BacktestEngine
+from backend.backtest.feature_cache import FeatureCache
+from backend.backtest.portfolio import PortfolioBacktester, align_prices, simulate_portfolio
+from backend.backtest.simulation_kernel import simulate_positions
+from backend.tests.test_backtest.test_backtest_engine import RuleBasedModel
+
+
+START_DATE = datetime(2023, 1, 1)
+END_DATE = datetime(2023, 4, 1)
+UNLIMITED_RISK = {'max_positions': 100, 'max_daily_trades': 10**6, 'daily_loss_limit': 1e9, 'max_drawdown': 1e9}
+
+
+def day_index(index):
+    return pd.DatetimeIndex(index).asi8 // (86400 * 10**9)
+
+
+class TestPortfolio:
+    """PortfolioBacktesterのテストクラス"""
+
+    @pytest.fixture
+    def engine(self):
+        """結果保存を行わないBacktestEngine"""
+        engine = BacktestEngine(Mock(), cache=FeatureCache())
+        engine._save_backtest_result = AsyncMock(return_value=None)
+        return engine
+
+    @pytest.mark.parametrize('parameters', [
+        {'min_confidence': 0.5},
+        {'min_confidence': 0.5, 'use_nanpin': True, 'nanpin_interval_pips': 5},
+    ])
+    def test_single_symbol_matches_kernel(self, engine, parameters):
+        """1通貨ペア・制限なしでは simulate_positions と同じ取引・エクイティになること"""
+        price_data = engine._generate_dummy_data('GBPJPY', 'H1', START_DATE, END_DATE)
+        features = engine.feature_engine.create_features(price_data)
+        codes, confidences = RuleBasedModel().predict_with_confidence(features)
+        columns = [price_data[name].to_numpy()[:, None] for name in ('high', 'low', 'close')]
+
+        expected = simulate_positions(*[column[:, 0] for column in columns], codes, confidences, parameters)
+        result = simulate_portfolio(
+            *columns, codes[:, None], confidences[:, None], np.ones((len(price_data), 1), dtype=bool),
+            day_index(price_data.index), parameters, UNLIMITED_RISK
+        )
+
+        assert len(result['trades']['profit_loss']) > 0
+        for field in ('entry_index', 'exit_index', 'type', 'lot_size', 'profit_loss', 'exit_reason', 'nanpin_count'):
+            np.testing.assert_array_equal(result['trades'][field], expected['trades'][field])
+        np.testing.assert_array_equal(result['equity_curve']['equity'], expected['equity_curve']['equity'])
+        assert result['final_balance'] == expected['final_balance']
+
+    def test_shared_balance_and_position_limit(self):
+        """同時シグナルは信頼度順に max_positions まで建て、損益は1つの残高に反映すること"""
+        n = 10
+        close = np.tile([150.0, 160.0, 170.0], (n, 1))
+        codes = np.zeros((n, 3), dtype=np.int64)
+        codes[1] = [1, 2, 1]
+        confidences = np.tile([0.8, 0.95, 0.9], (n, 1))
+        # 2バー目以降、各通貨ペアが建値方向に 0.2 動く
+        close[2:] += [0.2, -0.2, 0.2]
+
+        result = simulate_portfolio(
+            close, close, close, codes, confidences, np.ones((n, 3), dtype=bool), np.zeros(n),
+            {'min_confidence': 0.5, 'spread_pips': 0, 'commission_per_lot': 0},
+            {'max_positions': 2}, warmup_bars=0
+        )
+
+        trades = result['trades']
+        assert sorted(trades['symbol'].tolist()) == [1, 2]
+        assert result['risk_blocks']['max_positions'] == 1
+        assert result['equity_curve']['open_positions'].max() == 2
+        # 残高100000・リスク2%・損切り50pips → 0.04ロット、20pips × 2ポジション
+        np.testing.assert_allclose(trades['profit_loss'], [800.0, 800.0])
+        assert result['final_balance'] == pytest.approx(101600.0)
+
+    def test_daily_trade_limit_resets_each_day(self):
+        """max_daily_trades は日毎に数え、日が変わると再びエントリーできること"""
+        n = 6
+        close = np.full((n, 2), 150.0)
+        # 0バー目にエントリー、2バー目にシグナル反転で決済、3バー目以降に再エントリーを試みる
+        codes = np.array([[1, 2], [0, 0], [2, 1], [1, 2], [1, 2], [0, 0]])
+
+        result = simulate_portfolio(
+            close, close, close, codes, np.ones((n, 2)), np.ones((n, 2), dtype=bool),
+            np.array([0, 0, 0, 0, 1, 1]), {'min_confidence': 0.5},
+            {'max_daily_trades': 2}, warmup_bars=0
+        )
+
+        # 初日は2件で打ち止め（決済済みでも再エントリーしない）、翌日に再開
+        assert result['trades']['entry_index'].tolist() == [0, 0, 4, 4]
+        assert result['risk_blocks']['max_daily_trades'] == 2
+        assert result['risk_blocks']['max_positions'] == 0
+
+    def test_align_prices_marks_missing_bars(self):
+        """バーの無い時刻は直前の終値で埋めて無効扱いにすること"""
+        index = pd.date_range('2024-01-01', periods=3, freq='1h')
+        frame = pd.DataFrame({'high': [1.1, 2.1, 3.1], 'low': [0.9, 1.9, 2.9], 'close': [1.0, 2.0, 3.0]}, index=index)
+
+        aligned = align_prices({'USDJPY': frame, 'EURJPY': frame.drop(index[1])})
+
+        assert aligned['valid'].tolist() == [[True, True], [True, False], [True, True]]
+        assert aligned['close'][1].tolist() == [2.0, 1.0]
+        assert aligned['high'][1].tolist() == [2.1, 1.0]
+
+    @pytest.mark.asyncio
+    async def test_run_portfolio(self, engine, monkeypatch):
+        """複数通貨ペアを1つの残高で検証し、通貨ペア別の内訳を返すこと"""
+        async def train_model(features_data, parameters):
+            return RuleBasedModel()
+
+        monkeypatch.setattr(engine, '_train_model_for_backtest', train_model)
+        symbols = ['USDJPY', 'EURJPY', 'GBPJPY']
+        price_data = {symbol: engine._generate_dummy_data(symbol, 'H1', START_DATE, END_DATE) for symbol in symbols}
+
+        result = await PortfolioBacktester(engine).run(
+            symbols, 'H1', START_DATE, END_DATE, {'min_confidence': 0.5},
+            risk_settings={'max_positions': 2}, price_data=price_data
+        )
+
+        statistics = result['statistics']
+        assert set(statistics['symbols']) == set(symbols)
+        assert statistics['max_open_positions'] <= 2
+        assert statistics['total_trades'] == sum(s['total_trades'] for s in statistics['symbols'].values())
+        assert {trade['symbol'] for trade in result['trades']} <= set(symbols)
+        assert result['equity_curve'][-1]['timestamp'] == price_data['USDJPY'].index[-1].isoformat()
+        assert engine._save_backtest_result.call_args.args[1] == 'PORTFOLIO'
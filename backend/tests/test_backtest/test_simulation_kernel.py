@@ -0,0 +1,96 @@
+"""
+シミュレーションカーネル等価性テスト
+"""
+import pytest
+from unittest.mock import Mock
+from datetime import datetime
+import numpy as np
+
+from backend.backtest import simulation_kernel
+from backend.backtest.backtest_engine import BacktestEngine
+from backend.backtest.simulation_kernel import simulate_positions
+from backend.tests.test_backtest.test_backtest_engine import RuleBasedModel
+
+
+PARAMETER_SETS = [
+    {'min_confidence': 0.5},
+    {'min_confidence': 0.0, 'risk_per_trade': 3.3},
+    {'min_confidence': 0.55, 'stop_loss_pips': 20, 'take_profit_pips': 30,
+     'spread_pips': 2, 'commission_per_lot': 300},
+    {'min_confidence': 0.55, 'use_nanpin': True, 'stop_loss_pips': 20,
+     'take_profit_pips': 30, 'nanpin_interval_pips': 3},
+    {'min_confidence': 0.5, 'use_nanpin': True, 'stop_loss_pips': 200,
+     'take_profit_pips': 300, 'nanpin_interval_pips': 7, 'nanpin_max_count': 5},
+]
+
+
+class TestSimulationKernel:
+    """シミュレーションカーネルのテストクラス"""
+
+    @pytest.fixture(scope='class')
+    def market_data(self):
+        """価格データと特徴量"""
+        engine = BacktestEngine(Mock())
+        price_data = engine._generate_dummy_data(
+            'EURJPY', 'M15', datetime(2023, 1, 1), datetime(2023, 2, 15)
+        )
+        features_data = engine.feature_engine.create_features(price_data)
+        return price_data, features_data
+
+    @pytest.fixture(params=['compiled', 'python'])
+    def engine(self, request, monkeypatch):
+        """カーネル実装（numbaコンパイル版・純Python版）毎のBacktestEngine"""
+        if request.param == 'compiled' and not simulation_kernel.NUMBA_AVAILABLE:
+            pytest.skip("numba is not installed")
+        if request.param == 'python' and simulation_kernel.NUMBA_AVAILABLE:
+            monkeypatch.setattr(
+                simulation_kernel, '_simulate_kernel',
+                simulation_kernel._simulate_kernel.py_func
+            )
+        return BacktestEngine(Mock())
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('parameters', PARAMETER_SETS)
+    async def test_kernel_matches_python_path(self, engine, market_data, parameters):
+        """カーネルとPythonループで取引・エクイティカーブが一致すること"""
+        price_data, features_data = market_data
+
+        python_trades, python_curve = await engine._simulate_trading(
+            price_data, features_data, RuleBasedModel(),
+            dict(parameters, simulation_engine='python'), 100000
+        )
+        kernel_trades, kernel_curve = await engine._simulate_trading(
+            price_data, features_data, RuleBasedModel(),
+            dict(parameters, simulation_engine='kernel'), 100000
+        )
+
+        assert len(python_trades) > 0
+        assert kernel_trades == python_trades
+        assert kernel_curve == python_curve
+
+    def test_take_profit_and_end_of_test(self):
+        """テイクプロフィット決済と最終決済"""
+        close = np.array([100.0, 100.0, 100.5, 101.2, 100.8, 100.9])
+        high = close + 0.1
+        low = close - 0.1
+        signal_codes = np.array([0, 1, 0, 0, 2, 0])
+        confidences = np.full(len(close), 0.9)
+
+        result = simulate_positions(
+            high, low, close, signal_codes, confidences,
+            {'stop_loss_pips': 50, 'take_profit_pips': 100, 'spread_pips': 0,
+             'commission_per_lot': 0},
+            initial_balance=100000, warmup_bars=1
+        )
+        trades = result['trades']
+
+        assert list(trades['exit_reason']) == [
+            simulation_kernel.EXIT_TAKE_PROFIT, simulation_kernel.EXIT_END_OF_TEST
+        ]
+        assert list(trades['type']) == [
+            simulation_kernel.POSITION_BUY, simulation_kernel.POSITION_SELL
+        ]
+        assert trades['exit_price'][0] == pytest.approx(101.0)
+        # 0.04ロット × 100pips × 1000円
+        assert trades['profit_loss'][0] == pytest.approx(4000.0)
+        assert result['final_balance'] == pytest.approx(100000 + trades['profit_loss'].sum())
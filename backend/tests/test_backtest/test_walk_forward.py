@@ -0,0 +1,118 @@
+"""
+ウォークフォワード・バックテストのテスト
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, Mock
+from datetime import datetime
+
+from backend.backtest.backtest_engine import BacktestEngine
+from backend.backtest.feature_cache import FeatureCache
+from backend.backtest.walk_forward import WalkForwardBacktester, build_windows, stitch_equity_curves
+
+
+START_DATE = datetime(2023, 1, 1)
+END_DATE = datetime(2023, 4, 1)
+
+
+class TestWalkForward:
+    """WalkForwardBacktesterのテストクラス"""
+
+    @pytest.fixture
+    def engine(self):
+        """結果保存を行わないBacktestEngine"""
+        engine = BacktestEngine(Mock(), cache=FeatureCache())
+        engine._save_backtest_result = AsyncMock(return_value=None)
+        return engine
+
+    def test_build_windows(self):
+        """ローリングは学習区間の長さを保ち、アンカードは先頭から学習すること"""
+        rolling = build_windows(1000, 400, 250, purge_bars=5)
+        assert [(w['train_start'], w['train_end'], w['test_start'], w['test_end']) for w in rolling] == [
+            (0, 395, 400, 650), (250, 645, 650, 900), (500, 895, 900, 1000)
+        ]
+
+        anchored = build_windows(1000, 400, 250, anchored=True)
+        assert [w['train_start'] for w in anchored] == [0, 0, 0]
+        assert [w['train_end'] for w in anchored] == [400, 650, 900]
+
+        assert build_windows(300, 400, 250) == []
+        with pytest.raises(ValueError):
+            build_windows(1000, 5, 250, purge_bars=5)
+
+    def test_stitch_carries_realized_profit(self):
+        """後続ウィンドウのエクイティに前ウィンドウまでの確定損益を加算すること"""
+        def window(index, profit):
+            return {
+                'window': index,
+                'equity_curve': [{'timestamp': str(index), 'equity': 100000.0 + profit, 'balance': 100000.0 + profit}],
+                'trades': [{'profit_loss': profit}]
+            }
+
+        equity_curve, trades = stitch_equity_curves([window(0, 500.0), window(1, -200.0)])
+
+        assert [point['equity'] for point in equity_curve] == [100500.0, 100300.0]
+        assert [trade['window'] for trade in trades] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_warm_start_windows(self, engine):
+        """ウォームスタートで木を積み増し、テスト区間をつなげたエクイティカーブを返すこと"""
+        price_data = engine._generate_dummy_data('USDJPY', 'H1', START_DATE, END_DATE)
+        create_features = Mock(wraps=engine.feature_engine.create_features)
+        engine.feature_engine.create_features = create_features
+
+        result = await WalkForwardBacktester(engine, max_workers=2).run(
+            'USDJPY', 'H1', START_DATE, END_DATE, {'min_confidence': 0.4, 'warm_start_rounds': 20},
+            train_bars=1000, test_bars=400, price_data=price_data
+        )
+
+        windows = result['windows']
+        assert len(windows) == 3
+        assert create_features.call_count == 1
+        assert windows[1]['num_trees'] > windows[0]['num_trees']
+        assert windows[2]['num_trees'] > windows[1]['num_trees']
+        assert len(result['equity_curve']) == len(price_data) - 1000
+        assert result['equity_curve'][0]['timestamp'] == price_data.index[1000].isoformat()
+        assert result['statistics']['total_trades'] == sum(w['statistics']['total_trades'] for w in windows)
+
+        saved_parameters = engine._save_backtest_result.call_args.args[7]
+        assert saved_parameters['walk_forward']['windows'] == 3
+
+    @pytest.mark.asyncio
+    async def test_independent_windows(self, engine):
+        """ウォームスタート無しでは各ウィンドウを個別に学習すること"""
+        price_data = engine._generate_dummy_data('USDJPY', 'H1', START_DATE, END_DATE)
+
+        result = await WalkForwardBacktester(engine, max_workers=2).run(
+            'USDJPY', 'H1', START_DATE, END_DATE, {'min_confidence': 0.4},
+            train_bars=1000, test_bars=600, anchored=True, warm_start=False, price_data=price_data
+        )
+
+        windows = result['windows']
+        assert [w['window'] for w in windows] == [0, 1]
+        assert windows[1]['train_start'] == windows[0]['train_start']
+        assert windows[0]['test_end'] < windows[1]['test_start']
+
+    def test_warm_start_with_unseen_label(self, engine):
+        """前ウィンドウに無かったラベルが現れても学習できること"""
+        rng = np.random.default_rng(0)
+
+        def train_data(labels):
+            features = pd.DataFrame(rng.normal(size=(300, 4)), columns=['f0', 'f1', 'f2', 'f3'])
+            features['target'] = rng.choice(labels, size=300)
+            return features
+
+        parameters = {'warm_start_rounds': 5}
+        first = engine._fit_model(train_data([0, 1]), parameters)
+
+        # 新しいラベルが既存ラベルの後ろに並ぶ場合は続きから学習
+        extended = engine._fit_model(train_data([0, 1, 2]), parameters, first)
+        assert list(extended.label_encoder.classes_) == [0, 1, 2]
+        assert extended.model.num_trees() > first.model.num_trees()
+
+        # クラス番号がずれる場合は新規学習
+        shifted = engine._fit_model(train_data([1, 2]), parameters)
+        retrained = engine._fit_model(train_data([0, 1, 2]), parameters, shifted)
+        assert list(retrained.label_encoder.classes_) == [0, 1, 2]
+        assert retrained.predict(train_data([0])[['f0', 'f1', 'f2', 'f3']]).shape == (300,)
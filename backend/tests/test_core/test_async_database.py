@@ -0,0 +1,140 @@
+"""
+AsyncDatabase・イベントループ遅延監視のテスト
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from backend.core.async_database import AsyncDatabase
+from backend.monitoring.event_loop_monitor import EventLoopLagMonitor
+
+
+class SlowCursor:
+    """実行に時間がかかるカーソル"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        time.sleep(self.delay)
+        self.rowcount = 1
+
+    def fetchall(self):
+        return [{'value': 1}, {'value': 2}]
+
+    def fetchone(self):
+        return {'value': 1}
+
+
+class FakeDatabaseManager:
+    """同期DBアクセスを模擬するDatabaseManager"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.pool = None
+        self.commits = 0
+
+    @contextmanager
+    def get_connection(self):
+        manager = self
+
+        class Connection:
+            def cursor(self, cursor_factory=None):
+                return SlowCursor(manager.delay)
+
+            def commit(self):
+                manager.commits += 1
+
+        yield Connection()
+
+
+class TestAsyncDatabase:
+    """AsyncDatabaseのテストクラス"""
+
+    @pytest.mark.asyncio
+    async def test_run_offloads_to_db_thread(self):
+        """同期関数がイベントループ外のスレッドで実行されること"""
+        async_db = AsyncDatabase(FakeDatabaseManager(), max_workers=2)
+        try:
+            thread_name = await async_db.run(lambda: threading.current_thread().name)
+            assert thread_name.startswith('db')
+
+            stats = async_db.get_statistics()
+            assert stats['completed'] == 1
+            assert stats['active'] == 0
+        finally:
+            async_db.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_fetch_and_execute(self):
+        """fetch_all/fetch_one/executeが結果を返すこと"""
+        manager = FakeDatabaseManager()
+        async_db = AsyncDatabase(manager, max_workers=1)
+        try:
+            assert await async_db.fetch_all("SELECT 1") == [{'value': 1}, {'value': 2}]
+            assert await async_db.fetch_one("SELECT 1") == {'value': 1}
+            assert await async_db.execute("DELETE FROM t") == 1
+            assert manager.commits == 1
+        finally:
+            async_db.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self):
+        """例外がそのまま伝播し失敗数に記録されること"""
+        async_db = AsyncDatabase(FakeDatabaseManager(), max_workers=1)
+
+        def fail():
+            raise ValueError("query failed")
+
+        try:
+            with pytest.raises(ValueError):
+                await async_db.run(fail)
+            assert async_db.get_statistics()['failed'] == 1
+        finally:
+            async_db.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_slow_query_does_not_block_loop(self):
+        """遅いクエリ実行中もイベントループが止まらないこと"""
+        async_db = AsyncDatabase(FakeDatabaseManager(delay=0.3), max_workers=1)
+        monitor = EventLoopLagMonitor(interval=0.02)
+        monitor.start()
+        try:
+            await async_db.fetch_all("SELECT pg_sleep(0.3)")
+        finally:
+            await monitor.stop()
+            async_db.shutdown()
+
+        stats = monitor.get_statistics()
+        assert stats['samples'] > 5
+        assert stats['max_lag_ms'] < 150
+
+
+class TestEventLoopLagMonitor:
+    """EventLoopLagMonitorのテストクラス"""
+
+    @pytest.mark.asyncio
+    async def test_detects_blocking_call(self):
+        """同期ブロックが遅延として計測されること"""
+        monitor = EventLoopLagMonitor(interval=0.02, warning_threshold_ms=100)
+        monitor.start()
+        await asyncio.sleep(0.05)
+
+        time.sleep(0.2)  # イベントループをブロック
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        stats = monitor.get_statistics()
+        assert not stats['running']
+        assert stats['max_lag_ms'] >= 150
+        assert stats['blocked_samples'] >= 1
@@ -0,0 +1,281 @@
+"""
+バックテスト結果保存（COPY一括保存・JSONB）のテスト
+"""
+import json
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.backtest_results import (
+    EQUITY_COPY_DTYPE, LIST_COLUMNS, BacktestResultStore, decode_json_column, to_jsonb
+)
+from backend.core.database import PGCOPY_HEADER, PGCOPY_TRAILER, PG_EPOCH
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.db.executed.append((query, params))
+
+    def copy_expert(self, sql, buffer):
+        self.db.copied[sql.split()[1]] = (sql, buffer.read())
+
+
+class FakeDatabaseManager:
+    def __init__(self):
+        self.executed = []
+        self.copied = {}
+        self.commits = 0
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+def make_result(points, trade_count):
+    timestamps = pd.date_range('2024-01-01', periods=points, freq='1min')
+    equity_curve = [
+        {'timestamp': ts.isoformat(), 'equity': 100000.0 + i, 'balance': 100000.0, 'unrealized_pnl': float(i),
+         'position': 'BUY', 'price': 150.0}
+        for i, ts in enumerate(timestamps)
+    ]
+    trades = [
+        {'entry_time': '2024-01-01T00:00:00', 'exit_time': '2024-01-01T01:00:00', 'type': 'BUY',
+         'entry_price': 150.0, 'exit_price': 150.1, 'lot_size': 0.1, 'profit_loss': 100.0,
+         'duration_hours': 1.0, 'exit_reason': 'take_profit', 'nanpin_count': 0, 'commission': 0.0}
+        for _ in range(trade_count)
+    ]
+    statistics = {
+        'final_balance': 101000.0, 'total_trades': trade_count, 'winning_trades': trade_count,
+        'win_rate': 100.0, 'profit_factor': float('inf'), 'max_drawdown_percent': 1.5,
+        'sharpe_ratio': np.float64(1.2), 'return_percent': 1.0
+    }
+    return equity_curve, trades, statistics
+
+
+class TestBacktestResultStore:
+    """BacktestResultStoreのテストクラス"""
+
+    def test_full_curve_and_trades_are_copied(self):
+        """エクイティカーブ・取引を間引かずにCOPYで1トランザクション保存すること"""
+        db = FakeDatabaseManager()
+        equity_curve, trades, statistics = make_result(5000, 250)
+
+        result = BacktestResultStore(db).save(
+            'bt_1', 'USDJPY', 'H1', datetime(2024, 1, 1), datetime(2024, 2, 1), 100000,
+            statistics, {'min_confidence': 0.7}, equity_curve, trades
+        )
+
+        assert result['equity_points'] == 5000
+        assert result['trades'] == 250
+        assert db.commits == 1
+        # 行毎のINSERTは使わない（メイン結果とステージングからの一括INSERTのみ）
+        inserts = [params for query, params in db.executed if 'INSERT' in query]
+        assert inserts[1] == ('bt_1',)
+        assert len(inserts) == 2
+
+        sql, body = db.copied['backtest_equity_staging']
+        assert 'FORMAT binary' in sql
+        assert body.startswith(PGCOPY_HEADER) and body.endswith(PGCOPY_TRAILER)
+        records = np.frombuffer(body[len(PGCOPY_HEADER):-len(PGCOPY_TRAILER)], dtype=EQUITY_COPY_DTYPE)
+        assert len(records) == 5000
+        assert records['equity'][-1] == 104999.0
+        assert records['unrealized_pnl'][-1] == 4999.0
+        assert PG_EPOCH + np.timedelta64(int(records['timestamp'][-1]), 'us') == np.datetime64('2024-01-04T11:19')
+
+        sql, body = db.copied['backtest_trades']
+        assert 'nanpin_count' not in sql
+        assert len(body.splitlines()) == 250
+
+    def test_statistics_stored_as_json(self):
+        """統計はJSONとして保存し、Inf・NumPy型も扱えること"""
+        db = FakeDatabaseManager()
+        _, _, statistics = make_result(0, 0)
+
+        BacktestResultStore(db).save(
+            'bt_2', 'USDJPY', 'H1', datetime(2024, 1, 1), datetime(2024, 2, 1), 100000,
+            statistics, {}, [], []
+        )
+
+        params = [params for query, params in db.executed if 'backtest_results' in query][0]
+        stored = json.loads(params[-2])
+        assert stored['profit_factor'] is None
+        assert stored['sharpe_ratio'] == 1.2
+        assert db.copied == {}
+
+    def test_load_decodes_json_columns(self):
+        """保存済みの結果をJSONB列を辞書に戻して読み込むこと"""
+        db = FakeLoadDatabase({
+            'backtest_results': [(
+                'bt_1', 'USDJPY', 'H1', datetime(2024, 1, 1), datetime(2024, 2, 1), 100000.0,
+                {'rsi_period': 14}, to_jsonb({'return_percent': 2.5}), datetime(2024, 2, 2)
+            )],
+            'backtest_equity_curves': [(datetime(2024, 1, 1), 100000.0, 100000.0, 0.0)],
+            'backtest_trades': [(datetime(2024, 1, 1), datetime(2024, 1, 2), 'BUY', 150.0, 151.0,
+                                 0.1, 1000.0, 24.0, 'take_profit')]
+        })
+
+        result = BacktestResultStore(db).load('bt_1')
+
+        assert result['parameters'] == {'rsi_period': 14}
+        assert result['statistics'] == {'return_percent': 2.5}
+        assert result['period'] == {'start_date': '2024-01-01T00:00:00', 'end_date': '2024-02-01T00:00:00'}
+        assert result['equity_curve'][0]['equity'] == 100000.0
+        assert result['trades'][0]['exit_reason'] == 'take_profit'
+        assert BacktestResultStore(FakeLoadDatabase({})).load('missing') is None
+
+    def test_decode_json_column(self):
+        """JSONB・JSON文字列・移行前のstr(dict)を評価せずに読めること"""
+        assert decode_json_column({'a': 1}) == {'a': 1}
+        assert decode_json_column(to_jsonb({'a': 1.5})) == {'a': 1.5}
+        assert decode_json_column("{'return_percent': 2.5}") == {'return_percent': 2.5}
+        assert decode_json_column("__import__('os').system('true')") == {}
+        assert decode_json_column(None) == {}
+
+
+class FakeLoadCursor(FakeCursor):
+    """結果読み込み用: クエリの対象テーブルに応じた行を返す"""
+
+    def execute(self, query, params=None):
+        self.db.executed.append((query, params))
+        table = query.split('FROM')[1].split()[0]
+        self.result = self.db.tables.get(table, [])
+        if table == 'backtest_results':
+            self.description = [(column,) for column in (
+                'test_id', 'symbol', 'timeframe', 'period_start', 'period_end',
+                'initial_balance', 'parameters', 'statistics', 'created_at'
+            )]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+
+class FakeLoadDatabase(FakeDatabaseManager):
+    def __init__(self, tables):
+        super().__init__()
+        self.tables = tables
+
+    def cursor(self):
+        return FakeLoadCursor(self)
+
+
+class FakeListingCursor(FakeCursor):
+    """一覧クエリ用: 並べ替え済みの行を返し、実行したSQLを記録する"""
+
+    def execute(self, query, params=None):
+        self.db.executed.append((query, params))
+        if query.lstrip().startswith('EXPLAIN'):
+            self.result = [(json.dumps([{'Plan': {'Plan Rows': 12345}}]),)]
+        elif 'COUNT(*)' in query:
+            self.result = [(len(self.db.rows),)]
+        else:
+            limit = params[-2]
+            self.result = [tuple(row[column] for column in LIST_COLUMNS) for row in self.db.rows[:limit]]
+        self.description = [(column,) for column in LIST_COLUMNS]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0]
+
+
+class FakeListingDatabase(FakeDatabaseManager):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    def cursor(self):
+        return FakeListingCursor(self)
+
+
+def make_rows(count):
+    return [
+        {column: 0 for column in LIST_COLUMNS} | {
+            'test_id': f'bt_{i}', 'symbol': 'USDJPY', 'timeframe': 'H1',
+            'created_at': datetime(2024, 1, 1, 12, i), 'return_percent': 10.0 - i
+        }
+        for i in range(count)
+    ]
+
+
+class TestBacktestResultListing:
+    """結果一覧（キーセットページング）のテストクラス"""
+
+    def test_first_page_returns_cursor(self):
+        """page_size+1件を読み、次ページがあれば最終行からカーソルを作ること"""
+        db = FakeListingDatabase(make_rows(3))
+
+        listing = BacktestResultStore(db).list_results(page_size=2, symbol='USDJPY')
+
+        assert [item['test_id'] for item in listing['items']] == ['bt_0', 'bt_1']
+        assert listing['has_next'] is True
+        assert listing['total_count'] == 3
+        assert listing['count_is_estimate'] is False
+        query, params = db.executed[0]
+        assert 'ORDER BY created_at DESC, test_id DESC' in query
+        assert params == ['USDJPY', 3, 0]
+
+        value, test_id = BacktestResultStore.decode_cursor(listing['next_cursor'], 'created_at', True)
+        assert value == datetime(2024, 1, 1, 12, 1)
+        assert test_id == 'bt_1'
+
+    def test_cursor_uses_keyset_condition(self):
+        """カーソル指定時はOFFSETではなく (列, test_id) の比較で続きを読むこと"""
+        db = FakeListingDatabase(make_rows(1))
+        cursor = BacktestResultStore.encode_cursor('return_percent', False, np.float64(9.0), 'bt_1')
+
+        listing = BacktestResultStore(db).list_results(
+            page_size=2, cursor=cursor, sort='return_percent', descending=False, count='none', offset=40
+        )
+
+        query, params = db.executed[0]
+        assert '(return_percent, test_id) > (%s, %s)' in query
+        assert params == [9.0, 'bt_1', 3, 0]
+        assert len(db.executed) == 1
+        assert listing['has_next'] is False
+        assert listing['next_cursor'] is None
+        assert listing['total_count'] is None
+
+    def test_estimated_count(self):
+        """estimate は COUNT(*) ではなく実行計画の推定行数を返すこと"""
+        db = FakeListingDatabase(make_rows(2))
+
+        listing = BacktestResultStore(db).list_results(timeframe='H1', count='estimate')
+
+        assert listing['total_count'] == 12345
+        assert listing['count_is_estimate'] is True
+        assert not any('COUNT(*)' in query for query, _ in db.executed)
+        assert db.executed[-1][1] == ['H1']
+
+    def test_invalid_cursor_and_sort(self):
+        """不正なカーソル・並べ替え順の異なるカーソル・未知の列はValueErrorにすること"""
+        store = BacktestResultStore(FakeListingDatabase([]))
+        cursor = BacktestResultStore.encode_cursor('created_at', True, datetime(2024, 1, 1), 'bt_0')
+
+        with pytest.raises(ValueError):
+            store.list_results(cursor='not-a-cursor')
+        with pytest.raises(ValueError):
+            store.list_results(cursor=cursor, sort='sharpe_ratio')
+        with pytest.raises(ValueError):
+            store.list_results(sort='parameters')
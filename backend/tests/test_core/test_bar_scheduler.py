@@ -0,0 +1,209 @@
+"""
+BarCloseSchedulerのテスト
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from backend.core.bar_scheduler import BarCloseScheduler, TIMEFRAME_SECONDS, bar_open_time
+from backend.core.mt5_worker import MT5Worker
+
+
+class FakeMT5Client:
+    """最新足の時刻を返すMT5Client"""
+
+    def __init__(self):
+        self.bar_time = None
+        self.threads = set()
+
+    def get_rates(self, symbol, timeframe, count=1):
+        self.threads.add(threading.current_thread().name)
+        if self.bar_time is None:
+            return None
+        return pd.DataFrame({'time': [self.bar_time], 'close': [150.0]})
+
+
+class FakeHub:
+    """ティック時刻を指定できるマーケットデータハブ"""
+
+    def __init__(self):
+        self.mt5_client = FakeMT5Client()
+        self.tick_time = datetime(2024, 1, 1, 10, 0, 30)
+        self.watched = set()
+        self.tick_calls = 0
+
+    def watch(self, symbol):
+        self.watched.add(symbol)
+
+    def get_tick(self, symbol):
+        self.tick_calls += 1
+        if self.tick_time is None:
+            return None
+        return {'symbol': symbol, 'time': self.tick_time, 'bid': 150.0}
+
+
+@pytest.fixture
+def hub():
+    return FakeHub()
+
+
+@pytest.fixture
+def worker():
+    worker = MT5Worker(name='test-mt5-io')
+    yield worker
+    worker.stop()
+
+
+@pytest.fixture
+def scheduler(hub, worker):
+    return BarCloseScheduler(hub, poll_interval=0.01, worker=worker)
+
+
+class TestBarCloseScheduler:
+    """BarCloseSchedulerのテストクラス"""
+
+    def test_timeframe_seconds(self):
+        """時間軸毎の足の長さ・開始時刻が正しいこと"""
+        assert TIMEFRAME_SECONDS['M1'] == 60
+        assert TIMEFRAME_SECONDS['H4'] == 4 * 3600
+        assert TIMEFRAME_SECONDS['D1'] == 86400
+        assert bar_open_time(3725.0, 'M5') == 3600.0
+
+    @pytest.mark.asyncio
+    async def test_fires_only_on_new_bar(self, hub, scheduler):
+        """同じ足の間は呼ばず、足が切り替わった時に1回だけ呼ぶこと"""
+        events = []
+
+        async def callback(event):
+            events.append(event)
+
+        scheduler.subscribe('USDJPY', 'M1', callback)
+        assert 'USDJPY' in hub.watched
+        # 登録時はMT5から取得しない（最初の確認で現在の足を記録）
+        assert hub.tick_calls == 0
+
+        hub.tick_time = datetime(2024, 1, 1, 10, 0, 59)
+        assert await scheduler.check_once() == 0
+
+        hub.tick_time = datetime(2024, 1, 1, 10, 1, 2)
+        assert await scheduler.check_once() == 1
+        assert await scheduler.check_once() == 0
+        await asyncio.sleep(0)
+
+        assert len(events) == 1
+        assert events[0]['bar_time'] == datetime(2024, 1, 1, 10, 1)
+        assert events[0]['closed_bar_time'] == datetime(2024, 1, 1, 10, 0)
+        assert events[0]['latency_seconds'] == pytest.approx(2.0)
+
+    @pytest.mark.asyncio
+    async def test_fire_immediately(self, scheduler):
+        """fire_immediately指定時は現在の足で1回呼ぶこと"""
+        events = []
+
+        async def callback(event):
+            events.append(event)
+
+        scheduler.subscribe('USDJPY', 'H1', callback, fire_immediately=True)
+        assert await scheduler.check_once() == 1
+        await asyncio.sleep(0)
+
+        assert events[0]['bar_time'] == datetime(2024, 1, 1, 10)
+        assert events[0]['closed_bar_time'] is None
+
+    @pytest.mark.asyncio
+    async def test_skips_bar_while_callback_running(self, hub, scheduler):
+        """前回のコールバック実行中は次の足を見送ること"""
+        release = asyncio.Event()
+        calls = []
+
+        async def callback(event):
+            calls.append(event['bar_time'])
+            await release.wait()
+
+        subscription_id = scheduler.subscribe('USDJPY', 'M1', callback, fire_immediately=True)
+        await scheduler.check_once()
+        await asyncio.sleep(0)
+
+        hub.tick_time = datetime(2024, 1, 1, 10, 1, 1)
+        assert await scheduler.check_once() == 0
+
+        release.set()
+        await asyncio.sleep(0)
+
+        stats = scheduler.get_statistics()['subscriptions'][subscription_id]
+        assert stats['fired'] == 1
+        assert stats['skipped'] == 1
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_rates(self, hub, scheduler):
+        """ティックが取得できない場合は最新足の時刻で判定すること"""
+        hub.tick_time = None
+        hub.mt5_client.bar_time = pd.Timestamp('2024-01-01 10:15:00')
+        events = []
+
+        async def callback(event):
+            events.append(event)
+
+        scheduler.subscribe('USDJPY', 'M15', callback)
+        assert await scheduler.check_once() == 0
+        hub.mt5_client.bar_time = pd.Timestamp('2024-01-01 10:30:00')
+        assert await scheduler.check_once() == 1
+        await asyncio.sleep(0)
+
+        assert events[0]['bar_time'] == datetime(2024, 1, 1, 10, 30)
+        # 最新足の取得はMT5ワーカースレッドで実行
+        assert hub.mt5_client.threads == {'test-mt5-io'}
+
+    @pytest.mark.skipif(not hasattr(time, 'tzset'), reason="time.tzset is not available")
+    @pytest.mark.asyncio
+    async def test_event_times_are_utc(self, hub, scheduler, monkeypatch):
+        """ローカルタイムゾーンに関係なく足の時刻をUTC（MT5の足と同じ表現）で渡すこと"""
+        monkeypatch.setenv('TZ', 'Asia/Tokyo')
+        time.tzset()
+        try:
+            hub.tick_time = None
+            hub.mt5_client.bar_time = pd.Timestamp('2024-01-01 10:00:00')
+            events = []
+
+            async def callback(event):
+                events.append(event)
+
+            scheduler.subscribe('USDJPY', 'H1', callback)
+            await scheduler.check_once()
+            hub.mt5_client.bar_time = pd.Timestamp('2024-01-01 11:00:00')
+            assert await scheduler.check_once() == 1
+            await asyncio.sleep(0)
+        finally:
+            monkeypatch.delenv('TZ')
+            time.tzset()
+
+        assert events[0]['bar_time'] == datetime(2024, 1, 1, 11)
+        assert events[0]['closed_bar_time'] == datetime(2024, 1, 1, 10)
+
+    @pytest.mark.asyncio
+    async def test_start_stop(self, hub, scheduler):
+        """開始後はループで足の切り替わりを検出し、登録解除後は呼ばないこと"""
+        events = []
+
+        async def callback(event):
+            events.append(event)
+
+        subscription_id = scheduler.subscribe('USDJPY', 'M1', callback)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        hub.tick_time = datetime(2024, 1, 1, 10, 1, 0)
+        await asyncio.sleep(0.05)
+        assert len(events) == 1
+
+        scheduler.unsubscribe(subscription_id)
+        hub.tick_time = datetime(2024, 1, 1, 10, 2, 0)
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+        assert len(events) == 1
+        assert not scheduler.running
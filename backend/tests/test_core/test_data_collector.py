@@ -0,0 +1,231 @@
+"""
+IncrementalCollectorの差分取得・欠損補完のテスト
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+from backend.core.data_collector import IncrementalCollector
+
+
+def bars(start, periods, freq='1min'):
+    times = pd.date_range(start, periods=periods, freq=freq)
+    return pd.DataFrame({
+        'time': times,
+        'open': 150.0, 'high': 150.1, 'low': 149.9, 'close': 150.0,
+        'tick_volume': 10, 'spread': 2, 'real_volume': 0
+    })
+
+
+class FakeMT5IO:
+    """指定した足を返す非同期MT5クライアント"""
+
+    def __init__(self, history):
+        self.history = history
+        self.rates_calls = []
+        self.range_calls = []
+
+    async def get_rates(self, symbol, timeframe, count=1000):
+        self.rates_calls.append(count)
+        return self.history.tail(count).reset_index(drop=True)
+
+    async def get_rates_range(self, symbol, timeframe, start, end):
+        self.range_calls.append((start, end))
+        times = self.history['time']
+        return self.history[(times >= start) & (times <= end)].reset_index(drop=True)
+
+
+class FakeDatabaseManager:
+    """保存内容を記録するDatabaseManager"""
+
+    def __init__(self):
+        self.saved = []
+
+    def bulk_save_price_data(self, df, symbol=None, timeframe=None):
+        self.saved.append(df)
+        return {'success': True, 'rows': len(df)}
+
+
+class FakeLastBarsDatabase(FakeDatabaseManager):
+    """MAX(time) をTIMESTAMPTZと同じタイムゾーン付きで返すDatabaseManager"""
+
+    def __init__(self, last_bars):
+        super().__init__()
+        self.last_bars = last_bars
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return self.last_bars
+
+
+class InlineAsyncDatabase:
+    """同じスレッドで実行するAsyncDatabase"""
+
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+def make_collector(history, last_bar=None):
+    collector = IncrementalCollector(
+        FakeMT5IO(history), FakeDatabaseManager(),
+        symbols=['USDJPY'], timeframes=['M1'], async_db=InlineAsyncDatabase(),
+        initial_bars=50, backfill_chunk_bars=30
+    )
+    collector._load_last_bars = lambda: (
+        {('USDJPY', 'M1'): pd.Timestamp(last_bar)} if last_bar else {}
+    )
+    return collector
+
+
+class TestIncrementalCollector:
+    """IncrementalCollectorのテストクラス"""
+
+    @pytest.mark.asyncio
+    async def test_only_new_closed_bars_are_written(self):
+        """保存済みの足と形成中の足は書き込まないこと"""
+        history = bars('2024-01-01 10:00', 100)
+        collector = make_collector(history, last_bar='2024-01-01 11:35')
+
+        result = await collector.collect_once()
+
+        # 11:36〜11:38が新しい確定足、11:39は形成中
+        assert result['rows_written'] == 3
+        assert result['rows_skipped'] == 7
+        assert result['gap_repairs'] == 0
+        saved = collector.db_manager.saved[0]
+        assert saved['time'].min() == pd.Timestamp('2024-01-01 11:36')
+        assert collector.last_bars[('USDJPY', 'M1')] == pd.Timestamp('2024-01-01 11:38')
+
+        # 新しい足が無ければ何も書かない
+        result = await collector.collect_once()
+        assert result['rows_written'] == 0
+        assert len(collector.db_manager.saved) == 1
+
+    @pytest.mark.asyncio
+    async def test_gap_is_backfilled_in_chunks(self):
+        """取得した足が保存済みの足と重ならない場合、期間を分割して補完すること"""
+        history = bars('2024-01-01 10:00', 100)
+        collector = make_collector(history, last_bar='2024-01-01 10:04')
+
+        result = await collector.collect_once()
+
+        assert result['gap_repairs'] == 1
+        # 10:05〜11:38の確定足が欠損補完と差分で全て保存される
+        saved = collector.db_manager.saved[0]
+        assert len(saved) == 94
+        assert saved['time'].is_unique
+        assert len(collector.mt5_io.range_calls) == 3  # 30本ずつ
+        stats = collector.get_statistics()
+        assert stats['gap_rows'] == 85
+        assert stats['last_bars'] == {'USDJPY_M1': '2024-01-01T11:38:00'}
+
+    @pytest.mark.asyncio
+    async def test_initial_load_without_stored_bars(self):
+        """保存済みの足が無い場合は initial_bars 本を取得して保存すること"""
+        collector = make_collector(bars('2024-01-01 10:00', 100))
+
+        result = await collector.collect_once()
+
+        assert collector.mt5_io.rates_calls == [50]
+        assert result['rows_written'] == 49
+
+    @pytest.mark.asyncio
+    async def test_failed_save_keeps_last_bar(self):
+        """保存に失敗した場合は最終足を進めず、エラーとして数えること"""
+        collector = make_collector(bars('2024-01-01 10:00', 100), last_bar='2024-01-01 11:35')
+        collector.db_manager.bulk_save_price_data = lambda df, symbol, timeframe: {
+            'success': False, 'rows': 0, 'error': 'database unavailable'
+        }
+
+        await collector.collect_once()
+
+        assert collector.last_bars[('USDJPY', 'M1')] == pd.Timestamp('2024-01-01 11:35')
+        assert collector.get_statistics()['errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_higher_timeframes_derived_from_m1(self):
+        """derived_timeframes の確定足を保存済みM1から組み立てること"""
+        history = bars('2024-01-01 10:00', 100)
+        db_manager = FakeDatabaseManager()
+        saved_m1 = []
+
+        def load_m1(symbol, start, end):
+            m1 = pd.concat(saved_m1)
+            return m1[(m1['time'] >= start) & (m1['time'] <= end)]
+
+        collector = IncrementalCollector(
+            FakeMT5IO(history), db_manager,
+            symbols=['USDJPY'], timeframes=['M1'], derived_timeframes=['M5', 'M15'],
+            async_db=InlineAsyncDatabase(), initial_bars=50
+        )
+        collector._load_last_bars = lambda: {}
+        collector._load_m1 = load_m1
+        db_manager.bulk_save_price_data = lambda df, symbol, timeframe: (
+            saved_m1.append(df) if timeframe == 'M1' else db_manager.saved.append((timeframe, df))
+        ) or {'success': True, 'rows': len(df)}
+
+        result = await collector.collect_once()
+
+        # M1は10:50〜11:38、M5は10:50〜11:30、M15は11:00〜11:15の確定足
+        derived = dict(db_manager.saved)
+        assert list(derived['M5']['time']) == list(pd.date_range('2024-01-01 10:50', '2024-01-01 11:30', freq='5min'))
+        assert list(derived['M15']['time']) == list(pd.date_range('2024-01-01 11:00', '2024-01-01 11:15', freq='15min'))
+        assert result['derived_rows'] == 9 + 2
+        assert collector.get_statistics()['derived_rows'] == 9 + 2
+        assert collector.last_bars[('USDJPY', 'M5')] == pd.Timestamp('2024-01-01 11:30')
+
+        # 次回は未確定だった足から組み立てる
+        collector.mt5_io.history = bars('2024-01-01 10:00', 110)
+        db_manager.saved.clear()
+        await collector.collect_once()
+        derived = dict(db_manager.saved)
+        assert list(derived['M5']['time']) == [pd.Timestamp('2024-01-01 11:35'), pd.Timestamp('2024-01-01 11:40')]
+        assert list(derived['M15']['time']) == [pd.Timestamp('2024-01-01 11:30')]
+        assert derived['M15']['tick_volume'].iloc[0] == 150
+
+    @pytest.mark.asyncio
+    async def test_timezone_aware_last_bars_from_database(self):
+        """DBの最終足がタイムゾーン付きでもMT5の足と比較して差分を保存すること"""
+        db_manager = FakeLastBarsDatabase([
+            ('USDJPY', 'M1', datetime(2024, 1, 1, 11, 35, tzinfo=timezone.utc))
+        ])
+        collector = IncrementalCollector(
+            FakeMT5IO(bars('2024-01-01 10:00', 100)), db_manager,
+            symbols=['USDJPY'], timeframes=['M1'], async_db=InlineAsyncDatabase(),
+            initial_bars=50
+        )
+
+        result = await collector.collect_once()
+
+        assert collector.get_statistics()['errors'] == 0
+        assert result['rows_written'] == 3
+        assert db_manager.saved[0]['time'].min() == pd.Timestamp('2024-01-01 11:36')
+        assert collector.last_bars[('USDJPY', 'M1')] == pd.Timestamp('2024-01-01 11:38')
+
+    def test_load_m1_returns_naive_utc_times(self, monkeypatch):
+        """DBから読んだM1の時刻をタイムゾーン無しUTCに揃えること"""
+        stored = bars('2024-01-01 19:00', 3)
+        stored['time'] = stored['time'].dt.tz_localize('Asia/Tokyo')
+        monkeypatch.setattr(pd, 'read_sql_query', lambda *args, **kwargs: stored.copy())
+        collector = IncrementalCollector(
+            FakeMT5IO(stored), FakeLastBarsDatabase([]),
+            symbols=['USDJPY'], timeframes=['M1'], derived_timeframes=['M5'],
+            async_db=InlineAsyncDatabase()
+        )
+
+        m1 = collector._load_m1('USDJPY', pd.Timestamp('2024-01-01 10:00'), pd.Timestamp('2024-01-01 10:02'))
+
+        assert m1['time'].dt.tz is None
+        assert list(m1['time']) == list(pd.date_range('2024-01-01 10:00', periods=3, freq='1min'))
@@ -0,0 +1,180 @@
+"""
+ConnectionPool単体テスト
+"""
+import threading
+import time
+
+import pytest
+import psycopg2
+import psycopg2.extensions
+
+from backend.core.db_pool import ConnectionPool, PoolTimeoutError
+from backend.core.database import DatabaseManager
+
+
+class FakeCursor:
+    """テスト用カーソル"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        if self.connection.fail_health_check:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.connection.status = psycopg2.extensions.STATUS_IN_TRANSACTION
+
+    def fetchone(self):
+        return (1,)
+
+
+class FakeConnection:
+    """テスト用接続"""
+
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = True
+        self.status = psycopg2.extensions.STATUS_READY
+        self.rollbacks = 0
+        self.fail_health_check = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def commit(self):
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeConnect:
+    """接続回数を数えるconnect関数"""
+
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self, **params):
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+
+def make_pool(**kwargs) -> ConnectionPool:
+    connect = FakeConnect()
+    pool = ConnectionPool({'host': 'localhost', 'database': 'test'}, connect=connect, **kwargs)
+    pool.fake_connect = connect
+    return pool
+
+
+class TestConnectionPool:
+    """ConnectionPoolのテストクラス"""
+
+    def test_connections_are_reused(self):
+        """返却した接続が再利用されること"""
+        pool = make_pool(max_size=2)
+
+        for _ in range(5):
+            connection = pool.acquire()
+            pool.release(connection)
+
+        assert len(pool.fake_connect.connections) == 1
+        stats = pool.get_statistics()
+        assert stats['acquisitions'] == 5
+        assert stats['connections_created'] == 1
+        assert stats['in_use'] == 0
+        assert stats['idle'] == 1
+
+    def test_open_transaction_rolled_back_on_release(self):
+        """未完了のトランザクションは返却時にロールバックされること"""
+        pool = make_pool()
+        connection = pool.acquire()
+        connection.status = psycopg2.extensions.STATUS_IN_TRANSACTION
+
+        pool.release(connection)
+
+        assert connection.rollbacks == 1
+        assert connection.autocommit is False
+
+    def test_acquire_timeout(self):
+        """最大接続数に達すると待機し、タイムアウトで例外になること"""
+        pool = make_pool(max_size=1)
+        connection = pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(timeout=0.05)
+
+        assert pool.get_statistics()['timeouts'] == 1
+        pool.release(connection)
+
+    def test_waiter_receives_released_connection(self):
+        """待機中のスレッドが返却された接続を受け取り、待機が記録されること"""
+        pool = make_pool(max_size=1)
+        connection = pool.acquire()
+        acquired = []
+
+        thread = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=2.0)))
+        thread.start()
+        time.sleep(0.05)
+        pool.release(connection)
+        thread.join()
+
+        assert acquired == [connection]
+        stats = pool.get_statistics()
+        assert stats['waits'] == 1
+        assert stats['wait_time_max'] > 0
+        assert stats['in_use'] == 1
+
+    def test_unhealthy_connection_replaced(self):
+        """ヘルスチェックに失敗した接続は作り直されること"""
+        pool = make_pool(health_check_interval=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.fail_health_check = True
+
+        replacement = pool.acquire()
+
+        assert replacement is not connection
+        assert connection.closed
+        stats = pool.get_statistics()
+        assert stats['health_check_failures'] == 1
+        assert stats['size'] == 1
+
+    def test_discarded_connection_frees_slot(self):
+        """破棄した接続の枠が解放されること"""
+        pool = make_pool(max_size=1)
+        connection = pool.acquire()
+        pool.release(connection, discard=True)
+
+        assert connection.closed
+        assert pool.acquire(timeout=0.05) is not connection
+
+
+class TestDatabaseManagerPooling:
+    """DatabaseManagerのプール利用テスト"""
+
+    def test_get_connection_uses_pool(self, tmp_path):
+        """get_connectionがプールから接続を借りて返すこと"""
+        manager = DatabaseManager(config_path=str(tmp_path / 'missing.conf'), use_pool=False)
+        manager.pool = make_pool()
+
+        with manager.get_connection() as conn:
+            first = conn
+        with manager.get_connection() as conn:
+            assert conn is first
+
+        with pytest.raises(psycopg2.OperationalError):
+            with manager.get_connection() as conn:
+                raise psycopg2.OperationalError("connection lost")
+
+        assert first.closed
+        assert manager.get_pool_statistics()['size'] == 0
@@ -0,0 +1,144 @@
+"""
+DrawdownMonitorのライトビハインド書き込み・ロールアップのテスト
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from backend.core.drawdown_monitor import DrawdownMonitor
+
+
+class RecordingCursor:
+    """execute_valuesの行を記録するカーソル"""
+
+    def __init__(self, db):
+        self.db = db
+        self.connection = SimpleNamespace(encoding='UTF8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def mogrify(self, template, args):
+        self.db.rows.append(args)
+        return b'(row)'
+
+    def execute(self, query, params=None):
+        if self.db.fail:
+            raise RuntimeError("database unavailable")
+        self.db.statements.append(query.decode() if isinstance(query, bytes) else query)
+
+
+class FakeDatabaseManager:
+    """書き込みを記録するDatabaseManager"""
+
+    def __init__(self):
+        self.rows = []
+        self.statements = []
+        self.fail = False
+
+    @contextmanager
+    def get_connection(self):
+        db = self
+
+        class Connection:
+            def cursor(self):
+                return RecordingCursor(db)
+
+            def commit(self):
+                pass
+
+        yield Connection()
+
+
+@pytest.fixture
+def monitor():
+    db = FakeDatabaseManager()
+    drawdown_monitor = DrawdownMonitor(db, change_threshold=1.0, flush_interval=3600)
+    drawdown_monitor.peak_equity = 100000.0
+    drawdown_monitor._get_max_drawdown_setting = lambda: 20.0
+    drawdown_monitor.db = db
+    db.statements.clear()  # 初期化時のクエリは除外
+    return drawdown_monitor
+
+
+class TestDrawdownWriteBehind:
+    """ライトビハインド書き込みのテストクラス"""
+
+    def test_small_changes_are_buffered(self, monitor):
+        """閾値未満の変化は書き込まずバッファに集約すること"""
+        monitor.update(100000.0)  # 初回は書き込み
+        assert len(monitor.db.statements) == 1
+
+        for equity in (99800.0, 99600.0, 99700.0):
+            monitor.update(equity)
+
+        assert len(monitor.db.statements) == 1
+        stats = monitor.get_write_statistics()
+        assert stats['samples'] == 4
+        assert stats['buffered_buckets'] == 2  # 分・時間
+
+        assert monitor.flush() == 2
+        minute_row = next(row for row in monitor.db.rows[2:] if row[0] == 'minute')
+        assert minute_row[2] == pytest.approx(0.2)   # 最小
+        assert minute_row[3] == pytest.approx(0.4)   # 最大
+        assert minute_row[4] == pytest.approx(0.3)   # 最終値
+        assert minute_row[7] == 3
+        assert minute_row[8].adapted['max_drawdown'] == pytest.approx(0.4)
+
+    def test_threshold_change_triggers_flush(self, monitor):
+        """閾値以上の変化で即時書き込みすること"""
+        monitor.update(100000.0)
+        monitor.update(98500.0)
+
+        assert len(monitor.db.statements) == 2
+        assert "ON CONFLICT (bucket_size, bucket_start)" in monitor.db.statements[-1]
+
+    def test_failed_flush_keeps_samples(self, monitor):
+        """書き込み失敗時はバッファに戻し、再試行を間隔まで控えること"""
+        monitor.db.fail = True
+        monitor.update(100000.0)
+        monitor.update(95000.0)
+
+        stats = monitor.get_write_statistics()
+        assert stats['failed_flushes'] == 1
+        assert stats['buffered_buckets'] == 2
+
+        monitor.db.fail = False
+        monitor.flush()
+        minute_row = [row for row in monitor.db.rows if row[0] == 'minute'][-1]
+        assert minute_row[7] == 2
+        assert minute_row[3] == pytest.approx(5.0)
+
+
+class TestDrawdownRollupReads:
+    """ロールアップ読み込みのテストクラス"""
+
+    def test_statistics_and_chart_from_rollups(self, monitor):
+        """統計・チャートがロールアップから計算されること"""
+        rollups = pd.DataFrame({
+            'bucket_start': pd.date_range('2024-01-01', periods=4, freq='h'),
+            'min_drawdown': [0.0, 0.5, 1.0, 0.0],
+            'max_drawdown': [0.0, 2.0, 3.0, 0.0],
+            'last_drawdown': [0.0, 1.5, 0.5, 0.0],
+            'samples': [10, 10, 10, 10]
+        })
+        monitor._load_rollups = lambda days: rollups
+
+        stats = monitor.get_drawdown_statistics(days=7)
+        assert stats['max_drawdown'] == 3.0
+        assert stats['average_drawdown'] == pytest.approx(2.5)
+        assert stats['longest_drawdown_period'] == 2
+
+        chart = monitor.get_drawdown_chart_data(days=7)
+        assert chart[1] == {
+            'date': datetime(2024, 1, 1, 1).isoformat(),
+            'drawdown': 1.5,
+            'min_drawdown': 0.5,
+            'max_drawdown': 2.0
+        }
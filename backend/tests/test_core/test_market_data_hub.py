@@ -0,0 +1,147 @@
+"""
+MarketDataHubのテスト
+"""
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from backend.core.market_data_hub import MarketDataHub, tick_topic, POSITIONS_TOPIC
+from backend.core.mt5_worker import MT5Worker
+
+
+class FakeMT5Client:
+    """呼び出し回数を数えるMT5Client"""
+
+    def __init__(self):
+        self.calls = {'get_tick': 0, 'get_positions': 0, 'get_account_info': 0}
+        self.bid = 150.0
+        self.threads = set()
+
+    def ensure_connection(self):
+        return True
+
+    def get_tick(self, symbol):
+        self.calls['get_tick'] += 1
+        self.threads.add(threading.current_thread().name)
+        return {'symbol': symbol, 'time': datetime(2024, 1, 1), 'bid': self.bid, 'ask': self.bid + 0.01}
+
+    def get_positions(self, symbol=None):
+        self.calls['get_positions'] += 1
+        return [{'symbol': 'USDJPY', 'ticket': 1}, {'symbol': 'EURJPY', 'ticket': 2}]
+
+    def get_account_info(self):
+        self.calls['get_account_info'] += 1
+        return {'balance': 100000.0, 'equity': 100500.0}
+
+
+@pytest.fixture
+def worker():
+    worker = MT5Worker(name='test-mt5-io')
+    yield worker
+    worker.stop()
+
+
+@pytest.fixture
+def hub(worker):
+    return MarketDataHub(FakeMT5Client(), tick_interval=0.01, account_interval=0.05, worker=worker)
+
+
+class TestMarketDataHub:
+    """MarketDataHubのテストクラス"""
+
+    def test_consumers_share_cached_snapshot(self, hub):
+        """鮮度内の取得はMT5を呼ばずキャッシュから返すこと"""
+        for _ in range(5):
+            assert hub.get_tick('USDJPY')['bid'] == 150.0
+            hub.get_account_info()
+
+        assert hub.mt5_client.calls['get_tick'] == 1
+        assert hub.mt5_client.calls['get_account_info'] == 1
+        assert hub.get_statistics()['cache_hits'] == 8
+
+    def test_stale_snapshot_is_refetched(self, hub):
+        """max_ageを超えたキャッシュはMT5から取り直すこと"""
+        hub.get_tick('USDJPY')
+        hub.mt5_client.bid = 151.0
+
+        assert hub.get_tick('USDJPY', max_age=0)['bid'] == 151.0
+        assert hub.get_snapshot(tick_topic('USDJPY'))['version'] == 2
+
+    def test_fetch_through_runs_on_mt5_worker(self, hub, worker):
+        """キャッシュ切れの取得をMT5ワーカースレッドで実行すること"""
+        hub.get_tick('USDJPY')
+        hub.get_tick('USDJPY', max_age=0)
+
+        assert hub.mt5_client.threads == {'test-mt5-io'}
+        assert worker.get_statistics()['calls']['hub_fetch_through']['calls'] == 2
+
+    def test_positions_filtered_by_symbol(self, hub):
+        """全ポジションを1回取得し、通貨ペアで絞り込むこと"""
+        assert [p['ticket'] for p in hub.get_positions('EURJPY')] == [2]
+        assert len(hub.get_positions()) == 2
+        assert hub.mt5_client.calls['get_positions'] == 1
+
+    def test_unchanged_data_keeps_version(self, hub):
+        """内容が変わらない更新ではバージョンを進めないこと"""
+        hub.poll_once()
+        hub.poll_once()
+
+        assert hub.get_snapshot(POSITIONS_TOPIC)['version'] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_fetch_does_not_block_loop(self, hub, worker):
+        """非同期取得はMT5ワーカーの処理中もイベントループを止めないこと"""
+        started, release = threading.Event(), threading.Event()
+        worker.submit(lambda: started.set() or release.wait(1.0))
+        started.wait(1.0)
+        fetch = asyncio.create_task(hub.get_tick_async('USDJPY'))
+
+        # ワーカーが塞がっている間も他のコルーチンが進む
+        await asyncio.sleep(0.02)
+        assert not fetch.done()
+        release.set()
+
+        assert (await asyncio.wait_for(fetch, timeout=1.0))['bid'] == 150.0
+        assert hub.mt5_client.threads == {'test-mt5-io'}
+        assert (await hub.get_positions_async('USDJPY'))[0]['ticket'] == 1
+        assert (await hub.get_account_info_async())['balance'] == 100000.0
+        assert (await hub.get_tick_async('USDJPY'))['bid'] == 150.0
+        assert hub.mt5_client.calls['get_tick'] == 1
+
+    @pytest.mark.asyncio
+    async def test_subscribe_receives_updates(self, hub):
+        """購読者がポーリングによる更新を順に受け取ること"""
+        hub.watch('USDJPY')
+        hub.start()
+        received = []
+
+        async def consume():
+            async for snapshot in hub.subscribe(tick_topic('USDJPY')):
+                received.append(snapshot['data']['bid'])
+                if len(received) == 2:
+                    break
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        hub.mt5_client.bid = 152.0
+        await asyncio.wait_for(consumer, timeout=1.0)
+        await hub.stop()
+
+        assert received == [150.0, 152.0]
+
+    @pytest.mark.asyncio
+    async def test_update_from_other_thread_wakes_waiter(self, hub):
+        """別スレッドでの取得による更新でも待機中の購読者が起きること"""
+        hub.get_tick('USDJPY')
+        waiter = asyncio.create_task(hub.next_update(tick_topic('USDJPY'), after_version=1, timeout=1.0))
+        await asyncio.sleep(0.01)
+
+        hub.mt5_client.bid = 153.0
+        thread = threading.Thread(target=lambda: hub.get_tick('USDJPY', max_age=0))
+        thread.start()
+        thread.join()
+
+        snapshot = await waiter
+        assert snapshot['data']['bid'] == 153.0
@@ -0,0 +1,131 @@
+"""
+MT5Worker・AsyncMT5Clientのテスト
+"""
+import asyncio
+import threading
+
+import pytest
+
+from backend.core.mt5_worker import (
+    AsyncMT5Client, MT5Worker, PRIORITY_ACCOUNT, PRIORITY_DATA, PRIORITY_ORDER
+)
+
+
+class FakeMT5Client:
+    """呼び出し順とスレッドを記録するMT5Client"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def _record(self, name):
+        self.calls.append(name)
+        self.threads.add(threading.current_thread().name)
+
+    def get_rates(self, symbol, timeframe, count=1000):
+        self._record('get_rates')
+        return [symbol, timeframe, count]
+
+    def place_order(self, symbol, order_type, volume, **kwargs):
+        self._record('place_order')
+        return {'symbol': symbol, 'type': order_type, 'volume': volume}
+
+    def get_positions(self, symbol=None):
+        self._record('get_positions')
+        raise RuntimeError("terminal error")
+
+
+@pytest.fixture
+def worker():
+    mt5_worker = MT5Worker(name='mt5-test')
+    mt5_worker.start()
+    yield mt5_worker
+    mt5_worker.stop()
+
+
+def block(worker):
+    """ワーカーを止めておき、解除用イベントを返す"""
+    gate = threading.Event()
+    started = threading.Event()
+
+    def wait():
+        started.set()
+        gate.wait(5)
+
+    worker.submit(wait, priority=PRIORITY_ORDER)
+    started.wait(5)
+    return gate
+
+
+class TestMT5Worker:
+    """MT5Workerのテストクラス"""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_on_worker_thread(self, worker):
+        """MT5呼び出しがワーカースレッドで実行され、結果がawaitで返ること"""
+        client = FakeMT5Client()
+        mt5_io = AsyncMT5Client(client, worker)
+
+        assert await mt5_io.get_rates('USDJPY', 'H1', count=10) == ['USDJPY', 'H1', 10]
+        assert client.threads == {'mt5-test'}
+
+        stats = worker.get_statistics()['calls']['get_rates']
+        assert stats['calls'] == 1
+        assert stats['priority'] == 'data'
+
+    @pytest.mark.asyncio
+    async def test_orders_run_before_data_polling(self, worker):
+        """キュー待ちの発注がデータ取得より先に実行されること"""
+        client = FakeMT5Client()
+        mt5_io = AsyncMT5Client(client, worker)
+
+        gate = block(worker)
+        data = asyncio.ensure_future(mt5_io.get_rates('USDJPY', 'M1'))
+        order = asyncio.ensure_future(mt5_io.place_order('USDJPY', 'BUY', 0.1))
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(data, order)
+
+        assert client.calls == ['place_order', 'get_rates']
+
+    @pytest.mark.asyncio
+    async def test_timed_out_call_is_not_executed(self, worker):
+        """キュー待ちでタイムアウトした呼び出しは実行されないこと"""
+        client = FakeMT5Client()
+        mt5_io = AsyncMT5Client(client, worker, timeouts={PRIORITY_DATA: 0.05})
+
+        gate = block(worker)
+        with pytest.raises(asyncio.TimeoutError):
+            await mt5_io.get_rates('USDJPY', 'M1')
+        gate.set()
+        await worker.run(lambda: None, priority=PRIORITY_DATA)
+
+        assert client.calls == []
+        stats = worker.get_statistics()['calls']['get_rates']
+        assert stats['timeouts'] == 1
+        assert stats['expired'] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self, worker):
+        """MT5呼び出しの例外が呼び出し元に伝わり、失敗数が記録されること"""
+        mt5_io = AsyncMT5Client(FakeMT5Client(), worker)
+
+        with pytest.raises(RuntimeError):
+            await mt5_io.get_positions()
+
+        assert worker.get_statistics()['calls']['get_positions']['failed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_nested_submit_runs_inline(self, worker):
+        """ワーカー上の処理からの呼び出しはデッドロックせず直接実行されること"""
+        client = FakeMT5Client()
+
+        def poll():
+            return worker.submit(client.get_rates, 'USDJPY', 'M1', priority=PRIORITY_DATA).result(1)
+
+        assert await worker.run(poll, priority=PRIORITY_ACCOUNT, timeout=1) == ['USDJPY', 'M1', 1000]
+
+    def test_unknown_method_is_rejected(self, worker):
+        """MT5Client以外の属性は公開しないこと"""
+        with pytest.raises(AttributeError):
+            AsyncMT5Client(FakeMT5Client(), worker).connect
@@ -0,0 +1,134 @@
+"""
+TradingEngineの複数通貨ペアスロット・バッチ評価のテスト
+"""
+import asyncio
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.trading_engine import TradingEngine, StrategySlot
+
+
+class FakeDatabaseManager:
+    """接続できないDatabaseManager（リスク設定はデフォルト値）"""
+
+    @contextmanager
+    def get_connection(self):
+        raise RuntimeError("database unavailable")
+        yield
+
+
+class FakeMT5Client:
+    """レート取得のみ応答するMT5Client"""
+
+    def ensure_connection(self):
+        return True
+
+    def get_rates(self, symbol, timeframe, count=500):
+        return pd.DataFrame({'close': np.linspace(150.0, 151.0, 300)})
+
+
+class FakeModel:
+    """固定シグナルを返すモデル"""
+
+    feature_columns = ['f']
+
+    def __init__(self, prediction=1, confidence=0.9, error=None):
+        self.prediction = prediction
+        self.confidence = confidence
+        self.error = error
+
+    def predict_with_confidence(self, features):
+        if self.error:
+            raise self.error
+        return [self.prediction], [self.confidence]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # ModelManagerがmodelsディレクトリを作成するため
+    trading_engine = TradingEngine(FakeDatabaseManager(), FakeMT5Client())
+    trading_engine.is_active = True
+    trading_engine.use_streaming_features = False
+    trading_engine.feature_engine.create_features = lambda data, columns: pd.DataFrame({'f': [1.0]})
+    trading_engine.risk_manager.reconcile_due = lambda: False
+    trading_engine.risk_manager.check_risk_limits = lambda: True
+
+    executed = []
+
+    async def execute(slot, signal, confidence):
+        executed.append((slot.symbol, signal, confidence))
+
+    trading_engine._execute_trade_signal = execute
+    trading_engine.executed = executed
+    return trading_engine
+
+
+def add_slot(engine, symbol, timeframe='H1', **model_kwargs):
+    slot = StrategySlot(symbol=symbol, timeframe=timeframe, model=FakeModel(**model_kwargs))
+    engine.slots[symbol] = slot
+    return slot
+
+
+def bar_event(symbol, timeframe='H1'):
+    return {'symbol': symbol, 'timeframe': timeframe, 'latency_seconds': 0.3}
+
+
+class TestMultiSymbolEngine:
+    """複数スロット運用のテストクラス"""
+
+    @pytest.mark.asyncio
+    async def test_simultaneous_bar_closes_are_batched(self, engine):
+        """同時に足確定したスロットは1回のバッチで評価されること"""
+        add_slot(engine, 'USDJPY')
+        add_slot(engine, 'EURJPY')
+        batches = []
+
+        async def evaluate(slots):
+            batches.append([slot.symbol for slot in slots])
+            return True
+
+        engine._evaluate_slots = evaluate
+        await asyncio.gather(
+            engine._on_bar_close(bar_event('USDJPY')),
+            engine._on_bar_close(bar_event('EURJPY'))
+        )
+
+        assert batches == [['USDJPY', 'EURJPY']]
+        assert engine.slots['USDJPY'].last_bar_latency_seconds == 0.3
+
+    @pytest.mark.asyncio
+    async def test_signals_executed_by_confidence(self, engine):
+        """信頼度の高い順に発注し、リスク上限に達したら残りを見送ること"""
+        add_slot(engine, 'USDJPY', confidence=0.75)
+        add_slot(engine, 'EURJPY', prediction=2, confidence=0.95)
+        add_slot(engine, 'GBPJPY', prediction=0)
+        allowed = iter([True, False])
+        engine.risk_manager.check_risk_limits = lambda: next(allowed)
+
+        assert await engine._evaluate_slots(list(engine.slots.values()))
+
+        assert engine.executed == [('EURJPY', 'SELL', 0.95)]
+        assert engine.slots['GBPJPY'].last_signal == 'HOLD'
+        assert engine.slots['USDJPY'].last_latency_ms is not None
+
+    @pytest.mark.asyncio
+    async def test_slot_errors_are_isolated(self, engine):
+        """1スロットのエラーが他スロットに影響せず、連続エラーでスロットを停止すること"""
+        broken = add_slot(engine, 'USDJPY', error=ValueError("bad features"))
+        add_slot(engine, 'EURJPY')
+        engine.max_slot_errors = 2
+
+        for _ in range(3):
+            await engine._evaluate_slots(list(engine.slots.values()))
+
+        assert engine.executed == [('EURJPY', 'BUY', 0.9)] * 3
+        assert broken.errors == 2
+        assert broken.enabled is False
+        assert broken.last_error == "bad features"
+
+        status = engine.get_trading_status()
+        assert status['symbol'] is None
+        assert status['slots']['EURJPY']['evaluations'] == 3
@@ -0,0 +1,122 @@
+"""
+M1からの上位足リサンプリングのテスト
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.ohlcv_resampler import IncrementalResampler, bar_starts, resample_ohlcv
+
+
+def m1_bars(start, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 150 + np.cumsum(rng.normal(0, 0.01, periods))
+    open_ = np.r_[150.0, close[:-1]]
+    return pd.DataFrame({
+        'time': pd.date_range(start, periods=periods, freq='1min'),
+        'open': open_,
+        'high': np.maximum(open_, close) + 0.005,
+        'low': np.minimum(open_, close) - 0.005,
+        'close': close,
+        'tick_volume': rng.integers(1, 100, periods),
+        'spread': rng.integers(1, 5, periods),
+        'real_volume': 0
+    })
+
+
+class TestResampleOHLCV:
+    """resample_ohlcvのテストクラス"""
+
+    def test_ohlcv_aggregation(self):
+        """始値・高値・安値・終値・出来高・スプレッドの集計が正しいこと"""
+        m1 = m1_bars('2024-01-02 10:00', 30)
+
+        m5 = resample_ohlcv(m1, 'M5')
+
+        assert len(m5) == 6
+        assert list(m5.columns) == list(m1.columns)
+        first = m1.iloc[:5]
+        row = m5.iloc[0]
+        assert row['time'] == pd.Timestamp('2024-01-02 10:00')
+        assert row['open'] == first['open'].iloc[0]
+        assert row['high'] == first['high'].max()
+        assert row['low'] == first['low'].min()
+        assert row['close'] == first['close'].iloc[-1]
+        assert row['tick_volume'] == first['tick_volume'].sum()
+        assert row['spread'] == first['spread'].min()
+
+    def test_matches_pandas_resample(self):
+        """欠損のあるM1でも pandas の resample と同じ結果になること"""
+        m1 = m1_bars('2024-01-02 00:00', 3000).drop(index=range(100, 400))
+
+        h1 = resample_ohlcv(m1, 'H1').set_index('time')
+        expected = m1.set_index('time').resample('1H').agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'tick_volume': 'sum'
+        }).dropna()
+
+        pd.testing.assert_frame_equal(
+            h1[expected.columns], expected, check_dtype=False, check_freq=False, check_names=False
+        )
+
+    def test_calendar_boundaries(self):
+        """H4・W1（日曜始まり）・MN1の区切りとday_offset"""
+        times = pd.to_datetime(['2024-01-03 05:59', '2024-01-06 23:00', '2024-01-07 00:00']).to_numpy()
+
+        assert list(bar_starts(times, 'H4')) == list(pd.to_datetime(
+            ['2024-01-03 04:00', '2024-01-06 20:00', '2024-01-07 00:00']).to_numpy())
+        assert list(bar_starts(times, 'W1')) == list(pd.to_datetime(
+            ['2023-12-31', '2023-12-31', '2024-01-07']).to_numpy())
+        assert list(bar_starts(times, 'MN1')) == list(pd.to_datetime(
+            ['2024-01-01', '2024-01-01', '2024-01-01']).to_numpy())
+        assert list(bar_starts(times, 'D1', day_offset=timedelta(hours=-7))) == list(pd.to_datetime(
+            ['2024-01-02 17:00', '2024-01-06 17:00', '2024-01-06 17:00']).to_numpy())
+
+    def test_partial_bar_is_dropped(self):
+        """include_partial=False では最後の形成中の足を含めないこと"""
+        m1 = m1_bars('2024-01-02 10:00', 12)
+
+        assert len(resample_ohlcv(m1, 'M5')) == 3
+        assert len(resample_ohlcv(m1, 'M5', include_partial=False)) == 2
+        assert len(resample_ohlcv(m1.iloc[:10], 'M5', include_partial=False)) == 2
+
+    def test_datetime_index_input(self):
+        """DatetimeIndexのデータ（バックテスト形式）も扱えること"""
+        m1 = m1_bars('2024-01-02 10:00', 60).set_index('time')[['open', 'high', 'low', 'close', 'tick_volume']]
+        m1.columns = ['open', 'high', 'low', 'close', 'volume']
+
+        m15 = resample_ohlcv(m1, 'M15')
+
+        assert isinstance(m15.index, pd.DatetimeIndex)
+        assert list(m15.columns) == ['open', 'high', 'low', 'close', 'volume']
+        assert m15['volume'].sum() == m1['volume'].sum()
+
+
+class TestIncrementalResampler:
+    """IncrementalResamplerのテストクラス"""
+
+    def test_matches_batch_resampling(self):
+        """1本ずつ追加した結果が一括リサンプリングと一致すること"""
+        m1 = m1_bars('2024-01-02 10:03', 200).drop(index=range(50, 60))
+        resampler = IncrementalResampler('M15')
+
+        closed = [bar for bar in (resampler.update(row) for row in m1.to_dict('records')) if bar]
+
+        expected = resample_ohlcv(m1, 'M15', include_partial=False)
+        assert [bar['time'] for bar in closed] == list(expected['time'])
+        for bar, (_, row) in zip(closed, expected.iterrows()):
+            assert bar['high'] == pytest.approx(row['high'])
+            assert bar['close'] == pytest.approx(row['close'])
+            assert bar['tick_volume'] == row['tick_volume']
+
+    def test_closes_on_last_minute(self):
+        """足の最後のM1で、次の足を待たずに確定すること"""
+        resampler = IncrementalResampler('M5')
+        rows = m1_bars('2024-01-02 10:00', 5).to_dict('records')
+
+        results = [resampler.update(row) for row in rows]
+
+        assert results[:4] == [None] * 4
+        assert results[4]['time'] == pd.Timestamp('2024-01-02 10:00')
+        assert resampler.current is None
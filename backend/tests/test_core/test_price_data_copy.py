@@ -0,0 +1,170 @@
+"""
+DatabaseManager.bulk_save_price_data（COPY一括保存）のテスト
+"""
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.database import (
+    DatabaseManager, PRICE_COPY_DTYPE, PGCOPY_HEADER, PGCOPY_TRAILER, PG_EPOCH
+)
+
+
+def decode_copy(payload: bytes) -> pd.DataFrame:
+    """COPY BINARYのバイト列を読み戻す"""
+    assert payload.startswith(PGCOPY_HEADER) and payload.endswith(PGCOPY_TRAILER)
+    records = np.frombuffer(payload[len(PGCOPY_HEADER):-len(PGCOPY_TRAILER)], dtype=PRICE_COPY_DTYPE)
+    assert (records['field_count'] == 8).all()
+    assert (records['time_size'] == 8).all() and (records['spread_size'] == 4).all()
+    frame = pd.DataFrame({name: records[name].astype(records[name].dtype.newbyteorder('='))
+                          for name in ('open', 'high', 'low', 'close', 'tick_volume', 'spread')})
+    frame.insert(0, 'time', PG_EPOCH + records['time'].astype(np.int64).astype('timedelta64[us]'))
+    return frame
+
+
+class RecordingCursor:
+    """実行SQLとCOPYデータを記録するカーソル"""
+
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.log['sql'].append((' '.join(query.split()), params))
+
+    def copy_expert(self, sql, file):
+        assert 'FORMAT binary' in sql
+        self.log['copies'].append(decode_copy(file.read()))
+
+
+class RecordingConnection:
+    """テスト用接続"""
+
+    def __init__(self, log):
+        self.log = log
+
+    def cursor(self):
+        return RecordingCursor(self.log)
+
+    def commit(self):
+        self.log['commits'] += 1
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(config_path=str(tmp_path / 'missing.conf'), use_pool=False)
+    manager.log = {'sql': [], 'copies': [], 'commits': 0}
+
+    @contextmanager
+    def get_connection():
+        yield RecordingConnection(manager.log)
+
+    manager.get_connection = get_connection
+    return manager
+
+
+def make_rates(n: int, start: str = '2024-01-01') -> pd.DataFrame:
+    """MT5 get_rates形式のデータ"""
+    return pd.DataFrame({
+        'time': pd.date_range(start, periods=n, freq='min'),
+        'open': np.linspace(150.0, 151.0, n),
+        'high': np.linspace(150.1, 151.1, n),
+        'low': np.linspace(149.9, 150.9, n),
+        'close': np.linspace(150.05, 151.05, n),
+        'tick_volume': np.arange(n),
+        'spread': np.full(n, 2),
+        'real_volume': np.zeros(n, dtype=int),
+        'symbol': 'USDJPY',
+        'timeframe': 'M1'
+    })
+
+
+class TestBulkSavePriceData:
+    """bulk_save_price_dataのテストクラス"""
+
+    def test_copy_then_single_upsert_per_chunk(self, db_manager):
+        """チャンク毎にCOPYと1回のINSERT ... ON CONFLICTを実行すること"""
+        result = db_manager.bulk_save_price_data(make_rates(250), chunk_size=100)
+
+        assert result['success']
+        assert result['rows'] == 250
+        assert result['chunks'] == 3
+        assert result['rows_per_second'] > 0
+
+        log = db_manager.log
+        assert [len(rows) for rows in log['copies']] == [100, 100, 50]
+        upserts = [(sql, params) for sql, params in log['sql'] if sql.startswith('INSERT INTO price_data')]
+        assert len(upserts) == 3
+        assert all('ON CONFLICT (symbol, timeframe, time)' in sql for sql, _ in upserts)
+        assert all(params == ('USDJPY', 'M1') for _, params in upserts)
+        assert log['commits'] == 3
+
+        copied = pd.concat(log['copies'], ignore_index=True)
+        expected = make_rates(250)
+        np.testing.assert_array_equal(copied['time'].to_numpy(), expected['time'].to_numpy())
+        np.testing.assert_array_equal(copied['close'].to_numpy(), expected['close'].to_numpy())
+        np.testing.assert_array_equal(copied['tick_volume'].to_numpy(), expected['tick_volume'].to_numpy())
+
+    def test_chunked_record_array_input(self, db_manager):
+        """MT5のレコード配列をイテラブルで渡せること"""
+        rates = make_rates(20)
+        records = rates.drop(columns=['symbol', 'timeframe']).assign(
+            time=rates['time'].astype('int64') // 10**9
+        ).to_records(index=False)
+
+        result = db_manager.bulk_save_price_data(
+            (records[i:i + 8] for i in range(0, len(records), 8)),
+            symbol='EURUSD', timeframe='M1'
+        )
+
+        assert result['rows'] == 20
+        assert result['chunks'] == 3
+        copied = pd.concat(db_manager.log['copies'], ignore_index=True)
+        assert copied['time'].iloc[0] == pd.Timestamp('2024-01-01 00:00:00')
+        assert copied['spread'].tolist() == [2] * 20
+        assert db_manager.log['sql'][-1][1] == ('EURUSD', 'M1')
+
+    def test_duplicates_and_timezone(self, db_manager):
+        """重複キーは最後の行を残し、タイムゾーン付き時刻はUTCで書き出すこと"""
+        rates = make_rates(3)
+        rates['time'] = rates['time'].dt.tz_localize('Asia/Tokyo')
+        rates = pd.concat([rates, rates.tail(1).assign(close=999.0)], ignore_index=True)
+
+        db_manager.bulk_save_price_data(rates)
+
+        copied = db_manager.log['copies'][0]
+        assert len(copied) == 3
+        assert copied['time'].iloc[0] == pd.Timestamp('2023-12-31 15:00:00')
+        assert copied['close'].iloc[-1] == 999.0
+        assert "AT TIME ZONE 'UTC'" in db_manager.log['sql'][-1][0]
+
+    def test_save_price_data_uses_bulk_path(self, db_manager):
+        """save_price_dataが一括保存経由で成功フラグを返すこと"""
+        assert db_manager.save_price_data(make_rates(5))
+        assert len(db_manager.log['copies']) == 1
+        assert not db_manager.save_price_data(pd.DataFrame())
+
+    def test_missing_symbol_fails(self, db_manager):
+        """symbolが特定できない場合は失敗を返すこと"""
+        result = db_manager.bulk_save_price_data(make_rates(5).drop(columns='symbol'))
+
+        assert not result['success']
+        assert 'symbol' in result['error']
+
+    def test_multiple_symbols_in_one_chunk(self, db_manager):
+        """1チャンクに複数通貨ペアが含まれる場合はペア毎にマージすること"""
+        rates = pd.concat([make_rates(4), make_rates(4).assign(symbol='EURUSD')], ignore_index=True)
+
+        result = db_manager.bulk_save_price_data(rates)
+
+        assert result['rows'] == 8
+        upsert_params = [params for sql, params in db_manager.log['sql'] if sql.startswith('INSERT')]
+        assert upsert_params == [('USDJPY', 'M1'), ('EURUSD', 'M1')]
+        assert [len(copy) for copy in db_manager.log['copies']] == [4, 4]
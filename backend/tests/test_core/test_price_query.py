@@ -0,0 +1,196 @@
+"""
+PriceQueryPlanner（連続集計ビューの使い分け）のテスト
+"""
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.ohlcv_resampler import resample_ohlcv
+from backend.core.price_query import PriceQueryPlanner
+
+
+def m1_bars(start, periods):
+    close = 150 + np.cumsum(np.random.default_rng(0).normal(0, 0.01, periods))
+    return pd.DataFrame({
+        'time': pd.date_range(start, periods=periods, freq='1min'),
+        'open': close, 'high': close + 0.01, 'low': close - 0.01, 'close': close,
+        'tick_volume': 1
+    })
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params):
+        if 'continuous_aggregates' in query:
+            self.db.aggregate_checks += 1
+            if self.db.aggregates is None:
+                raise RuntimeError('relation "timescaledb_information.continuous_aggregates" does not exist')
+            self.result = [(name,) for name in self.db.aggregates]
+        else:
+            view = query.split('FROM')[1].split()[0]
+            rows = self.db.materialized(view)
+            self.result = [(rows['time'].max() if not rows.empty else None,)]
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0]
+
+
+class FakeDatabase:
+    """M1と、指定時刻まで集計済みの連続集計ビューを持つDB"""
+
+    def __init__(self, m1, aggregates=('price_data_1h', 'price_data_1d'), watermark=None, stored=None):
+        self.m1 = m1
+        self.aggregates = aggregates
+        self.watermark = pd.Timestamp(watermark) if watermark else None
+        # M1以外に保存済みの時間軸 {時間軸: DataFrame}
+        self.stored = stored or {}
+        self.queries = []
+        self.aggregate_checks = 0
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def materialized(self, view):
+        if self.watermark is None:
+            return self.m1.iloc[0:0]
+        m1 = self.m1[self.m1['time'] < self.watermark]
+        return resample_ohlcv(m1, 'H1' if view == 'price_data_1h' else 'D1', include_partial=False)
+
+    def read_sql_query(self, query, conn, params, parse_dates=None):
+        source = query.split('FROM')[1].split()[0]
+        self.queries.append(source)
+        if source == 'price_data':
+            frame = self.m1 if "'M1'" in query else self.stored.get(params[1], self.m1.iloc[0:0])
+            times = frame['time']
+            upper = times < params[-1] if "'M1'" in query else times <= params[-1]
+            return self._as_timestamptz(frame[(times >= params[-2]) & upper])
+        frame = self.materialized(source)
+        return self._as_timestamptz(frame[(frame['time'] >= params[1]) & (frame['time'] < params[2])])
+
+    @staticmethod
+    def _as_timestamptz(frame):
+        """TIMESTAMPTZ列と同じくタイムゾーン付きで返す"""
+        frame = frame.reset_index(drop=True)
+        frame['time'] = frame['time'].dt.tz_localize('UTC').dt.tz_convert('Asia/Tokyo')
+        return frame
+
+
+@pytest.fixture
+def m1():
+    return m1_bars('2024-01-01 00:00', 10 * 24 * 60)
+
+
+def make_planner(monkeypatch, db):
+    monkeypatch.setattr('backend.core.price_query.pd.read_sql_query', db.read_sql_query)
+    return PriceQueryPlanner(db)
+
+
+class TestPriceQueryPlanner:
+    """PriceQueryPlannerのテストクラス"""
+
+    def test_coarsest_aggregate_with_raw_tail(self, monkeypatch, m1):
+        """日足は price_data_1d から読み、未集計の末尾だけM1から組み立てること"""
+        db = FakeDatabase(m1, watermark='2024-01-08 00:00')
+        planner = make_planner(monkeypatch, db)
+
+        df, sources = planner.load('USDJPY', 'D1', datetime(2024, 1, 1), datetime(2024, 1, 10, 23, 59))
+
+        assert [s['source'] for s in sources] == ['price_data_1d', 'price_data']
+        assert sources[0]['rows'] == 7
+        assert sources[1]['rows'] == 3 * 24 * 60
+        expected = resample_ohlcv(m1, 'D1')
+        pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+        assert planner.get_statistics()['sources']['price_data_1d'] == {'queries': 1, 'rows': 7}
+
+    def test_h4_rolls_up_hourly_aggregate(self, monkeypatch, m1):
+        """H4は日足で割り切れないため price_data_1h から組み立てること"""
+        db = FakeDatabase(m1, watermark='2024-01-11 00:00')
+        planner = make_planner(monkeypatch, db)
+
+        df, sources = planner.load('USDJPY', 'H4', datetime(2024, 1, 2, 1), datetime(2024, 1, 3))
+
+        assert [s['source'] for s in sources] == ['price_data_1h']
+        # 途中から始まる足は含めない（01:00 → 04:00の足から、00:00の足まで）
+        assert df['time'].iloc[0] == pd.Timestamp('2024-01-02 04:00')
+        assert df['time'].iloc[-1] == pd.Timestamp('2024-01-03 00:00')
+        assert (df['tick_volume'] == 240).all()
+
+    def test_fine_timeframes_and_missing_aggregates_use_raw(self, monkeypatch, m1):
+        """集計幅より細かい時間軸・集計ビューが無い環境では price_data を直接読むこと"""
+        planner = make_planner(monkeypatch, FakeDatabase(m1, watermark='2024-01-11'))
+        _, sources = planner.load('USDJPY', 'M15', datetime(2024, 1, 2), datetime(2024, 1, 3))
+        assert [s['source'] for s in sources] == ['price_data']
+
+        db = FakeDatabase(m1, aggregates=None)
+        planner = make_planner(monkeypatch, db)
+        df, sources = planner.load('USDJPY', 'H1', datetime(2024, 1, 2), datetime(2024, 1, 2, 5))
+        assert sources == [{'source': 'price_data', 'timeframe': 'M1', 'rows': 6 * 60}]
+        assert len(df) == 6
+        assert planner.get_statistics()['aggregates'] == []
+
+    def test_stored_timeframe_used_when_aggregates_are_empty(self, monkeypatch, m1):
+        """集計ビューはあるがM1が無い場合、保存済みの時間軸を直接読むこと"""
+        h1 = resample_ohlcv(m1, 'H1')
+        db = FakeDatabase(m1.iloc[0:0], stored={'H1': h1})
+        planner = make_planner(monkeypatch, db)
+
+        df, sources = planner.load('USDJPY', 'H1', datetime(2024, 1, 2), datetime(2024, 1, 2, 5))
+
+        assert sources[-1] == {'source': 'price_data', 'timeframe': 'H1', 'rows': 6}
+        assert list(df['time']) == list(pd.date_range('2024-01-02 00:00', periods=6, freq='1h'))
+
+    def test_times_are_naive_utc_from_every_source(self, monkeypatch, m1):
+        """集計ビュー・price_data のどちらから読んでもタイムゾーン無しUTCで返すこと"""
+        db = FakeDatabase(m1, watermark='2024-01-08 00:00', stored={'M15': resample_ohlcv(m1, 'M15')})
+        planner = make_planner(monkeypatch, db)
+        aggregated, _ = planner.load('USDJPY', 'D1', datetime(2024, 1, 1), datetime(2024, 1, 10, 23, 59))
+        raw, sources = planner.load('USDJPY', 'M15', datetime(2024, 1, 2), datetime(2024, 1, 2, 1))
+
+        assert sources == [{'source': 'price_data', 'timeframe': 'M15', 'rows': 5}]
+
+        assert aggregated['time'].dt.tz is None
+        assert raw['time'].dt.tz is None
+        assert aggregated['time'].iloc[0] == pd.Timestamp('2024-01-01')
+        assert raw['time'].iloc[0] == pd.Timestamp('2024-01-02')
+
+    def test_aggregate_availability_is_rechecked(self, monkeypatch, m1):
+        """集計ビューの有無はTTL経過後・集計ビューの読み込み失敗後に問い合わせ直すこと"""
+        db = FakeDatabase(m1, aggregates=None)
+        monkeypatch.setattr('backend.core.price_query.pd.read_sql_query', db.read_sql_query)
+        planner = PriceQueryPlanner(db, availability_ttl=0)
+
+        planner.load('USDJPY', 'H1', datetime(2024, 1, 2), datetime(2024, 1, 2, 5))
+        db.aggregates = ('price_data_1h', 'price_data_1d')
+        db.watermark = pd.Timestamp('2024-01-11')
+        _, sources = planner.load('USDJPY', 'H1', datetime(2024, 1, 2), datetime(2024, 1, 2, 5))
+
+        assert db.aggregate_checks == 2
+        assert [s['source'] for s in sources] == ['price_data_1h']
+
+        planner.availability_ttl = 3600
+        db.materialized = lambda view: (_ for _ in ()).throw(RuntimeError('relation does not exist'))
+        _, sources = planner.load('USDJPY', 'H1', datetime(2024, 1, 2), datetime(2024, 1, 2, 5))
+        assert [s['source'] for s in sources] == ['price_data']
+        assert planner.get_statistics()['aggregates'] is None
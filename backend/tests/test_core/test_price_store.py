@@ -0,0 +1,110 @@
+"""
+PriceStore（列指向ローカル価格ストア）のテスト
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.core.price_store import PriceStore
+
+
+def bars(start, periods, freq='1min', close=150.0):
+    return pd.DataFrame({
+        'time': pd.date_range(start, periods=periods, freq=freq),
+        'open': close, 'high': close + 0.1, 'low': close - 0.1, 'close': close,
+        'tick_volume': 10, 'spread': 2, 'real_volume': 0
+    })
+
+
+class FakeDatabaseManager:
+    """price_data を保持するDatabaseManager"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    @contextmanager
+    def get_connection(self):
+        yield self
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(tmp_path / 'price_store')
+
+
+class TestPriceStore:
+    """PriceStoreのテストクラス"""
+
+    def test_round_trip_and_range_slice(self, store):
+        """保存した足を期間指定で読めること（両端を含む）"""
+        store.write(bars('2024-01-10 00:00', 600), 'USDJPY', 'M1')
+
+        df = store.read('USDJPY', 'M1', '2024-01-10 01:00', '2024-01-10 02:00')
+
+        assert len(df) == 61
+        assert df['time'].iloc[0] == pd.Timestamp('2024-01-10 01:00')
+        assert df['time'].iloc[-1] == pd.Timestamp('2024-01-10 02:00')
+        assert df['close'].dtype == np.float64
+        assert store.last_time('USDJPY', 'M1') == pd.Timestamp('2024-01-10 09:59')
+
+    def test_single_partition_read_is_memory_mapped(self, store):
+        """1パーティション内の読み込みはメモリマップのスライスを返すこと"""
+        store.write(bars('2024-01-10 00:00', 100), 'USDJPY', 'M1')
+
+        arrays = store.read_arrays('USDJPY', 'M1', '2024-01-10 00:10', '2024-01-10 00:20')
+
+        assert isinstance(arrays['close'], np.memmap)
+        assert len(arrays['close']) == 11
+        assert arrays['time'].dtype == np.dtype('datetime64[ns]')
+
+    def test_month_partitions_and_overwrite(self, store):
+        """月を跨ぐ書き込みはパーティションに分かれ、同じ時刻の足は上書きされること"""
+        store.write(bars('2024-01-31 23:00', 120), 'USDJPY', 'M1')
+        store.write(bars('2024-02-01 00:30', 60, close=151.0), 'USDJPY', 'M1')
+
+        assert store.partitions('USDJPY', 'M1') == ['2024-01', '2024-02']
+        df = store.read('USDJPY', 'M1')
+        assert len(df) == 150
+        assert df['time'].is_monotonic_increasing
+        assert df.set_index('time').loc['2024-02-01 00:45', 'close'] == 151.0
+        assert df.set_index('time').loc['2024-02-01 00:15', 'close'] == 150.0
+
+    def test_sync_only_fetches_new_rows(self, store, monkeypatch):
+        """DBからの取り込みは最終足より新しい足だけを対象にすること"""
+        rows = bars('2024-01-10 00:00', 200)
+        db_manager = FakeDatabaseManager(rows)
+
+        def read_sql_query(query, conn, params, **kwargs):
+            conn.queries.append(params)
+            frame = conn.rows[conn.rows['time'] > params[2]]
+            return iter([frame])
+
+        monkeypatch.setattr('backend.core.price_store.pd.read_sql_query', read_sql_query)
+
+        assert store.sync_from_database(db_manager, 'USDJPY', 'M1') == 200
+        db_manager.rows = bars('2024-01-10 00:00', 230)
+        assert store.sync_from_database(db_manager, 'USDJPY', 'M1') == 30
+
+        assert db_manager.queries[1][2] == datetime(2024, 1, 10, 3, 19)
+        assert len(store.read('USDJPY', 'M1')) == 230
+
+    @pytest.mark.asyncio
+    async def test_backtest_reads_from_store(self, store):
+        """バックテストが価格ストアから読み、上位足が無ければM1から組み立てること"""
+        from backend.backtest.backtest_engine import BacktestEngine
+
+        store.write(bars('2024-01-10 00:00', 300), 'USDJPY', 'M1')
+        engine = BacktestEngine(Mock(), price_store=store)
+
+        df = await engine._get_historical_data(
+            'USDJPY', 'H1', datetime(2024, 1, 10), datetime(2024, 1, 10, 4, 59)
+        )
+
+        assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+        assert len(df) == 5
+        assert df['volume'].iloc[0] == 600
@@ -0,0 +1,127 @@
+"""
+RiskState（インメモリリスク状態）のテスト
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.core.risk_state import RiskState, LatencyHistogram
+
+
+SETTINGS = {
+    'max_drawdown': 0.20,
+    'max_positions': 2,
+    'max_daily_trades': 3,
+    'max_consecutive_losses': 2,
+    'daily_loss_limit': 0.05
+}
+
+
+@pytest.fixture
+def state():
+    risk_state = RiskState()
+    risk_state.load({'daily_trade_count': 0, 'daily_pnl': 0.0,
+                     'consecutive_losses': 0, 'max_equity': 100000.0})
+    risk_state.update_account({'equity': 100000.0, 'balance': 100000.0}, positions_count=0)
+    return risk_state
+
+
+class TestRiskState:
+    """RiskStateのテストクラス"""
+
+    def test_within_limits(self, state):
+        """制限内であれば違反なしとなること"""
+        assert state.evaluate(SETTINGS) is None
+
+    def test_trade_events_update_counters(self, state):
+        """オープン・クローズイベントでカウンタが更新されること"""
+        state.on_trade_opened()
+        state.on_trade_closed(-100.0)
+        state.on_trade_opened()
+
+        snapshot = state.snapshot()
+        assert snapshot['daily_trade_count'] == 2
+        assert snapshot['daily_pnl'] == -100.0
+        assert snapshot['consecutive_losses'] == 1
+        assert snapshot['open_positions'] == 1
+
+        state.on_trade_closed(50.0)
+        assert state.consecutive_losses == 0
+
+    def test_limit_violations(self, state):
+        """各制限の違反が判定されること"""
+        state.on_trade_closed(-10.0)
+        state.on_trade_closed(-10.0)
+        assert state.evaluate(SETTINGS)['event_type'] == 'consecutive_losses'
+
+        state.on_trade_closed(-6000.0 + 20.0)
+        state.consecutive_losses = 0
+        violation = state.evaluate(SETTINGS)
+        assert violation['event_type'] == 'daily_loss_limit'
+        assert violation['trigger_value'] == pytest.approx(0.06)
+
+        state.update_account({'equity': 70000.0, 'balance': 100000.0})
+        assert state.evaluate(SETTINGS)['event_type'] == 'drawdown_limit'
+
+    def test_position_and_trade_count_limits(self, state):
+        """ポジション数・日次取引数の上限が判定されること"""
+        state.on_trade_opened()
+        state.on_trade_opened()
+        assert state.evaluate(SETTINGS)['event_type'] == 'position_limit'
+
+        state.on_trade_closed(1.0)
+        state.on_trade_closed(1.0)
+        state.on_trade_opened()
+        assert state.evaluate(SETTINGS)['event_type'] == 'daily_trade_limit'
+
+    def test_previous_day_entry_excluded_from_daily_pnl(self, state):
+        """前日エントリーの決済損益は日次損益に含めないこと"""
+        state.on_trade_closed(-500.0, entry_time=datetime.now() - timedelta(days=1))
+
+        assert state.daily_pnl == 0.0
+        assert state.consecutive_losses == 1
+
+    def test_day_rollover_resets_daily_counters(self, state):
+        """日付が変わると日次カウンタがリセットされること"""
+        state.on_trade_opened()
+        state.on_trade_closed(-100.0)
+        state.trading_date -= timedelta(days=1)
+
+        assert state.reconcile_due(3600)
+        assert state.evaluate(SETTINGS) is None
+        assert state.daily_trade_count == 0
+        assert state.daily_pnl == 0.0
+        assert state.consecutive_losses == 1
+
+    def test_reconcile_reports_drift(self, state):
+        """DB集計との差分が補正・記録されること"""
+        state.on_trade_opened()
+        state.update_account({'equity': 105000.0, 'balance': 100000.0})
+
+        drift = state.load({'daily_trade_count': 3, 'daily_pnl': 0.0,
+                            'consecutive_losses': 0, 'max_equity': 100000.0})
+
+        assert drift == {'daily_trade_count': (1, 3)}
+        assert state.daily_trade_count == 3
+        assert state.max_equity == 105000.0
+        assert state.snapshot()['drift_count'] == 1
+        assert not state.reconcile_due(3600)
+
+    def test_missing_account_blocks_trading(self):
+        """口座情報が未取得の場合は取引不可とすること"""
+        assert RiskState().evaluate(SETTINGS)['event_type'] == 'account_unavailable'
+
+
+class TestLatencyHistogram:
+    """LatencyHistogramのテストクラス"""
+
+    def test_bucketing(self):
+        """計測値が上限以下の最小バケットに入ること"""
+        histogram = LatencyHistogram(buckets_us=(10, 100))
+        for seconds in (5e-6, 10e-6, 50e-6, 1e-3):
+            histogram.observe(seconds)
+
+        stats = histogram.get_statistics()
+        assert stats['count'] == 4
+        assert stats['buckets'] == {'le_10us': 2, 'le_100us': 1, 'gt_100us': 1}
+        assert stats['max_us'] == pytest.approx(1000.0)
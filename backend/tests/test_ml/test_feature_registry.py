@@ -0,0 +1,94 @@
+"""
+特徴量レジストリ・選択的特徴量作成のテスト
+"""
+import pytest
+import numpy as np
+import pandas as pd
+
+from backend.ml.features import FeatureEngineering, FeatureGroup, FeatureRegistry
+
+
+@pytest.fixture(scope='module')
+def price_data():
+    """テスト用OHLCVデータ"""
+    rng = np.random.default_rng(0)
+    n = 400
+    close = 100 + np.cumsum(rng.standard_normal(n) * 0.1)
+    open_ = close + rng.standard_normal(n) * 0.05
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + np.abs(rng.standard_normal(n) * 0.1),
+        'low': np.minimum(open_, close) - np.abs(rng.standard_normal(n) * 0.1),
+        'close': close,
+        'volume': rng.integers(1000, 10000, n)
+    }, index=pd.date_range('2023-01-02', periods=n, freq='H'))
+
+
+@pytest.fixture(scope='module')
+def full_features(price_data):
+    return FeatureEngineering().create_features(price_data)
+
+
+class TestFeatureRegistry:
+    """FeatureRegistryのテストクラス"""
+
+    def test_resolve_includes_dependencies(self):
+        """依存先のグループが登録順で含まれること"""
+        registry = FeatureRegistry()
+        registry.register(FeatureGroup('a', ['a'], lambda df: None))
+        registry.register(FeatureGroup('b', ['b'], lambda df: None))
+        registry.register(FeatureGroup('c', ['c1', 'c2'], lambda df: None, depends_on=['a']))
+
+        assert [g.name for g in registry.resolve(['c2'])] == ['a', 'c']
+        assert [g.name for g in registry.resolve(['c1', 'b'])] == ['a', 'b', 'c']
+        assert [g.name for g in registry.resolve()] == ['a', 'b', 'c']
+        assert registry.resolve(['close']) == []
+
+    def test_unregistered_dependency_rejected(self):
+        """未登録のグループへの依存はエラーになること"""
+        registry = FeatureRegistry()
+        with pytest.raises(ValueError):
+            registry.register(FeatureGroup('vix_like', ['vix_like'], lambda df: None, depends_on=['atr']))
+
+    def test_all_columns_registered(self, full_features):
+        """全特徴量カラムがいずれかのグループに属すること"""
+        fe = FeatureEngineering()
+        fe.create_features(full_features[['open', 'high', 'low', 'close', 'volume']])
+
+        assert all(fe.registry.group_for_column(col) for col in fe.get_feature_columns())
+
+
+class TestSelectiveFeatures:
+    """create_features(columns=...)のテストクラス"""
+
+    def test_only_required_columns_computed(self, price_data):
+        """指定カラムと依存先のみ計算されること"""
+        fe = FeatureEngineering()
+        features = fe.create_features(price_data, columns=['vix_like', 'rsi_14'])
+
+        assert 'atr' in features.columns
+        assert 'rsi_14' in features.columns
+        assert 'macd' not in features.columns
+        assert 'pattern_net_score' not in features.columns
+        assert 'autocorr_1' not in features.columns
+        assert fe.get_feature_columns() == ['vix_like', 'rsi_14']
+
+    def test_subset_matches_full(self, price_data, full_features):
+        """部分計算の値が全計算と一致すること"""
+        columns = ['vix_spike', 'pattern_net_score', 'autocorr_5', 'hour_sin', 'obv_sma', 'zscore_20']
+        features = FeatureEngineering().create_features(price_data, columns=columns)
+
+        for column in columns:
+            np.testing.assert_allclose(
+                features[column].astype(float).to_numpy(),
+                full_features[column].astype(float).to_numpy(),
+                err_msg=column
+            )
+
+    def test_volume_features_skipped_without_volume(self, price_data):
+        """volumeが無い場合はvolume依存の特徴量をスキップすること"""
+        fe = FeatureEngineering()
+        features = fe.create_features(price_data.drop(columns='volume'), columns=['mfi', 'atr'])
+
+        assert 'mfi' not in features.columns
+        assert fe.get_feature_columns() == ['atr']
@@ -0,0 +1,59 @@
+"""
+ベクトル化ローリング統計量のテスト
+"""
+import time
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from backend.ml.rolling_stats import rolling_autocorr, pattern_counts
+
+
+class TestRollingAutocorr:
+    """rolling_autocorrのテストクラス"""
+
+    @pytest.mark.parametrize('lag', [1, 5, 10])
+    def test_matches_rolling_apply(self, lag):
+        """rolling().apply(autocorr)と一致すること"""
+        rng = np.random.default_rng(0)
+        close = pd.Series(100 + np.cumsum(rng.standard_normal(400) * 0.1))
+        close.iloc[120] = np.nan
+        close.iloc[250:280] = 101.0  # 一定区間（相関が定義できない窓）
+
+        expected = close.rolling(50).apply(lambda x: x.autocorr(lag=lag), raw=False)
+        result = rolling_autocorr(close.to_numpy(), 50, lag, chunk_size=64)
+
+        np.testing.assert_allclose(result, expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+    def test_short_series(self):
+        """窓長未満の系列は全てNaNになること"""
+        result = rolling_autocorr(np.arange(10, dtype=float), 50, 1)
+        assert len(result) == 10
+        assert np.isnan(result).all()
+
+    def test_large_frame_performance(self):
+        """10万本の自己相関が短時間で計算できること"""
+        close = 100 + np.cumsum(np.random.randn(100000) * 0.1)
+
+        start_time = time.time()
+        for lag in [1, 5, 10]:
+            rolling_autocorr(close, 50, lag)
+        processing_time = time.time() - start_time
+
+        # rolling().apply()では1ラグあたり20秒以上かかる
+        assert processing_time < 5.0, f"Rolling autocorr took {processing_time:.2f}s"
+
+
+class TestPatternCounts:
+    """pattern_countsのテストクラス"""
+
+    def test_matches_row_apply(self):
+        """apply(axis=1)によるカウントと一致すること"""
+        rng = np.random.default_rng(1)
+        patterns = pd.DataFrame(rng.choice([-100, 0, 0, 100, 200], size=(200, 20)))
+
+        bull, bear = pattern_counts(patterns.to_numpy())
+
+        np.testing.assert_array_equal(bull, patterns.apply(lambda x: (x > 0).sum(), axis=1))
+        np.testing.assert_array_equal(bear, patterns.apply(lambda x: (x < 0).sum(), axis=1))
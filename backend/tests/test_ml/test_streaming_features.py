@@ -0,0 +1,144 @@
+"""
+StreamingFeatureEngine単体テスト
+"""
+import pytest
+import numpy as np
+import pandas as pd
+
+from backend.ml.features import FeatureEngineering
+from backend.ml.streaming_features import StreamingFeatureEngine, RingBuffer
+
+
+def make_price_data(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    """テスト用OHLCVデータ作成"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2023-01-02', periods=n, freq='H')
+    close = 100 + np.cumsum(rng.standard_normal(n) * 0.1)
+    open_ = close + rng.standard_normal(n) * 0.05
+    df = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + np.abs(rng.standard_normal(n) * 0.1),
+        'low': np.minimum(open_, close) - np.abs(rng.standard_normal(n) * 0.1),
+        'close': close,
+        'volume': rng.integers(1000, 10000, n)
+    }, index=dates)
+    return df
+
+
+@pytest.fixture(scope='module')
+def price_data():
+    return make_price_data()
+
+
+@pytest.fixture(scope='module')
+def batch_features(price_data):
+    return FeatureEngineering().create_features(price_data)
+
+
+def assert_row_matches(row: pd.Series, expected: pd.Series):
+    """1行分の特徴量を比較"""
+    assert list(row.index) == list(expected.index)
+    np.testing.assert_allclose(
+        row.astype(float).to_numpy(), expected.astype(float).to_numpy(),
+        rtol=1e-7, atol=1e-9
+    )
+
+
+class TestStreamingFeatureEngine:
+    """StreamingFeatureEngineのテストクラス"""
+
+    def test_matches_batch_features(self, price_data, batch_features):
+        """1本ずつ更新した結果がcreate_featuresの全行と一致すること"""
+        engine = StreamingFeatureEngine()
+        rows = [
+            engine.update('USDJPY', 'H1', bar_time, bar)
+            for bar_time, bar in zip(price_data.index, price_data.to_dict('records'))
+        ]
+        streamed = pd.DataFrame(rows, index=price_data.index)
+
+        assert list(streamed.columns) == list(batch_features.columns)
+        for column in batch_features.columns:
+            np.testing.assert_allclose(
+                streamed[column].astype(float).to_numpy(),
+                batch_features[column].astype(float).to_numpy(),
+                rtol=1e-7, atol=1e-9, err_msg=column
+            )
+
+    def test_forming_bar_is_replaced(self, price_data, batch_features):
+        """同時刻の足は未確定足として置き換えられること"""
+        engine = StreamingFeatureEngine()
+        records = price_data.to_dict('records')
+        for bar_time, bar in zip(price_data.index[:-1], records[:-1]):
+            engine.update('USDJPY', 'H1', bar_time, bar)
+
+        last_time = price_data.index[-1]
+        forming = dict(records[-1], close=records[-1]['open'], high=records[-1]['open'] + 0.5)
+        engine.update('USDJPY', 'H1', last_time, forming)
+        row = engine.update('USDJPY', 'H1', last_time, records[-1])
+
+        assert_row_matches(pd.Series(row), batch_features.iloc[-1])
+
+    def test_update_from_frame_incremental(self, price_data, batch_features):
+        """ウォームアップ後は重なりのある直近データだけで更新できること"""
+        engine = StreamingFeatureEngine(incremental_bars=10)
+        assert engine.bars_needed('USDJPY', 'H1', full=500) == 500
+
+        # MT5同様time列を持つ形式
+        frame = price_data.reset_index().rename(columns={'index': 'time'})
+        assert engine.update_from_frame('USDJPY', 'H1', frame.iloc[:150]) is None
+
+        latest = engine.update_from_frame('USDJPY', 'H1', frame.iloc[:300])
+        assert engine.is_ready('USDJPY', 'H1')
+        assert engine.bars_needed('USDJPY', 'H1', full=500) == 10
+        assert_row_matches(latest.iloc[0], batch_features.iloc[299])
+
+        # 前回の最新足を含む直近10本ずつ
+        for end in range(309, len(frame) + 1, 9):
+            latest = engine.update_from_frame('USDJPY', 'H1', frame.iloc[end - 10:end])
+            assert latest.index[0] == price_data.index[end - 1]
+            assert_row_matches(latest.iloc[0], batch_features.iloc[end - 1])
+
+        assert engine.get_statistics()['streams']['USDJPY_H1']['bars'] == end
+
+    def test_gap_rebuilds_stream(self, price_data):
+        """前回の最新足と重ならないデータでは状態を作り直すこと"""
+        engine = StreamingFeatureEngine()
+        engine.update_from_frame('USDJPY', 'H1', price_data.iloc[:250])
+        assert engine.is_ready('USDJPY', 'H1')
+
+        assert engine.update_from_frame('USDJPY', 'H1', price_data.iloc[300:310]) is None
+        assert not engine.is_ready('USDJPY', 'H1')
+
+    def test_streams_are_independent(self, price_data, batch_features):
+        """通貨ペア・時間軸ごとに状態が独立していること"""
+        engine = StreamingFeatureEngine()
+        other = make_price_data(seed=1)
+
+        engine.update_from_frame('USDJPY', 'H1', price_data)
+        engine.update_from_frame('EURUSD', 'H1', other)
+        latest = engine.update_from_frame('USDJPY', 'H1', price_data.iloc[-5:])
+
+        assert_row_matches(latest.iloc[0], batch_features.iloc[-1])
+
+        engine.reset('EURUSD')
+        assert not engine.is_ready('EURUSD', 'H1')
+        assert engine.is_ready('USDJPY', 'H1')
+
+
+class TestRingBuffer:
+    """RingBufferのテストクラス"""
+
+    def test_tail_after_wraparound(self):
+        """容量を超えても末尾k件を時系列順に取得できること"""
+        buffer = RingBuffer(4)
+        for value in range(11):
+            buffer.append(float(value))
+
+        assert len(buffer) == 4
+        assert buffer.tail(4).tolist() == [7.0, 8.0, 9.0, 10.0]
+        assert buffer.last(2) == 9.0
+        assert buffer.tail(5) is None
+
+        buffer.pop()
+        buffer.append(20.0)
+        assert buffer.tail(4).tolist() == [7.0, 8.0, 9.0, 20.0]
@@ -32,8 +32,10 @@ def create_backtest_tables():
                         profit_factor DECIMAL(8,4) NOT NULL,
                         max_drawdown DECIMAL(8,4) NOT NULL,
                         sharpe_ratio DECIMAL(8,4) NOT NULL,
-                        parameters TEXT,
-                        statistics TEXT,
+                        parameters JSONB,
+                        statistics JSONB,
+                        return_percent DOUBLE PRECISION GENERATED ALWAYS AS
+                            (COALESCE((statistics->>'return_percent')::double precision, 0)) STORED,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
                 """)
@@ -91,6 +93,19 @@ def create_backtest_tables():
                     ON backtest_results(symbol, timeframe)
                 """)
                 
+                # 結果一覧のキーセットページング用（(並べ替え列, test_id)）
+                for column in ('created_at', 'return_percent', 'sharpe_ratio', 'profit_factor',
+                               'max_drawdown', 'win_rate', 'total_trades', 'final_balance'):
+                    cursor.execute(f"""
+                        CREATE INDEX IF NOT EXISTS idx_backtest_results_{column}_test_id 
+                        ON backtest_results({column}, test_id)
+                    """)
+                
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_backtest_results_symbol_timeframe_created_at 
+                    ON backtest_results(symbol, timeframe, created_at, test_id)
+                """)
+                
                 cursor.execute("""
                     CREATE INDEX IF NOT EXISTS idx_price_data_symbol_timeframe_time 
                     ON price_data(symbol, timeframe, time)
@@ -101,6 +116,11 @@ def create_backtest_tables():
                     ON backtest_equity_curves(test_id, timestamp)
                 """)
                 
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_backtest_trades_test_id_entry_time 
+                    ON backtest_trades(test_id, entry_time)
+                """)
+                
                 conn.commit()
                 logger.info("Backtest tables created successfully")
                 
@@ -177,6 +177,21 @@ CREATE INDEX IF NOT EXISTS idx_performance_stats_period ON performance_stats (pe
 CREATE INDEX IF NOT EXISTS idx_performance_stats_symbol ON performance_stats (symbol, period_start DESC);
 CREATE INDEX IF NOT EXISTS idx_performance_stats_strategy ON performance_stats (strategy_name, period_start DESC);
 
+-- ドローダウンロールアップテーブル（分・時間単位の最小/最大/最終値）
+CREATE TABLE IF NOT EXISTS drawdown_rollups (
+    bucket_size VARCHAR(10) NOT NULL, -- minute, hour
+    bucket_start TIMESTAMP NOT NULL,
+    min_drawdown DOUBLE PRECISION NOT NULL,
+    max_drawdown DOUBLE PRECISION NOT NULL,
+    last_drawdown DOUBLE PRECISION NOT NULL,
+    last_equity DOUBLE PRECISION,
+    peak_equity DOUBLE PRECISION,
+    samples INTEGER NOT NULL DEFAULT 0,
+    metadata JSONB,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (bucket_size, bucket_start)
+);
+
 -- ユーザー認証テーブル
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
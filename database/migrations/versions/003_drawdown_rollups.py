@@ -0,0 +1,40 @@
+"""Drawdown rollups for write-behind drawdown persistence
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add drawdown rollup table"""
+    
+    # ドローダウンロールアップテーブル（分・時間単位の最小/最大/最終値）
+    op.create_table('drawdown_rollups',
+        sa.Column('bucket_size', sa.VARCHAR(length=10), nullable=False),
+        sa.Column('bucket_start', sa.TIMESTAMP(), nullable=False),
+        sa.Column('min_drawdown', sa.Float(), nullable=False),
+        sa.Column('max_drawdown', sa.Float(), nullable=False),
+        sa.Column('last_drawdown', sa.Float(), nullable=False),
+        sa.Column('last_equity', sa.Float()),
+        sa.Column('peak_equity', sa.Float()),
+        sa.Column('samples', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('metadata', postgresql.JSONB()),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.func.current_timestamp()),
+        sa.PrimaryKeyConstraint('bucket_size', 'bucket_start')
+    )
+
+
+def downgrade() -> None:
+    """Drop drawdown rollup table"""
+    op.drop_table('drawdown_rollups')
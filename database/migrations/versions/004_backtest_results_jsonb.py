@@ -0,0 +1,84 @@
+"""Store backtest parameters and statistics as JSONB
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+import ast
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def _literal_to_json(value):
+    """str(dict) で保存した値をJSONに変換（読めない値はNULL）"""
+    if value is None:
+        return None
+    try:
+        return json.dumps(json.loads(value))
+    except ValueError:
+        pass
+    try:
+        return json.dumps(ast.literal_eval(value), default=str)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def upgrade() -> None:
+    """Convert backtest_results.parameters/statistics from TEXT to JSONB"""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('backtest_results'):
+        return
+
+    # 取引履歴は結果毎に全件読むため test_id で引けるようにする
+    if inspector.has_table('backtest_trades'):
+        op.execute("CREATE INDEX IF NOT EXISTS idx_backtest_trades_test_id_entry_time "
+                   "ON backtest_trades (test_id, entry_time)")
+
+    column_types = {column['name']: column['type'] for column in inspector.get_columns('backtest_results')}
+    if isinstance(column_types.get('statistics'), postgresql.JSONB):
+        return
+
+    # 既存行はPythonリテラル（str(dict)）のため、SQLのキャストではなく1行ずつ変換
+    for column in ('parameters', 'statistics'):
+        op.alter_column('backtest_results', column, new_column_name=f'{column}_text')
+        op.add_column('backtest_results', sa.Column(column, postgresql.JSONB()))
+
+    rows = bind.execute(sa.text(
+        "SELECT test_id, parameters_text, statistics_text FROM backtest_results"
+    )).fetchall()
+    for test_id, parameters, statistics in rows:
+        bind.execute(sa.text("""
+            UPDATE backtest_results
+            SET parameters = CAST(:parameters AS jsonb), statistics = CAST(:statistics AS jsonb)
+            WHERE test_id = :test_id
+        """), {
+            'test_id': test_id,
+            'parameters': _literal_to_json(parameters),
+            'statistics': _literal_to_json(statistics)
+        })
+
+    op.drop_column('backtest_results', 'parameters_text')
+    op.drop_column('backtest_results', 'statistics_text')
+
+
+def downgrade() -> None:
+    """Convert backtest_results.parameters/statistics back to TEXT"""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('backtest_results'):
+        return
+
+    op.execute("DROP INDEX IF EXISTS idx_backtest_trades_test_id_entry_time")
+    for column in ('parameters', 'statistics'):
+        op.alter_column('backtest_results', column, type_=sa.Text(),
+                        postgresql_using=f'{column}::text')
@@ -0,0 +1,49 @@
+"""Typed metric column and keyset indexes for the backtest results catalog
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# 一覧の並べ替え列（(列, test_id) のキーセットページング用インデックス）
+SORT_COLUMNS = (
+    'created_at', 'return_percent', 'sharpe_ratio', 'profit_factor',
+    'max_drawdown', 'win_rate', 'total_trades', 'final_balance'
+)
+
+
+def upgrade() -> None:
+    """Add return_percent generated column and catalog indexes"""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('backtest_results'):
+        return
+
+    # statistics(JSONB) から生成する型付き列（既存行も自動で埋まる）
+    op.execute("""
+        ALTER TABLE backtest_results
+        ADD COLUMN IF NOT EXISTS return_percent DOUBLE PRECISION
+        GENERATED ALWAYS AS (COALESCE((statistics->>'return_percent')::double precision, 0)) STORED
+    """)
+
+    for column in SORT_COLUMNS:
+        op.execute(f"CREATE INDEX IF NOT EXISTS idx_backtest_results_{column}_test_id "
+                   f"ON backtest_results ({column}, test_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_backtest_results_symbol_timeframe_created_at "
+               "ON backtest_results (symbol, timeframe, created_at, test_id)")
+
+
+def downgrade() -> None:
+    """Drop catalog indexes and return_percent column"""
+    op.execute("DROP INDEX IF EXISTS idx_backtest_results_symbol_timeframe_created_at")
+    for column in SORT_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS idx_backtest_results_{column}_test_id")
+    op.execute("ALTER TABLE backtest_results DROP COLUMN IF EXISTS return_percent")
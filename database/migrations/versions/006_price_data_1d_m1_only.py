@@ -0,0 +1,79 @@
+"""Rebuild price_data_1d from M1 rows only
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+# 変更前の定義（M1〜H1を合算していたため出来高が重複計上される）
+LEGACY_TIMEFRAMES = "'M1', 'M5', 'M15', 'M30', 'H1'"
+
+
+def _has_daily_aggregate(bind) -> bool:
+    """TimescaleDBの連続集計ビュー price_data_1d が存在するか"""
+    has_timescale = bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb')"
+    )).scalar()
+    if not has_timescale:
+        return False
+    return bind.execute(sa.text("""
+        SELECT EXISTS (
+            SELECT 1 FROM timescaledb_information.continuous_aggregates
+            WHERE view_name = 'price_data_1d'
+        )
+    """)).scalar()
+
+
+def _recreate_daily_aggregate(timeframes: str) -> None:
+    """price_data_1d を作り直し、全期間を再集計"""
+    # CREATE IF NOT EXISTS では既存DBの定義が変わらないため削除して作り直す（ポリシーも削除される）
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS price_data_1d CASCADE")
+    op.execute(f"""
+        CREATE MATERIALIZED VIEW price_data_1d
+        WITH (timescaledb.continuous) AS
+        SELECT
+            time_bucket('1 day', time) as time_bucket,
+            symbol,
+            first(open, time) as open,
+            max(high) as high,
+            min(low) as low,
+            last(close, time) as close,
+            sum(tick_volume) as tick_volume
+        FROM price_data
+        WHERE timeframe IN ({timeframes})
+        GROUP BY time_bucket, symbol
+        WITH NO DATA
+    """)
+    op.execute("""
+        SELECT add_continuous_aggregate_policy('price_data_1d',
+            start_offset => INTERVAL '3 days',
+            end_offset => INTERVAL '1 day',
+            schedule_interval => INTERVAL '1 day')
+    """)
+
+    # リフレッシュポリシーは直近3日分しか集計しないため、過去分はここで集計（トランザクション外で実行）
+    with op.get_context().autocommit_block():
+        op.execute("CALL refresh_continuous_aggregate('price_data_1d', NULL, NULL)")
+
+
+def upgrade() -> None:
+    """Recreate price_data_1d aggregating M1 rows only"""
+    if not _has_daily_aggregate(op.get_bind()):
+        return
+    _recreate_daily_aggregate("'M1'")
+
+
+def downgrade() -> None:
+    """Restore the previous price_data_1d definition"""
+    if not _has_daily_aggregate(op.get_bind()):
+        return
+    _recreate_daily_aggregate(LEGACY_TIMEFRAMES)
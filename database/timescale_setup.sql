@@ -40,6 +40,7 @@ FROM price_data
 WHERE timeframe = 'M1'
 GROUP BY time_bucket, symbol, timeframe;
 
+-- M1のみから集計（複数の時間軸を混ぜると出来高が重複計上される）
 CREATE MATERIALIZED VIEW IF NOT EXISTS price_data_1d
 WITH (timescaledb.continuous) AS
 SELECT 
@@ -51,7 +52,7 @@ SELECT
     last(close, time) as close,
     sum(tick_volume) as tick_volume
 FROM price_data
-WHERE timeframe IN ('M1', 'M5', 'M15', 'M30', 'H1')
+WHERE timeframe = 'M1'
 GROUP BY time_bucket, symbol;
 
 -- 連続集計ビューのリフレッシュポリシー設定